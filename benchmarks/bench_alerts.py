@@ -0,0 +1,125 @@
+# benchmarks/bench_alerts.py
+"""
+Alert queries on a large documents table.
+
+Compares the former approach (fetch every dated document, parse and
+classify in Python) with the SQL-side window of services.alert_service.
+
+    python -m benchmarks.bench_alerts --documents 1000000
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+from benchmarks.bench_services import DATA_DIR, time_callable
+from database import get_connection, init_db
+from services.alert_service import get_document_alerts, get_all_alerts
+
+
+def build_documents_db(documents, vehicles=2000, seed=42):
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    path = DATA_DIR / f"alerts_{documents}_{seed}.db"
+    if path.exists():
+        init_db(path)
+        return path
+
+    rng = random.Random(seed)
+    today = date.today()
+    init_db(path)
+
+    with get_connection(path) as conn:
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executemany(
+            """
+            INSERT INTO vehicules (
+                immatriculation, marque, modele, type_vehicule,
+                type_affectation, statut
+            ) VALUES (?, 'Renault', 'Clio', 'Voiture', 'mutualise', 'disponible')
+            """,
+            [(f"AL-{i:06}",) for i in range(vehicles)],
+        )
+        conn.executemany(
+            """
+            INSERT INTO documents (
+                vehicule_id, type_document, date_echeance, chemin_fichier
+            ) VALUES (?, 'Assurance', ?, 'docs/a.pdf')
+            """,
+            (
+                (
+                    rng.randint(1, vehicles),
+                    # Mostly future deadlines, a few recently overdue
+                    (today + timedelta(days=rng.randint(-30, 3650))).isoformat(),
+                )
+                for _ in range(documents)
+            ),
+        )
+        conn.commit()
+
+    return path
+
+
+def legacy_document_alerts(days_ahead, db_path):
+    """
+    Previous implementation: full scan, classification in Python.
+    """
+    today = date.today()
+    limit_date = today + timedelta(days=days_ahead)
+
+    with get_connection(db_path) as conn:
+        rows = conn.execute("""
+            SELECT d.type_document, d.date_echeance, v.immatriculation
+            FROM documents d
+            JOIN vehicules v ON d.vehicule_id = v.id
+            WHERE d.date_echeance IS NOT NULL
+            ORDER BY d.date_echeance
+        """).fetchall()
+
+    alerts = []
+    for r in rows:
+        echeance = date.fromisoformat(r["date_echeance"])
+        if echeance < today:
+            statut = "retard"
+        elif echeance <= limit_date:
+            statut = "proche"
+        else:
+            continue
+        alerts.append({
+            "type": "Document",
+            "vehicule": r["immatriculation"],
+            "libelle": r["type_document"],
+            "date_echeance": r["date_echeance"],
+            "statut": statut,
+        })
+    return alerts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--documents", type=int, default=1_000_000)
+    parser.add_argument("--days-ahead", type=int, default=30)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    db_path = build_documents_db(args.documents)
+    print(f"Base : {db_path} ({time.perf_counter() - t0:.1f} s)")
+
+    cases = [
+        ("legacy (scan + Python)", lambda: legacy_document_alerts(args.days_ahead, db_path)),
+        ("get_document_alerts", lambda: get_document_alerts(args.days_ahead, db_path)),
+        ("get_all_alerts", lambda: get_all_alerts(args.days_ahead, db_path)),
+    ]
+
+    for name, func in cases:
+        count = len(func())  # warm-up (page cache)
+        timings = time_callable(func, max_repeats=args.repeats, min_total=float("inf"))
+        print(f"{name:<28}{statistics.median(timings):>12.1f} ms  ({count} alertes)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+# benchmarks/bench_analytics.py
+"""
+Dashboard statistics: SQL (services.dashboard_service) against the
+numpy arrays of services.analytics_service.
+
+Reports the one-off array load, the incremental refresh and, per
+statistic, the SQL time against the vectorised time on loaded arrays.
+
+    python -m benchmarks.bench_analytics --size large
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from benchmarks.bench_services import SIZES, _work_copy, dataset_path, time_callable
+from services import dashboard_service
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--size", choices=list(SIZES), default="medium")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    from services import analytics_service as analytics
+    try:
+        analytics._require_numpy()
+    except analytics.AnalyticsError as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 2
+
+    db_path = _work_copy(dataset_path(args.size))
+    analytics.reset_arrays(db_path)
+
+    t0 = time.perf_counter()
+    arrays = analytics.get_arrays(db_path)
+    rows = {table: len(cols["id"]) for table, cols in arrays.tables.items()}
+    print(f"Chargement des tableaux : {(time.perf_counter() - t0) * 1000:.0f} ms  {rows}")
+
+    refresh = time_callable(arrays.refresh, max_repeats=args.repeats, min_total=float("inf"))
+    print(f"Rafraîchissement incrémental (rien de neuf) : {statistics.median(refresh):.2f} ms")
+    print()
+
+    cases = [
+        ("fleet_summary", dashboard_service.get_fleet_summary, analytics.fleet_summary),
+        ("detailed_costs_by_vehicle", dashboard_service.get_detailed_costs_by_vehicle,
+         analytics.detailed_costs_by_vehicle),
+        ("mileage_by_period", dashboard_service.get_mileage_by_period, analytics.mileage_by_period),
+        ("cost_evolution", dashboard_service.get_cost_evolution, analytics.cost_evolution),
+        ("cost_per_km_percentiles", None, analytics.cost_per_km_percentiles),
+        ("rolling_daily_costs", None, analytics.rolling_daily_costs),
+    ]
+
+    print(f"{'statistique':<30}{'SQL (ms)':>12}{'numpy (ms)':>12}")
+    for name, sql, vectorised in cases:
+        sql_ms = "-"
+        if sql is not None:
+            # Undecorated: the stats cache would answer every repeat
+            timings = time_callable(lambda: sql.__wrapped__(db_path=db_path),
+                                    max_repeats=args.repeats, min_total=float("inf"))
+            sql_ms = f"{statistics.median(timings):.1f}"
+        timings = time_callable(lambda: vectorised(db_path=db_path),
+                                max_repeats=args.repeats, min_total=float("inf"))
+        print(f"{name:<30}{sql_ms:>12}{statistics.median(timings):>12.1f}")
+
+    analytics.reset_arrays(db_path)
+    db_path.unlink()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
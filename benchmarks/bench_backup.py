@@ -0,0 +1,158 @@
+# benchmarks/bench_backup.py
+"""
+Check-out latency while the database is being backed up.
+
+A writer thread records check-outs (reservation_service.create_reservation,
+then return_vehicle so that the vehicle is available again) every
+--interval-ms on a copy of a synthetic dataset, first alone, then while
+another thread takes backups in a loop (services.backup_service): copied
+in one step (the source is locked for the whole copy), then a few
+hundred pages per step with a pause between steps. Reports the
+create_reservation latency (p50 / p95 / max) and the backups taken in
+each phase; fails (exit code 1) when the p95 during stepped backups
+exceeds --max-p95-ms.
+
+    python -m benchmarks.bench_backup --size medium --seconds 5
+"""
+import argparse
+import shutil
+import statistics
+import sys
+import threading
+import time
+from datetime import date
+
+from benchmarks.bench_services import SIZES, _work_copy, dataset_path
+from database import get_connection
+
+
+def _fleet(db_path, count):
+    """[vehicle id, km] of `count` available vehicles, and eligible drivers."""
+    with get_connection(db_path) as conn:
+        vehicles = [
+            [r["id"], r["kilometrage_actuel"] or 0]
+            for r in conn.execute(
+                "SELECT id, kilometrage_actuel FROM vehicules WHERE statut = 'disponible' ORDER BY id LIMIT ?",
+                (count,),
+            )
+        ]
+        drivers = [
+            r["id"]
+            for r in conn.execute(
+                """
+                SELECT id FROM employes
+                WHERE autorise_conduire = 1 AND date_validite_permis >= ?
+                ORDER BY id LIMIT ?
+                """,
+                (date.today().isoformat(), count),
+            )
+        ]
+    return vehicles, drivers
+
+
+def writer(db_path, vehicles, drivers, interval, stop, latencies, errors):
+    from services.reservation_service import create_reservation, return_vehicle
+
+    today = date.today().isoformat()
+    n = 0
+    while not stop.is_set():
+        vehicle = vehicles[n % len(vehicles)]
+        t0 = time.perf_counter()
+        try:
+            create_reservation(
+                vehicle[0], drivers[n % len(drivers)], today, "08:00", today, "18:00",
+                vehicle[1], "Benchmark", "Siège", db_path=db_path,
+            )
+        except Exception as e:  # database is locked, ...
+            errors.append(str(e))
+        else:
+            latencies.append((time.perf_counter() - t0) * 1000)
+            with get_connection(db_path) as conn:
+                reservation_id = conn.execute(
+                    "SELECT MAX(id) FROM sorties_reservations WHERE vehicule_id = ? AND statut = 'en sortie'",
+                    (vehicle[0],),
+                ).fetchone()[0]
+            vehicle[1] += 10
+            return_vehicle(reservation_id, vehicle[1], "propre", "plein", db_path=db_path)
+        n += 1
+        time.sleep(interval)
+
+
+def backups(db_path, directory, pages, pause, stop, results):
+    from services.backup_service import create_backup
+
+    while not stop.is_set():
+        results.append(create_backup(db_path, directory, keep=2, pages=pages, pause=pause))
+
+
+def run(db_path, directory, seconds, interval, vehicles, drivers, pages=None, pause=0.0):
+    stop = threading.Event()
+    latencies, errors, taken = [], [], []
+    threads = [threading.Thread(target=writer, args=(db_path, vehicles, drivers, interval, stop, latencies, errors))]
+    if pages is not None:
+        threads.append(threading.Thread(target=backups, args=(db_path, directory, pages, pause, stop, taken)))
+
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return latencies, errors, taken
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] if ordered else 0.0
+
+
+def main(argv=None):
+    from services.snapshot_service import DEFAULT_PAGES, DEFAULT_PAUSE
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--size", choices=list(SIZES), default="medium")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Durée de chaque phase")
+    parser.add_argument("--interval-ms", type=float, default=10.0, help="Pause entre deux sorties")
+    parser.add_argument("--pages", type=int, default=DEFAULT_PAGES)
+    parser.add_argument("--pause", type=float, default=DEFAULT_PAUSE)
+    parser.add_argument("--max-p95-ms", type=float, default=50.0)
+    args = parser.parse_args(argv)
+
+    db_path = _work_copy(dataset_path(args.size))
+    directory = db_path.with_name(f"{db_path.stem}_sauvegardes")
+    vehicles, drivers = _fleet(db_path, 20)
+
+    phases = [
+        ("sans sauvegarde", None, 0.0),
+        ("une étape", -1, 0.0),
+        (f"{args.pages} pages / étape", args.pages, args.pause),
+    ]
+    print(f"{'phase':<22}{'sorties':>8}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}{'erreurs':>9}  sauvegardes")
+    p95 = 0.0
+    try:
+        for name, pages, pause in phases:
+            latencies, errors, taken = run(
+                db_path, directory, args.seconds, args.interval_ms / 1000,
+                vehicles, drivers, pages, pause,
+            )
+            p95 = percentile(latencies, 95)
+            detail = ""
+            if taken:
+                detail = (
+                    f"{len(taken)} x {statistics.median(r['secondes'] for r in taken):.2f} s, "
+                    f"{sum(r['redemarrages'] for r in taken)} redémarrage(s)"
+                )
+            print(f"{name:<22}{len(latencies):>8}{percentile(latencies, 50):>9.1f}{p95:>9.1f}"
+                  f"{max(latencies, default=0):>9.1f}{len(errors):>9}  {detail}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+        db_path.unlink()
+
+    if p95 > args.max_p95_ms:
+        print(f"Erreur : p95 supérieur à {args.max_p95_ms} ms pendant les sauvegardes", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
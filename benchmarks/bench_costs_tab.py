@@ -0,0 +1,85 @@
+# benchmarks/bench_costs_tab.py
+"""
+Costs tab of the statistics window (get_detailed_costs_by_vehicle).
+
+Former query (maintenances classified by LIKE patterns on
+type_intervention, refuels summed by a correlated subquery per vehicle)
+against the current one (categorie column, one grouped pass per table).
+Both must return the same rows.
+
+    python -m benchmarks.bench_costs_tab --sizes small medium large
+"""
+import argparse
+import statistics
+import sys
+
+from benchmarks.bench_services import SIZES, _work_copy, dataset_path, time_callable
+from database import get_connection
+from services.dashboard_service import get_detailed_costs_by_vehicle
+
+LIKE_QUERY = """
+    SELECT
+        v.id,
+        v.immatriculation,
+        v.marque,
+        v.modele,
+        COALESCE(SUM(CASE WHEN m.type_intervention LIKE '%carburant%'
+            OR m.type_intervention LIKE '%essence%'
+            OR m.type_intervention LIKE '%diesel%'
+            OR m.type_intervention LIKE '%ravitaillement%'
+            THEN m.cout ELSE 0 END), 0) +
+        COALESCE((SELECT SUM(r.cout) FROM ravitaillements r WHERE r.vehicule_id = v.id), 0) as cout_carburant,
+        COALESCE(SUM(CASE WHEN m.type_intervention NOT LIKE '%carburant%'
+            AND m.type_intervention NOT LIKE '%essence%'
+            AND m.type_intervention NOT LIKE '%diesel%'
+            AND m.type_intervention NOT LIKE '%ravitaillement%'
+            AND m.type_intervention NOT LIKE '%assurance%'
+            THEN m.cout ELSE 0 END), 0) as cout_maintenance,
+        COALESCE(SUM(CASE WHEN m.type_intervention LIKE '%assurance%'
+            THEN m.cout ELSE 0 END), 0) as cout_assurance,
+        COALESCE(SUM(m.cout), 0) +
+        COALESCE((SELECT SUM(r.cout) FROM ravitaillements r WHERE r.vehicule_id = v.id), 0) as cout_total
+    FROM vehicules v
+    LEFT JOIN maintenances m ON v.id = m.vehicule_id
+    GROUP BY v.id, v.immatriculation, v.marque, v.modele
+    ORDER BY cout_total DESC
+"""
+
+
+def like_query(db_path):
+    with get_connection(db_path) as conn:
+        return conn.execute(LIKE_QUERY).fetchall()
+
+
+def _rounded(row):
+    return {k: round(v, 6) if isinstance(v, float) else v for k, v in dict(row).items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small", "medium"])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    print(f"{'jeu':<10}{'LIKE (ms)':>12}{'categorie (ms)':>16}")
+    for size in args.sizes:
+        db_path = _work_copy(dataset_path(size))
+
+        # Rows are summed in index order: compare rounded
+        before = [_rounded(r) for r in like_query(db_path)]
+        after = [_rounded(r) for r in get_detailed_costs_by_vehicle.__wrapped__(db_path=db_path)]
+        if before != after:
+            print(f"Erreur : résultats différents ({size})", file=sys.stderr)
+            return 1
+
+        like_ms = time_callable(lambda: like_query(db_path), max_repeats=args.repeats, min_total=float("inf"))
+        column_ms = time_callable(lambda: get_detailed_costs_by_vehicle.__wrapped__(db_path=db_path),
+                                  max_repeats=args.repeats, min_total=float("inf"))
+        print(f"{size:<10}{statistics.median(like_ms):>12.2f}{statistics.median(column_ms):>16.2f}")
+        db_path.unlink()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+# benchmarks/bench_fleet_pdf.py
+"""
+Complete fleet PDF report for a large fleet.
+
+Renders the costs and utilisation tables of every vehicle with
+services.report_service.render_fleet_pdf (page-sized tables, optional
+worker processes) and, unless --skip-legacy, with one auto-sized table
+per section as the former export did. Reports pages/sec.
+
+    python -m benchmarks.bench_fleet_pdf --vehicles 10000 --workers 1 4
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from services.report_service import render_fleet_pdf
+
+
+def synthetic_rows(vehicles, seed=42):
+    rng = random.Random(seed)
+    costs, utilization = [], []
+
+    for i in range(vehicles):
+        plate = f"{rng.choice('ABCDEFGH')}{rng.choice('ABCDEFGH')}-{i:03}-XY"
+        fuel = rng.uniform(200, 4000)
+        repairs = rng.uniform(0, 3000)
+        insurance = rng.uniform(300, 900)
+        costs.append({
+            "immatriculation": plate,
+            "cout_carburant": fuel,
+            "cout_maintenance": repairs,
+            "cout_assurance": insurance,
+            "cout_total": fuel + repairs + insurance,
+        })
+        days = rng.randint(0, 30)
+        utilization.append({
+            "immatriculation": plate,
+            "nombre_sorties": days + rng.randint(0, 5),
+            "jours_utilises": days,
+            "km_parcourus": days * rng.randint(20, 150),
+            "taux_utilisation": round(days * 100.0 / 30, 1),
+        })
+
+    summary = {"total": vehicles, "available": vehicles, "en_sortie": 0, "maintenance": 0}
+    return summary, costs, utilization
+
+
+def legacy_fleet_pdf(path, costs, utilization):
+    """
+    Former layout without the 10-row cut: one Table per section, sized
+    by reportlab and split at every page break. Returns the page count.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Table, TableStyle
+
+    styles = getSampleStyleSheet()
+    elements = []
+    sections = [
+        (["Immatriculation", "Carburant", "Maintenance", "Assurance", "Total"],
+         [[r["immatriculation"], f"{r['cout_carburant']:.2f} €", f"{r['cout_maintenance']:.2f} €",
+           f"{r['cout_assurance']:.2f} €", f"{r['cout_total']:.2f} €"] for r in costs]),
+        (["Véhicule", "Sorties", "Jours utilisés", "Km parcourus", "Taux (%)"],
+         [[r["immatriculation"], str(r["nombre_sorties"]), str(r["jours_utilises"]),
+           f"{r['km_parcourus']} km", f"{r['taux_utilisation']}%"] for r in utilization]),
+    ]
+
+    for headers, rows in sections:
+        elements.append(Paragraph("Section", styles["Heading2"]))
+        table = Table([headers] + rows, repeatRows=1)
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1976D2')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ]))
+        elements.append(table)
+
+    doc = SimpleDocTemplate(str(path), pagesize=A4, leftMargin=2 * cm, rightMargin=2 * cm)
+    doc.build(elements)
+    return doc.page
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--vehicles", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--skip-legacy", action="store_true",
+                        help="Sans le rendu en un seul tableau (très lent au-delà de quelques milliers de lignes)")
+    args = parser.parse_args(argv)
+
+    summary, costs, utilization = synthetic_rows(args.vehicles)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if not args.skip_legacy:
+            t0 = time.perf_counter()
+            pages = legacy_fleet_pdf(Path(tmp) / "legacy.pdf", costs, utilization)
+            elapsed = time.perf_counter() - t0
+            print(f"{'tableau unique':<24}{pages:>6} pages {elapsed:>8.2f} s {pages / elapsed:>8.1f} pages/s")
+
+        for workers in args.workers:
+            stats = render_fleet_pdf(Path(tmp) / f"fleet_{workers}.pdf", summary, costs, utilization,
+                                     max_workers=workers)
+            label = f"paginé, {workers} processus"
+            print(f"{label:<24}{stats['pages']:>6} pages {stats['secondes']:>8.2f} s "
+                  f"{stats['pages_par_seconde']:>8.1f} pages/s  ({stats['parties']} partie(s))")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# benchmarks/bench_report_charts.py
+"""
+Statistics window charts refreshed 100 times, off screen (Agg).
+
+Draws the chart data of gui.reports for a synthetic dataset, changed a
+little on every refresh, either on figures kept across refreshes
+(gui.charts.Chart, as ReportsWindow does) or on a new Figure and canvas
+per refresh (the former behaviour), then refreshes with unchanged data
+(skipped by the hash). Reports ms per refresh and the process RSS every
+10 refreshes; fails (exit code 1) when the RSS of the kept figures grows
+by more than --max-growth-mb after the first 10 refreshes.
+
+    python -m benchmarks.bench_report_charts --size small --refreshes 100
+"""
+import argparse
+import gc
+import os
+import resource
+import statistics
+import sys
+import time
+
+from benchmarks.bench_services import SIZES, _work_copy, dataset_path
+
+
+def rss_mb():
+    """Resident set size (peak size where /proc is not available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def vary(data, step):
+    """The same chart data with every number shifted by step % 5."""
+    if isinstance(data, tuple):
+        return tuple(vary(item, step) for item in data)
+    if isinstance(data, (int, float)) and not isinstance(data, bool):
+        return data + step % 5
+    return data
+
+
+def run(mode, data, refreshes, Chart, renderers, rows):
+    charts = {}
+    timings, samples = [], []
+
+    for step in range(refreshes):
+        current = data if mode == "inchangé" else {key: vary(values, step) for key, values in data.items()}
+        t0 = time.perf_counter()
+        for key, values in current.items():
+            if mode == "recréation" or key not in charts:
+                charts[key] = Chart((12, 6), rows.get(key, 1))
+            charts[key].refresh(values, renderers[key])
+        timings.append((time.perf_counter() - t0) * 1000)
+        if step % 10 == 9:
+            gc.collect()
+            samples.append(rss_mb())
+
+    return timings, samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--size", choices=list(SIZES), default="small")
+    parser.add_argument("--refreshes", type=int, default=100)
+    parser.add_argument("--max-growth-mb", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    try:
+        from gui.charts import Chart
+        from gui.reports import CHART_ROWS, RENDERERS, chart_data
+    except ImportError as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 2
+
+    db_path = _work_copy(dataset_path(args.size))
+    data = chart_data(db_path)
+    db_path.unlink()
+
+    print(f"{'mode':<14}{'ms / rafraîchissement':>24}  RSS (Mo) tous les 10")
+    growth = 0.0
+    for mode in ("réutilisation", "recréation", "inchangé"):
+        timings, samples = run(mode, data, args.refreshes, Chart, RENDERERS, CHART_ROWS)
+        print(f"{mode:<14}{statistics.median(timings):>24.1f}  "
+              + " ".join(f"{s:.0f}" for s in samples))
+        if mode == "réutilisation" and samples:
+            growth = samples[-1] - samples[0]
+
+    print(f"Croissance RSS (figures conservées) : {growth:+.1f} Mo")
+    if growth > args.max_growth_mb:
+        print(f"Erreur : RSS en hausse de plus de {args.max_growth_mb} Mo", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,415 @@
+# benchmarks/bench_services.py
+"""
+Service-layer benchmark suite.
+
+Times the public service functions on synthetic databases of increasing
+size (see utils/synthetic_data), writes the results as JSON and compares
+them against a stored baseline.
+
+    python -m benchmarks.bench_services --sizes small medium
+    python -m benchmarks.bench_services --output results.json
+    python -m benchmarks.bench_services --save-baseline
+    python -m benchmarks.bench_services --baseline benchmarks/baseline.json --tolerance 0.25
+
+Exit status is 1 when a function is slower than its baseline by more
+than the tolerance (and by more than the absolute noise floor).
+tests/test_bench_services.py runs this gate on the small dataset.
+
+A change that makes a function slower on purpose (more rows read, a new
+hook on a write path) re-records the baseline in the same commit, on a
+quiet machine, and checks the gate passes again:
+
+    python -m benchmarks.bench_services --save-baseline
+    python -m benchmarks.bench_services --baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+from database import get_connection, init_db
+from utils.synthetic_data import generate_dataset
+
+BENCH_DIR = Path(__file__).resolve().parent
+DATA_DIR = BENCH_DIR / "_data"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+
+# Fixed end date so that cached datasets and baselines stay comparable
+DATASET_END_DATE = date(2026, 1, 1)
+
+SIZES = {
+    "small": {"vehicles": 20, "employees": 15, "years": 1},
+    "medium": {"vehicles": 200, "employees": 100, "years": 2},
+    "large": {"vehicles": 1500, "employees": 500, "years": 5},
+}
+
+# Regressions smaller than this (ms) are considered timer noise
+NOISE_FLOOR_MS = 2.0
+
+_BENCHMARKS = {}
+
+
+def benchmark(name, max_repeats=20):
+    """
+    Register a benchmark. The decorated function receives a context dict
+    (db_path, ids...) and returns a zero-argument callable to time, or
+    None to skip on this dataset.
+    """
+    def decorator(factory):
+        _BENCHMARKS[name] = (factory, max_repeats)
+        return factory
+    return decorator
+
+
+# ============================================================================
+# DATASETS
+# ============================================================================
+
+def dataset_path(size, seed=42):
+    """
+    Return the cached dataset for `size`, generating it on first use.
+    """
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    path = DATA_DIR / f"{size}_{seed}.db"
+
+    if not path.exists():
+        tmp = path.with_suffix(".tmp")
+        if tmp.exists():
+            tmp.unlink()
+        generate_dataset(tmp, seed=seed, end_date=DATASET_END_DATE, **SIZES[size])
+        tmp.rename(path)
+
+    return path
+
+
+def _work_copy(path):
+    """
+    Write benchmarks mutate data: run them on a throw-away copy,
+    brought up to the current schema (indexes, new tables) with its
+    aggregates current, as in the running application.
+    """
+    from services.rollup_service import refresh_rollups
+
+    work = path.with_name(f"{path.stem}_work.db")
+    shutil.copyfile(path, work)
+    init_db(work)
+    refresh_rollups(work)
+    return work
+
+
+def _context(db_path):
+    with get_connection(db_path) as conn:
+        vehicule_id = conn.execute(
+            "SELECT id FROM vehicules WHERE statut = 'disponible' ORDER BY id LIMIT 1"
+        ).fetchone()[0]
+        employe_id = conn.execute(
+            """
+            SELECT id FROM employes
+            WHERE autorise_conduire = 1 AND date_validite_permis >= ?
+            ORDER BY id LIMIT 1
+            """,
+            (date.today().isoformat(),),
+        ).fetchone()[0]
+        km = conn.execute(
+            "SELECT kilometrage_actuel FROM vehicules WHERE id = ?",
+            (vehicule_id,),
+        ).fetchone()[0]
+
+    return {
+        "db_path": db_path,
+        "vehicule_id": vehicule_id,
+        "employe_id": employe_id,
+        "km": km,
+    }
+
+
+# ============================================================================
+# READ BENCHMARKS
+# ============================================================================
+
+def _register_reads():
+    from services import (
+        alert_service,
+        dashboard_service,
+        document_service,
+        employee_service,
+        fuel_service,
+        log_service,
+        maintenance_service,
+        reservation_service,
+        vehicle_service,
+    )
+
+    reads = [
+        dashboard_service.get_fleet_summary,
+        dashboard_service.get_available_vehicles,
+        dashboard_service.get_vehicle_type_counts,
+        dashboard_service.get_maintenance_costs_by_vehicle,
+        dashboard_service.get_total_mileage,
+        dashboard_service.get_mileage_by_vehicle,
+        dashboard_service.get_mileage_by_period,
+        dashboard_service.get_detailed_costs_by_vehicle,
+        dashboard_service.get_vehicle_utilization_rate,
+        dashboard_service.get_most_active_employees,
+        dashboard_service.get_average_consumption_by_vehicle,
+        dashboard_service.get_average_consumption_by_type,
+        dashboard_service.get_cost_evolution,
+        alert_service.get_document_alerts,
+        alert_service.get_maintenance_alerts,
+        alert_service.get_all_alerts,
+        document_service.get_expiring_documents,
+        employee_service.get_all_employees,
+        employee_service.get_authorized_employees,
+        fuel_service.get_all_fuel_entries,
+        log_service.get_logs,
+        maintenance_service.get_all_maintenances,
+        reservation_service.get_all_reservations,
+        vehicle_service.get_vehicles,
+        vehicle_service.get_available_vehicles,
+    ]
+
+    for func in reads:
+        name = f"{func.__module__.split('.')[-1]}.{func.__name__}"
+        # Time the SQL, not the in-process stats cache
+        func = getattr(func, "__wrapped__", func)
+
+        def factory(ctx, func=func):
+            return lambda: func(db_path=ctx["db_path"])
+
+        benchmark(name)(factory)
+
+    cached_stats = [f for f in reads if hasattr(f, "__wrapped__")]
+
+    @benchmark("dashboard_service.refresh_all (cache)")
+    def _bench_cached_refresh(ctx):
+        # Every dashboard statistic once, as a window refresh does,
+        # once the first window has filled the cache
+        def refresh():
+            return [f(db_path=ctx["db_path"]) for f in cached_stats]
+
+        refresh()
+        return refresh
+
+
+@benchmark("fuel_service.compute_last_consumption_l_per_100km")
+def _bench_consumption(ctx):
+    from services.fuel_service import compute_last_consumption_l_per_100km
+    return lambda: compute_last_consumption_l_per_100km(ctx["vehicule_id"], db_path=ctx["db_path"])
+
+
+@benchmark("maintenance_service.get_maintenances_for_vehicle")
+def _bench_maintenances_for_vehicle(ctx):
+    from services.maintenance_service import get_maintenances_for_vehicle
+    return lambda: get_maintenances_for_vehicle(ctx["vehicule_id"], db_path=ctx["db_path"])
+
+
+@benchmark("document_service.get_documents_for_vehicle")
+def _bench_documents_for_vehicle(ctx):
+    from services.document_service import get_documents_for_vehicle
+    return lambda: get_documents_for_vehicle(ctx["vehicule_id"], db_path=ctx["db_path"])
+
+
+@benchmark("affectation_service.get_active_affectation")
+def _bench_active_affectation(ctx):
+    from services.affectation_service import get_active_affectation
+    return lambda: get_active_affectation(ctx["vehicule_id"], db_path=ctx["db_path"])
+
+
+# ============================================================================
+# WRITE BENCHMARKS
+# ============================================================================
+
+@benchmark("reservation_service.create_reservation+return_vehicle")
+def _bench_reservation_cycle(ctx):
+    from services.reservation_service import create_reservation, return_vehicle
+
+    state = {"km": ctx["km"]}
+
+    def run():
+        today = date.today().isoformat()
+        create_reservation(
+            ctx["vehicule_id"], ctx["employe_id"],
+            today, "08:00", today, "18:00",
+            state["km"], "Benchmark", "Paris",
+            db_path=ctx["db_path"],
+        )
+        with get_connection(ctx["db_path"]) as conn:
+            reservation_id = conn.execute(
+                "SELECT MAX(id) FROM sorties_reservations"
+            ).fetchone()[0]
+        state["km"] += 10
+        return_vehicle(reservation_id, state["km"], "propre", "plein", db_path=ctx["db_path"])
+
+    return run
+
+
+@benchmark("log_service.log_action")
+def _bench_log_action(ctx):
+    from services.log_service import log_action
+    return lambda: log_action("benchmark", details="bench", db_path=ctx["db_path"])
+
+
+@benchmark("fuel_service.record_fuel")
+def _bench_record_fuel(ctx):
+    from services.fuel_service import record_fuel
+    return lambda: record_fuel(
+        ctx["vehicule_id"], ctx["employe_id"], date.today().isoformat(),
+        40.0, 72.0, station="Total", db_path=ctx["db_path"],
+    )
+
+
+@benchmark("maintenance_service.record_maintenance")
+def _bench_record_maintenance(ctx):
+    from services.maintenance_service import record_maintenance
+    return lambda: record_maintenance(
+        ctx["vehicule_id"], date.today().isoformat(), "Vidange",
+        cout=90.0, db_path=ctx["db_path"],
+    )
+
+
+@benchmark("document_service.add_document")
+def _bench_add_document(ctx):
+    from services.document_service import add_document
+    return lambda: add_document(
+        ctx["vehicule_id"], "Assurance", "docs/bench.pdf",
+        date_echeance=date.today().isoformat(), db_path=ctx["db_path"],
+    )
+
+
+@benchmark("auth.authenticate_user", max_repeats=3)
+def _bench_authenticate(ctx):
+    from auth import authenticate_user
+    return lambda: authenticate_user("admin", "admin123", db_path=ctx["db_path"])
+
+
+# ============================================================================
+# RUNNER
+# ============================================================================
+
+def time_callable(func, max_repeats=20, min_total=0.2):
+    """
+    Call `func` until `min_total` seconds have elapsed (at least once,
+    at most `max_repeats` times). Returns timings in milliseconds.
+    """
+    timings = []
+    started = time.perf_counter()
+
+    while len(timings) < max_repeats:
+        t0 = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - t0) * 1000)
+        if time.perf_counter() - started >= min_total:
+            break
+
+    return timings
+
+
+def run_suite(sizes, only=None, seed=42, verbose=True):
+    _register_reads()
+
+    results = {}
+
+    for size in sizes:
+        work = _work_copy(dataset_path(size, seed))
+        ctx = _context(work)
+        results[size] = {}
+
+        for name, (factory, max_repeats) in sorted(_BENCHMARKS.items()):
+            if only and not any(pattern in name for pattern in only):
+                continue
+
+            func = factory(ctx)
+            if func is None:
+                continue
+
+            timings = time_callable(func, max_repeats=max_repeats)
+            results[size][name] = {
+                "median_ms": round(statistics.median(timings), 3),
+                "min_ms": round(min(timings), 3),
+                "repeats": len(timings),
+            }
+
+            if verbose:
+                print(f"[{size}] {name:<62}{results[size][name]['median_ms']:>12.3f} ms")
+
+        work.unlink()
+
+    return {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare_results(current, baseline, tolerance=0.25, noise_floor_ms=NOISE_FLOOR_MS):
+    """
+    Return a list of (size, name, baseline_ms, current_ms) regressions.
+    Functions absent from the baseline are ignored.
+    """
+    regressions = []
+
+    for size, functions in current["results"].items():
+        reference = baseline.get("results", {}).get(size, {})
+
+        for name, result in functions.items():
+            if name not in reference:
+                continue
+
+            before = reference[name]["median_ms"]
+            after = result["median_ms"]
+
+            if after > before * (1 + tolerance) and after - before > noise_floor_ms:
+                regressions.append((size, name, before, after))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small", "medium"])
+    parser.add_argument("--only", nargs="+", help="Sous-chaînes des benchmarks à exécuter")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    parser.add_argument("--baseline", help="Fichier de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Ralentissement relatif toléré (0.25 = +25 %%)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help=f"Enregistrer les résultats comme référence ({DEFAULT_BASELINE.name})")
+    args = parser.parse_args(argv)
+
+    current = run_suite(args.sizes, only=args.only, seed=args.seed)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(current, indent=2), encoding="utf-8")
+
+    if args.save_baseline:
+        DEFAULT_BASELINE.write_text(json.dumps(current, indent=2), encoding="utf-8")
+        print(f"Référence enregistrée : {DEFAULT_BASELINE}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_results(current, baseline, args.tolerance)
+
+        for size, name, before, after in regressions:
+            print(f"REGRESSION [{size}] {name}: {before:.3f} ms -> {after:.3f} ms", file=sys.stderr)
+
+        if regressions:
+            return 1
+        print("Aucune régression au-delà de la tolérance")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
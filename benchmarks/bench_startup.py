@@ -0,0 +1,128 @@
+# benchmarks/bench_startup.py
+"""
+Application startup: time until the login window is shown.
+
+Runs `python -X importtime -c "import main"` in fresh interpreters and
+reports the cumulative import time of main.py with its heaviest
+modules, then (when a display is available) the wall time of a process
+that imports main, initialises a temporary database and draws the
+LoginWindow. Fails (exit code 1) above --target-ms or when a module
+meant to be loaded on first use (matplotlib, reportlab, report and
+maintenance windows) is imported at startup.
+
+    python -m benchmarks.bench_startup --repeats 5 --target-ms 300
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Loaded when their window is first opened, never before the login window
+LAZY_MODULES = (
+    "matplotlib",
+    "reportlab",
+    "gui.dashboard",
+    "gui.reports",
+    "gui.maintenance",
+    "services.report_service",
+)
+
+_LOGIN_WINDOW = """
+import sys
+import tkinter as tk
+import main
+from database import init_db
+main.DB_PATH = sys.argv[1]
+init_db(main.DB_PATH)
+try:
+    app = main.LoginWindow()
+except tk.TclError:
+    sys.exit(3)
+app.update()
+app.destroy()
+"""
+
+
+def import_times(code="import main"):
+    """
+    {module: (self µs, cumulative µs)} of one fresh interpreter running `code`.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header line
+        times.setdefault(name.strip(), (int(self_us), int(cumulative_us)))
+    return times
+
+
+def login_window_ms():
+    """
+    Wall time (ms) of a process drawing the login window, None without display.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", _LOGIN_WINDOW, os.path.join(tmp, "startup.db")],
+            cwd=ROOT, capture_output=True, text=True,
+        )
+        elapsed = (time.perf_counter() - t0) * 1000
+    if result.returncode == 3:
+        return None
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Modules les plus lents affichés")
+    parser.add_argument("--target-ms", type=float, default=300.0,
+                        help="Temps maximal jusqu'à la fenêtre de connexion")
+    args = parser.parse_args(argv)
+
+    runs = [import_times() for _ in range(args.repeats)]
+    import_ms = statistics.median(r["main"][1] for r in runs) / 1000
+    print(f"import main : {import_ms:.0f} ms (médiane de {args.repeats})")
+
+    last = runs[-1]
+    print(f"{'module':<45}{'cumulé (ms)':>12}")
+    for name, (_, cumulative) in sorted(last.items(), key=lambda item: -item[1][1])[1:args.top + 1]:
+        print(f"{name:<45}{cumulative / 1000:>12.1f}")
+
+    failed = False
+    eager = [m for m in LAZY_MODULES if m in last]
+    if eager:
+        print(f"Erreur : importés au démarrage : {', '.join(eager)}", file=sys.stderr)
+        failed = True
+
+    window = [login_window_ms() for _ in range(args.repeats)]
+    if None in window:
+        print("Fenêtre de connexion : pas d'affichage, seul l'import est mesuré")
+        startup_ms = import_ms
+    else:
+        startup_ms = statistics.median(window)
+        print(f"Fenêtre de connexion : {startup_ms:.0f} ms (processus complet)")
+
+    if startup_ms > args.target_ms:
+        print(f"Erreur : {startup_ms:.0f} ms > objectif {args.target_ms:.0f} ms", file=sys.stderr)
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
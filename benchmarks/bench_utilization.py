@@ -0,0 +1,82 @@
+# benchmarks/bench_utilization.py
+"""
+Utilisation rate of a fleet with 1M reservations.
+
+Generates random trips (a few hours to a few days, some overlapping)
+and times services.analytics_service.occupied_minutes per day, week
+and month over one year, against the pure Python sweep of
+dashboard_service.get_vehicle_utilization_rate (one window per vehicle).
+
+    python -m benchmarks.bench_utilization --reservations 1000000 --vehicles 2000
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+
+from services.dashboard_service import _occupied_time
+
+
+def synthetic_trips(np, reservations, vehicles, year, seed=42):
+    rng = np.random.default_rng(seed)
+    origin = np.datetime64(f"{year}-01-01T00:00", "m")
+    vehicle = rng.integers(0, vehicles, reservations)
+    start = origin + rng.integers(0, 365 * 24 * 60, reservations).astype("timedelta64[m]")
+    # Mostly same-day trips, one in ten over several days
+    hours = np.where(rng.random(reservations) < 0.9,
+                     rng.integers(1, 10, reservations), rng.integers(24, 96, reservations))
+    end = start + (hours * 60).astype("timedelta64[m]")
+    return vehicle, start, end
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--reservations", type=int, default=1_000_000)
+    parser.add_argument("--vehicles", type=int, default=2_000)
+    parser.add_argument("--year", type=int, default=2025)
+    parser.add_argument("--skip-python", action="store_true",
+                        help="Sans le balayage en Python pur (plusieurs secondes à 1M de sorties)")
+    args = parser.parse_args(argv)
+
+    from services import analytics_service as analytics
+    try:
+        analytics._require_numpy()
+    except analytics.AnalyticsError as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 2
+    import numpy as np
+
+    vehicle, start, end = synthetic_trips(np, args.reservations, args.vehicles, args.year)
+    first, last = f"{args.year}-01-01", f"{args.year}-12-31"
+    print(f"{args.reservations} sorties, {args.vehicles} véhicules, {first} → {last}")
+
+    totals = None
+    for granularity in analytics.GRANULARITIES:
+        edges = analytics._bucket_edges(first, last, granularity)
+        t0 = time.perf_counter()
+        minutes = analytics.occupied_minutes(vehicle, start, end, edges, args.vehicles)
+        elapsed = time.perf_counter() - t0
+        totals = minutes.sum(axis=1)
+        print(f"numpy, par {granularity:<6}{len(edges) - 1:>5} périodes {elapsed * 1000:>10.0f} ms")
+
+    if not args.skip_python:
+        t0 = time.perf_counter()
+        order = np.lexsort((start, vehicle))
+        per_vehicle = {}
+        for v, s, e in zip(vehicle[order].tolist(), start[order].tolist(), end[order].tolist()):
+            per_vehicle.setdefault(v, []).append((s, e))
+        window = (datetime(args.year, 1, 1), datetime(args.year + 1, 1, 1))
+        python_totals = [
+            _occupied_time(per_vehicle.get(v, []), *window)[0] for v in range(args.vehicles)
+        ]
+        elapsed = time.perf_counter() - t0
+        print(f"{'Python, fenêtre unique':<30}{elapsed * 1000:>10.0f} ms")
+        if python_totals != totals.tolist():
+            print("Erreur : résultats différents", file=sys.stderr)
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
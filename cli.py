@@ -0,0 +1,652 @@
+# cli.py
+"""
+Command-line entry point for headless administration tasks.
+
+    python cli.py import-users utilisateurs.csv
+    python cli.py --db db/bench.db generate-data --vehicles 1500 --years 5
+    python cli.py --slow-log slow.log profile-dashboard
+    python cli.py sweep-licences --suspend
+    python cli.py scheduler --every alert_sweep=900
+    python cli.py notify --smtp localhost:1025
+    python cli.py report --from 2025-01-01 --to 2025-12-31 --all-services
+    python cli.py fleet-pdf rapport_parc.pdf --workers 4
+    python cli.py export ravitaillements ravitaillements.csv.gz
+    python cli.py export-columnar maintenances bi/ --incremental
+    python cli.py rollups --rebuild
+    python cli.py snapshot
+    python cli.py report --snapshot --all-services
+    python cli.py backup --keep 14
+    python cli.py restore --at "2026-10-12 18:00"
+
+Add --trace-sql to any command to print the SQL statistics at the end.
+"""
+import argparse
+import sys
+
+DB_PATH = "db/parc_auto.db"
+
+
+# --------------------------------------------------
+# IMPORT USERS
+# --------------------------------------------------
+
+def cmd_import_users(args):
+    from database import init_db
+    from services.user_service import import_users_from_csv, UserCreationError
+
+    init_db(args.db)
+
+    try:
+        created, errors = import_users_from_csv(
+            args.csv_path,
+            delimiter=args.delimiter,
+            max_workers=args.workers,
+            db_path=args.db,
+        )
+    except (OSError, UserCreationError) as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 1
+
+    for line, message in errors:
+        print(f"Ligne {line} : {message}", file=sys.stderr)
+
+    print(f"{created} utilisateur(s) créé(s), {len(errors)} erreur(s)")
+    return 1 if errors else 0
+
+
+# --------------------------------------------------
+# SYNTHETIC DATA
+# --------------------------------------------------
+
+def cmd_generate_data(args):
+    import os
+    import time
+    from utils.synthetic_data import generate_dataset
+
+    if args.force and os.path.exists(args.db):
+        os.remove(args.db)
+
+    start = time.perf_counter()
+    try:
+        counts = generate_dataset(
+            args.db,
+            vehicles=args.vehicles,
+            employees=args.employees,
+            years=args.years,
+            seed=args.seed,
+        )
+    except ValueError as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    for table, count in counts.items():
+        print(f"{table:<28}{count:>12,}")
+    print(f"{sum(counts.values()):,} lignes générées en {elapsed:.1f} s -> {args.db}")
+    return 0
+
+
+# --------------------------------------------------
+# SQL PROFILING
+# --------------------------------------------------
+
+def cmd_profile_dashboard(args):
+    from services import dashboard_service
+
+    functions = [
+        dashboard_service.get_fleet_summary,
+        dashboard_service.get_vehicle_type_counts,
+        dashboard_service.get_maintenance_costs_by_vehicle,
+        dashboard_service.get_total_mileage,
+        dashboard_service.get_mileage_by_vehicle,
+        dashboard_service.get_mileage_by_period,
+        dashboard_service.get_detailed_costs_by_vehicle,
+        dashboard_service.get_vehicle_utilization_rate,
+        dashboard_service.get_most_active_employees,
+        dashboard_service.get_average_consumption_by_vehicle,
+        dashboard_service.get_average_consumption_by_type,
+        dashboard_service.get_cost_evolution,
+    ]
+
+    for _ in range(args.repeat):
+        for func in functions:
+            # Bypass the stats cache: every repeat runs the SQL
+            func.__wrapped__(db_path=args.db)
+
+    # Summary printed by main() since tracing is forced on
+    return 0
+
+
+# --------------------------------------------------
+# DRIVER LICENCES
+# --------------------------------------------------
+
+def cmd_sweep_licences(args):
+    from database import init_db
+    from services.employee_service import sweep_expired_licences
+
+    init_db(args.db)
+    expired = sweep_expired_licences(auto_suspend=args.suspend, db_path=args.db)
+
+    for e in expired:
+        nom = f"{e['nom']} {e['prenom']}"
+        print(f"{e['matricule']:<12}{nom:<35}{e['date_validite_permis'] or '-'}")
+
+    action = "suspendu(s)" if args.suspend else "signalé(s)"
+    print(f"{len(expired)} conducteur(s) au permis expiré {action}")
+    return 0
+
+
+# --------------------------------------------------
+# REPORTS
+# --------------------------------------------------
+
+def _report_db(args):
+    """The reporting replica, refreshed first, with --snapshot."""
+    if not getattr(args, "snapshot", False):
+        return args.db
+    from services.snapshot_service import create_snapshot
+    return create_snapshot(args.db)["replique"]
+
+
+def cmd_report(args):
+    import time
+    from datetime import date, timedelta
+    from services import report_service as reports
+
+    db_path = _report_db(args)
+
+    end = args.date_to or date.today().isoformat()
+    start = args.date_from or (date.fromisoformat(end) - timedelta(days=30)).isoformat()
+
+    services = args.service or []
+    if args.all_services:
+        services = reports.get_services(db_path)
+
+    t0 = time.perf_counter()
+    try:
+        summary = reports.generate_reports(
+            args.output, start, end,
+            services=services,
+            sections=args.sections,
+            formats=args.format,
+            max_workers=args.workers,
+            timeout=args.timeout,
+            db_path=db_path,
+        )
+    except reports.ReportError as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 2
+
+    failed = False
+    for report in summary:
+        print(f"{report['service']}: {len(report['fichiers'])} fichier(s)")
+        for error in report["erreurs"]:
+            failed = True
+            print(f"  section en erreur - {error}", file=sys.stderr)
+    print(f"Rapports générés en {time.perf_counter() - t0:.1f} s -> {args.output}")
+    return 1 if failed else 0
+
+
+def cmd_fleet_pdf(args):
+    from database import init_db
+    from services.report_service import ReportError, generate_fleet_pdf
+
+    init_db(args.db)
+
+    try:
+        stats = generate_fleet_pdf(args.output, max_workers=args.workers, db_path=_report_db(args))
+    except ReportError as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 2
+
+    print(
+        f"{stats['pages']} pages ({stats['parties']} partie(s)) en {stats['secondes']} s, "
+        f"{stats['pages_par_seconde']} pages/s -> {args.output}"
+    )
+    return 0
+
+
+# --------------------------------------------------
+# EXPORT
+# --------------------------------------------------
+
+def cmd_export(args):
+    import time
+    from services.export_service import ExportError, export_table_csv
+
+    def progress(written, total):
+        print(f"\r{written:,} / {total:,} lignes".replace(",", " "), end="", file=sys.stderr)
+
+    t0 = time.perf_counter()
+    try:
+        count = export_table_csv(
+            args.table, args.output,
+            columns=args.columns,
+            start_date=args.date_from,
+            end_date=args.date_to,
+            chunk_size=args.chunk_size,
+            progress=None if args.quiet else progress,
+            db_path=args.db,
+        )
+    except ExportError as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 2
+
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(f"{count} lignes exportées en {time.perf_counter() - t0:.1f} s -> {args.output}")
+    return 0
+
+
+def cmd_export_columnar(args):
+    import time
+    from database import init_db
+    from services.export_service import ExportError, export_columnar
+
+    init_db(args.db)
+
+    t0 = time.perf_counter()
+    try:
+        result = export_columnar(
+            args.table, args.output_dir,
+            fmt=args.format,
+            incremental=args.incremental,
+            db_path=args.db,
+        )
+    except ExportError as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 2
+
+    months = result["partitions"]
+    if months:
+        span = months[0] if len(months) == 1 else f"{months[0]} .. {months[-1]}"
+        print(
+            f"{len(months)} partition(s) {result['format']} ({span}), "
+            f"{result['lignes']} lignes en {time.perf_counter() - t0:.1f} s -> {args.output_dir}"
+        )
+    else:
+        print("Aucune nouvelle partition à exporter")
+    return 0
+
+
+# --------------------------------------------------
+# AGRÉGATS (COÛTS / KILOMÉTRAGE)
+# --------------------------------------------------
+
+def cmd_rollups(args):
+    import time
+    from database import init_db
+    from services.rollup_service import rebuild_rollups, refresh_rollups
+
+    init_db(args.db)
+
+    t0 = time.perf_counter()
+    counts = (rebuild_rollups if args.rebuild else refresh_rollups)(args.db)
+    details = ", ".join(f"{table} : {n}" for table, n in counts.items())
+    print(f"Agrégats à jour en {time.perf_counter() - t0:.1f} s ({details})")
+    return 0
+
+
+# --------------------------------------------------
+# RÉPLIQUE DE CONSULTATION
+# --------------------------------------------------
+
+def cmd_snapshot(args):
+    from database import init_db
+    from services.snapshot_service import SnapshotError, create_snapshot
+
+    init_db(args.db)
+
+    def progress(copied, total):
+        print(f"\r{copied:,} / {total:,} pages".replace(",", " "), end="", file=sys.stderr)
+
+    try:
+        result = create_snapshot(
+            args.db, args.replica,
+            pages=args.pages, pause=args.pause, force=args.force,
+            progress=None if args.quiet else progress,
+        )
+    except SnapshotError as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 2
+
+    if not args.quiet and result["copie"]:
+        print(file=sys.stderr)
+    if result["copie"]:
+        print(
+            f"{result['pages']} pages copiées en {result['etapes']} étape(s) "
+            f"({result['redemarrages']} redémarrage(s)) en {result['secondes']} s -> {result['replique']}"
+        )
+    else:
+        print(f"Base inchangée depuis la dernière copie -> {result['replique']}")
+    return 0
+
+
+# --------------------------------------------------
+# BACKUP / RESTORE
+# --------------------------------------------------
+
+def cmd_backup(args):
+    from database import init_db
+    from services.backup_service import BackupError, create_backup, list_backups
+
+    if args.list:
+        for b in list_backups(args.db, args.dir):
+            print(f"{b['date']:%d/%m/%Y %H:%M:%S}  {b['taille'] / 2**20:8.1f} Mo  {b['fichier']}")
+        return 0
+
+    init_db(args.db)
+
+    def progress(copied, total):
+        print(f"\r{copied:,} / {total:,} pages".replace(",", " "), end="", file=sys.stderr)
+
+    try:
+        result = create_backup(
+            args.db, args.dir, keep=args.keep,
+            pages=args.pages, pause=args.pause,
+            progress=None if args.quiet else progress,
+        )
+    except BackupError as e:
+        print(f"\nErreur : {e}", file=sys.stderr)
+        return 2
+
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(
+        f"{result['pages']} pages copiées en {result['etapes']} étape(s) "
+        f"({result['redemarrages']} redémarrage(s)), vérifiées et compressées "
+        f"({result['taille'] / 2**20:.1f} Mo) en {result['secondes']} s -> {result['fichier']}"
+    )
+    if result["supprimees"]:
+        print(f"{result['supprimees']} ancienne(s) sauvegarde(s) supprimée(s)")
+    return 0
+
+
+def _point_in_time(value):
+    from datetime import datetime, time
+
+    try:
+        when = datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"date invalide : {value} (AAAA-MM-JJ[ HH:MM])")
+    # A day alone: the last backup of that day
+    return datetime.combine(when.date(), time.max) if len(value) == 10 else when
+
+
+def cmd_restore(args):
+    from database import init_db
+    from services.backup_service import BackupError, restore_backup
+
+    try:
+        result = restore_backup(
+            args.db, args.backup, at=args.at, directory=args.dir,
+            safety=not args.no_safety,
+        )
+    except BackupError as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 2
+
+    # Backup taken before a schema change: bring it up to date
+    init_db(args.db)
+    if result["securite"]:
+        print(f"Base actuelle sauvegardée -> {result['securite']}")
+    print(f"{result['pages']} pages restaurées en {result['secondes']} s depuis {result['sauvegarde']}")
+    return 0
+
+
+# --------------------------------------------------
+# NOTIFICATIONS
+# --------------------------------------------------
+
+def cmd_notify(args):
+    from database import init_db
+    from services import notification_service as notifications
+
+    init_db(args.db)
+
+    try:
+        if args.smtp:
+            transport = notifications.smtp_transport(args.smtp)
+        elif args.spool:
+            transport = notifications.SpoolTransport(args.spool)
+        else:
+            transport = notifications.transport_from_env(args.db)
+    except notifications.NotificationError as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 2
+
+    from services.alert_engine import sweep_alerts
+    sweep_alerts(db_path=args.db)
+
+    queued = notifications.enqueue_alert_notifications(args.db)
+    print(f"{queued} notification(s) mise(s) en file")
+
+    if not args.enqueue_only:
+        stats = notifications.deliver_pending(transport, args.db)
+        print(
+            f"{stats['envoyes']} message(s) envoyé(s) pour {stats['notifications']} notification(s), "
+            f"{stats['reportes']} reportée(s), {stats['echecs']} échec(s), {stats['annulees']} annulée(s)"
+        )
+        return 1 if stats["echecs"] else 0
+    return 0
+
+
+# --------------------------------------------------
+# SCHEDULER
+# --------------------------------------------------
+
+def cmd_scheduler(args):
+    from database import init_db
+    from services import scheduler_service as scheduler
+
+    try:
+        for spec in args.every or []:
+            name, _, seconds = spec.partition("=")
+            scheduler.set_interval(name, float(seconds))
+    except (ValueError, scheduler.SchedulerError) as e:
+        print(f"Erreur : --every {spec} ({e})", file=sys.stderr)
+        return 2
+
+    init_db(args.db)
+
+    if args.status:
+        for s in scheduler.get_job_states(args.db):
+            print(
+                f"{s['nom']:<16}{s['intervalle_s']:>10.0f} s  "
+                f"{s['dernier_lancement'] or '-':<20}{s['prochain_lancement'] or '-':<20}"
+                f"{s['dernier_statut'] or '-':<8}{s['derniere_erreur'] or ''}"
+            )
+        return 0
+
+    try:
+        if args.once:
+            lock = scheduler.acquire_lock(args.db)
+            try:
+                results = scheduler.run_pending(args.db, only=args.only, log=print)
+            finally:
+                scheduler.release_lock(lock)
+            return 1 if "erreur" in results.values() else 0
+
+        # SIGTERM (service manager) stops the loop and releases the lock
+        import signal
+        import threading
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+        scheduler.run_forever(args.db, only=args.only, stop_event=stop, log=print)
+    except scheduler.SchedulerError as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+# --------------------------------------------------
+# PARSER
+# --------------------------------------------------
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description="Outils en ligne de commande du parc automobile",
+    )
+    parser.add_argument("--db", default=DB_PATH, help="Chemin de la base SQLite")
+    parser.add_argument("--trace-sql", action="store_true",
+                        help="Tracer les requêtes SQL et afficher un résumé")
+    parser.add_argument("--slow-query-ms", type=float, default=100.0,
+                        help="Seuil du journal des requêtes lentes (ms)")
+    parser.add_argument("--slow-log", default=None,
+                        help="Fichier du journal des requêtes lentes")
+
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("import-users", help="Créer des utilisateurs depuis un CSV")
+    p.add_argument("csv_path")
+    p.add_argument("--delimiter", default=";")
+    p.add_argument("--workers", type=int, default=None,
+                   help="Nombre de processus de hachage (défaut : nb de CPU)")
+    p.set_defaults(func=cmd_import_users)
+
+    p = sub.add_parser("generate-data", help="Générer un jeu de données synthétique")
+    p.add_argument("--vehicles", type=int, default=100)
+    p.add_argument("--employees", type=int, default=50)
+    p.add_argument("--years", type=int, default=2)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--force", action="store_true",
+                   help="Supprimer la base cible si elle existe")
+    p.set_defaults(func=cmd_generate_data)
+
+    p = sub.add_parser("profile-dashboard",
+                       help="Exécuter les statistiques du tableau de bord et tracer le SQL")
+    p.add_argument("--repeat", type=int, default=1)
+    p.set_defaults(func=cmd_profile_dashboard, trace_sql=True)
+
+    p = sub.add_parser("sweep-licences",
+                       help="Signaler les conducteurs dont le permis a expiré")
+    p.add_argument("--suspend", action="store_true",
+                   help="Retirer l'autorisation de conduire des permis expirés")
+    p.set_defaults(func=cmd_sweep_licences)
+
+    p = sub.add_parser("report", help="Générer les rapports CSV / PDF sans interface")
+    p.add_argument("--from", dest="date_from", help="Début de période (AAAA-MM-JJ, défaut : 30 jours avant la fin)")
+    p.add_argument("--to", dest="date_to", help="Fin de période (AAAA-MM-JJ, défaut : aujourd'hui)")
+    p.add_argument("--service", action="append",
+                   help="Rapport pour un service (répétable ; défaut : rapport du parc)")
+    p.add_argument("--all-services", action="store_true", help="Un rapport par service")
+    p.add_argument("--sections", nargs="+", help="Sections à inclure (défaut : toutes)")
+    p.add_argument("--format", nargs="+", choices=["csv", "pdf"], default=["csv", "pdf"])
+    p.add_argument("--output", default="rapports", help="Dossier de sortie")
+    p.add_argument("--workers", type=int, default=None, help="Sections calculées en parallèle")
+    p.add_argument("--timeout", type=float, default=300,
+                   help="Durée maximale du calcul (s), les sections non terminées sont ignorées")
+    p.add_argument("--snapshot", action="store_true",
+                   help="Lire la réplique de consultation (copiée d'abord si la base a changé)")
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser("fleet-pdf", help="Rapport PDF complet du parc (tous les véhicules)")
+    p.add_argument("output", help="Fichier PDF")
+    p.add_argument("--workers", type=int, default=None,
+                   help="Processus de rendu (défaut : nombre de CPU ; fusion avec pypdf)")
+    p.add_argument("--snapshot", action="store_true",
+                   help="Lire la réplique de consultation (copiée d'abord si la base a changé)")
+    p.set_defaults(func=cmd_fleet_pdf)
+
+    from services.export_service import DEFAULT_CHUNK_SIZE, EXPORTABLE_TABLES
+    p = sub.add_parser("export", help="Exporter une table complète en CSV (flux, .gz possible)")
+    p.add_argument("table", choices=list(EXPORTABLE_TABLES))
+    p.add_argument("output", help="Fichier CSV (compressé si le nom se termine par .gz)")
+    p.add_argument("--columns", nargs="+", help="Colonnes à exporter (défaut : toutes)")
+    p.add_argument("--from", dest="date_from", help="Date de début (AAAA-MM-JJ)")
+    p.add_argument("--to", dest="date_to", help="Date de fin (AAAA-MM-JJ)")
+    p.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    p.add_argument("--quiet", action="store_true", help="Sans affichage de la progression")
+    p.set_defaults(func=cmd_export)
+
+    from services.export_service import COLUMNAR_SCHEMAS
+    p = sub.add_parser("export-columnar",
+                       help="Exporter une table en fichiers typés par mois (Parquet / npz)")
+    p.add_argument("table", choices=list(COLUMNAR_SCHEMAS))
+    p.add_argument("output_dir", help="Dossier de sortie (<table>/mois=AAAA-MM/)")
+    p.add_argument("--format", choices=["auto", "parquet", "npz"], default="auto",
+                   help="auto : Parquet si pyarrow est installé, sinon npz (numpy)")
+    p.add_argument("--incremental", action="store_true",
+                   help="Ne réécrire que les mois ayant reçu des lignes depuis le dernier export")
+    p.set_defaults(func=cmd_export_columnar)
+
+    p = sub.add_parser("rollups", help="Mettre à jour les agrégats journaliers / mensuels (coûts, km)")
+    p.add_argument("--rebuild", action="store_true",
+                   help="Tout recalculer (après modification manuelle des tables sources)")
+    p.set_defaults(func=cmd_rollups)
+
+    from services.snapshot_service import DEFAULT_PAGES, DEFAULT_PAUSE
+    p = sub.add_parser("snapshot", help="Copier la base vers la réplique de consultation (rapports)")
+    p.add_argument("--replica", default=None,
+                   help="Fichier de la réplique (défaut : <base>_rapports.db)")
+    p.add_argument("--pages", type=int, default=DEFAULT_PAGES, help="Pages copiées par étape")
+    p.add_argument("--pause", type=float, default=DEFAULT_PAUSE,
+                   help="Pause entre deux étapes (s), pendant laquelle les écritures passent")
+    p.add_argument("--force", action="store_true", help="Copier même si la base n'a pas changé")
+    p.add_argument("--quiet", action="store_true", help="Sans affichage de la progression")
+    p.set_defaults(func=cmd_snapshot)
+
+    from services.backup_service import DEFAULT_KEEP
+    p = sub.add_parser("backup", help="Sauvegarder la base (copie en ligne, vérifiée, compressée)")
+    p.add_argument("--dir", default=None,
+                   help="Dossier des sauvegardes (défaut : sauvegardes/ à côté de la base)")
+    p.add_argument("--keep", type=int, default=DEFAULT_KEEP, help="Nombre de sauvegardes conservées")
+    p.add_argument("--pages", type=int, default=DEFAULT_PAGES, help="Pages copiées par étape")
+    p.add_argument("--pause", type=float, default=DEFAULT_PAUSE,
+                   help="Pause entre deux étapes (s), pendant laquelle les écritures passent")
+    p.add_argument("--list", action="store_true", help="Lister les sauvegardes existantes")
+    p.add_argument("--quiet", action="store_true", help="Sans affichage de la progression")
+    p.set_defaults(func=cmd_backup)
+
+    p = sub.add_parser("restore", help="Restaurer une sauvegarde sans arrêter l'application")
+    p.add_argument("backup", nargs="?", default=None,
+                   help="Fichier .db.gz (défaut : la sauvegarde la plus récente)")
+    p.add_argument("--at", type=_point_in_time, default=None, metavar="AAAA-MM-JJ[ HH:MM]",
+                   help="Restaurer la dernière sauvegarde prise à cette date ou avant")
+    p.add_argument("--dir", default=None, help="Dossier des sauvegardes")
+    p.add_argument("--no-safety", action="store_true",
+                   help="Ne pas sauvegarder la base actuelle avant de la remplacer")
+    p.set_defaults(func=cmd_restore)
+
+    p = sub.add_parser("notify", help="Envoyer les notifications des alertes en retard")
+    target = p.add_mutually_exclusive_group()
+    target.add_argument("--smtp", metavar="HOTE[:PORT]", help="Serveur SMTP")
+    target.add_argument("--spool", metavar="DOSSIER", help="Écrire les messages (.eml) dans un dossier")
+    p.add_argument("--enqueue-only", action="store_true",
+                   help="Mettre en file sans envoyer")
+    p.set_defaults(func=cmd_notify)
+
+    p = sub.add_parser("scheduler", help="Exécuter les tâches périodiques (alertes, archivage, maintenance SQLite)")
+    p.add_argument("--once", action="store_true",
+                   help="Exécuter les tâches dues puis quitter (cron)")
+    p.add_argument("--only", nargs="+", help="Tâches à exécuter")
+    p.add_argument("--every", action="append", metavar="TACHE=SECONDES",
+                   help="Modifier l'intervalle d'une tâche (répétable)")
+    p.add_argument("--status", action="store_true",
+                   help="Afficher le dernier et le prochain lancement de chaque tâche")
+    p.set_defaults(func=cmd_scheduler)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.trace_sql or args.slow_log:
+        from utils.query_trace import enable_query_tracing
+        enable_query_tracing(args.slow_query_ms, args.slow_log)
+
+    status = args.func(args)
+
+    if args.trace_sql:
+        from utils.query_trace import format_query_stats
+        print(format_query_stats(), file=sys.stderr)
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
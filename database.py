@@ -1,7 +1,10 @@
+import re
 import sqlite3
 from pathlib import Path
 from typing import Union
 
+from utils import query_trace
+
 DEFAULT_DB_PATH = Path("db/parc_auto.db")
 
 
@@ -9,13 +12,60 @@ def get_connection(db_path: Union[str, Path] = DEFAULT_DB_PATH):
     """
     Return a SQLite connection with foreign keys enabled.
     Caller must close the connection (use with-statement).
+    Statements are timed when query tracing is enabled (utils.query_trace).
     """
-    conn = sqlite3.connect(db_path)
+    if query_trace.is_tracing_enabled():
+        conn = sqlite3.connect(db_path, factory=query_trace.TracedConnection)
+    else:
+        conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON;")
     return conn
 
 
+def _add_column(cur, table: str, column: str, definition: str) -> bool:
+    """
+    ALTER TABLE ... ADD COLUMN for databases created before the column.
+    Returns True when the column was added.
+    """
+    columns = {r["name"] for r in cur.execute(f"PRAGMA table_info({table})")}
+    if column in columns:
+        return False
+    cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return True
+
+
+def _drop_not_null(conn, table: str, column: str) -> bool:
+    """
+    Rebuild `table` without the NOT NULL constraint of `column` (SQLite
+    cannot alter a constraint). Indexes are recreated by init_db.
+    Returns True when the table was rebuilt.
+    """
+    info = {r["name"]: r["notnull"] for r in conn.execute(f"PRAGMA table_info({table})")}
+    if not info.get(column):
+        return False
+
+    sql = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()[0]
+    sql = re.sub(rf"(\b{column}\s+\w+)\s+NOT NULL", r"\1", sql, count=1)
+    sql = re.sub(rf"\b{table}\b", f"{table}_migration", sql, count=1)
+
+    # Dropping a table referenced by other tables: foreign keys off for
+    # the rebuild (outside of any transaction)
+    conn.commit()
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        conn.execute(sql)
+        conn.execute(f"INSERT INTO {table}_migration SELECT * FROM {table}")
+        conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"ALTER TABLE {table}_migration RENAME TO {table}")
+        conn.commit()
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON")
+    return True
+
+
 def init_db(db_path: Union[str, Path] = DEFAULT_DB_PATH):
     """
     Initialize database schema exactly as specified in the assignment PDF.
@@ -176,4 +226,203 @@ def init_db(db_path: Union[str, Path] = DEFAULT_DB_PATH):
         );
         """)
 
+        # ==================== ÉTAT APPLICATIF (CLÉ / VALEUR) ====================
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS app_state (
+            cle TEXT PRIMARY KEY,
+            valeur TEXT
+        );
+        """)
+
+        # ==================== ALERTES (ÉTAT PERSISTÉ) ====================
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS alertes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source_type TEXT NOT NULL,
+            source_id INTEGER NOT NULL,
+            vehicule_id INTEGER,
+            employe_id INTEGER,
+            libelle TEXT NOT NULL,
+            date_echeance TEXT,
+            statut TEXT NOT NULL,
+            date_creation TEXT NOT NULL,
+            date_maj TEXT NOT NULL,
+            date_resolution TEXT,
+            date_acquittement TEXT,
+            acquittee_par INTEGER,
+            UNIQUE (source_type, source_id),
+            FOREIGN KEY (vehicule_id) REFERENCES vehicules(id),
+            FOREIGN KEY (employe_id) REFERENCES employes(id),
+            FOREIGN KEY (acquittee_par) REFERENCES users(id)
+        );
+        """)
+
+        # ==================== LOGS ARCHIVÉS ====================
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS logs_archive (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER,
+            action TEXT NOT NULL,
+            date_action TEXT NOT NULL,
+            details TEXT
+        );
+        """)
+
+        # ==================== PLANIFICATEUR ====================
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS scheduler_jobs (
+            nom TEXT PRIMARY KEY,
+            dernier_lancement TEXT,
+            prochain_lancement TEXT,
+            dernier_statut TEXT,
+            derniere_erreur TEXT,
+            duree_ms REAL
+        );
+        """)
+
+        # ==================== NOTIFICATIONS (OUTBOX) ====================
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS notifications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            destinataire TEXT NOT NULL,
+            alerte_id INTEGER NOT NULL,
+            cle_dedup TEXT UNIQUE NOT NULL,
+            statut TEXT NOT NULL,
+            tentatives INTEGER DEFAULT 0,
+            prochain_essai TEXT NOT NULL,
+            date_creation TEXT NOT NULL,
+            date_envoi TEXT,
+            derniere_erreur TEXT,
+            FOREIGN KEY (alerte_id) REFERENCES alertes(id)
+        );
+        """)
+
+        # ==================== AGRÉGATS (services.rollup_service) ====================
+        for table, key in (("agregats_jour", "jour"), ("agregats_mois", "mois")):
+            cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                {key} TEXT NOT NULL,
+                vehicule_id INTEGER NOT NULL,
+                cout_carburant REAL NOT NULL DEFAULT 0,
+                cout_maintenance REAL NOT NULL DEFAULT 0,
+                cout_assurance REAL NOT NULL DEFAULT 0,
+                cout_total REAL NOT NULL DEFAULT 0,
+                km REAL NOT NULL DEFAULT 0,
+                sorties INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY ({key}, vehicule_id)
+            ) WITHOUT ROWID;
+            """)
+
+        # ==================== MIGRATIONS ====================
+        # Set when a driver is suspended for an expired licence
+        _add_column(cur, "employes", "permis_suspendu", "INTEGER DEFAULT 0")
+
+        # Cost category (services.maintenance_service.classify_intervention)
+        if _add_column(cur, "maintenances", "categorie", "TEXT"):
+            from services.maintenance_service import classify_intervention
+            conn.create_function("categorie_intervention", 1, classify_intervention, deterministic=True)
+            cur.execute("UPDATE maintenances SET categorie = categorie_intervention(type_intervention)")
+
+        # Notifications claimed by a sender (services.notification_service)
+        _add_column(cur, "notifications", "envoi_par", "TEXT")
+        _add_column(cur, "notifications", "envoi_debut", "TEXT")
+
+        # Km-based revisions without a projected date (alert_engine)
+        _drop_not_null(conn, "alertes", "date_echeance")
+
+        # ==================== INDEX ====================
+        cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_documents_echeance
+        ON documents(date_echeance);
+        """)
+
+        cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_maintenances_echeance
+        ON maintenances(date_prochaine_echeance);
+        """)
+
+        cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_documents_vehicule_type
+        ON documents(vehicule_id, type_document, date_echeance);
+        """)
+
+        cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_maintenances_vehicule_type
+        ON maintenances(vehicule_id, type_intervention, date);
+        """)
+
+        cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_maintenances_vehicule_categorie
+        ON maintenances(vehicule_id, categorie, cout);
+        """)
+
+        # Last revision km (alert_engine): per category since insurance and
+        # fuel entries do not restart the counter
+        cur.execute("DROP INDEX IF EXISTS idx_maintenances_vehicule_km")
+        cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_maintenances_vehicule_categorie_km
+        ON maintenances(vehicule_id, categorie, kilometrage);
+        """)
+
+        cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sorties_vehicule_retour
+        ON sorties_reservations(vehicule_id, date_retour_reelle);
+        """)
+
+        cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_employes_permis
+        ON employes(autorise_conduire, date_validite_permis);
+        """)
+
+        cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sorties_date_sortie
+        ON sorties_reservations(date_sortie_reelle);
+        """)
+
+        cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sorties_date_depart
+        ON sorties_reservations(COALESCE(date_sortie_reelle, date_sortie_prevue));
+        """)
+
+        cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sorties_statut_employe
+        ON sorties_reservations(statut, employe_id, km_depart, km_retour);
+        """)
+
+        cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_ravitaillements_date
+        ON ravitaillements(date);
+        """)
+
+        cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_maintenances_date
+        ON maintenances(date);
+        """)
+
+        cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_logs_date
+        ON logs(date_action);
+        """)
+
+        cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_notifications_statut_essai
+        ON notifications(statut, prochain_essai);
+        """)
+
+        cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_notifications_statut_envoi
+        ON notifications(statut, date_envoi);
+        """)
+
+        cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_alertes_statut_echeance
+        ON alertes(statut, date_echeance);
+        """)
+
+        # ==================== AGRÉGATS (CONSTRUCTION) ====================
+        # Built on first start, then catch up on the rows written outside
+        # the application (services.rollup_service)
+        from services.rollup_service import refresh_within
+        refresh_within(cur)
+
         conn.commit()
@@ -1,19 +1,24 @@
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox
 
-from services.alert_service import (
-    get_document_alerts,
-    get_maintenance_alerts,
+from services.alert_engine import (
+    ensure_alert_store,
+    get_open_alerts,
+    acknowledge_alert,
+    AlertError,
 )
 
 
 class AlertsWindow(tk.Toplevel):
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, user=None, db_path="db/parc_auto.db"):
         super().__init__(parent)
         self.title("Alertes & échéances")
         self.geometry("1000x500")
 
+        self.user = user
+        self.db_path = db_path
+
         self._build_ui()
         self._load_alerts()
 
@@ -26,7 +31,7 @@ class AlertsWindow(tk.Toplevel):
             font=("Arial", 14, "bold"),
         ).pack(pady=10)
 
-        columns = ("type", "vehicule", "libelle", "date_echeance", "statut")
+        columns = ("type", "vehicule", "libelle", "date_echeance", "statut", "acquittee")
 
         self.tree = ttk.Treeview(
             self,
@@ -36,7 +41,7 @@ class AlertsWindow(tk.Toplevel):
 
         for col in columns:
             self.tree.heading(col, text=col.replace("_", " ").title())
-            self.tree.column(col, width=180)
+            self.tree.column(col, width=160)
 
         self.tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
@@ -44,25 +49,44 @@ class AlertsWindow(tk.Toplevel):
         self.tree.tag_configure("retard", background="#ffb3b3")   # rouge
         self.tree.tag_configure("proche", background="#ffe0b3")   # orange
 
+        ttk.Button(
+            self,
+            text="✔ Acquitter la sélection",
+            command=self._acknowledge_selected,
+        ).pack(pady=(0, 10))
+
     # ================= DATA =================
 
     def _load_alerts(self):
         self.tree.delete(*self.tree.get_children())
 
-        alerts = []
-        alerts.extend(get_document_alerts())
-        alerts.extend(get_maintenance_alerts())
+        # No write transaction on every opening: built once, then kept
+        # current by the services and the scheduler
+        ensure_alert_store(db_path=self.db_path)
 
-        for a in alerts:
+        for a in get_open_alerts(db_path=self.db_path):
             self.tree.insert(
                 "",
                 tk.END,
+                iid=str(a["id"]),
                 values=(
                     a["type"],
                     a["vehicule"],
                     a["libelle"],
-                    a["date_echeance"],
+                    a["date_echeance"] or "",
                     a["statut"],
+                    "oui" if a["acquittee"] else "",
                 ),
                 tags=(a["statut"],),
-            )
\ No newline at end of file
+            )
+
+    def _acknowledge_selected(self):
+        user_id = self.user["id"] if self.user else None
+
+        try:
+            for iid in self.tree.selection():
+                acknowledge_alert(int(iid), user_id, db_path=self.db_path)
+        except AlertError as e:
+            messagebox.showerror("Erreur", str(e))
+
+        self._load_alerts()
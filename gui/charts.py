@@ -0,0 +1,146 @@
+import hashlib
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+# Charts kept for the lifetime of a window.
+#
+# A Chart owns one Figure and its canvas. refresh() hashes the data
+# plotted (plain lists / tuples, not database rows) and does nothing when
+# it did not change; otherwise the render function updates the existing
+# artists (bar heights, line data, value labels) and the canvas is drawn
+# again. Artists are only recreated when the number of bars changes.
+#
+# The canvas is built by a factory so that the GUI embeds the figure in
+# Tk (FigureCanvasTkAgg) and tests / benchmarks render off screen (Agg).
+
+
+def data_hash(data) -> str:
+    """Digest of the plotted data (its repr)."""
+    return hashlib.blake2b(repr(data).encode(), digest_size=16).hexdigest()
+
+
+class Bars:
+    """
+    One bar series on an Axes, resized in place while the number of bars
+    is unchanged. Bars are drawn at positions 0..n-1 (+ offset).
+    """
+
+    def __init__(self, ax, horizontal=False, width=0.8, offset=0.0,
+                 color=None, label=None, value_format=None, fontsize=9):
+        self.ax = ax
+        self.horizontal = horizontal
+        self.width = width
+        self.offset = offset
+        self.color = color
+        self.label = label
+        self.value_format = value_format
+        self.fontsize = fontsize
+        self.container = None
+        self.texts = []
+
+    def _remove(self):
+        if self.container is not None:
+            self.container.remove()
+        for text in self.texts:
+            text.remove()
+        self.container, self.texts = None, []
+
+    def set(self, values, colors=None):
+        positions = [i + self.offset for i in range(len(values))]
+
+        if self.container is None or len(self.container) != len(values):
+            self._remove()
+            draw = self.ax.barh if self.horizontal else self.ax.bar
+            self.container = draw(positions, values, self.width,
+                                  color=colors or self.color, label=self.label)
+            if self.value_format:
+                self.texts = [
+                    self.ax.text(0, 0, "", fontsize=self.fontsize,
+                                 ha="left" if self.horizontal else "center",
+                                 va="center" if self.horizontal else "bottom")
+                    for _ in values
+                ]
+        else:
+            for bar, value in zip(self.container, values):
+                if self.horizontal:
+                    bar.set_width(value)
+                else:
+                    bar.set_height(value)
+            if colors:
+                for bar, color in zip(self.container, colors):
+                    bar.set_facecolor(color)
+
+        for text, bar, value in zip(self.texts, self.container, values):
+            if self.horizontal:
+                text.set_position((bar.get_width(), bar.get_y() + bar.get_height() / 2))
+            else:
+                text.set_position((bar.get_x() + bar.get_width() / 2, bar.get_height()))
+            text.set_text(self.value_format(value))
+
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+
+def set_categories(ax, labels, horizontal=False, rotation=0, ha="center"):
+    """Tick labels of bars / points drawn at positions 0..n-1."""
+    positions = range(len(labels))
+    if horizontal:
+        ax.set_yticks(positions, labels)
+    else:
+        ax.set_xticks(positions, labels, rotation=rotation, ha=ha)
+
+
+class Chart:
+
+    def __init__(self, figsize, rows=1, canvas=FigureCanvasAgg):
+        self.figure = Figure(figsize=figsize)
+        self.axes = [self.figure.add_subplot(rows, 1, i + 1) for i in range(rows)]
+        self.canvas = canvas(self.figure)
+        self.series = {}
+        self.draws = 0
+        self._hash = None
+        self._message = self.figure.text(
+            0.5, 0.5, "", ha="center", va="center",
+            fontsize=12, style="italic", visible=False,
+        )
+
+    @property
+    def ax(self):
+        return self.axes[0]
+
+    def bars(self, key, ax=None, **options) -> Bars:
+        """Bar series `key`, created on first use."""
+        if key not in self.series:
+            self.series[key] = Bars(ax or self.ax, **options)
+        return self.series[key]
+
+    def line(self, key, ax=None, **style):
+        """Line2D `key`, created (empty) on first use."""
+        if key not in self.series:
+            self.series[key], = (ax or self.ax).plot([], [], **style)
+        return self.series[key]
+
+    def message(self, text=None):
+        """Replace the axes by `text` (None: show the axes again)."""
+        for ax in self.axes:
+            ax.set_visible(text is None)
+        self._message.set_visible(text is not None)
+        self._message.set_text(text or "")
+
+    def refresh(self, data, render) -> bool:
+        """
+        Draw `data` with render(chart, data) unless it is the data already
+        shown. Returns True when the canvas was drawn.
+        """
+        digest = data_hash(data)
+        if digest == self._hash:
+            return False
+
+        self.message(None)
+        render(self, data)
+        self.canvas.draw()
+        self._hash = digest
+        self.draws += 1
+        return True
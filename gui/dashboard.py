@@ -1,3 +1,4 @@
+import importlib
 import tkinter as tk
 from tkinter import ttk, messagebox
 
@@ -6,15 +7,27 @@ from services.dashboard_service import (
     get_available_vehicles,
 )
 
+
+def _window(module: str, name: str):
+    """
+    Window class imported on first use: the windows (and matplotlib for
+    the statistics) are not loaded before the dashboard is shown.
+    """
+    def open_window(*args, **kwargs):
+        return getattr(importlib.import_module(module), name)(*args, **kwargs)
+    return open_window
+
+
 # UI modules
-from gui.vehicles import VehicleManagementWindow
-from gui.employees import EmployeeManagementWindow
-from gui.reservations import ReservationWindow
-from gui.alerte_window import AlertsWindow
-from gui.maintenance import MaintenanceFuelWindow
-from gui.documents import DocumentManagementWindow
-from gui.reports import ReportsWindow
-from gui.user_management import UserManagementWindow
+VehicleManagementWindow = _window("gui.vehicles", "VehicleManagementWindow")
+EmployeeManagementWindow = _window("gui.employees", "EmployeeManagementWindow")
+ReservationWindow = _window("gui.reservations", "ReservationWindow")
+AlertsWindow = _window("gui.alerte_window", "AlertsWindow")
+MaintenanceFuelWindow = _window("gui.maintenance", "MaintenanceFuelWindow")
+DocumentManagementWindow = _window("gui.documents", "DocumentManagementWindow")
+ReportsWindow = _window("gui.reports", "ReportsWindow")
+UserManagementWindow = _window("gui.user_management", "UserManagementWindow")
+QueryStatsWindow = _window("gui.query_stats", "QueryStatsWindow")
 
 
 class DashboardWindow(tk.Toplevel):
@@ -70,7 +83,7 @@ class DashboardWindow(tk.Toplevel):
         ttk.Button(
             nav_frame,
             text="Alertes & échéances",
-            command=lambda: AlertsWindow(self),
+            command=lambda: AlertsWindow(self, user=self.user, db_path=self.db_path),
         ).pack(fill="x", pady=2)
 
         ttk.Button(
@@ -93,6 +106,11 @@ class DashboardWindow(tk.Toplevel):
                 text="🔐 Gestion des utilisateurs",
                 command=lambda: UserManagementWindow(self.db_path),
             ).pack(fill="x", pady=2)
+            ttk.Button(
+                nav_frame,
+                text="Statistiques SQL",
+                command=lambda: QueryStatsWindow(self),
+            ).pack(fill="x", pady=2)
 
         # ================= RIGHT: DASHBOARD CONTENT =================
         main_frame = tk.Frame(container)
@@ -0,0 +1,98 @@
+import tkinter as tk
+from tkinter import ttk
+
+from utils.query_trace import (
+    enable_query_tracing,
+    disable_query_tracing,
+    is_tracing_enabled,
+    get_query_stats,
+    reset_query_stats,
+)
+from utils.stats_cache import clear_cache, get_cache_stats, reset_cache_stats
+
+
+class QueryStatsWindow(tk.Toplevel):
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.title("Statistiques SQL")
+        self.geometry("1100x500")
+
+        self._build_ui()
+        self._refresh()
+
+    # ================= UI =================
+
+    def _build_ui(self):
+        toolbar = tk.Frame(self)
+        toolbar.pack(fill=tk.X, padx=10, pady=5)
+
+        self.tracing_var = tk.BooleanVar(value=is_tracing_enabled())
+        ttk.Checkbutton(
+            toolbar,
+            text="Tracer les requêtes",
+            variable=self.tracing_var,
+            command=self._toggle_tracing,
+        ).pack(side=tk.LEFT)
+
+        ttk.Button(toolbar, text="🔄 Rafraîchir", command=self._refresh).pack(side=tk.LEFT, padx=5)
+        ttk.Button(toolbar, text="Réinitialiser", command=self._reset).pack(side=tk.LEFT, padx=5)
+        ttk.Button(toolbar, text="Vider le cache", command=self._clear_cache).pack(side=tk.LEFT, padx=5)
+
+        # Compteurs du cache des statistiques (utils.stats_cache)
+        self.cache_label = tk.Label(toolbar, anchor="w")
+        self.cache_label.pack(side=tk.LEFT, padx=15)
+
+        columns = ("total_ms", "calls", "avg_ms", "max_ms", "rows", "caller", "sql")
+        headings = ("Total (ms)", "Appels", "Moy. (ms)", "Max (ms)", "Lignes", "Appelant", "Requête")
+        widths = (80, 60, 80, 80, 70, 260, 500)
+
+        self.tree = ttk.Treeview(self, columns=columns, show="headings")
+        for col, heading, width in zip(columns, headings, widths):
+            self.tree.heading(col, text=heading)
+            self.tree.column(col, width=width, anchor="w" if col in ("caller", "sql") else "e")
+
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+    # ================= DATA =================
+
+    def _toggle_tracing(self):
+        if self.tracing_var.get():
+            enable_query_tracing()
+        else:
+            disable_query_tracing()
+
+    def _reset(self):
+        reset_query_stats()
+        reset_cache_stats()
+        self._refresh()
+
+    def _clear_cache(self):
+        clear_cache()
+        self._refresh()
+
+    def _refresh(self):
+        cache = get_cache_stats()
+        ratio = f"{cache['hit_ratio']:.0%}" if cache["hit_ratio"] is not None else "-"
+        self.cache_label.config(
+            text=f"Cache : {cache['hits']} succès / {cache['misses']} échecs ({ratio}), "
+                 f"{cache['entries']}/{cache['max_entries']} entrées, "
+                 f"{cache['invalidations']} invalidées, {cache['evictions']} évincées"
+        )
+
+        self.tree.delete(*self.tree.get_children())
+
+        for s in get_query_stats():
+            self.tree.insert(
+                "",
+                tk.END,
+                values=(
+                    f"{s['total_ms']:.1f}",
+                    s["calls"],
+                    f"{s['avg_ms']:.2f}",
+                    f"{s['max_ms']:.2f}",
+                    s["rows"],
+                    next(iter(s["callers"]), "?"),
+                    s["sql"],
+                ),
+            )
@@ -1,3 +1,4 @@
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from datetime import date, datetime
@@ -5,7 +6,6 @@ from datetime import date, datetime
 import matplotlib
 matplotlib.use("TkAgg")
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
 
 from services.dashboard_service import (
     get_fleet_summary,
@@ -23,6 +23,265 @@ from services.dashboard_service import (
     export_to_csv,
     export_fleet_summary_to_pdf,
 )
+from services.export_service import export_table_csv
+from services.snapshot_service import reporting_db
+from gui.charts import Chart, set_categories
+from utils.chart_data import histogram, lttb, top_k
+
+
+# =========================================================
+# DONNÉES DES GRAPHIQUES
+# =========================================================
+
+# Stable mapping (API-safe); optional states only drawn if present
+FLEET_STATES = [
+    ("available", "Disponible", "#4CAF50"),
+    ("en_sortie", "En sortie", "#FF9800"),
+    ("maintenance", "En maintenance", "#2196F3"),
+    ("_panne", "En panne", "#F44336"),
+    ("_immobilise", "Immobilisé", "#9E9E9E"),
+]
+
+
+# Bars and points drawn whatever the fleet size: beyond, the rows are
+# folded into an "Autres" bar or the series decimated
+TOP_TYPES = 8
+TOP_VEHICLES = 10
+TOP_UTILIZATION = 15
+TOP_EMPLOYEES = 15
+UTILIZATION_BINS = 10
+MAX_POINTS = 300  # ~4 px per point on a 12 inch figure
+
+# Figures with two Axes (one above the other)
+CHART_ROWS = {"employees": 2, "utilization": 2}
+
+
+def chart_data(db_path="db/parc_auto.db"):
+    """
+    Plotted values of every chart, as plain tuples so that an unchanged
+    chart is recognised by its hash and not drawn again.
+    Per-vehicle charts keep the largest vehicles and the mean of the
+    others ("Autres (n)"); counts keep the largest groups and their sum.
+    """
+    summary = get_fleet_summary(db_path)
+    counts = get_vehicle_type_counts(db_path)
+    mileage = get_mileage_by_vehicle(db_path)
+    costs = [c for c in get_detailed_costs_by_vehicle(db_path) if c["cout_total"] > 0]
+    utilization = get_vehicle_utilization_rate(db_path=db_path)
+    employees = get_most_active_employees(db_path)[:TOP_EMPLOYEES]
+    consumption = get_average_consumption_by_type(db_path)
+    evolution = get_cost_evolution(months=12, db_path=db_path)
+
+    # Decimated on the total, the other series cut at the same months
+    evolution = [evolution[i] for i in lttb([e["cout_total"] for e in evolution], MAX_POINTS)]
+
+    return {
+        "fleet_status": tuple(
+            (label, summary[key], color)
+            for key, label, color in FLEET_STATES
+            if summary.get(key, 0) > 0
+        ),
+        "vehicle_types": tuple(top_k(counts.items(), TOP_TYPES)),
+        "mileage": tuple(top_k(
+            [(f"{v['immatriculation']}\n{v['marque']} {v['modele']}", v["kilometrage"]) for v in mileage],
+            TOP_VEHICLES, aggregate="mean",
+        )),
+        "detailed_costs": tuple(top_k(
+            [
+                (c["immatriculation"], c["cout_total"], c["cout_carburant"],
+                 c["cout_maintenance"], c["cout_assurance"])
+                for c in costs
+            ],
+            TOP_VEHICLES, aggregate="mean",
+        )),
+        "utilization": (
+            tuple(top_k(
+                [(v["immatriculation"], v["taux_utilisation"]) for v in utilization if v["taux_utilisation"] > 0],
+                TOP_UTILIZATION, aggregate="mean",
+            )),
+            tuple(histogram([v["taux_utilisation"] for v in utilization], UTILIZATION_BINS, 0, 100)),
+        ),
+        "employees": tuple(
+            (f"{e['nom']} {e['prenom']}", e["nombre_sorties"], e["km_total"]) for e in employees
+        ),
+        "consumption": tuple(top_k(
+            [(c["type_vehicule"], c["km_moyen_vehicule"]) for c in consumption], TOP_TYPES, aggregate="mean",
+        )),
+        "cost_evolution": tuple(
+            (e["periode"], e["cout_carburant"], e["cout_maintenance"], e["cout_total"]) for e in evolution
+        ),
+    }
+
+
+# =========================================================
+# RENDU (mise à jour des artistes existants)
+# =========================================================
+
+def render_fleet_status(chart, states):
+    # The wedges depend on the states present: the pie is redrawn on its Axes
+    ax = chart.ax
+    ax.clear()
+    if not states:
+        chart.message("Aucune donnée d'état du parc disponible")
+        return
+    labels, sizes, colors = zip(*states)
+    ax.pie(sizes, labels=labels, colors=colors, autopct="%1.1f%%", startangle=90)
+    ax.axis("equal")
+    ax.set_title("Répartition de l'état du parc", fontsize=14, fontweight='bold')
+
+
+def render_vehicle_types(chart, counts):
+    if not counts:
+        chart.message("Aucune donnée de type de véhicule")
+        return
+    types, values = zip(*counts)
+    chart.bars("types", color='#2196F3', value_format=lambda v: f'{int(v)}', fontsize=10).set(values)
+    set_categories(chart.ax, types, rotation=45 if len(types) > 3 else 0)
+    chart.ax.set_title("Véhicules par type", fontsize=14, fontweight='bold')
+    chart.ax.set_ylabel("Nombre")
+
+
+def render_mileage(chart, top_10):
+    if not top_10:
+        chart.message("Aucune donnée de kilométrage disponible")
+        return
+    labels, km = zip(*top_10)
+    ax = chart.ax
+    chart.bars("km", horizontal=True, color='#FF9800', value_format=lambda v: f'{int(v):,} km').set(km)
+    set_categories(ax, labels, horizontal=True)
+    ax.set_xlabel('Kilométrage (km)', fontsize=12)
+    ax.set_title('Top 10 - Kilométrage par véhicule', fontsize=14, fontweight='bold')
+    ax.grid(axis='x', alpha=0.3)
+
+
+def render_detailed_costs(chart, top_10):
+    if not top_10:
+        chart.message("Aucun coût enregistré")
+        return
+    labels, _, carburant, maintenance, assurance = zip(*top_10)
+    ax = chart.ax
+    width = 0.25
+    chart.bars("carburant", width=width, offset=-width, label='Carburant', color='#FF5722').set(carburant)
+    chart.bars("maintenance", width=width, label='Maintenance', color='#2196F3').set(maintenance)
+    chart.bars("assurance", width=width, offset=width, label='Assurance', color='#4CAF50').set(assurance)
+    set_categories(ax, labels, rotation=45, ha='right')
+    ax.set_ylabel('Coût (€)', fontsize=12)
+    ax.set_title('Coûts détaillés par véhicule (Top 10)', fontsize=14, fontweight='bold')
+    if ax.get_legend() is None:
+        ax.legend()
+    ax.grid(axis='y', alpha=0.3)
+
+
+def _utilization_color(taux):
+    if taux >= 70:
+        return '#4CAF50'  # Vert : très utilisé
+    if taux >= 40:
+        return '#FF9800'  # Orange : moyennement utilisé
+    return '#F44336'  # Rouge : peu utilisé
+
+
+def render_utilization(chart, data):
+    vehicles, distribution = data
+    if not vehicles:
+        chart.message("Aucun véhicule utilisé dans les 30 derniers jours")
+        return
+    labels, taux = zip(*vehicles)
+    ax1, ax2 = chart.axes
+
+    chart.bars("taux", ax1, value_format=lambda v: f'{v:.1f}%', fontsize=8).set(
+        taux, colors=[_utilization_color(t) for t in taux]
+    )
+    set_categories(ax1, labels, rotation=45)
+    if "seuil" not in chart.series:
+        chart.series["seuil"] = ax1.axhline(y=50, color='r', linestyle='--', alpha=0.5, label='Seuil 50%')
+        ax1.legend(handles=[chart.series["seuil"]])
+    ax1.set_ylabel('Taux d\'utilisation (%)', fontsize=12)
+    ax1.set_title('Taux d\'utilisation des véhicules (30 derniers jours)',
+                  fontsize=14, fontweight='bold')
+    ax1.grid(axis='y', alpha=0.3)
+
+    # Whole fleet, one bar per bin
+    lower, upper, counts = zip(*distribution)
+    chart.bars("repartition", ax2, color='#2196F3', value_format=lambda v: f'{int(v)}').set(counts)
+    set_categories(ax2, [f"{a:.0f}-{b:.0f}%" for a, b in zip(lower, upper)])
+    ax2.set_ylabel('Véhicules', fontsize=12)
+    ax2.set_xlabel('Taux d\'utilisation', fontsize=12)
+    ax2.set_title('Répartition du parc par taux d\'utilisation', fontsize=12)
+    ax2.grid(axis='y', alpha=0.3)
+
+    chart.figure.tight_layout()
+
+
+def render_employees(chart, top_15):
+    if not top_15:
+        chart.message("Aucune donnée d'activité d'employés disponible")
+        return
+    labels, sorties, km_total = zip(*top_15)
+    ax1, ax2 = chart.axes
+
+    chart.bars("sorties", ax1, horizontal=True, color='#2196F3',
+               value_format=lambda v: f' {int(v)}').set(sorties)
+    set_categories(ax1, labels, horizontal=True)
+    ax1.set_xlabel('Nombre de sorties', fontsize=12)
+    ax1.set_title('Top 15 - Employés par nombre de sorties', fontsize=14, fontweight='bold')
+    ax1.grid(axis='x', alpha=0.3)
+
+    chart.bars("km", ax2, horizontal=True, color='#FF9800',
+               value_format=lambda v: f' {int(v):,} km').set(km_total)
+    set_categories(ax2, labels, horizontal=True)
+    ax2.set_xlabel('Kilomètres parcourus', fontsize=12)
+    ax2.set_title('Top 15 - Employés par kilomètres parcourus', fontsize=14, fontweight='bold')
+    ax2.grid(axis='x', alpha=0.3)
+
+    chart.figure.tight_layout()
+
+
+def render_consumption(chart, by_type):
+    if not by_type:
+        chart.message("Aucune donnée de consommation disponible")
+        return
+    types, km_moyen = zip(*by_type)
+    ax = chart.ax
+    chart.bars("km_moyen", color='#4CAF50', value_format=lambda v: f'{int(v):,}', fontsize=10).set(km_moyen)
+    set_categories(ax, types, rotation=45)
+    ax.set_ylabel('Kilométrage moyen (km)', fontsize=12)
+    ax.set_xlabel('Type de véhicule', fontsize=12)
+    ax.set_title('Kilométrage moyen par type de véhicule', fontsize=14, fontweight='bold')
+    ax.grid(axis='y', alpha=0.3)
+
+
+def render_cost_evolution(chart, evolution):
+    if not evolution:
+        chart.message("Aucune donnée d'évolution disponible")
+        return
+    periodes, carburant, maintenance, total = zip(*evolution)
+    ax = chart.ax
+    x = range(len(periodes))
+    chart.line("carburant", marker='o', label='Carburant', color='#FF5722', linewidth=2).set_data(x, carburant)
+    chart.line("maintenance", marker='s', label='Maintenance', color='#2196F3', linewidth=2).set_data(x, maintenance)
+    chart.line("total", marker='^', label='Total', color='#4CAF50', linewidth=2,
+               linestyle='--').set_data(x, total)
+    set_categories(ax, periodes, rotation=45)
+    ax.relim()
+    ax.autoscale_view()
+    ax.set_ylabel('Coût (€)', fontsize=12)
+    ax.set_xlabel('Période', fontsize=12)
+    ax.set_title('Évolution des coûts sur 12 mois', fontsize=14, fontweight='bold')
+    if ax.get_legend() is None:
+        ax.legend()
+    ax.grid(True, alpha=0.3)
+
+
+RENDERERS = {
+    "fleet_status": render_fleet_status,
+    "vehicle_types": render_vehicle_types,
+    "mileage": render_mileage,
+    "detailed_costs": render_detailed_costs,
+    "utilization": render_utilization,
+    "employees": render_employees,
+    "consumption": render_consumption,
+    "cost_evolution": render_cost_evolution,
+}
 
 
 class ReportsWindow(tk.Toplevel):
@@ -32,7 +291,11 @@ class ReportsWindow(tk.Toplevel):
         self.title("Statistiques et rapports")
         self.geometry("1400x800")
 
+        # Reporting replica when enabled (PARC_AUTO_REPORT_SNAPSHOT=1)
+        self.db_path = reporting_db()
+
         self._build_ui()
+        self._build_charts()
         self._load_charts()
 
     # ---------------- UI ----------------
@@ -97,418 +360,41 @@ class ReportsWindow(tk.Toplevel):
 
     # ---------------- Charts ----------------
 
-    def _load_charts(self):
-        self._clear_tabs()
-        
-        # Onglet 1 : État du parc
-        self._fleet_status_chart()
-        self._vehicle_types_chart()
-        
-        # Onglet 2 : Kilométrage
-        self._mileage_charts()
-        
-        # Onglet 3 : Coûts détaillés
-        self._detailed_costs_chart()
-        
-        # Onglet 4 : Taux d'utilisation
-        self._utilization_chart()
-        
-        # Onglet 5 : Employés actifs
-        self._employees_activity_chart()
-        
-        # Onglet 6 : Consommation
-        self._consumption_charts()
-        
-        # Onglet 7 : Évolution
-        self._cost_evolution_chart()
-
-    def _clear_tabs(self):
-        for tab in (self.tab_fleet, self.tab_mileage, self.tab_costs,
-                    self.tab_utilization, self.tab_employees, 
-                    self.tab_consumption, self.tab_evolution):
-            for w in tab.winfo_children():
-                w.destroy()
+    def _add_chart(self, key, master, figsize, **pack):
+        # Figure and Tk canvas kept for the lifetime of the window
+        chart = Chart(figsize, CHART_ROWS.get(key, 1), canvas=lambda figure: FigureCanvasTkAgg(figure, master))
+        chart.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, **pack)
+        self.charts[key] = chart
 
-    # -------- Fleet status --------
+    def _build_charts(self):
+        self.charts = {}
 
-    def _fleet_status_chart(self):
-        data = get_fleet_summary()
-
-        # Container pour les deux graphiques côte à côte
-        container = tk.Frame(self.tab_fleet)
-        container.pack(fill=tk.BOTH, expand=True)
-        
-        # Cadre gauche : État du parc
-        left_frame = tk.Frame(container)
+        # Onglet 1 : deux graphiques côte à côte
+        left_frame = tk.Frame(self.tab_fleet)
         left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-        # Stable mapping (API-safe)
-        mapping = [
-            ("available", "Disponible", "#4CAF50"),
-            ("en_sortie", "En sortie", "#FF9800"),
-            ("maintenance", "En maintenance", "#2196F3"),
-
-            # Optional states (only if present)
-            ("_panne", "En panne", "#F44336"),
-            ("_immobilise", "Immobilisé", "#9E9E9E"),
-        ]
-
-        labels = []
-        sizes = []
-        colors = []
-
-        for key, label, color in mapping:
-            if data.get(key, 0) > 0:
-                labels.append(label)
-                sizes.append(data[key])
-                colors.append(color)
-
-        # Safety net: never draw an empty pie
-        if not sizes:
-            tk.Label(
-                left_frame,
-                text="Aucune donnée d'état du parc disponible",
-                font=("Arial", 11, "italic"),
-            ).pack(pady=20)
-            return
-
-        fig = Figure(figsize=(6, 5))
-        ax = fig.add_subplot(111)
-
-        ax.pie(
-            sizes,
-            labels=labels,
-            colors=colors,
-            autopct="%1.1f%%",
-            startangle=90,
-        )
-        ax.axis("equal")
-        ax.set_title("Répartition de l'état du parc", fontsize=14, fontweight='bold')
-
-        canvas = FigureCanvasTkAgg(fig, left_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-
-    # -------- Vehicle types --------
-
-    def _vehicle_types_chart(self):
-        counts = get_vehicle_type_counts()
-
-        # Cadre droit : Types de véhicules
         right_frame = tk.Frame(self.tab_fleet)
         right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
 
-        if not counts:
-            tk.Label(
-                right_frame,
-                text="Aucune donnée de type de véhicule",
-            ).pack(pady=20)
-            return
-
-        fig = Figure(figsize=(6, 5))
-        ax = fig.add_subplot(111)
-        
-        types = list(counts.keys())
-        values = list(counts.values())
-        
-        bars = ax.bar(types, values, color='#2196F3')
-        ax.set_title("Véhicules par type", fontsize=14, fontweight='bold')
-        ax.set_ylabel("Nombre")
-        
-        if len(types) > 3:
-            ax.tick_params(axis='x', rotation=45)
-        
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{int(height)}',
-                   ha='center', va='bottom')
-
-        canvas = FigureCanvasTkAgg(fig, right_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-
-    # -------- Mileage --------
-
-    def _mileage_charts(self):
-        mileage_data = get_mileage_by_vehicle()
-        
-        if not mileage_data:
-            tk.Label(
-                self.tab_mileage,
-                text="Aucune donnée de kilométrage disponible",
-                font=('Arial', 12)
-            ).pack(pady=50)
-            return
-        
-        # Top 10 véhicules par kilométrage
-        top_10 = mileage_data[:10]
-        
-        fig = Figure(figsize=(12, 6))
-        ax = fig.add_subplot(111)
-        
-        labels = [f"{v['immatriculation']}\n{v['marque']} {v['modele']}" for v in top_10]
-        km = [v['kilometrage'] for v in top_10]
-        
-        bars = ax.barh(labels, km, color='#FF9800')
-        ax.set_xlabel('Kilométrage (km)', fontsize=12)
-        ax.set_title('Top 10 - Kilométrage par véhicule', fontsize=14, fontweight='bold')
-        ax.grid(axis='x', alpha=0.3)
-        
-        for i, bar in enumerate(bars):
-            width = bar.get_width()
-            ax.text(width, bar.get_y() + bar.get_height()/2.,
-                   f'{int(width):,} km',
-                   ha='left', va='center', fontsize=9)
-        
-        canvas = FigureCanvasTkAgg(fig, self.tab_mileage)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-
-    # -------- Detailed costs --------
+        self._add_chart("fleet_status", left_frame, (6, 5))
+        self._add_chart("vehicle_types", right_frame, (6, 5))
+        self._add_chart("mileage", self.tab_mileage, (12, 6), padx=10, pady=10)
+        self._add_chart("detailed_costs", self.tab_costs, (12, 7), padx=10, pady=10)
+        self._add_chart("utilization", self.tab_utilization, (12, 9), padx=10, pady=10)
+        self._add_chart("employees", self.tab_employees, (14, 10), padx=10, pady=10)
+        self._add_chart("consumption", self.tab_consumption, (12, 6), padx=10, pady=10)
+        self._add_chart("cost_evolution", self.tab_evolution, (12, 6), padx=10, pady=10)
 
-    def _detailed_costs_chart(self):
-        costs_data = get_detailed_costs_by_vehicle()
-        
-        if not costs_data:
-            tk.Label(
-                self.tab_costs,
-                text="Aucune donnée de coûts disponible",
-                font=('Arial', 12)
-            ).pack(pady=50)
-            return
-        
-        # Top 10 véhicules par coût total
-        top_10 = [c for c in costs_data if c['cout_total'] > 0][:10]
-        
-        if not top_10:
-            tk.Label(
-                self.tab_costs,
-                text="Aucun coût enregistré",
-                font=('Arial', 12)
-            ).pack(pady=50)
-            return
-        
-        fig = Figure(figsize=(12, 7))
-        ax = fig.add_subplot(111)
-        
-        labels = [f"{v['immatriculation']}" for v in top_10]
-        carburant = [v['cout_carburant'] for v in top_10]
-        maintenance = [v['cout_maintenance'] for v in top_10]
-        assurance = [v['cout_assurance'] for v in top_10]
-        
-        x = range(len(labels))
-        width = 0.25
-        
-        ax.bar([i - width for i in x], carburant, width, label='Carburant', color='#FF5722')
-        ax.bar(x, maintenance, width, label='Maintenance', color='#2196F3')
-        ax.bar([i + width for i in x], assurance, width, label='Assurance', color='#4CAF50')
-        
-        ax.set_ylabel('Coût (€)', fontsize=12)
-        ax.set_title('Coûts détaillés par véhicule (Top 10)', fontsize=14, fontweight='bold')
-        ax.set_xticks(x)
-        ax.set_xticklabels(labels, rotation=45, ha='right')
-        ax.legend()
-        ax.grid(axis='y', alpha=0.3)
-        
-        canvas = FigureCanvasTkAgg(fig, self.tab_costs)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-
-    # -------- Utilization --------
-
-    def _utilization_chart(self):
-        util_data = get_vehicle_utilization_rate()
-        
-        if not util_data:
-            tk.Label(
-                self.tab_utilization,
-                text="Aucune donnée d'utilisation disponible",
-                font=('Arial', 12)
-            ).pack(pady=50)
-            return
-        
-        # Filtrer les véhicules avec utilisation > 0
-        active_vehicles = [v for v in util_data if v['taux_utilisation'] > 0][:15]
-        
-        if not active_vehicles:
-            tk.Label(
-                self.tab_utilization,
-                text="Aucun véhicule utilisé dans les 30 derniers jours",
-                font=('Arial', 12)
-            ).pack(pady=50)
-            return
-        
-        fig = Figure(figsize=(12, 6))
-        ax = fig.add_subplot(111)
-        
-        labels = [v['immatriculation'] for v in active_vehicles]
-        taux = [v['taux_utilisation'] for v in active_vehicles]
-        
-        # Couleurs selon le taux
-        colors = []
-        for t in taux:
-            if t >= 70:
-                colors.append('#4CAF50')  # Vert : très utilisé
-            elif t >= 40:
-                colors.append('#FF9800')  # Orange : moyennement utilisé
-            else:
-                colors.append('#F44336')  # Rouge : peu utilisé
-        
-        bars = ax.bar(labels, taux, color=colors)
-        ax.set_ylabel('Taux d\'utilisation (%)', fontsize=12)
-        ax.set_xlabel('Véhicule', fontsize=12)
-        ax.set_title('Taux d\'utilisation des véhicules (30 derniers jours)', 
-                     fontsize=14, fontweight='bold')
-        ax.tick_params(axis='x', rotation=45)
-        ax.grid(axis='y', alpha=0.3)
-        ax.axhline(y=50, color='r', linestyle='--', alpha=0.5, label='Seuil 50%')
-        ax.legend()
-        
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{height:.1f}%',
-                   ha='center', va='bottom', fontsize=8)
-        
-        canvas = FigureCanvasTkAgg(fig, self.tab_utilization)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-
-    # -------- Employees --------
-
-    def _employees_activity_chart(self):
-        emp_data = get_most_active_employees()
-        
-        if not emp_data:
-            tk.Label(
-                self.tab_employees,
-                text="Aucune donnée d'activité d'employés disponible",
-                font=('Arial', 12)
-            ).pack(pady=50)
-            return
-        
-        top_15 = emp_data[:15]
-        
-        # Créer deux sous-graphiques
-        fig = Figure(figsize=(14, 10))
-        
-        # Graphique 1 : Nombre de sorties
-        ax1 = fig.add_subplot(211)
-        labels1 = [f"{e['nom']} {e['prenom']}" for e in top_15]
-        sorties = [e['nombre_sorties'] for e in top_15]
-        
-        bars1 = ax1.barh(labels1, sorties, color='#2196F3')
-        ax1.set_xlabel('Nombre de sorties', fontsize=12)
-        ax1.set_title('Top 15 - Employés par nombre de sorties', fontsize=14, fontweight='bold')
-        ax1.grid(axis='x', alpha=0.3)
-        
-        for bar in bars1:
-            width = bar.get_width()
-            ax1.text(width, bar.get_y() + bar.get_height()/2.,
-                    f' {int(width)}',
-                    ha='left', va='center', fontsize=9)
-        
-        # Graphique 2 : Kilomètres parcourus
-        ax2 = fig.add_subplot(212)
-        labels2 = [f"{e['nom']} {e['prenom']}" for e in top_15]
-        km_total = [e['km_total'] for e in top_15]
-        
-        bars2 = ax2.barh(labels2, km_total, color='#FF9800')
-        ax2.set_xlabel('Kilomètres parcourus', fontsize=12)
-        ax2.set_title('Top 15 - Employés par kilomètres parcourus', fontsize=14, fontweight='bold')
-        ax2.grid(axis='x', alpha=0.3)
-        
-        for bar in bars2:
-            width = bar.get_width()
-            ax2.text(width, bar.get_y() + bar.get_height()/2.,
-                    f' {int(width):,} km',
-                    ha='left', va='center', fontsize=9)
-        
-        fig.tight_layout()
-        
-        canvas = FigureCanvasTkAgg(fig, self.tab_employees)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-
-    # -------- Consumption --------
-
-    def _consumption_charts(self):
-        consumption_by_type = get_average_consumption_by_type()
-        
-        if not consumption_by_type:
-            tk.Label(
-                self.tab_consumption,
-                text="Aucune donnée de consommation disponible",
-                font=('Arial', 12)
-            ).pack(pady=50)
-            return
-        
-        fig = Figure(figsize=(12, 6))
-        ax = fig.add_subplot(111)
-        
-        types = [c['type_vehicule'] for c in consumption_by_type]
-        km_moyen = [c['km_moyen_vehicule'] for c in consumption_by_type]
-        
-        bars = ax.bar(types, km_moyen, color='#4CAF50')
-        ax.set_ylabel('Kilométrage moyen (km)', fontsize=12)
-        ax.set_xlabel('Type de véhicule', fontsize=12)
-        ax.set_title('Kilométrage moyen par type de véhicule', fontsize=14, fontweight='bold')
-        ax.tick_params(axis='x', rotation=45)
-        ax.grid(axis='y', alpha=0.3)
-        
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{int(height):,}',
-                   ha='center', va='bottom')
-        
-        canvas = FigureCanvasTkAgg(fig, self.tab_consumption)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-
-    # -------- Evolution --------
-
-    def _cost_evolution_chart(self):
-        evolution_data = get_cost_evolution(months=12)
-        
-        if not evolution_data:
-            tk.Label(
-                self.tab_evolution,
-                text="Aucune donnée d'évolution disponible",
-                font=('Arial', 12)
-            ).pack(pady=50)
-            return
-        
-        fig = Figure(figsize=(12, 6))
-        ax = fig.add_subplot(111)
-        
-        periodes = [e['periode'] for e in evolution_data]
-        carburant = [e['cout_carburant'] for e in evolution_data]
-        maintenance = [e['cout_maintenance'] for e in evolution_data]
-        total = [e['cout_total'] for e in evolution_data]
-        
-        ax.plot(periodes, carburant, marker='o', label='Carburant', color='#FF5722', linewidth=2)
-        ax.plot(periodes, maintenance, marker='s', label='Maintenance', color='#2196F3', linewidth=2)
-        ax.plot(periodes, total, marker='^', label='Total', color='#4CAF50', linewidth=2, linestyle='--')
-        
-        ax.set_ylabel('Coût (€)', fontsize=12)
-        ax.set_xlabel('Période', fontsize=12)
-        ax.set_title('Évolution des coûts sur 12 mois', fontsize=14, fontweight='bold')
-        ax.tick_params(axis='x', rotation=45)
-        ax.legend()
-        ax.grid(True, alpha=0.3)
-        
-        canvas = FigureCanvasTkAgg(fig, self.tab_evolution)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+    def _load_charts(self):
+        # Seuls les graphiques dont les données ont changé sont redessinés
+        for key, data in chart_data(self.db_path).items():
+            self.charts[key].refresh(data, RENDERERS[key])
 
     # -------- Export CSV --------
 
     def _export_csv_menu(self):
         menu_window = tk.Toplevel(self)
         menu_window.title("Export CSV")
-        menu_window.geometry("400x400")
+        menu_window.geometry("400x500")
         
         tk.Label(
             menu_window,
@@ -522,6 +408,10 @@ class ReportsWindow(tk.Toplevel):
             ("Taux d'utilisation", self._export_utilization_csv),
             ("Employés actifs", self._export_employees_csv),
             ("Consommation par type", self._export_consumption_csv),
+            ("Historique complet des sorties",
+             lambda: self._export_history_csv("sorties_reservations", "sorties")),
+            ("Historique complet des ravitaillements",
+             lambda: self._export_history_csv("ravitaillements", "ravitaillements")),
         ]
         
         for text, command in options:
@@ -548,7 +438,7 @@ class ReportsWindow(tk.Toplevel):
             initialfile=f"kilometrage_{datetime.now().strftime('%Y%m%d')}.csv"
         )
         if filename:
-            data = get_mileage_by_vehicle()
+            data = get_mileage_by_vehicle(db_path=self.db_path)
             headers = ['immatriculation', 'marque', 'modele', 'type_vehicule', 'kilometrage']
             success, msg = export_to_csv(data, headers, filename)
             if success:
@@ -563,7 +453,7 @@ class ReportsWindow(tk.Toplevel):
             initialfile=f"couts_detailles_{datetime.now().strftime('%Y%m%d')}.csv"
         )
         if filename:
-            data = get_detailed_costs_by_vehicle()
+            data = get_detailed_costs_by_vehicle(db_path=self.db_path)
             headers = ['immatriculation', 'marque', 'modele', 'cout_carburant', 
                       'cout_maintenance', 'cout_assurance', 'cout_total']
             success, msg = export_to_csv(data, headers, filename)
@@ -579,7 +469,7 @@ class ReportsWindow(tk.Toplevel):
             initialfile=f"taux_utilisation_{datetime.now().strftime('%Y%m%d')}.csv"
         )
         if filename:
-            data = get_vehicle_utilization_rate()
+            data = get_vehicle_utilization_rate(db_path=self.db_path)
             headers = ['immatriculation', 'marque', 'modele', 'statut', 
                       'jours_utilises', 'nombre_sorties', 'km_parcourus', 'taux_utilisation']
             success, msg = export_to_csv(data, headers, filename)
@@ -595,7 +485,7 @@ class ReportsWindow(tk.Toplevel):
             initialfile=f"employes_actifs_{datetime.now().strftime('%Y%m%d')}.csv"
         )
         if filename:
-            data = get_most_active_employees()
+            data = get_most_active_employees(db_path=self.db_path)
             headers = ['nom', 'prenom', 'service', 'nombre_sorties', 
                       'km_total', 'km_moyen_par_sortie']
             success, msg = export_to_csv(data, headers, filename)
@@ -611,7 +501,7 @@ class ReportsWindow(tk.Toplevel):
             initialfile=f"consommation_{datetime.now().strftime('%Y%m%d')}.csv"
         )
         if filename:
-            data = get_average_consumption_by_type()
+            data = get_average_consumption_by_type(db_path=self.db_path)
             headers = ['type_vehicule', 'nombre_vehicules', 'km_total', 
                       'cout_carburant_total', 'km_moyen_vehicule']
             success, msg = export_to_csv(data, headers, filename)
@@ -620,6 +510,50 @@ class ReportsWindow(tk.Toplevel):
             else:
                 messagebox.showerror("Erreur", msg)
 
+    def _export_history_csv(self, table, prefix):
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("CSV compressé", "*.csv.gz")],
+            initialfile=f"historique_{prefix}_{datetime.now().strftime('%Y%m%d')}.csv"
+        )
+        if not filename:
+            return
+
+        # Export en arrière-plan : la fenêtre reste réactive sur les gros historiques
+        progress_window = tk.Toplevel(self)
+        progress_window.title("Export CSV")
+        progress_window.geometry("320x90")
+        label = tk.Label(progress_window, text="Export en cours...", font=('Arial', 10))
+        label.pack(expand=True)
+
+        state = {"written": 0, "total": None, "result": None}
+
+        def on_progress(written, total):
+            state["written"], state["total"] = written, total
+
+        def worker():
+            try:
+                count = export_table_csv(table, filename, progress=on_progress, db_path=self.db_path)
+                state["result"] = (True, f"Export CSV réussi : {count} lignes -> {filename}")
+            except Exception as e:
+                state["result"] = (False, f"Erreur lors de l'export CSV : {e}")
+
+        def poll():
+            if state["result"] is None:
+                if state["total"]:
+                    label.config(text=f"{state['written']:,} / {state['total']:,} lignes".replace(",", " "))
+                self.after(200, poll)
+                return
+            progress_window.destroy()
+            success, msg = state["result"]
+            if success:
+                messagebox.showinfo("Succès", msg)
+            else:
+                messagebox.showerror("Erreur", msg)
+
+        threading.Thread(target=worker, daemon=True).start()
+        poll()
+
     # -------- Export PDF --------
 
     def _export_pdf_menu(self):
@@ -655,13 +589,36 @@ class ReportsWindow(tk.Toplevel):
             filetypes=[("PDF files", "*.pdf")],
             initialfile=f"rapport_parc_{datetime.now().strftime('%Y%m%d')}.pdf"
         )
-        if filename:
-            summary = get_fleet_summary()
-            costs = get_detailed_costs_by_vehicle()
-            utilization = get_vehicle_utilization_rate()
-            
-            success, msg = export_fleet_summary_to_pdf(summary, costs, utilization, filename)
+        if not filename:
+            return
+
+        # Rendu en arrière-plan : tout le parc, potentiellement plusieurs centaines de pages
+        progress_window = tk.Toplevel(self)
+        progress_window.title("Export PDF")
+        progress_window.geometry("320x90")
+        tk.Label(progress_window, text="Génération du rapport...", font=('Arial', 10)).pack(expand=True)
+
+        state = {"result": None}
+
+        def worker():
+            try:
+                summary = get_fleet_summary(db_path=self.db_path)
+                costs = get_detailed_costs_by_vehicle(db_path=self.db_path)
+                utilization = get_vehicle_utilization_rate(db_path=self.db_path)
+                state["result"] = export_fleet_summary_to_pdf(summary, costs, utilization, filename)
+            except Exception as e:
+                state["result"] = (False, f"Erreur lors de l'export PDF : {e}")
+
+        def poll():
+            if state["result"] is None:
+                self.after(200, poll)
+                return
+            progress_window.destroy()
+            success, msg = state["result"]
             if success:
                 messagebox.showinfo("Succès", msg)
             else:
-                messagebox.showerror("Erreur", msg)
\ No newline at end of file
+                messagebox.showerror("Erreur", msg)
+
+        threading.Thread(target=worker, daemon=True).start()
+        poll()
\ No newline at end of file
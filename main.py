@@ -3,8 +3,10 @@ from tkinter import messagebox
 
 from auth import authenticate_user, AuthError
 from database import init_db, get_connection
-from gui.dashboard import DashboardWindow
-from gui.user_management import UserManagementWindow
+from services.session_service import create_session
+
+# gui.dashboard and gui.user_management are imported when first needed so
+# that the login window appears without loading the other windows
 
 
 DB_PATH = "db/parc_auto.db"
@@ -26,6 +28,7 @@ def route_by_role(user: dict):
     Route user to the appropriate dashboard based on role.
     All roles currently land on the same dashboard.
     """
+    from gui.dashboard import DashboardWindow
     DashboardWindow(user, db_path=DB_PATH)
 
 
@@ -79,7 +82,9 @@ class LoginWindow(tk.Tk):
             messagebox.showerror("Erreur de connexion", str(e))
             return
 
-        # Login successful
+        # Login successful: role checks go through the session cache
+        user["session_token"] = create_session(user, db_path=DB_PATH)
+
         self.withdraw()
         route_by_role(user)
 
@@ -88,6 +93,7 @@ class LoginWindow(tk.Tk):
         Open the user creation window (bootstrap mode).
         Intended for first admin creation only.
         """
+        from gui.user_management import UserManagementWindow
         UserManagementWindow(db_path=DB_PATH)
 
 
@@ -1,4 +1,5 @@
 from database import get_connection
+from utils.stats_cache import invalidate_tables
 
 
 class AffectationError(Exception):
@@ -48,6 +49,8 @@ def create_affectation(
 
         conn.commit()
 
+    invalidate_tables("affectations_permanentes", db_path=db_path)
+
 
 def get_active_affectation(
     vehicule_id: int,
@@ -94,3 +97,5 @@ def end_affectation(
             raise AffectationError("Affectation introuvable")
 
         conn.commit()
+
+    invalidate_tables("affectations_permanentes", db_path=db_path)
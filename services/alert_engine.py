@@ -0,0 +1,549 @@
+from datetime import date, datetime, timedelta
+import math
+
+from database import get_connection
+
+
+# Persisted alert store (table `alertes`).
+#
+# Each dated source row (document, maintenance, driving licence) has one
+# alert row, plus one km-based revision alert per vehicle whose deadline
+# is projected from its recent mileage. The statut follows the deadline:
+#   a_venir -> proche (within ALERT_WINDOW_DAYS) -> retard (overdue)
+# and becomes `resolue` when the source is superseded (renewed document,
+# newer maintenance of the same type, renewed licence).
+#
+# Writes in the services call the on_*_written hooks inside their own
+# transaction; the passage of time is handled by sweep_alerts(), two
+# indexed range updates. Open alerts are an indexed read. The km-based
+# revision alerts only change with the odometer (on_vehicle_odometer):
+# their projected date may be empty and is not escalated by the sweep.
+
+class AlertError(Exception):
+    pass
+
+
+ALERT_WINDOW_DAYS = 30
+
+# Km-based revision: alert when fewer than REVISION_KM_AHEAD km remain,
+# daily mileage measured over the last MILEAGE_RATE_DAYS days of trips.
+REVISION_KM_AHEAD = 1000
+MILEAGE_RATE_DAYS = 90
+
+_REVISION_SQL = """
+    SELECT
+        v.id AS vehicule_id,
+        v.immatriculation,
+        COALESCE(v.kilometrage_actuel, 0) AS kilometrage_actuel,
+        -- Counter restarted by maintenance interventions only, not by
+        -- insurance or fuel entries recorded in maintenances
+        COALESCE(
+            (SELECT MAX(m.kilometrage) FROM maintenances m
+             WHERE m.vehicule_id = v.id AND m.categorie = 'maintenance'
+               AND m.kilometrage IS NOT NULL),
+            0
+        ) + v.seuil_revision_km AS km_revision,
+        COALESCE(
+            (SELECT SUM(s.km_retour - s.km_depart) FROM sorties_reservations s
+             WHERE s.vehicule_id = v.id
+               AND s.date_retour_reelle >= :rate_start
+               AND s.km_retour IS NOT NULL),
+            0
+        ) * 1.0 / :rate_days AS km_par_jour
+    FROM vehicules v
+    WHERE v.seuil_revision_km > 0
+"""
+
+
+def classify(date_echeance: str, today: date | None = None) -> str:
+    today = today or date.today()
+    echeance = date.fromisoformat(date_echeance)
+
+    if echeance < today:
+        return "retard"
+    if echeance <= today + timedelta(days=ALERT_WINDOW_DAYS):
+        return "proche"
+    return "a_venir"
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _upsert(cur, source_type, source_id, vehicule_id, employe_id, libelle, date_echeance, statut):
+    now = _now()
+    cur.execute(
+        """
+        INSERT INTO alertes (
+            source_type, source_id, vehicule_id, employe_id,
+            libelle, date_echeance, statut, date_creation, date_maj
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (source_type, source_id) DO UPDATE SET
+            libelle = excluded.libelle,
+            date_echeance = excluded.date_echeance,
+            date_maj = excluded.date_maj,
+            date_resolution = CASE
+                WHEN excluded.statut = 'resolue' THEN COALESCE(alertes.date_resolution, excluded.date_maj)
+                ELSE NULL END,
+            date_acquittement = CASE
+                WHEN alertes.statut = excluded.statut THEN alertes.date_acquittement END,
+            acquittee_par = CASE
+                WHEN alertes.statut = excluded.statut THEN alertes.acquittee_par END,
+            statut = excluded.statut
+        """,
+        (source_type, source_id, vehicule_id, employe_id, libelle, date_echeance, statut, now, now),
+    )
+
+
+def _resolve(cur, source_type, source_ids):
+    if not source_ids:
+        return
+    now = _now()
+    cur.executemany(
+        """
+        UPDATE alertes
+        SET statut = 'resolue', date_resolution = ?, date_maj = ?
+        WHERE source_type = ? AND source_id = ? AND statut != 'resolue'
+        """,
+        [(now, now, source_type, source_id) for source_id in source_ids],
+    )
+
+
+def revision_km_status(cur, today: date | None = None, vehicule_id: int | None = None,
+                       km_ahead: int = REVISION_KM_AHEAD):
+    """
+    Km-based revision state of every vehicle with a seuil_revision_km
+    (or of one vehicle). Due at the last maintenance kilometrage plus the
+    threshold; the due date is projected from the recent daily mileage.
+    Returns dicts with km_restants, km_par_jour, date_prevue (None when the
+    vehicle has not been driven recently) and statut.
+    """
+    today = today or date.today()
+    params = {
+        "rate_start": (today - timedelta(days=MILEAGE_RATE_DAYS)).isoformat(),
+        "rate_days": MILEAGE_RATE_DAYS,
+    }
+    query = _REVISION_SQL
+    if vehicule_id is not None:
+        query += " AND v.id = :vehicule_id"
+        params["vehicule_id"] = vehicule_id
+
+    result = []
+    for r in cur.execute(query, params).fetchall():
+        km_restants = r["km_revision"] - r["kilometrage_actuel"]
+        km_par_jour = r["km_par_jour"]
+
+        if km_restants <= 0:
+            date_prevue = today
+        elif km_par_jour > 0:
+            date_prevue = today + timedelta(days=math.ceil(km_restants / km_par_jour))
+        else:
+            date_prevue = None
+
+        if km_restants <= 0:
+            statut = "retard"
+        elif km_restants <= km_ahead:
+            statut = "proche"
+        elif date_prevue is not None:
+            statut = classify(date_prevue.isoformat(), today)
+        else:
+            statut = None
+
+        result.append({
+            "vehicule_id": r["vehicule_id"],
+            "immatriculation": r["immatriculation"],
+            "kilometrage_actuel": r["kilometrage_actuel"],
+            "km_revision": r["km_revision"],
+            "km_restants": km_restants,
+            "km_par_jour": round(km_par_jour, 1),
+            "date_prevue": date_prevue.isoformat() if date_prevue else None,
+            "statut": statut,
+        })
+
+    return result
+
+
+def _store_revision(cur, status):
+    if status["statut"] is None:
+        # Not due and no mileage to project a date from
+        _resolve(cur, "revision_km", [status["vehicule_id"]])
+        return
+
+    # No projected date when the vehicle has not been driven recently:
+    # left empty rather than a date that sweep_alerts would see pass
+    _upsert(
+        cur, "revision_km", status["vehicule_id"], status["vehicule_id"], None,
+        f"Révision à {status['km_revision']} km",
+        status["date_prevue"],
+        status["statut"],
+    )
+
+
+# =========================================================
+# HOOKS (APPELÉS PAR LES SERVICES, DANS LEUR TRANSACTION)
+# =========================================================
+
+def on_vehicle_odometer(cur, vehicule_id: int, today: date | None = None):
+    """
+    Re-evaluate the km-based revision alert of one vehicle after its
+    odometer (or its maintenance history) changed.
+    """
+    rows = revision_km_status(cur, today, vehicule_id=vehicule_id)
+    if not rows:
+        _resolve(cur, "revision_km", [vehicule_id])
+        return
+    _store_revision(cur, rows[0])
+
+
+def on_document_written(cur, document_id: int, today: date | None = None):
+    """
+    Refresh the alert of a document and resolve the ones it renews
+    (same vehicle and document type, earlier deadline).
+    """
+    doc = cur.execute(
+        "SELECT id, vehicule_id, type_document, date_echeance FROM documents WHERE id = ?",
+        (document_id,),
+    ).fetchone()
+    if doc is None or doc["date_echeance"] is None:
+        _resolve(cur, "document", [document_id])
+        return
+
+    newer = cur.execute(
+        """
+        SELECT 1 FROM documents
+        WHERE vehicule_id = ? AND type_document = ? AND id != ?
+          AND date_echeance > ?
+        LIMIT 1
+        """,
+        (doc["vehicule_id"], doc["type_document"], doc["id"], doc["date_echeance"]),
+    ).fetchone()
+
+    statut = "resolue" if newer else classify(doc["date_echeance"], today)
+    _upsert(
+        cur, "document", doc["id"], doc["vehicule_id"], None,
+        doc["type_document"], doc["date_echeance"], statut,
+    )
+
+    if not newer:
+        older = cur.execute(
+            """
+            SELECT id FROM documents
+            WHERE vehicule_id = ? AND type_document = ? AND id != ?
+              AND date_echeance <= ?
+            """,
+            (doc["vehicule_id"], doc["type_document"], doc["id"], doc["date_echeance"]),
+        ).fetchall()
+        _resolve(cur, "document", [r["id"] for r in older])
+
+
+def on_maintenance_written(cur, maintenance_id: int, today: date | None = None):
+    """
+    Refresh the alert of a maintenance; a newer intervention of the same
+    type on the same vehicle resolves the previous deadlines.
+    """
+    m = cur.execute(
+        """
+        SELECT id, vehicule_id, type_intervention, date, date_prochaine_echeance
+        FROM maintenances WHERE id = ?
+        """,
+        (maintenance_id,),
+    ).fetchone()
+    if m is None:
+        _resolve(cur, "maintenance", [maintenance_id])
+        return
+
+    newer = cur.execute(
+        """
+        SELECT 1 FROM maintenances
+        WHERE vehicule_id = ? AND type_intervention = ? AND id != ?
+          AND (date > ? OR (date = ? AND id > ?))
+        LIMIT 1
+        """,
+        (m["vehicule_id"], m["type_intervention"], m["id"], m["date"], m["date"], m["id"]),
+    ).fetchone()
+
+    if not newer:
+        older = cur.execute(
+            """
+            SELECT id FROM maintenances
+            WHERE vehicule_id = ? AND type_intervention = ? AND id != ?
+              AND date_prochaine_echeance IS NOT NULL
+              AND (date < ? OR (date = ? AND id < ?))
+            """,
+            (m["vehicule_id"], m["type_intervention"], m["id"], m["date"], m["date"], m["id"]),
+        ).fetchall()
+        _resolve(cur, "maintenance", [r["id"] for r in older])
+
+    on_vehicle_odometer(cur, m["vehicule_id"], today)
+
+    if m["date_prochaine_echeance"] is None:
+        _resolve(cur, "maintenance", [m["id"]])
+        return
+
+    statut = "resolue" if newer else classify(m["date_prochaine_echeance"], today)
+    _upsert(
+        cur, "maintenance", m["id"], m["vehicule_id"], None,
+        m["type_intervention"], m["date_prochaine_echeance"], statut,
+    )
+
+
+def on_employee_written(cur, employe_id: int, today: date | None = None):
+    """
+    Driving licence alert for employees allowed to drive, or suspended
+    because their licence expired (the alert stays until renewal).
+    """
+    e = cur.execute(
+        """
+        SELECT id, autorise_conduire, permis_suspendu, date_validite_permis
+        FROM employes WHERE id = ?
+        """,
+        (employe_id,),
+    ).fetchone()
+
+    if (
+        e is None
+        or not (e["autorise_conduire"] or e["permis_suspendu"])
+        or not e["date_validite_permis"]
+    ):
+        _resolve(cur, "permis", [employe_id])
+        return
+
+    _upsert(
+        cur, "permis", e["id"], None, e["id"],
+        "Permis de conduire", e["date_validite_permis"],
+        classify(e["date_validite_permis"], today),
+    )
+
+
+# =========================================================
+# BALAYAGE / RECONSTRUCTION
+# =========================================================
+
+def sweep_alerts(today: date | None = None, db_path="db/parc_auto.db"):
+    """
+    Escalate alerts as days pass (a_venir -> proche -> retard).
+    Builds the store from the source tables on first run (databases
+    created or seeded before the store existed).
+    Returns {"proche": n, "retard": n} escalation counts.
+    """
+    today = today or date.today()
+    limit_date = (today + timedelta(days=ALERT_WINDOW_DAYS)).isoformat()
+    now = _now()
+
+    with get_connection(db_path) as conn:
+        cur = conn.cursor()
+
+        if _needs_rebuild(cur):
+            _rebuild(cur, today)
+
+        cur.execute(
+            """
+            UPDATE alertes
+            SET statut = 'retard', date_maj = ?,
+                date_acquittement = NULL, acquittee_par = NULL
+            WHERE statut IN ('a_venir', 'proche') AND date_echeance < ?
+              AND source_type != 'revision_km'
+            """,
+            (now, today.isoformat()),
+        )
+        retard = cur.rowcount
+
+        cur.execute(
+            """
+            UPDATE alertes
+            SET statut = 'proche', date_maj = ?
+            WHERE statut = 'a_venir' AND date_echeance <= ?
+              AND source_type != 'revision_km'
+            """,
+            (now, limit_date),
+        )
+        proche = cur.rowcount
+
+        conn.commit()
+
+    return {"proche": proche, "retard": retard}
+
+
+def _needs_rebuild(cur):
+    return cur.execute(
+        "SELECT 1 FROM app_state WHERE cle = 'alertes_initialisees'"
+    ).fetchone() is None
+
+
+def ensure_alert_store(db_path="db/parc_auto.db") -> bool:
+    """
+    Build the store when it does not exist yet (sweep_alerts); read only
+    otherwise, escalation being left to the scheduler's alert_sweep job.
+    Returns True when the store was built.
+    """
+    with get_connection(db_path) as conn:
+        if not _needs_rebuild(conn.cursor()):
+            return False
+    sweep_alerts(db_path=db_path)
+    return True
+
+
+def rebuild_alerts(today: date | None = None, db_path="db/parc_auto.db"):
+    """
+    Recompute the whole store from the source tables (migration / repair).
+    Acknowledgements are lost.
+    """
+    with get_connection(db_path) as conn:
+        cur = conn.cursor()
+        _rebuild(cur, today or date.today())
+        conn.commit()
+
+
+def _rebuild(cur, today):
+    cur.execute("DELETE FROM alertes")
+
+    params = {
+        "today": today.isoformat(),
+        "limit_date": (today + timedelta(days=ALERT_WINDOW_DAYS)).isoformat(),
+        "now": _now(),
+    }
+    statut_sql = """
+        CASE
+            WHEN rang > 1 THEN 'resolue'
+            WHEN echeance < :today THEN 'retard'
+            WHEN echeance <= :limit_date THEN 'proche'
+            ELSE 'a_venir'
+        END
+    """
+
+    cur.execute(f"""
+        INSERT INTO alertes (
+            source_type, source_id, vehicule_id, libelle,
+            date_echeance, statut, date_creation, date_maj
+        )
+        SELECT 'document', id, vehicule_id, type_document, echeance,
+               {statut_sql}, :now, :now
+        FROM (
+            SELECT id, vehicule_id, type_document, date_echeance AS echeance,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY vehicule_id, type_document
+                       ORDER BY date_echeance DESC, id DESC
+                   ) AS rang
+            FROM documents
+            WHERE date_echeance IS NOT NULL
+        )
+    """, params)
+
+    cur.execute(f"""
+        INSERT INTO alertes (
+            source_type, source_id, vehicule_id, libelle,
+            date_echeance, statut, date_creation, date_maj
+        )
+        SELECT 'maintenance', id, vehicule_id, type_intervention, echeance,
+               {statut_sql}, :now, :now
+        FROM (
+            SELECT id, vehicule_id, type_intervention,
+                   date_prochaine_echeance AS echeance,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY vehicule_id, type_intervention
+                       ORDER BY date DESC, id DESC
+                   ) AS rang
+            FROM maintenances
+        )
+        WHERE echeance IS NOT NULL
+    """, params)
+
+    cur.execute(f"""
+        INSERT INTO alertes (
+            source_type, source_id, employe_id, libelle,
+            date_echeance, statut, date_creation, date_maj
+        )
+        SELECT 'permis', id, id, 'Permis de conduire', echeance,
+               {statut_sql}, :now, :now
+        FROM (
+            SELECT id, date_validite_permis AS echeance, 1 AS rang
+            FROM employes
+            WHERE (autorise_conduire = 1 OR permis_suspendu = 1)
+              AND date_validite_permis IS NOT NULL
+        )
+    """, params)
+
+    for status in revision_km_status(cur, today):
+        _store_revision(cur, status)
+
+    cur.execute(
+        """
+        INSERT INTO app_state (cle, valeur) VALUES ('alertes_initialisees', ?)
+        ON CONFLICT (cle) DO UPDATE SET valeur = excluded.valeur
+        """,
+        (params["now"],),
+    )
+
+
+# =========================================================
+# LECTURE / ACQUITTEMENT
+# =========================================================
+
+TYPE_LABELS = {
+    "document": "Document",
+    "maintenance": "Maintenance",
+    "permis": "Permis",
+    "revision_km": "Révision km",
+}
+
+
+def get_open_alerts(include_acknowledged=True, db_path="db/parc_auto.db"):
+    """
+    Open alerts (proche / retard), most urgent first.
+    Keys match alert_service (type, vehicule, libelle, date_echeance,
+    statut) plus id, source_type and acquittee.
+    """
+    query = """
+        SELECT
+            a.id,
+            a.source_type,
+            a.libelle,
+            a.date_echeance,
+            a.statut,
+            a.date_acquittement,
+            COALESCE(v.immatriculation, e.nom || ' ' || e.prenom) AS vehicule
+        FROM alertes a
+        LEFT JOIN vehicules v ON v.id = a.vehicule_id
+        LEFT JOIN employes e ON e.id = a.employe_id
+        WHERE a.statut IN ('proche', 'retard')
+    """
+    if not include_acknowledged:
+        query += " AND a.date_acquittement IS NULL"
+    query += " ORDER BY a.date_echeance IS NULL, a.date_echeance"
+
+    with get_connection(db_path) as conn:
+        rows = conn.execute(query).fetchall()
+
+    return [
+        {
+            "id": r["id"],
+            "source_type": r["source_type"],
+            "type": TYPE_LABELS.get(r["source_type"], r["source_type"]),
+            "vehicule": r["vehicule"],
+            "libelle": r["libelle"],
+            "date_echeance": r["date_echeance"],
+            "statut": r["statut"],
+            "acquittee": r["date_acquittement"] is not None,
+        }
+        for r in rows
+    ]
+
+
+def acknowledge_alert(alert_id: int, user_id: int | None = None, db_path="db/parc_auto.db"):
+    """
+    Mark an alert as seen. It stays open until resolved; escalation
+    to `retard` clears the acknowledgement.
+    """
+    with get_connection(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            UPDATE alertes
+            SET date_acquittement = ?, acquittee_par = ?
+            WHERE id = ? AND statut IN ('proche', 'retard')
+            """,
+            (_now(), user_id, alert_id),
+        )
+        if cur.rowcount == 0:
+            raise AlertError("Alerte introuvable ou déjà résolue")
+        conn.commit()
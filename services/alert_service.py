@@ -1,90 +1,108 @@
 from datetime import date, timedelta
 from database import get_connection
+from services.alert_engine import REVISION_KM_AHEAD, revision_km_status
+
+
+# Both queries return only rows inside the window: the date filter is a
+# range scan on idx_documents_echeance / idx_maintenances_echeance and the
+# retard/proche classification is done by SQLite.
+
+_DOCUMENT_ALERTS_SQL = """
+    SELECT
+        'Document' AS type,
+        v.immatriculation AS vehicule,
+        d.type_document AS libelle,
+        d.date_echeance AS date_echeance,
+        CASE WHEN d.date_echeance < :today THEN 'retard' ELSE 'proche' END AS statut
+    FROM documents d
+    JOIN vehicules v ON d.vehicule_id = v.id
+    WHERE d.date_echeance IS NOT NULL
+      AND d.date_echeance <= :limit_date
+"""
+
+_MAINTENANCE_ALERTS_SQL = """
+    SELECT
+        'Maintenance' AS type,
+        v.immatriculation AS vehicule,
+        m.type_intervention AS libelle,
+        m.date_prochaine_echeance AS date_echeance,
+        CASE WHEN m.date_prochaine_echeance < :today THEN 'retard' ELSE 'proche' END AS statut
+    FROM maintenances m
+    JOIN vehicules v ON m.vehicule_id = v.id
+    WHERE m.date_prochaine_echeance IS NOT NULL
+      AND m.date_prochaine_echeance <= :limit_date
+"""
+
+
+def _window(days_ahead):
+    today = date.today()
+    return {
+        "today": today.isoformat(),
+        "limit_date": (today + timedelta(days=days_ahead)).isoformat(),
+    }
+
+
+def _fetch_alerts(sql, days_ahead, db_path):
+    with get_connection(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(sql + " ORDER BY date_echeance", _window(days_ahead))
+        return [dict(r) for r in cur.fetchall()]
 
 
 # =========================================================
 # ALERTES DOCUMENTS (RETARD + PROCHE)
 # =========================================================
 def get_document_alerts(days_ahead=30, db_path="db/parc_auto.db"):
-    today = date.today()
-    limit_date = today + timedelta(days=days_ahead)
-
-    with get_connection(db_path) as conn:
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT
-                d.type_document,
-                d.date_echeance,
-                v.immatriculation
-            FROM documents d
-            JOIN vehicules v ON d.vehicule_id = v.id
-            WHERE d.date_echeance IS NOT NULL
-            ORDER BY d.date_echeance
-        """)
-        rows = cur.fetchall()
-
-    alerts = []
-
-    for r in rows:
-        echeance = date.fromisoformat(r["date_echeance"])
-
-        if echeance < today:
-            statut = "retard"
-        elif echeance <= limit_date:
-            statut = "proche"
-        else:
-            continue  # pas une alerte
-
-        alerts.append({
-            "type": "Document",
-            "vehicule": r["immatriculation"],
-            "libelle": r["type_document"],
-            "date_echeance": r["date_echeance"],
-            "statut": statut,
-        })
-
-    return alerts
+    return _fetch_alerts(_DOCUMENT_ALERTS_SQL, days_ahead, db_path)
 
 
 # =========================================================
 # ALERTES MAINTENANCE (RETARD + PROCHE)
 # =========================================================
 def get_maintenance_alerts(days_ahead=30, db_path="db/parc_auto.db"):
-    today = date.today()
-    limit_date = today + timedelta(days=days_ahead)
+    return _fetch_alerts(_MAINTENANCE_ALERTS_SQL, days_ahead, db_path)
+
+
+# =========================================================
+# TOUTES LES ALERTES (UNE SEULE REQUÊTE)
+# =========================================================
+def get_all_alerts(days_ahead=30, db_path="db/parc_auto.db"):
+    """
+    Document and maintenance alerts merged and sorted by due date.
+    """
+    return _fetch_alerts(
+        _DOCUMENT_ALERTS_SQL + " UNION ALL " + _MAINTENANCE_ALERTS_SQL,
+        days_ahead,
+        db_path,
+    )
+
 
+# =========================================================
+# ALERTES RÉVISION AU KILOMÉTRAGE
+# =========================================================
+def get_revision_km_alerts(km_ahead=REVISION_KM_AHEAD, db_path="db/parc_auto.db"):
+    """
+    Vehicles whose revision (last maintenance km + seuil_revision_km) is
+    overdue, less than km_ahead km away, or projected within the alert
+    window from their recent daily mileage. Most urgent first.
+    """
     with get_connection(db_path) as conn:
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT
-                m.type_intervention,
-                m.date_prochaine_echeance,
-                v.immatriculation
-            FROM maintenances m
-            JOIN vehicules v ON m.vehicule_id = v.id
-            WHERE m.date_prochaine_echeance IS NOT NULL
-            ORDER BY m.date_prochaine_echeance
-        """)
-        rows = cur.fetchall()
-
-    alerts = []
-
-    for r in rows:
-        echeance = date.fromisoformat(r["date_prochaine_echeance"])
-
-        if echeance < today:
-            statut = "retard"
-        elif echeance <= limit_date:
-            statut = "proche"
-        else:
-            continue
-
-        alerts.append({
-            "type": "Maintenance",
-            "vehicule": r["immatriculation"],
-            "libelle": r["type_intervention"],
-            "date_echeance": r["date_prochaine_echeance"],
-            "statut": statut,
-        })
+        rows = revision_km_status(conn.cursor(), km_ahead=km_ahead)
 
+    alerts = [
+        {
+            "type": "Révision km",
+            "vehicule": r["immatriculation"],
+            "libelle": f"Révision à {r['km_revision']} km",
+            "date_echeance": r["date_prevue"],
+            "statut": r["statut"],
+            "kilometrage_actuel": r["kilometrage_actuel"],
+            "km_revision": r["km_revision"],
+            "km_restants": r["km_restants"],
+            "km_par_jour": r["km_par_jour"],
+        }
+        for r in rows
+        if r["statut"] in ("proche", "retard")
+    ]
+    alerts.sort(key=lambda a: a["km_restants"])
     return alerts
@@ -0,0 +1,639 @@
+import json
+import threading
+from datetime import datetime
+
+from database import get_connection
+from services.maintenance_service import (
+    CATEGORIE_ASSURANCE,
+    CATEGORIE_CARBURANT,
+    CATEGORIE_MAINTENANCE,
+    classify_intervention as _categorie,
+)
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency (pip install numpy)
+    np = None
+
+
+class AnalyticsError(Exception):
+    pass
+
+
+# Vectorised fleet statistics (numpy).
+#
+# The columns used by the statistics of vehicules, sorties_reservations,
+# ravitaillements and maintenances are loaded once per database into
+# numpy arrays (FleetArrays). Each call then only fetches the rows above
+# the per-table id high-water mark; trips still open at the last load
+# (no date_retour_reelle) are read again so that their return is picked
+# up. vehicules is small and mutable (statut, kilometrage) and is
+# reloaded entirely. The application never deletes these rows: call
+# reset_arrays() after editing the database by hand.
+#
+# Maintenances are classified with their categorie column (fuel /
+# insurance / maintenance, see maintenance_service.classify_intervention)
+# turned into small integer codes.
+#
+# A trip occupies its vehicle from its departure (the planned one when
+# create_reservation has not recorded the actual one) until its return,
+# or until now while it is still open.
+
+CAT_MAINTENANCE = 0
+CAT_FUEL = 1
+CAT_INSURANCE = 2
+CAT_UNKNOWN = 3  # categorie NULL: counted in totals only
+
+_CATEGORY_CODES = {
+    CATEGORIE_MAINTENANCE: CAT_MAINTENANCE,
+    CATEGORIE_CARBURANT: CAT_FUEL,
+    CATEGORIE_ASSURANCE: CAT_INSURANCE,
+}
+
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+
+VEHICLE_STATUTS = ("disponible", "en_sortie", "en_maintenance", "en_panne", "immobilise")
+
+# table -> (select list, {column: kind}) in select order
+_TABLES = {
+    "sorties_reservations": (
+        """
+        id, vehicule_id, employe_id,
+        COALESCE(date_sortie_reelle, date_sortie_prevue),
+        COALESCE(
+            date_sortie_reelle || 'T' || COALESCE(heure_sortie_reelle, '00:00'),
+            date_sortie_prevue || 'T' || COALESCE(heure_sortie_prevue, '00:00')
+        ),
+        date_retour_reelle || 'T' || COALESCE(heure_retour_reelle, '00:00'),
+        km_depart, km_retour
+        """,
+        {
+            "id": "int",
+            "vehicule_id": "int",
+            "employe_id": "int",
+            "jour": "day",
+            "debut": "minute",
+            "fin": "minute",
+            "km_depart": "float",
+            "km_retour": "float",
+        },
+    ),
+    "ravitaillements": (
+        "id, vehicule_id, employe_id, date, quantite_litres, cout, kilometrage",
+        {
+            "id": "int",
+            "vehicule_id": "int",
+            "employe_id": "int",
+            "jour": "day",
+            "litres": "float",
+            "cout": "float",
+            "kilometrage": "float",
+        },
+    ),
+    "maintenances": (
+        "id, vehicule_id, date, categorie, kilometrage, cout",
+        {
+            "id": "int",
+            "vehicule_id": "int",
+            "jour": "day",
+            "categorie": "category",
+            "kilometrage": "float",
+            "cout": "float",
+        },
+    ),
+}
+
+_VEHICLE_COLUMNS = (
+    "id", "immatriculation", "marque", "modele", "type_vehicule",
+    "statut", "kilometrage_actuel", "service_principal",
+)
+
+
+def _require_numpy():
+    if np is None:
+        raise AnalyticsError("Le module numpy est requis pour les statistiques avancées")
+
+
+def classify_intervention(type_intervention: str | None) -> int:
+    """
+    CAT_FUEL, CAT_INSURANCE, CAT_MAINTENANCE or CAT_UNKNOWN (NULL)
+    code of an intervention label.
+    """
+    return _CATEGORY_CODES.get(_categorie(type_intervention), CAT_UNKNOWN)
+
+
+def _column(kind, values):
+    if kind == "int":
+        return np.array([-1 if v is None else v for v in values], dtype=np.int64)
+    if kind == "float":
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    if kind == "day":
+        return np.array(values, dtype="datetime64[D]")
+    if kind == "minute":
+        return np.array(values, dtype="datetime64[m]")
+    if kind == "category":
+        return np.array([_CATEGORY_CODES.get(v, CAT_UNKNOWN) for v in values], dtype=np.int8)
+    return np.array(values, dtype=object)
+
+
+def _columns(kinds, rows):
+    values = list(zip(*rows)) if rows else [()] * len(kinds)
+    return {name: _column(kind, col) for (name, kind), col in zip(kinds.items(), values)}
+
+
+# =========================================================
+# TABLEAUX EN MÉMOIRE
+# =========================================================
+
+class FleetArrays:
+    """
+    Column arrays of one database, refreshed incrementally.
+    tables[table][column] -> numpy array, rows in id order.
+    """
+
+    def __init__(self, db_path):
+        _require_numpy()
+        self.db_path = db_path
+        self.tables = {
+            table: _columns(kinds, []) for table, (_, kinds) in _TABLES.items()
+        }
+        self.vehicles = _columns({c: "object" for c in _VEHICLE_COLUMNS}, [])
+        self.high_water = {table: 0 for table in _TABLES}
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """
+        Load the rows written since the last refresh.
+        Returns {table: rows added or updated}.
+        """
+        with self._lock, get_connection(self.db_path) as conn:
+            conn.row_factory = None
+            self._load_vehicles(conn)
+            return {table: self._load_table(conn, table) for table in _TABLES}
+
+    def _load_vehicles(self, conn):
+        rows = conn.execute(
+            f"SELECT {', '.join(_VEHICLE_COLUMNS)} FROM vehicules ORDER BY id"
+        ).fetchall()
+        vehicles = _columns({c: "object" for c in _VEHICLE_COLUMNS}, rows)
+        vehicles["id"] = vehicles["id"].astype(np.int64)
+        vehicles["kilometrage_actuel"] = _column("float", vehicles["kilometrage_actuel"])
+        self.vehicles = vehicles
+
+    def _load_table(self, conn, table):
+        select, kinds = _TABLES[table]
+        columns = self.tables[table]
+        params = [self.high_water[table]]
+        where = "id > ?"
+
+        if table == "sorties_reservations":
+            open_ids = columns["id"][np.isnat(columns["fin"])]
+            if len(open_ids):
+                where += " OR id IN (SELECT value FROM json_each(?))"
+                params.append(json.dumps(open_ids.tolist()))
+
+        rows = conn.execute(
+            f"SELECT {select} FROM {table} WHERE {where} ORDER BY id", params
+        ).fetchall()
+        if not rows:
+            return 0
+
+        new = _columns(kinds, rows)
+        updated = new["id"] <= self.high_water[table]
+        if updated.any():
+            positions = np.searchsorted(columns["id"], new["id"][updated])
+            for name in kinds:
+                columns[name][positions] = new[name][updated]
+
+        appended = ~updated
+        for name in kinds:
+            columns[name] = np.concatenate([columns[name], new[name][appended]])
+        self.high_water[table] = int(columns["id"][-1]) if len(columns["id"]) else 0
+        return len(rows)
+
+    # ---------- helpers ----------
+
+    def per_vehicle(self, vehicle_ids, weights=None):
+        """
+        Sum of `weights` (count without) per vehicle, aligned on
+        self.vehicles["id"]; NaN weights count as 0.
+        """
+        vehicle_index = self.vehicles["id"]
+        size = int(max(vehicle_index.max(initial=0), vehicle_ids.max(initial=0))) + 1
+        if weights is not None:
+            weights = np.nan_to_num(weights)
+        valid = vehicle_ids >= 0
+        sums = np.bincount(
+            vehicle_ids[valid],
+            weights=None if weights is None else weights[valid],
+            minlength=size,
+        )
+        return sums[vehicle_index]
+
+
+_arrays_lock = threading.Lock()
+_arrays = {}
+
+
+def get_arrays(db_path="db/parc_auto.db") -> FleetArrays:
+    """
+    FleetArrays of a database, loaded on first use and refreshed.
+    """
+    _require_numpy()
+    key = str(db_path)
+    with _arrays_lock:
+        arrays = _arrays.get(key)
+        if arrays is None:
+            arrays = _arrays[key] = FleetArrays(db_path)
+    arrays.refresh()
+    return arrays
+
+
+def reset_arrays(db_path=None):
+    """
+    Forget the loaded arrays of one database (all when db_path is None).
+    """
+    with _arrays_lock:
+        if db_path is None:
+            _arrays.clear()
+        else:
+            _arrays.pop(str(db_path), None)
+
+
+def _day(value):
+    return np.datetime64(value, "D") if value else None
+
+
+def _in_period(days, start, end):
+    mask = ~np.isnat(days)
+    if start:
+        mask &= days >= _day(start)
+    if end:
+        mask &= days <= _day(end)
+    return mask
+
+
+# =========================================================
+# ÉQUIVALENTS DE dashboard_service
+# =========================================================
+
+def fleet_summary(db_path="db/parc_auto.db"):
+    """
+    Same result as dashboard_service.get_fleet_summary.
+    """
+    arrays = get_arrays(db_path)
+    statuts = arrays.vehicles["statut"]
+    counts = {s: int(np.count_nonzero(statuts == s)) for s in VEHICLE_STATUTS}
+    total = len(statuts)
+
+    return {
+        "total": total,
+        "available": counts["disponible"],
+        "en_sortie": counts["en_sortie"],
+        "maintenance": counts["en_maintenance"],
+        "_panne": counts["en_panne"],
+        "_immobilise": counts["immobilise"],
+        "parc_complet": counts["disponible"] == 0 and total > 0,
+    }
+
+
+def _cost_columns(arrays):
+    m = arrays.tables["maintenances"]
+    r = arrays.tables["ravitaillements"]
+    costs = {}
+    for name, category in (("fuel", CAT_FUEL), ("insurance", CAT_INSURANCE), ("maintenance", CAT_MAINTENANCE)):
+        selected = m["categorie"] == category
+        costs[name] = arrays.per_vehicle(m["vehicule_id"][selected], m["cout"][selected])
+    costs["maintenances_total"] = arrays.per_vehicle(m["vehicule_id"], m["cout"])
+    costs["refuels"] = arrays.per_vehicle(r["vehicule_id"], r["cout"])
+    return costs
+
+
+def detailed_costs_by_vehicle(db_path="db/parc_auto.db"):
+    """
+    Same rows as dashboard_service.get_detailed_costs_by_vehicle
+    (dicts, most expensive vehicle first).
+    """
+    arrays = get_arrays(db_path)
+    v = arrays.vehicles
+    costs = _cost_columns(arrays)
+    fuel = costs["fuel"] + costs["refuels"]
+    total = costs["maintenances_total"] + costs["refuels"]
+
+    order = np.argsort(-total, kind="stable")
+    return [
+        {
+            "id": int(v["id"][i]),
+            "immatriculation": v["immatriculation"][i],
+            "marque": v["marque"][i],
+            "modele": v["modele"][i],
+            "cout_carburant": float(fuel[i]),
+            "cout_maintenance": float(costs["maintenance"][i]),
+            "cout_assurance": float(costs["insurance"][i]),
+            "cout_total": float(total[i]),
+        }
+        for i in order
+    ]
+
+
+def _trip_km(trips):
+    return trips["km_retour"] - trips["km_depart"]
+
+
+def mileage_by_period(start_date=None, end_date=None, db_path="db/parc_auto.db"):
+    """
+    Same rows as dashboard_service.get_mileage_by_period.
+    """
+    arrays = get_arrays(db_path)
+    v = arrays.vehicles
+    s = arrays.tables["sorties_reservations"]
+    selected = _in_period(s["jour"], start_date, end_date) if (start_date or end_date) else slice(None)
+    km = arrays.per_vehicle(s["vehicule_id"][selected], _trip_km(s)[selected])
+
+    order = [i for i in np.argsort(-km, kind="stable") if km[i] > 0]
+    return [
+        {
+            "immatriculation": v["immatriculation"][i],
+            "marque": v["marque"][i],
+            "modele": v["modele"][i],
+            "km_periode": float(km[i]),
+        }
+        for i in order
+    ]
+
+
+def cost_evolution(months=12, db_path="db/parc_auto.db"):
+    """
+    Same rows as dashboard_service.get_cost_evolution (maintenances and
+    refuels of the last calendar months, per month).
+    """
+    arrays = get_arrays(db_path)
+    m = arrays.tables["maintenances"]
+    r = arrays.tables["ravitaillements"]
+    start = np.datetime64(datetime.now(), "M") - (months - 1)
+
+    days = np.concatenate([m["jour"], r["jour"]])
+    cost = np.nan_to_num(np.concatenate([m["cout"], r["cout"]]))
+    category = np.concatenate([m["categorie"], np.full(len(r["jour"]), CAT_FUEL, dtype=np.int8)])
+    selected = ~np.isnat(days) & (days.astype("datetime64[M]") >= start)
+
+    month = days[selected].astype("datetime64[M]")
+    cost, category = cost[selected], category[selected]
+    periods, index = np.unique(month, return_inverse=True)
+
+    fuel = np.bincount(index, weights=np.where(category == CAT_FUEL, cost, 0), minlength=len(periods))
+    other = np.where((category == CAT_MAINTENANCE) | (category == CAT_INSURANCE), cost, 0)
+    maintenance = np.bincount(index, weights=other, minlength=len(periods))
+    total = np.bincount(index, weights=cost, minlength=len(periods))
+
+    return [
+        {
+            "periode": str(periods[i]),
+            "cout_carburant": float(fuel[i]),
+            "cout_maintenance": float(maintenance[i]),
+            "cout_total": float(total[i]),
+        }
+        for i in range(len(periods))
+    ]
+
+
+# =========================================================
+# NOUVELLES MESURES
+# =========================================================
+
+def _percentiles(values, percentiles):
+    if len(values) == 0:
+        return {f"p{p:g}": None for p in percentiles}
+    result = np.percentile(values, percentiles)
+    return {f"p{p:g}": round(float(x), 4) for p, x in zip(percentiles, result)}
+
+
+def cost_per_km_percentiles(percentiles=DEFAULT_PERCENTILES, by=None, db_path="db/parc_auto.db"):
+    """
+    Distribution of the cost per km driven (maintenances + refuels over
+    the km of the trips) across vehicles with trips.
+    by: a vehicules column (e.g. "type_vehicule", "service_principal")
+    for one distribution per value.
+    Returns {"vehicules": n, "p50": ...} or {value: {...}} with by.
+    """
+    arrays = get_arrays(db_path)
+    costs = _cost_columns(arrays)
+    trips = arrays.tables["sorties_reservations"]
+    km = arrays.per_vehicle(trips["vehicule_id"], _trip_km(trips))
+    driven = km > 0
+    per_km = np.divide(costs["maintenances_total"] + costs["refuels"], km, where=driven, out=np.zeros_like(km))
+
+    def summary(mask):
+        values = per_km[mask & driven]
+        return {"vehicules": int(len(values)), **_percentiles(values, percentiles)}
+
+    if by is None:
+        return summary(np.ones(len(km), dtype=bool))
+    if by not in arrays.vehicles:
+        raise AnalyticsError(f"Colonne inconnue : {by}")
+    groups = arrays.vehicles[by]
+    return {str(g): summary(groups == g) for g in sorted(set(groups.tolist()), key=str)}
+
+
+def trip_distance_percentiles(
+    start_date=None,
+    end_date=None,
+    percentiles=DEFAULT_PERCENTILES,
+    db_path="db/parc_auto.db",
+):
+    """
+    Distribution of the km of the finished trips of the period.
+    """
+    trips = get_arrays(db_path).tables["sorties_reservations"]
+    km = _trip_km(trips)
+    selected = _in_period(trips["jour"], start_date, end_date) & ~np.isnan(km)
+    values = km[selected]
+    return {
+        "sorties": int(len(values)),
+        "moyenne": round(float(values.mean()), 1) if len(values) else None,
+        **_percentiles(values, percentiles),
+    }
+
+
+def rolling_daily_costs(
+    window_days: int = 30,
+    start_date=None,
+    end_date=None,
+    db_path="db/parc_auto.db",
+):
+    """
+    Daily fleet cost (maintenances + refuels) and its rolling mean over
+    the previous `window_days` days (days without cost count as 0).
+    Returns [{"date", "cout", "moyenne_glissante"}].
+    """
+    if window_days <= 0:
+        raise AnalyticsError("Fenêtre invalide")
+
+    arrays = get_arrays(db_path)
+    m = arrays.tables["maintenances"]
+    r = arrays.tables["ravitaillements"]
+    days = np.concatenate([m["jour"], r["jour"]])
+    cost = np.nan_to_num(np.concatenate([m["cout"], r["cout"]]))
+    known = ~np.isnat(days)
+    days, cost = days[known], cost[known]
+    if not len(days):
+        return []
+
+    first = _day(start_date) if start_date else days.min()
+    last = _day(end_date) if end_date else days.max()
+    if last < first:
+        return []
+
+    # Series starts window_days early so that the first means are complete
+    origin = first - np.timedelta64(window_days - 1, "D")
+    length = int((last - origin).astype(int)) + 1
+    offsets = (days - origin).astype(np.int64)
+    inside = (offsets >= 0) & (offsets < length)
+    daily = np.bincount(offsets[inside], weights=cost[inside], minlength=length)
+
+    cumulative = np.concatenate([[0.0], np.cumsum(daily)])
+    rolling = (cumulative[window_days:] - cumulative[:-window_days]) / window_days
+    daily = daily[window_days - 1:]
+    dates = first + np.arange(len(daily))
+
+    return [
+        {
+            "date": str(d),
+            "cout": round(float(c), 2),
+            "moyenne_glissante": round(float(a), 2),
+        }
+        for d, c, a in zip(dates, daily, rolling)
+    ]
+
+
+# =========================================================
+# TAUX D'UTILISATION
+# =========================================================
+
+GRANULARITIES = ("day", "week", "month")
+
+
+def _bucket_edges(start_date, end_date, granularity):
+    """
+    Edges (datetime64[m]) of the days, weeks (from Monday) or months
+    covering start_date to end_date included; the first and last
+    buckets are cut at the period bounds.
+    """
+    first = _day(start_date)
+    stop = _day(end_date) + np.timedelta64(1, "D")
+    if granularity == "day":
+        edges = np.arange(first, stop + np.timedelta64(1, "D"))
+    elif granularity == "week":
+        # Day 0 (1970-01-01) is a Thursday
+        monday = first - np.timedelta64((first.astype(np.int64) + 3) % 7, "D")
+        edges = np.arange(monday, stop + np.timedelta64(7, "D"), np.timedelta64(7, "D"))
+    else:
+        months = np.arange(first.astype("datetime64[M]"), (stop - 1).astype("datetime64[M]") + 2)
+        edges = months.astype("datetime64[D]")
+    return np.unique(np.clip(edges, first, stop)).astype("datetime64[m]")
+
+
+def occupied_minutes(vehicle_index, debut, fin, edges, n_vehicles):
+    """
+    Minutes during which each vehicle is occupied in each bucket.
+
+    vehicle_index: row (0 .. n_vehicles - 1) of the vehicle of each
+    interval, debut / fin: datetime64[m] bounds, edges: sorted bucket
+    edges. Overlapping intervals of a vehicle are counted once.
+    Returns an int64 array of shape (n_vehicles, len(edges) - 1).
+    """
+    origin = edges[0]
+    length = int((edges[-1] - origin).astype(np.int64))
+    offsets = (edges - origin).astype(np.int64)
+    start = np.clip((debut - origin).astype(np.int64), 0, length)
+    end = np.clip((fin - origin).astype(np.int64), 0, length)
+    kept = end > start
+    if not kept.any():
+        return np.zeros((n_vehicles, len(edges) - 1), dtype=np.int64)
+
+    # Vehicles laid end to end on one axis: their intervals never merge
+    span = length + 1
+    base = vehicle_index[kept].astype(np.int64) * span
+    start = base + start[kept]
+    end = base + end[kept]
+    order = np.argsort(start, kind="stable")
+    start, end = start[order], end[order]
+
+    # Sweep: an interval opens a block when it starts after every earlier end
+    reach = np.maximum.accumulate(end)
+    opens = np.ones(len(start), dtype=bool)
+    opens[1:] = start[1:] > reach[:-1]
+    first_of_block = np.flatnonzero(opens)
+    block_start = start[first_of_block]
+    block_end = reach[np.append(first_of_block[1:] - 1, len(start) - 1)]
+    block_length = block_end - block_start
+    covered = np.concatenate([[0], np.cumsum(block_length)])
+
+    # Occupied minutes of the whole axis before each edge of each vehicle
+    queries = np.arange(n_vehicles, dtype=np.int64)[:, None] * span + offsets[None, :]
+    started = np.searchsorted(block_start, queries, side="right")
+    last = np.maximum(started - 1, 0)
+    inside = np.where(
+        started > 0,
+        np.minimum(queries - block_start[last], block_length[last]),
+        0,
+    )
+    return np.diff(covered[last] + inside, axis=1)
+
+
+def utilization(start_date, end_date, granularity="day", db_path="db/parc_auto.db"):
+    """
+    Occupied hours and utilisation rate (% of the bucket duration) of
+    every vehicle per day, week or month from start_date to end_date
+    included.
+    Returns {"periodes", "heures_periode", "taux_flotte", "vehicules":
+    [{"id", "immatriculation", "heures", "taux", "heures_total",
+    "taux_global"}]}, the lists being aligned on "periodes".
+    """
+    if granularity not in GRANULARITIES:
+        raise AnalyticsError(f"Granularité inconnue : {granularity}")
+    if not start_date or not end_date or end_date < start_date:
+        raise AnalyticsError("Période invalide")
+
+    arrays = get_arrays(db_path)
+    v = arrays.vehicles
+    trips = arrays.tables["sorties_reservations"]
+    edges = _bucket_edges(start_date, end_date, granularity)
+
+    position = np.searchsorted(v["id"], trips["vehicule_id"])
+    position = np.minimum(position, max(len(v["id"]) - 1, 0))
+    known = ~np.isnat(trips["debut"])
+    if len(v["id"]):
+        known &= v["id"][position] == trips["vehicule_id"]
+    else:
+        known[:] = False
+    now = np.datetime64(datetime.now(), "m")
+    fin = np.where(np.isnat(trips["fin"]), now, trips["fin"])
+
+    minutes = occupied_minutes(
+        position[known], trips["debut"][known], fin[known], edges, len(v["id"])
+    )
+    bucket = np.diff(edges).astype(np.int64)
+
+    if granularity == "month":
+        periods = edges[:-1].astype("datetime64[M]")
+    else:
+        periods = edges[:-1].astype("datetime64[D]")
+    fleet = minutes.sum(axis=0) / np.maximum(bucket * len(v["id"]), 1) * 100
+
+    return {
+        "periodes": [str(p) for p in periods],
+        "heures_periode": (bucket / 60).tolist(),
+        "taux_flotte": np.round(fleet, 1).tolist(),
+        "vehicules": [
+            {
+                "id": int(v["id"][i]),
+                "immatriculation": v["immatriculation"][i],
+                "heures": np.round(minutes[i] / 60, 2).tolist(),
+                "taux": np.round(minutes[i] / bucket * 100, 1).tolist(),
+                "heures_total": round(float(minutes[i].sum()) / 60, 2),
+                "taux_global": round(float(minutes[i].sum()) / bucket.sum() * 100, 1),
+            }
+            for i in range(len(v["id"]))
+        ],
+    }
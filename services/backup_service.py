@@ -0,0 +1,225 @@
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+from services.snapshot_service import (
+    DEFAULT_MAX_RESTARTS,
+    DEFAULT_PAGES,
+    DEFAULT_PAUSE,
+    online_copy,
+)
+
+
+class BackupError(Exception):
+    pass
+
+
+# Backups and restore while the application is running.
+#
+# A backup is an online copy of the database (snapshot_service.online_copy:
+# backup API, a few hundred pages per step with a pause between steps so
+# that check-outs and returns keep committing during the copy). The copy
+# is checked with PRAGMA integrity_check, then gzip-compressed to
+# <dossier>/<nom>_AAAAMMJJ-HHMMSS.db.gz; only the `keep` most recent
+# backups of the database are kept.
+#
+# A restore picks a backup (the most recent one, or the most recent one
+# taken at or before a given date: point-in-time restore), decompresses
+# and checks it, saves the current database first (safety backup), then
+# copies it into the live database with the backup API: open connections
+# see the restored content at their next transaction, the application
+# does not have to be stopped. The in-memory caches of the statistics
+# (stats_cache, analytics arrays) are dropped afterwards.
+
+DEFAULT_KEEP = 10
+TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S"
+RESTORE_TIMEOUT = 30.0  # seconds waited for the writers to finish
+
+
+def backup_dir(db_path="db/parc_auto.db") -> Path:
+    """Default backup folder: sauvegardes/ next to the database."""
+    return Path(db_path).parent / "sauvegardes"
+
+
+def _pattern(db_path):
+    # nom_20261019-101500.db.gz, nom_20261019-101500-1.db.gz for a
+    # second backup within the same second
+    path = Path(db_path)
+    return re.compile(
+        rf"^{re.escape(path.stem)}_(\d{{8}}-\d{{6}})(?:-(\d+))?{re.escape(path.suffix)}\.gz$"
+    )
+
+
+def list_backups(db_path="db/parc_auto.db", directory=None) -> list:
+    """
+    Backups of db_path, oldest first:
+    [{"fichier": Path, "date": datetime, "taille": bytes}].
+    """
+    directory = Path(directory or backup_dir(db_path))
+    if not directory.is_dir():
+        return []
+
+    pattern = _pattern(db_path)
+    backups = []
+    for f in directory.iterdir():
+        match = pattern.match(f.name)
+        if match:
+            backups.append((
+                datetime.strptime(match.group(1), TIMESTAMP_FORMAT),
+                int(match.group(2) or 0),
+                f,
+            ))
+    backups.sort()
+    return [{"fichier": f, "date": when, "taille": f.stat().st_size} for when, _, f in backups]
+
+
+def check_integrity(db_path):
+    """Raise BackupError unless PRAGMA integrity_check answers ok."""
+    with closing(sqlite3.connect(db_path)) as conn:
+        try:
+            result = [r[0] for r in conn.execute("PRAGMA integrity_check")]
+        except sqlite3.DatabaseError as e:
+            raise BackupError(f"Base illisible : {db_path} ({e})") from e
+    if result != ["ok"]:
+        raise BackupError(f"Base corrompue : {db_path} ({'; '.join(result[:3])})")
+
+
+def rotate_backups(db_path="db/parc_auto.db", directory=None, keep=DEFAULT_KEEP) -> list:
+    """Delete all but the `keep` most recent backups; returns the deleted files."""
+    if keep < 1:
+        raise BackupError("Il faut conserver au moins une sauvegarde")
+    removed = [b["fichier"] for b in list_backups(db_path, directory)[:-keep]]
+    for f in removed:
+        f.unlink(missing_ok=True)
+    return removed
+
+
+def create_backup(
+    db_path="db/parc_auto.db",
+    directory=None,
+    keep=DEFAULT_KEEP,
+    pages=DEFAULT_PAGES,
+    pause=DEFAULT_PAUSE,
+    max_restarts=DEFAULT_MAX_RESTARTS,
+    progress=None,
+):
+    """
+    Compressed, checked backup of db_path, then rotation (keep=None:
+    no rotation). progress(pages copied, total pages) is called after
+    every step of the copy.
+    Returns {"fichier", "pages", "etapes", "redemarrages", "taille",
+    "supprimees", "secondes"}.
+    """
+    if not Path(db_path).exists():
+        raise BackupError(f"Base introuvable : {db_path}")
+    directory = Path(directory or backup_dir(db_path))
+    directory.mkdir(parents=True, exist_ok=True)
+
+    t0 = time.perf_counter()
+    stem, suffix = Path(db_path).stem, Path(db_path).suffix
+    stamp = datetime.now().strftime(TIMESTAMP_FORMAT)
+    target = directory / f"{stem}_{stamp}{suffix}.gz"
+    n = 0
+    while target.exists():
+        n += 1
+        target = directory / f"{stem}_{stamp}-{n}{suffix}.gz"
+
+    copy = target.with_name(target.name + ".copie")
+    partial = target.with_name(target.name + ".tmp")
+    try:
+        steps, restarts = online_copy(db_path, copy, pages, pause, max_restarts, progress)
+        check_integrity(copy)
+        with closing(sqlite3.connect(copy)) as conn:
+            total_pages = conn.execute("PRAGMA page_count").fetchone()[0]
+
+        with open(copy, "rb") as src, gzip.open(partial, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        os.replace(partial, target)
+    finally:
+        copy.unlink(missing_ok=True)
+        partial.unlink(missing_ok=True)
+
+    removed = rotate_backups(db_path, directory, keep) if keep is not None else []
+    return {
+        "fichier": str(target),
+        "pages": total_pages,
+        "etapes": steps,
+        "redemarrages": restarts,
+        "taille": target.stat().st_size,
+        "supprimees": len(removed),
+        "secondes": round(time.perf_counter() - t0, 3),
+    }
+
+
+def find_backup(db_path="db/parc_auto.db", at=None, directory=None) -> dict:
+    """Most recent backup, or the most recent one taken at or before `at`."""
+    backups = list_backups(db_path, directory)
+    if at is not None:
+        backups = [b for b in backups if b["date"] <= at]
+    if not backups:
+        when = f" au {at:%d/%m/%Y %H:%M:%S}" if at is not None else ""
+        raise BackupError(f"Aucune sauvegarde{when} pour {db_path}")
+    return backups[-1]
+
+
+def restore_backup(
+    db_path="db/parc_auto.db",
+    backup=None,
+    at=None,
+    directory=None,
+    safety=True,
+):
+    """
+    Replace the content of db_path with a backup: the file `backup`, else
+    the most recent one taken at or before `at` (the most recent one when
+    at is None). safety: back up the current database first.
+    Returns {"sauvegarde", "securite", "pages", "secondes"}.
+    """
+    from services.analytics_service import reset_arrays
+    from utils.stats_cache import clear_cache
+
+    t0 = time.perf_counter()
+    backup = Path(backup) if backup else find_backup(db_path, at, directory)["fichier"]
+    if not backup.exists():
+        raise BackupError(f"Sauvegarde introuvable : {backup}")
+
+    restored = Path(db_path).with_name(Path(db_path).name + ".restauration")
+    try:
+        try:
+            with gzip.open(backup, "rb") as src, open(restored, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+        except (OSError, EOFError) as e:
+            raise BackupError(f"Sauvegarde illisible : {backup} ({e})") from e
+        check_integrity(restored)
+
+        safety_backup = None
+        if safety and Path(db_path).exists():
+            # Without rotation: the backup being restored must not be deleted
+            safety_backup = create_backup(db_path, directory, keep=None)["fichier"]
+
+        # One step: the live database is locked only while the local,
+        # already checked copy is written, and never seen half restored
+        with closing(sqlite3.connect(restored)) as src, \
+                closing(sqlite3.connect(db_path, timeout=RESTORE_TIMEOUT)) as dst:
+            try:
+                src.backup(dst)
+            except sqlite3.OperationalError as e:
+                raise BackupError(f"Base occupée, restauration impossible : {e}") from e
+            total_pages = dst.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        restored.unlink(missing_ok=True)
+
+    clear_cache()
+    reset_arrays(db_path)
+    return {
+        "sauvegarde": str(backup),
+        "securite": safety_backup,
+        "pages": total_pages,
+        "secondes": round(time.perf_counter() - t0, 3),
+    }
@@ -1,7 +1,10 @@
 from database import get_connection
 from datetime import datetime, timedelta
+from services.rollup_service import months_back, pending_rows_sql, period_rows_sql
+from utils.stats_cache import cached
 
 
+@cached("vehicules")
 def get_fleet_summary(db_path="db/parc_auto.db"):
     """
     Return fleet summary counts.
@@ -53,6 +56,7 @@ def get_fleet_summary(db_path="db/parc_auto.db"):
     }
 
 
+@cached("vehicules")
 def get_available_vehicles(db_path="db/parc_auto.db"):
     """
     Return list of available vehicles.
@@ -70,6 +74,7 @@ def get_available_vehicles(db_path="db/parc_auto.db"):
         return cur.fetchall()
 
 
+@cached("vehicules")
 def get_vehicle_type_counts(db_path="db/parc_auto.db"):
     """
     Return number of vehicles per type.
@@ -88,6 +93,7 @@ def get_vehicle_type_counts(db_path="db/parc_auto.db"):
     return {row["type_vehicule"]: row["count"] for row in rows}
 
 
+@cached("vehicules", "maintenances")
 def get_maintenance_costs_by_vehicle(db_path="db/parc_auto.db"):
     """
     Return total maintenance cost per vehicle.
@@ -113,6 +119,7 @@ def get_maintenance_costs_by_vehicle(db_path="db/parc_auto.db"):
 # NOUVELLES FONCTIONS STATISTIQUES AVANCÉES
 # ============================================================================
 
+@cached("vehicules")
 def get_total_mileage(db_path="db/parc_auto.db"):
     """
     Retourne le kilométrage total de tous les véhicules.
@@ -126,6 +133,7 @@ def get_total_mileage(db_path="db/parc_auto.db"):
         return cur.fetchone()["total"]
 
 
+@cached("vehicules")
 def get_mileage_by_vehicle(db_path="db/parc_auto.db"):
     """
     Retourne le kilométrage par véhicule.
@@ -146,42 +154,31 @@ def get_mileage_by_vehicle(db_path="db/parc_auto.db"):
         return cur.fetchall()
 
 
+@cached("vehicules", "sorties_reservations")
 def get_mileage_by_period(start_date=None, end_date=None, db_path="db/parc_auto.db"):
     """
-    Retourne le kilométrage parcouru par période (basé sur les sorties).
+    Retourne le kilométrage parcouru par période (basé sur les sorties,
+    lu dans les agrégats journaliers et mensuels).
     """
     with get_connection(db_path) as conn:
+        rows_sql, params = period_rows_sql(start_date, end_date, pending_rows_sql(conn))
         cur = conn.cursor()
-        
-        query = """
+        cur.execute(f"""
             SELECT 
                 v.immatriculation,
                 v.marque,
                 v.modele,
-                COALESCE(SUM(s.km_retour - s.km_depart), 0) as km_periode
+                SUM(a.km) as km_periode
             FROM vehicules v
-            LEFT JOIN sorties_reservations s ON v.id = s.vehicule_id
-            WHERE 1=1
-        """
-        
-        params = []
-        if start_date:
-            query += " AND s.date_sortie_reelle >= ?"
-            params.append(start_date)
-        if end_date:
-            query += " AND s.date_sortie_reelle <= ?"
-            params.append(end_date)
-            
-        query += """
+            JOIN ({rows_sql}) a ON v.id = a.vehicule_id
             GROUP BY v.id, v.immatriculation, v.marque, v.modele
             HAVING km_periode > 0
             ORDER BY km_periode DESC
-        """
-        
-        cur.execute(query, params)
+        """, params)
         return cur.fetchall()
 
 
+@cached("vehicules", "maintenances", "ravitaillements")
 def get_detailed_costs_by_vehicle(db_path="db/parc_auto.db"):
     """
     Retourne les coûts détaillés par véhicule : carburant, maintenance, assurances, total.
@@ -196,91 +193,179 @@ def get_detailed_costs_by_vehicle(db_path="db/parc_auto.db"):
                 v.marque,
                 v.modele,
                 -- Coût carburant = maintenances type carburant + ravitaillements
-                COALESCE(SUM(CASE WHEN m.type_intervention LIKE '%carburant%' 
-                    OR m.type_intervention LIKE '%essence%'
-                    OR m.type_intervention LIKE '%diesel%'
-                    OR m.type_intervention LIKE '%ravitaillement%'
-                    THEN m.cout ELSE 0 END), 0) + 
-                COALESCE((SELECT SUM(r.cout) FROM ravitaillements r WHERE r.vehicule_id = v.id), 0) as cout_carburant,
+                COALESCE(m.carburant, 0) + COALESCE(r.cout, 0) as cout_carburant,
                 -- Coût maintenance = tout sauf carburant et assurance
-                COALESCE(SUM(CASE WHEN m.type_intervention NOT LIKE '%carburant%' 
-                    AND m.type_intervention NOT LIKE '%essence%'
-                    AND m.type_intervention NOT LIKE '%diesel%'
-                    AND m.type_intervention NOT LIKE '%ravitaillement%'
-                    AND m.type_intervention NOT LIKE '%assurance%'
-                    THEN m.cout ELSE 0 END), 0) as cout_maintenance,
+                COALESCE(m.maintenance, 0) as cout_maintenance,
                 -- Coût assurance
-                COALESCE(SUM(CASE WHEN m.type_intervention LIKE '%assurance%' 
-                    THEN m.cout ELSE 0 END), 0) as cout_assurance,
+                COALESCE(m.assurance, 0) as cout_assurance,
                 -- Coût total = maintenance + ravitaillements
-                COALESCE(SUM(m.cout), 0) + 
-                COALESCE((SELECT SUM(r.cout) FROM ravitaillements r WHERE r.vehicule_id = v.id), 0) as cout_total
+                COALESCE(m.total, 0) + COALESCE(r.cout, 0) as cout_total
             FROM vehicules v
-            LEFT JOIN maintenances m ON v.id = m.vehicule_id
-            GROUP BY v.id, v.immatriculation, v.marque, v.modele
+            -- One pass over each table (index on vehicule_id, categorie, cout)
+            LEFT JOIN (
+                SELECT
+                    vehicule_id,
+                    SUM(CASE WHEN categorie = 'carburant' THEN cout ELSE 0 END) as carburant,
+                    SUM(CASE WHEN categorie = 'maintenance' THEN cout ELSE 0 END) as maintenance,
+                    SUM(CASE WHEN categorie = 'assurance' THEN cout ELSE 0 END) as assurance,
+                    SUM(cout) as total
+                FROM maintenances
+                GROUP BY vehicule_id
+            ) m ON m.vehicule_id = v.id
+            LEFT JOIN (
+                SELECT vehicule_id, SUM(cout) as cout
+                FROM ravitaillements
+                GROUP BY vehicule_id
+            ) r ON r.vehicule_id = v.id
             ORDER BY cout_total DESC
         """)
         return cur.fetchall()
 
 
-def get_vehicle_utilization_rate(db_path="db/parc_auto.db"):
+def _occupied_time(intervals, start, end):
     """
-    Retourne le taux d'occupation et d'utilisation des véhicules.
-    Basé sur le nombre de jours d'utilisation sur les 30 derniers jours.
+    Sweep of (debut, fin) datetimes sorted by debut, cut to [start, end):
+    overlapping trips are counted once.
+    Returns (occupied minutes, set of days touched).
     """
+    minutes = 0
+    days = set()
+    block_start = block_end = None
+
+    def close():
+        nonlocal minutes
+        minutes += (block_end - block_start) // timedelta(minutes=1)
+        day = block_start.date()
+        while day <= (block_end - timedelta(minutes=1)).date():
+            days.add(day)
+            day += timedelta(days=1)
+
+    for debut, fin in intervals:
+        debut, fin = max(debut, start), min(fin, end)
+        if fin <= debut:
+            continue
+        if block_end is None or debut > block_end:
+            if block_end is not None:
+                close()
+            block_start, block_end = debut, fin
+        else:
+            block_end = max(block_end, fin)
+    if block_end is not None:
+        close()
+    return minutes, days
+
+
+@cached("vehicules", "sorties_reservations")
+def get_vehicle_utilization_rate(db_path="db/parc_auto.db", *, days=30):
+    """
+    Retourne le taux d'occupation et d'utilisation des véhicules sur les
+    `days` derniers jours : heures pendant lesquelles le véhicule est
+    sorti (sorties sur plusieurs jours et sorties en cours comprises)
+    rapportées à la durée de la fenêtre.
+    Fenêtre et granularité quelconques : analytics_service.utilization.
+    """
+    end = datetime.now().replace(second=0, microsecond=0)
+    start = end - timedelta(days=days)
+    window_start = start.strftime("%Y-%m-%dT%H:%M")
+
     with get_connection(db_path) as conn:
         cur = conn.cursor()
-        
-        # Date il y a 30 jours
-        date_30_days_ago = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
-        
-        cur.execute("""
-            SELECT 
-                v.id,
-                v.immatriculation,
-                v.marque,
-                v.modele,
-                v.statut,
-                COUNT(DISTINCT DATE(s.date_sortie_reelle)) as jours_utilises,
-                COUNT(s.id) as nombre_sorties,
-                COALESCE(SUM(s.km_retour - s.km_depart), 0) as km_parcourus,
-                ROUND(COUNT(DISTINCT DATE(s.date_sortie_reelle)) * 100.0 / 30, 1) as taux_utilisation
-            FROM vehicules v
-            LEFT JOIN sorties_reservations s ON v.id = s.vehicule_id 
-                AND s.date_sortie_reelle >= ?
-                AND s.statut = 'terminee'
-            GROUP BY v.id, v.immatriculation, v.marque, v.modele, v.statut
-            ORDER BY taux_utilisation DESC
-        """, [date_30_days_ago])
-        
-        return cur.fetchall()
 
+        cur.execute("""
+            SELECT id, immatriculation, marque, modele, statut
+            FROM vehicules
+        """)
+        vehicles = cur.fetchall()
 
+        # Trips overlapping the window, sorted for the sweep
+        cur.execute("""
+            SELECT vehicule_id, debut, fin, km_retour - km_depart AS km
+            FROM (
+                SELECT
+                    vehicule_id,
+                    km_depart,
+                    km_retour,
+                    COALESCE(
+                        date_sortie_reelle || 'T' || COALESCE(heure_sortie_reelle, '00:00'),
+                        date_sortie_prevue || 'T' || COALESCE(heure_sortie_prevue, '00:00')
+                    ) AS debut,
+                    date_retour_reelle || 'T' || COALESCE(heure_retour_reelle, '00:00') AS fin
+                FROM sorties_reservations
+                -- Trips returned before the window, skipped before
+                -- building the timestamps
+                WHERE date_retour_reelle IS NULL OR date_retour_reelle >= ?
+            )
+            WHERE debut < ? AND (fin IS NULL OR fin > ?)
+            ORDER BY vehicule_id, debut
+        """, [start.date().isoformat(), end.strftime("%Y-%m-%dT%H:%M"), window_start])
+
+        trips = {}
+        for vehicule_id, debut, fin, km in cur.fetchall():
+            trips.setdefault(vehicule_id, []).append((
+                datetime.fromisoformat(debut),
+                datetime.fromisoformat(fin) if fin else end,
+                km,
+            ))
+
+    window_minutes = days * 24 * 60
+    result = []
+    for v in vehicles:
+        vehicle_trips = trips.get(v["id"], [])
+        minutes, used_days = _occupied_time(
+            [(debut, fin) for debut, fin, _ in vehicle_trips], start, end
+        )
+        result.append({
+            "id": v["id"],
+            "immatriculation": v["immatriculation"],
+            "marque": v["marque"],
+            "modele": v["modele"],
+            "statut": v["statut"],
+            "jours_utilises": len(used_days),
+            "nombre_sorties": len(vehicle_trips),
+            "km_parcourus": sum(km for _, _, km in vehicle_trips if km is not None),
+            "heures_utilisees": round(minutes / 60, 1),
+            "taux_utilisation": round(minutes * 100.0 / window_minutes, 1) if window_minutes else 0.0,
+        })
+
+    result.sort(key=lambda r: r["taux_utilisation"], reverse=True)
+    return result
+
+
+@cached("employes", "sorties_reservations")
 def get_most_active_employees(db_path="db/parc_auto.db"):
     """
     Retourne les employés les plus actifs (nombre de sorties, km parcourus).
     """
     with get_connection(db_path) as conn:
         cur = conn.cursor()
+        # Trips aggregated per employee first (covering index
+        # idx_sorties_statut_employe), then joined
         cur.execute("""
             SELECT 
                 e.id,
                 e.nom,
                 e.prenom,
                 e.service,
-                COUNT(s.id) as nombre_sorties,
-                COALESCE(SUM(s.km_retour - s.km_depart), 0) as km_total,
-                ROUND(AVG(s.km_retour - s.km_depart), 1) as km_moyen_par_sortie
+                s.nombre_sorties,
+                s.km_total,
+                s.km_moyen_par_sortie
             FROM employes e
-            LEFT JOIN sorties_reservations s ON e.id = s.employe_id
-                AND s.statut = 'terminee'
-            GROUP BY e.id, e.nom, e.prenom, e.service
-            HAVING nombre_sorties > 0
-            ORDER BY nombre_sorties DESC
+            JOIN (
+                SELECT
+                    employe_id,
+                    COUNT(*) as nombre_sorties,
+                    COALESCE(SUM(km_retour - km_depart), 0) as km_total,
+                    ROUND(AVG(km_retour - km_depart), 1) as km_moyen_par_sortie
+                FROM sorties_reservations
+                WHERE statut = 'terminée'
+                GROUP BY employe_id
+            ) s ON s.employe_id = e.id
+            ORDER BY s.nombre_sorties DESC
         """)
         return cur.fetchall()
 
 
+@cached("vehicules", "sorties_reservations", "maintenances")
 def get_average_consumption_by_vehicle(db_path="db/parc_auto.db"):
     """
     Retourne la consommation moyenne par véhicule.
@@ -297,11 +382,7 @@ def get_average_consumption_by_vehicle(db_path="db/parc_auto.db"):
                 v.type_vehicule,
                 v.kilometrage_actuel as kilometrage,
                 COALESCE(SUM(s.km_retour - s.km_depart), 0) as km_parcourus,
-                COALESCE(SUM(CASE WHEN m.type_intervention LIKE '%carburant%' 
-                    OR m.type_intervention LIKE '%essence%'
-                    OR m.type_intervention LIKE '%diesel%'
-                    OR m.type_intervention LIKE '%ravitaillement%'
-                    THEN m.cout ELSE 0 END), 0) as cout_carburant_total
+                COALESCE(SUM(CASE WHEN m.categorie = 'carburant' THEN m.cout ELSE 0 END), 0) as cout_carburant_total
             FROM vehicules v
             LEFT JOIN sorties_reservations s ON v.id = s.vehicule_id
             LEFT JOIN maintenances m ON v.id = m.vehicule_id
@@ -311,6 +392,7 @@ def get_average_consumption_by_vehicle(db_path="db/parc_auto.db"):
         return cur.fetchall()
 
 
+@cached("vehicules", "sorties_reservations", "maintenances")
 def get_average_consumption_by_type(db_path="db/parc_auto.db"):
     """
     Retourne la consommation moyenne par type de véhicule.
@@ -322,11 +404,7 @@ def get_average_consumption_by_type(db_path="db/parc_auto.db"):
                 v.type_vehicule,
                 COUNT(DISTINCT v.id) as nombre_vehicules,
                 COALESCE(SUM(s.km_retour - s.km_depart), 0) as km_total,
-                COALESCE(SUM(CASE WHEN m.type_intervention LIKE '%carburant%' 
-                    OR m.type_intervention LIKE '%essence%'
-                    OR m.type_intervention LIKE '%diesel%'
-                    OR m.type_intervention LIKE '%ravitaillement%'
-                    THEN m.cout ELSE 0 END), 0) as cout_carburant_total,
+                COALESCE(SUM(CASE WHEN m.categorie = 'carburant' THEN m.cout ELSE 0 END), 0) as cout_carburant_total,
                 ROUND(AVG(v.kilometrage_actuel), 0) as km_moyen_vehicule
             FROM vehicules v
             LEFT JOIN sorties_reservations s ON v.id = s.vehicule_id
@@ -337,35 +415,35 @@ def get_average_consumption_by_type(db_path="db/parc_auto.db"):
         return cur.fetchall()
 
 
+@cached("maintenances", "ravitaillements")
 def get_cost_evolution(months=12, db_path="db/parc_auto.db"):
     """
-    Retourne l'évolution des coûts sur les N derniers mois.
+    Retourne l'évolution des coûts (maintenances et ravitaillements) sur
+    les N derniers mois calendaires, mois en cours compris.
     """
+    first_month = months_back(months)
+
     with get_connection(db_path) as conn:
+        pending_sql, pending_params = pending_rows_sql(conn)
         cur = conn.cursor()
-        
-        # Date de début
-        start_date = (datetime.now() - timedelta(days=months*30)).strftime('%Y-%m-%d')
-        
-        cur.execute("""
+        cur.execute(f"""
             SELECT 
-                strftime('%Y-%m', m.date) as periode,
-                COALESCE(SUM(CASE WHEN m.type_intervention LIKE '%carburant%' 
-                    OR m.type_intervention LIKE '%essence%'
-                    OR m.type_intervention LIKE '%diesel%'
-                    OR m.type_intervention LIKE '%ravitaillement%'
-                    THEN m.cout ELSE 0 END), 0) as cout_carburant,
-                COALESCE(SUM(CASE WHEN m.type_intervention NOT LIKE '%carburant%' 
-                    AND m.type_intervention NOT LIKE '%essence%'
-                    AND m.type_intervention NOT LIKE '%diesel%'
-                    AND m.type_intervention NOT LIKE '%ravitaillement%'
-                    THEN m.cout ELSE 0 END), 0) as cout_maintenance,
-                COALESCE(SUM(m.cout), 0) as cout_total
-            FROM maintenances m
-            WHERE m.date >= ?
-            GROUP BY periode
-            ORDER BY periode
-        """, [start_date])
+                mois as periode,
+                SUM(cout_carburant) as cout_carburant,
+                SUM(cout_maintenance + cout_assurance) as cout_maintenance,
+                SUM(cout_total) as cout_total
+            FROM (
+                SELECT mois, cout_carburant, cout_maintenance, cout_assurance, cout_total
+                FROM agregats_mois
+                WHERE mois >= ?
+                UNION ALL
+                SELECT substr(jour, 1, 7), cout_carburant, cout_maintenance, cout_assurance, cout_total
+                FROM ({pending_sql})
+                WHERE jour >= ?
+            )
+            GROUP BY mois
+            ORDER BY mois
+        """, [first_month] + pending_params + [f"{first_month}-01"])
         
         return cur.fetchall()
 
@@ -399,169 +477,27 @@ def export_to_csv(data, headers, filename):
         return False, f"Erreur lors de l'export CSV : {str(e)}"
 
 
-def export_fleet_summary_to_pdf(summary_data, costs_data, utilization_data, filename):
+def export_fleet_summary_to_pdf(summary_data, costs_data, utilization_data, filename, max_workers=None):
     """
-    Exporte un rapport complet du parc en PDF.
+    Exporte un rapport complet du parc en PDF (tous les véhicules,
+    tableaux paginés, voir report_service.render_fleet_pdf).
     
     Args:
         summary_data: Dictionnaire avec résumé du parc
         costs_data: Liste des coûts détaillés par véhicule
         utilization_data: Liste des taux d'utilisation
         filename: Nom du fichier de sortie
+        max_workers: Nombre de processus de rendu (défaut : nombre de CPU)
     
     Returns:
         tuple: (success: bool, message: str)
     """
+    from services.report_service import render_fleet_pdf
+
     try:
-        from reportlab.lib import colors
-        from reportlab.lib.pagesizes import A4
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import cm
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-        from reportlab.lib.enums import TA_CENTER
-        
-        doc = SimpleDocTemplate(
-            filename,
-            pagesize=A4,
-            rightMargin=2*cm,
-            leftMargin=2*cm,
-            topMargin=2*cm,
-            bottomMargin=2*cm
-        )
-        
-        elements = []
-        styles = getSampleStyleSheet()
-        
-        # Style personnalisé pour le titre
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            textColor=colors.HexColor('#1976D2'),
-            spaceAfter=30,
-            alignment=TA_CENTER
-        )
-        
-        # Titre
-        title = Paragraph("Rapport du Parc Automobile", title_style)
-        elements.append(title)
-        
-        # Date du rapport
-        date_style = ParagraphStyle(
-            'DateStyle',
-            parent=styles['Normal'],
-            fontSize=10,
-            alignment=TA_CENTER,
-            textColor=colors.grey
-        )
-        date_text = Paragraph(
-            f"Généré le {datetime.now().strftime('%d/%m/%Y à %H:%M')}",
-            date_style
+        stats = render_fleet_pdf(
+            filename, summary_data, costs_data, utilization_data, max_workers=max_workers
         )
-        elements.append(date_text)
-        elements.append(Spacer(1, 20))
-        
-        # Section 1 : Résumé du parc
-        section_title = Paragraph("1. Résumé du parc", styles['Heading2'])
-        elements.append(section_title)
-        elements.append(Spacer(1, 10))
-        
-        summary_table_data = [
-            ['Indicateur', 'Valeur'],
-            ['Total de véhicules', str(summary_data.get('total', 0))],
-            ['Disponibles', str(summary_data.get('available', 0))],
-            ['En sortie', str(summary_data.get('en_sortie', 0))],
-            ['En maintenance', str(summary_data.get('maintenance', 0))],
-        ]
-        
-        summary_table = Table(summary_table_data, colWidths=[10*cm, 5*cm])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1976D2')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ]))
-        elements.append(summary_table)
-        elements.append(Spacer(1, 20))
-        
-        # Section 2 : Coûts par véhicule
-        if costs_data:
-            section_title = Paragraph("2. Coûts détaillés par véhicule", styles['Heading2'])
-            elements.append(section_title)
-            elements.append(Spacer(1, 10))
-            
-            costs_table_data = [
-                ['Immatriculation', 'Carburant', 'Maintenance', 'Assurance', 'Total']
-            ]
-            
-            for row in costs_data[:10]:  # Limite à 10 véhicules
-                costs_table_data.append([
-                    row['immatriculation'],
-                    f"{row['cout_carburant']:.2f} €",
-                    f"{row['cout_maintenance']:.2f} €",
-                    f"{row['cout_assurance']:.2f} €",
-                    f"{row['cout_total']:.2f} €"
-                ])
-            
-            costs_table = Table(costs_table_data, colWidths=[4*cm, 3*cm, 3*cm, 3*cm, 3*cm])
-            costs_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1976D2')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ]))
-            elements.append(costs_table)
-            elements.append(Spacer(1, 20))
-        
-        # Section 3 : Taux d'utilisation
-        if utilization_data:
-            section_title = Paragraph("3. Taux d'utilisation (30 derniers jours)", styles['Heading2'])
-            elements.append(section_title)
-            elements.append(Spacer(1, 10))
-            
-            util_table_data = [
-                ['Véhicule', 'Sorties', 'Jours utilisés', 'Km parcourus', 'Taux (%)']
-            ]
-            
-            for row in utilization_data[:10]:
-                util_table_data.append([
-                    row['immatriculation'],
-                    str(row['nombre_sorties']),
-                    str(row['jours_utilises']),
-                    f"{row['km_parcourus']} km",
-                    f"{row['taux_utilisation']}%"
-                ])
-            
-            util_table = Table(util_table_data, colWidths=[4*cm, 2.5*cm, 3*cm, 3*cm, 2.5*cm])
-            util_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1976D2')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ]))
-            elements.append(util_table)
-        
-        # Générer le PDF
-        doc.build(elements)
-        
-        return True, f"Export PDF réussi : {filename}"
+        return True, f"Export PDF réussi : {filename} ({stats['pages']} pages)"
     except Exception as e:
         return False, f"Erreur lors de l'export PDF : {str(e)}"
\ No newline at end of file
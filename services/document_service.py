@@ -1,5 +1,7 @@
 from datetime import date, timedelta
 from database import get_connection
+from services import alert_engine
+from utils.stats_cache import invalidate_tables
 
 
 class DocumentError(Exception):
@@ -53,8 +55,12 @@ def add_document(
             ),
         )
 
+        alert_engine.on_document_written(cur, cur.lastrowid)
+
         conn.commit()
 
+    invalidate_tables("documents", db_path=db_path)
+
 
 def get_documents_for_vehicle(
     vehicule_id: int,
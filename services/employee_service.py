@@ -1,11 +1,28 @@
 from datetime import date
+import threading
+import time
+
 from database import get_connection
+from services import alert_engine
+from utils.stats_cache import invalidate_tables
 
 
 class EmployeeError(Exception):
     pass
 
 
+# Eligibility map used by reservation checks: employe_id -> licence
+# expiry of every driver allowed to drive, per database. Reloaded after
+# ELIGIBILITY_TTL_SECONDS (writes from other processes) and dropped by
+# the writes of this module. create_reservation checks the employee row
+# again when inserting the trip, so a suspension made by another process
+# in the meantime is not missed.
+ELIGIBILITY_TTL_SECONDS = 300
+
+_eligibility_lock = threading.Lock()
+_eligibility_cache = {}
+
+
 def is_permis_valid(date_validite_permis: str) -> bool:
     """
     Check if a driving license is still valid.
@@ -45,7 +62,8 @@ def create_employee(
 
     try:
         with get_connection(db_path) as conn:
-            conn.execute(
+            cur = conn.cursor()
+            cur.execute(
                 """
                 INSERT INTO employes (
                     matricule, nom, prenom, service,
@@ -67,10 +85,174 @@ def create_employee(
                     photo_path,
                 ),
             )
+            alert_engine.on_employee_written(cur, cur.lastrowid)
             conn.commit()
     except Exception as e:
         raise EmployeeError(str(e))
 
+    invalidate_eligibility(db_path)
+    invalidate_tables("employes", db_path=db_path)
+
+
+def update_driver_licence(
+    employe_id: int,
+    num_permis: str,
+    date_validite_permis: str,
+    db_path="db/parc_auto.db",
+):
+    """
+    Record a renewed licence. A driver suspended for an expired licence
+    is authorised again when the new one is valid.
+    """
+    if not num_permis or not date_validite_permis:
+        raise EmployeeError("Numéro et date de validité du permis requis")
+
+    valid = is_permis_valid(date_validite_permis)
+
+    with get_connection(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            UPDATE employes
+            SET num_permis = ?,
+                date_validite_permis = ?,
+                autorise_conduire = CASE
+                    WHEN permis_suspendu = 1 AND ? THEN 1
+                    ELSE autorise_conduire END,
+                permis_suspendu = CASE
+                    WHEN ? THEN 0 ELSE permis_suspendu END
+            WHERE id = ?
+            """,
+            (num_permis, date_validite_permis, valid, valid, employe_id),
+        )
+        if cur.rowcount == 0:
+            raise EmployeeError("Employé introuvable")
+
+        alert_engine.on_employee_written(cur, employe_id)
+        conn.commit()
+
+    invalidate_eligibility(db_path)
+    invalidate_tables("employes", db_path=db_path)
+
+
+# =========================================================
+# PERMIS EXPIRÉS
+# =========================================================
+
+def get_expired_drivers(today: date | None = None, db_path="db/parc_auto.db"):
+    """
+    Employees still allowed to drive whose licence has expired (or has
+    no expiry date). Range scan on idx_employes_permis.
+    """
+    today = today or date.today()
+
+    with get_connection(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT id, matricule, nom, prenom, num_permis, date_validite_permis
+            FROM employes
+            WHERE autorise_conduire = 1
+              AND (date_validite_permis IS NULL OR date_validite_permis < ?)
+            ORDER BY date_validite_permis
+            """,
+            (today.isoformat(),),
+        )
+        return [dict(r) for r in cur.fetchall()]
+
+
+def sweep_expired_licences(
+    today: date | None = None,
+    auto_suspend: bool = False,
+    db_path="db/parc_auto.db",
+):
+    """
+    Flag drivers whose licence has expired: their permis alert is
+    refreshed (retard) and, with auto_suspend, autorise_conduire is
+    cleared (permis_suspendu = 1 until update_driver_licence).
+    Returns the expired drivers.
+    """
+    expired = get_expired_drivers(today, db_path)
+    if not expired:
+        return expired
+
+    ids = [e["id"] for e in expired]
+
+    with get_connection(db_path) as conn:
+        cur = conn.cursor()
+
+        if auto_suspend:
+            cur.executemany(
+                """
+                UPDATE employes
+                SET autorise_conduire = 0, permis_suspendu = 1
+                WHERE id = ?
+                """,
+                [(i,) for i in ids],
+            )
+
+        for employe_id in ids:
+            alert_engine.on_employee_written(cur, employe_id, today)
+
+        conn.commit()
+
+    invalidate_eligibility(db_path)
+    invalidate_tables("employes", db_path=db_path)
+    return expired
+
+
+# =========================================================
+# ÉLIGIBILITÉ À LA CONDUITE (CACHE)
+# =========================================================
+
+def _load_drivers(db_path):
+    with get_connection(db_path) as conn:
+        rows = conn.execute(
+            """
+            SELECT id, date_validite_permis
+            FROM employes
+            WHERE autorise_conduire = 1
+            """
+        ).fetchall()
+    return {r["id"]: r["date_validite_permis"] for r in rows}
+
+
+def is_driver_eligible(
+    employe_id: int,
+    until: str | None = None,
+    db_path="db/parc_auto.db",
+) -> bool:
+    """
+    True when the employee is allowed to drive and their licence is
+    valid until `until` (YYYY-MM-DD, default today).
+    """
+    key = str(db_path)
+
+    with _eligibility_lock:
+        entry = _eligibility_cache.get(key)
+
+    if entry is None or entry[0] < time.monotonic():
+        entry = (time.monotonic() + ELIGIBILITY_TTL_SECONDS, _load_drivers(db_path))
+        with _eligibility_lock:
+            _eligibility_cache[key] = entry
+
+    expiry = entry[1].get(employe_id)
+    if not expiry:
+        return False
+
+    return expiry >= (until or date.today().isoformat())
+
+
+def invalidate_eligibility(db_path=None):
+    """
+    Drop the eligibility map of one database (all when db_path is None).
+    """
+    with _eligibility_lock:
+        if db_path is None:
+            _eligibility_cache.clear()
+        else:
+            _eligibility_cache.pop(str(db_path), None)
+
 
 def get_authorized_employees(db_path="db/parc_auto.db"):
     """
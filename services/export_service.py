@@ -0,0 +1,395 @@
+import csv
+import gzip
+import json
+import os
+from datetime import date
+from pathlib import Path
+
+from database import get_connection
+
+
+class ExportError(Exception):
+    pass
+
+
+# Streaming CSV export: rows are pulled from the cursor in chunks of
+# `chunk_size` (fetchmany) and written as they come, so memory stays
+# constant whatever the size of the table. Output is gzip-compressed when
+# the file name ends with .gz, and written to a temporary file renamed at
+# the end (no partial CSV left behind on error).
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Exportable tables and the date column used by the period filter
+# (trips created in the application only have their planned departure;
+# the expression is indexed by idx_sorties_date_depart)
+EXPORTABLE_TABLES = {
+    "sorties_reservations": "COALESCE(date_sortie_reelle, date_sortie_prevue)",
+    "ravitaillements": "date",
+    "maintenances": "date",
+    "documents": "date_echeance",
+    "logs": "date_action",
+    "vehicules": None,
+    "employes": None,
+}
+
+
+def get_table_columns(table: str, db_path="db/parc_auto.db"):
+    if table not in EXPORTABLE_TABLES:
+        raise ExportError(f"Table non exportable : {table}")
+
+    with get_connection(db_path) as conn:
+        return [r["name"] for r in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _open_output(path, compress):
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8-sig", newline="", compresslevel=6)
+    return open(path, "w", encoding="utf-8-sig", newline="")
+
+
+def stream_rows_to_csv(
+    cursor,
+    path,
+    headers=None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress=None,
+    total: int | None = None,
+    delimiter: str = ";",
+):
+    """
+    Write the remaining rows of an executed cursor to `path`, chunk by
+    chunk. headers default to the cursor's column names.
+    progress(rows_written, total) is called after each chunk.
+    Returns the number of rows written.
+    """
+    path = Path(path)
+    headers = headers or [d[0] for d in cursor.description]
+    tmp = path.with_name(path.name + ".tmp")
+    written = 0
+
+    try:
+        with _open_output(tmp, path.suffix == ".gz") as f:
+            writer = csv.writer(f, delimiter=delimiter)
+            writer.writerow(headers)
+
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                writer.writerows(rows)
+                written += len(rows)
+                if progress:
+                    progress(written, total)
+
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    return written
+
+
+def export_table_csv(
+    table: str,
+    path,
+    columns=None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress=None,
+    delimiter: str = ";",
+    db_path="db/parc_auto.db",
+):
+    """
+    Export a whole table in id order, or a period of it in date order.
+    columns: subset of the table columns (default: all).
+    start_date / end_date filter on the table's date column.
+    progress(rows_written, total) is called after each chunk (total is
+    counted first only when a progress callback is given).
+    Returns the number of rows written.
+    """
+    available = get_table_columns(table, db_path)
+    columns = list(columns or available)
+
+    unknown = [c for c in columns if c not in available]
+    if unknown:
+        raise ExportError(f"Colonne(s) inconnue(s) dans {table} : {', '.join(unknown)}")
+    if chunk_size <= 0:
+        raise ExportError("Taille de lot invalide")
+
+    where, params = [], []
+    date_column = EXPORTABLE_TABLES[table]
+    if (start_date or end_date) and date_column is None:
+        raise ExportError(f"La table {table} n'a pas de filtre par date")
+    if start_date:
+        where.append(f"{date_column} >= ?")
+        params.append(start_date)
+    if end_date:
+        where.append(f"{date_column} <= ?")
+        params.append(end_date)
+
+    where_sql = f" WHERE {' AND '.join(where)}" if where else ""
+    # Follow the scanned index: ORDER BY id after a date range search
+    # would need a temporary B-tree holding the whole result
+    order_sql = f"{date_column}, id" if where else "id"
+    select_list = ", ".join(f'"{c}"' for c in columns)
+
+    with get_connection(db_path) as conn:
+        # Plain tuples: no sqlite3.Row allocation per exported row
+        conn.row_factory = None
+
+        total = None
+        if progress:
+            total = conn.execute(f"SELECT COUNT(*) FROM {table}{where_sql}", params).fetchone()[0]
+
+        cur = conn.execute(
+            f"SELECT {select_list} FROM {table}{where_sql} ORDER BY {order_sql}",
+            params,
+        )
+        return stream_rows_to_csv(
+            cur, path, headers=columns, chunk_size=chunk_size,
+            progress=progress, total=total, delimiter=delimiter,
+        )
+
+
+# =========================================================
+# EXPORT COLONNAIRE (PARQUET / NPZ)
+# =========================================================
+#
+# Typed, month-partitioned files for notebooks and BI tools, laid out
+# Hive-style so that pyarrow / pandas / DuckDB read the folder as one
+# dataset:
+#     <output_dir>/<table>/mois=2025-03/part.parquet   (pyarrow)
+#     <output_dir>/<table>/mois=2025-03/part.npz       (numpy fallback)
+#
+# In .npz files dates are datetime64[D] (NaT for NULL) and nullable
+# integer columns come with a boolean "<column>__valide" mask.
+#
+# Incremental runs rewrite only the months that received rows since the
+# last export (highest exported id kept in app_state per table and
+# output folder). Updated or deleted rows need a full export.
+
+COLUMNAR_SCHEMAS = {
+    "ravitaillements": {
+        "date_column": "date",
+        "columns": {
+            "id": "int",
+            "vehicule_id": "int",
+            "employe_id": "int",
+            "date": "date",
+            "quantite_litres": "float",
+            "cout": "float",
+            "station": "str",
+            "kilometrage": "int",
+        },
+    },
+    "maintenances": {
+        "date_column": "date",
+        "columns": {
+            "id": "int",
+            "vehicule_id": "int",
+            "date": "date",
+            "type_intervention": "str",
+            "kilometrage": "int",
+            "cout": "float",
+            "prestataire": "str",
+            "remarques": "str",
+            "date_prochaine_echeance": "date",
+        },
+    },
+}
+
+
+def _columnar_backend(fmt):
+    """
+    Resolve "auto" / "parquet" / "npz" to an available backend.
+    """
+    if fmt in ("auto", "parquet"):
+        try:
+            import pyarrow  # noqa: F401
+            import pyarrow.parquet  # noqa: F401
+            return "parquet"
+        except ImportError:
+            if fmt == "parquet":
+                raise ExportError("Le module pyarrow est requis pour le format Parquet")
+
+    if fmt in ("auto", "npz"):
+        try:
+            import numpy  # noqa: F401
+            return "npz"
+        except ImportError:
+            raise ExportError("numpy ou pyarrow est requis pour l'export colonnaire")
+
+    raise ExportError(f"Format inconnu : {fmt}")
+
+
+def _state_key(table, output_dir):
+    return f"export_colonnaire:{table}:{Path(output_dir).resolve()}"
+
+
+def _load_export_state(conn, table, output_dir):
+    row = conn.execute(
+        "SELECT valeur FROM app_state WHERE cle = ?",
+        (_state_key(table, output_dir),),
+    ).fetchone()
+    return json.loads(row[0]) if row else {}
+
+
+def _pending_months(conn, table, output_dir, incremental):
+    """
+    (months, max_id): the months with rows up to max_id not yet exported,
+    read in one transaction so that a row committed in between is left
+    to the next export instead of being marked exported.
+    """
+    date_column = COLUMNAR_SCHEMAS[table]["date_column"]
+
+    conn.execute("BEGIN")
+    try:
+        max_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+        since_id = _load_export_state(conn, table, output_dir).get("max_id", 0) if incremental else 0
+        rows = conn.execute(
+            f"""
+            SELECT DISTINCT substr({date_column}, 1, 7) AS mois
+            FROM {table}
+            WHERE id > ? AND id <= ? AND {date_column} IS NOT NULL
+            ORDER BY mois
+            """,
+            (since_id, max_id),
+        ).fetchall()
+    finally:
+        conn.commit()
+
+    return [r[0] for r in rows], max_id
+
+
+def get_pending_partitions(table: str, output_dir, incremental=True, db_path="db/parc_auto.db"):
+    """
+    Months (YYYY-MM) an export of `table` into output_dir would write:
+    every month, or only those with rows added since the last export.
+    """
+    if table not in COLUMNAR_SCHEMAS:
+        raise ExportError(f"Table non disponible en export colonnaire : {table}")
+
+    with get_connection(db_path) as conn:
+        return _pending_months(conn, table, output_dir, incremental)[0]
+
+
+def _month_bounds(month):
+    year, m = map(int, month.split("-"))
+    start = date(year, m, 1)
+    end = date(year + (m == 12), m % 12 + 1, 1)
+    return start.isoformat(), end.isoformat()
+
+
+def _write_parquet(path, columns, types, rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    pa_types = {"int": pa.int64(), "float": pa.float64(), "str": pa.string(), "date": pa.date32()}
+    data = {}
+    for i, name in enumerate(columns):
+        values = [r[i] for r in rows]
+        if types[name] == "date":
+            values = [date.fromisoformat(v[:10]) if v else None for v in values]
+        data[name] = pa.array(values, type=pa_types[types[name]])
+
+    pq.write_table(pa.table(data), path, compression="snappy")
+
+
+def _write_npz(path, columns, types, rows):
+    import numpy as np
+
+    arrays = {}
+    for i, name in enumerate(columns):
+        values = [r[i] for r in rows]
+        kind = types[name]
+
+        if kind == "date":
+            arrays[name] = np.array(
+                [v[:10] if v else "NaT" for v in values], dtype="datetime64[D]"
+            )
+        elif kind == "float":
+            arrays[name] = np.array(
+                [np.nan if v is None else v for v in values], dtype=np.float64
+            )
+        elif kind == "int":
+            valid = np.array([v is not None for v in values], dtype=bool)
+            arrays[name] = np.array([0 if v is None else v for v in values], dtype=np.int64)
+            if not valid.all():
+                arrays[f"{name}__valide"] = valid
+        else:
+            arrays[name] = np.array(["" if v is None else str(v) for v in values], dtype=np.str_)
+
+    # File object: savez_compressed would append .npz to a .tmp name
+    with open(path, "wb") as f:
+        np.savez_compressed(f, **arrays)
+
+
+def export_columnar(
+    table: str,
+    output_dir,
+    fmt: str = "auto",
+    incremental: bool = False,
+    progress=None,
+    db_path="db/parc_auto.db",
+):
+    """
+    Write `table` as typed month partitions (Parquet with pyarrow,
+    .npz with numpy otherwise). With incremental, only the months that
+    received rows since the last export are (re)written.
+    progress(partitions_done, partitions_total) is called per month.
+    Returns {"format", "partitions": [months], "lignes": n}.
+    """
+    backend = _columnar_backend(fmt)
+    schema = COLUMNAR_SCHEMAS.get(table)
+    if schema is None:
+        raise ExportError(f"Table non disponible en export colonnaire : {table}")
+
+    columns = list(schema["columns"])
+    date_column = schema["date_column"]
+    writer = _write_parquet if backend == "parquet" else _write_npz
+    table_dir = Path(output_dir) / table
+    written_rows = 0
+
+    with get_connection(db_path) as conn:
+        conn.row_factory = None
+        months, max_id = _pending_months(conn, table, output_dir, incremental)
+
+        for done, month in enumerate(months, start=1):
+            start, end = _month_bounds(month)
+            # Rows added since max_id: their month is rewritten next time
+            rows = conn.execute(
+                f"""
+                SELECT {", ".join(columns)} FROM {table}
+                WHERE {date_column} >= ? AND {date_column} < ? AND id <= ?
+                ORDER BY {date_column}, id
+                """,
+                (start, end, max_id),
+            ).fetchall()
+
+            folder = table_dir / f"mois={month}"
+            folder.mkdir(parents=True, exist_ok=True)
+            target = folder / f"part.{backend}"
+            tmp = folder / f"part.{backend}.tmp"
+            try:
+                writer(tmp, columns, schema["columns"], rows)
+                os.replace(tmp, target)
+            except BaseException:
+                tmp.unlink(missing_ok=True)
+                raise
+
+            written_rows += len(rows)
+            if progress:
+                progress(done, len(months))
+
+        conn.execute(
+            """
+            INSERT INTO app_state (cle, valeur) VALUES (?, ?)
+            ON CONFLICT (cle) DO UPDATE SET valeur = excluded.valeur
+            """,
+            (_state_key(table, output_dir), json.dumps({"max_id": max_id, "format": backend})),
+        )
+        conn.commit()
+
+    return {"format": backend, "partitions": months, "lignes": written_rows}
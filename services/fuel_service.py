@@ -1,4 +1,6 @@
 from database import get_connection
+from services import alert_engine, rollup_service
+from utils.stats_cache import invalidate_tables
 
 
 class FuelError(Exception):
@@ -59,8 +61,25 @@ def record_fuel(
                 station,
             ),
         )
+
+        # Le relevé du compteur fait avancer le kilométrage du véhicule
+        if kilometrage is not None:
+            cur.execute(
+                """
+                UPDATE vehicules
+                SET kilometrage_actuel = ?
+                WHERE id = ? AND COALESCE(kilometrage_actuel, 0) < ?
+                """,
+                (kilometrage, vehicule_id, kilometrage),
+            )
+            if cur.rowcount:
+                alert_engine.on_vehicle_odometer(cur, vehicule_id)
+
+        rollup_service.refresh_within(cur)
         conn.commit()
 
+    invalidate_tables("ravitaillements", "vehicules", db_path=db_path)
+
 
 # =========================================================
 # CALCUL DERNIÈRE CONSOMMATION (L / 100 KM)
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from database import get_connection
 
 
@@ -44,3 +44,31 @@ def get_logs(
             (limit,),
         )
         return cur.fetchall()
+
+
+def archive_logs(
+    older_than_days: int = 365,
+    db_path="db/parc_auto.db",
+):
+    """
+    Move logs older than `older_than_days` to logs_archive, in one
+    transaction. Returns the number of archived rows.
+    """
+    limit = (datetime.now() - timedelta(days=older_than_days)).isoformat(timespec="seconds")
+
+    with get_connection(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            INSERT INTO logs_archive (id, user_id, action, date_action, details)
+            SELECT id, user_id, action, date_action, details
+            FROM logs
+            WHERE date_action < ?
+            """,
+            (limit,),
+        )
+        archived = cur.rowcount
+        cur.execute("DELETE FROM logs WHERE date_action < ?", (limit,))
+        conn.commit()
+
+    return archived
@@ -1,10 +1,38 @@
 from database import get_connection
+from services import alert_engine, rollup_service
+from utils.stats_cache import invalidate_tables
 
 
 class MaintenanceError(Exception):
     pass
 
 
+# Cost category of an intervention, stored in maintenances.categorie when
+# the maintenance is recorded (backfilled by init_db for older rows) so
+# that statistics filter on it instead of LIKE patterns on the label.
+
+CATEGORIE_CARBURANT = "carburant"
+CATEGORIE_ASSURANCE = "assurance"
+CATEGORIE_MAINTENANCE = "maintenance"
+
+FUEL_KEYWORDS = ("carburant", "essence", "diesel", "ravitaillement")
+INSURANCE_KEYWORDS = ("assurance",)
+
+
+def classify_intervention(type_intervention: str | None) -> str | None:
+    """
+    Category of an intervention label (None for no label).
+    """
+    if type_intervention is None:
+        return None
+    text = type_intervention.lower()
+    if any(k in text for k in FUEL_KEYWORDS):
+        return CATEGORIE_CARBURANT
+    if any(k in text for k in INSURANCE_KEYWORDS):
+        return CATEGORIE_ASSURANCE
+    return CATEGORIE_MAINTENANCE
+
+
 def record_maintenance(
     vehicule_id: int,
     date_: str,
@@ -30,14 +58,15 @@ def record_maintenance(
         cur.execute(
             """
             INSERT INTO maintenances (
-                vehicule_id, date, type_intervention, kilometrage,
+                vehicule_id, date, type_intervention, categorie, kilometrage,
                 cout, prestataire, remarques, date_prochaine_echeance
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 vehicule_id,
                 date_,
                 type_intervention,
+                classify_intervention(type_intervention),
                 kilometrage,
                 cout,
                 prestataire,
@@ -46,8 +75,13 @@ def record_maintenance(
             ),
         )
 
+        alert_engine.on_maintenance_written(cur, cur.lastrowid)
+        rollup_service.refresh_within(cur)
+
         conn.commit()
 
+    invalidate_tables("maintenances", db_path=db_path)
+
 
 def get_maintenances_for_vehicle(
     vehicule_id: int,
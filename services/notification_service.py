@@ -0,0 +1,352 @@
+import os
+import smtplib
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from pathlib import Path
+
+from database import get_connection
+from services.alert_engine import TYPE_LABELS
+
+
+class NotificationError(Exception):
+    pass
+
+
+# Outbox (table `notifications`): one row per (overdue alert, recipient).
+#
+# enqueue_alert_notifications() inserts the rows of every unacknowledged
+# `retard` alert for the gestionnaires (users) and for the driver concerned
+# (employes.email: licence holder, or permanent assignee of the vehicle).
+# The dedup key (alert, deadline, recipient) makes repeated sweeps no-ops;
+# the deadline of a km-based revision is its threshold, not the projected
+# date.
+#
+# deliver_pending() groups pending rows per recipient and sends one digest
+# through a transport (anything with send(recipient, subject, body)).
+# Failed sends are retried with RETRY_DELAYS_MINUTES back-off; a recipient
+# gets at most one digest per DIGEST_MIN_INTERVAL_MINUTES, later rows wait
+# for the next run.
+#
+# The rows to send are claimed first in a write transaction (statut
+# 'envoi', envoi_par / envoi_debut), so that the scheduler job and a manual
+# run at the same time never send the same row twice. A claim older than
+# CLAIM_TIMEOUT_MINUTES was left by a sender that crashed and is taken
+# over.
+
+DEFAULT_SENDER = "parc-auto@localhost"
+DIGEST_MIN_INTERVAL_MINUTES = 60
+RETRY_DELAYS_MINUTES = (5, 30, 120, 720)
+MAX_MESSAGES_PER_RUN = 500
+CLAIM_TIMEOUT_MINUTES = 30
+
+
+# =========================================================
+# TRANSPORTS
+# =========================================================
+
+def _message(sender, recipient, subject, body):
+    msg = EmailMessage()
+    msg["From"] = sender
+    msg["To"] = recipient
+    msg["Subject"] = subject
+    msg["Date"] = datetime.now().astimezone().strftime("%a, %d %b %Y %H:%M:%S %z")
+    msg.set_content(body)
+    return msg
+
+
+class SmtpTransport:
+    """
+    SMTP delivery, one connection per delivery run
+    (e.g. python -m aiosmtpd -n -l localhost:1025 for debugging).
+    """
+
+    def __init__(self, host="localhost", port=1025, sender=DEFAULT_SENDER, timeout=10):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.timeout = timeout
+        self._smtp = None
+
+    def send(self, recipient, subject, body):
+        if self._smtp is None:
+            self._smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            self._smtp.send_message(_message(self.sender, recipient, subject, body))
+        except (smtplib.SMTPServerDisconnected, OSError):
+            self._smtp = None
+            raise
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+
+class SpoolTransport:
+    """
+    Write each message as an .eml file in a spool directory
+    (written to a temporary name then renamed, so readers never see
+    partial files).
+    """
+
+    def __init__(self, directory, sender=DEFAULT_SENDER):
+        self.directory = Path(directory)
+        self.sender = sender
+
+    def send(self, recipient, subject, body):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"{datetime.now():%Y%m%d%H%M%S}_{uuid.uuid4().hex[:8]}.eml"
+        tmp = self.directory / (name + ".tmp")
+        tmp.write_bytes(_message(self.sender, recipient, subject, body).as_bytes())
+        os.replace(tmp, self.directory / name)
+
+    def close(self):
+        pass
+
+
+def smtp_transport(address: str):
+    """
+    SmtpTransport from "host" or "host:port" (port 25 by default).
+    """
+    host, _, port = address.partition(":")
+    if not host or (port and not port.isdigit()):
+        raise NotificationError(f"Serveur SMTP invalide : {address}")
+    return SmtpTransport(host, int(port or 25))
+
+
+def transport_from_env(db_path="db/parc_auto.db"):
+    """
+    PARC_AUTO_SMTP_HOST[:port] selects SMTP, otherwise messages are
+    spooled to PARC_AUTO_MAIL_SPOOL (default: mail_spool next to the db).
+    """
+    smtp = os.environ.get("PARC_AUTO_SMTP_HOST")
+    if smtp:
+        return smtp_transport(smtp)
+
+    spool = os.environ.get("PARC_AUTO_MAIL_SPOOL") or Path(db_path).parent / "mail_spool"
+    return SpoolTransport(spool)
+
+
+# =========================================================
+# FILE D'ATTENTE
+# =========================================================
+
+_ENQUEUE_SQL = """
+    INSERT OR IGNORE INTO notifications (
+        destinataire, alerte_id, cle_dedup, statut,
+        tentatives, prochain_essai, date_creation
+    )
+    SELECT destinataire, alerte_id,
+           alerte_id || '|' || echeance || '|' || destinataire,
+           'en_attente', 0, :now, :now
+    FROM (
+        -- Gestionnaires : toutes les alertes
+        SELECT u.email AS destinataire, a.id AS alerte_id, {echeance}
+        FROM alertes a
+        JOIN users u ON u.role = 'Gestionnaire' AND u.actif = 1
+        WHERE a.statut = 'retard' AND a.date_acquittement IS NULL
+          AND COALESCE(u.email, '') != ''
+
+        UNION
+
+        -- Titulaire du permis
+        SELECT e.email, a.id, {echeance}
+        FROM alertes a
+        JOIN employes e ON e.id = a.employe_id
+        WHERE a.statut = 'retard' AND a.date_acquittement IS NULL
+          AND COALESCE(e.email, '') != ''
+
+        UNION
+
+        -- Conducteur affecté au véhicule
+        SELECT e.email, a.id, {echeance}
+        FROM alertes a
+        JOIN affectations_permanentes ap
+          ON ap.vehicule_id = a.vehicule_id AND ap.date_fin IS NULL
+        JOIN employes e ON e.id = ap.employe_id
+        WHERE a.statut = 'retard' AND a.date_acquittement IS NULL
+          AND COALESCE(e.email, '') != ''
+    )
+""".format(
+    # The estimated date of a km-based revision moves with every odometer
+    # reading: its threshold ("Révision à N km") identifies the deadline
+    echeance="CASE WHEN a.source_type = 'revision_km' THEN a.libelle ELSE a.date_echeance END AS echeance"
+)
+
+
+def _ts(dt):
+    return dt.isoformat(timespec="seconds")
+
+
+def enqueue_alert_notifications(db_path="db/parc_auto.db", now: datetime | None = None):
+    """
+    Queue the notifications of overdue alerts. Returns the number of
+    new outbox rows (already queued pairs are ignored).
+    """
+    with get_connection(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(_ENQUEUE_SQL, {"now": _ts(now or datetime.now())})
+        count = cur.rowcount
+        conn.commit()
+    return count
+
+
+# =========================================================
+# ENVOI
+# =========================================================
+
+def _digest(items):
+    subject = f"[Parc auto] {len(items)} alerte(s) en retard"
+    lines = ["Les échéances suivantes sont dépassées :", ""]
+    for it in items:
+        lines.append(
+            f"- {it['date_echeance']}  {TYPE_LABELS.get(it['source_type'], it['source_type']):<12}"
+            f"{it['concerne'] or '-':<20}{it['libelle']}"
+        )
+    lines += ["", "Message automatique du gestionnaire de parc automobile."]
+    return subject, "\n".join(lines)
+
+
+def deliver_pending(
+    transport,
+    db_path="db/parc_auto.db",
+    now: datetime | None = None,
+    max_messages: int = MAX_MESSAGES_PER_RUN,
+    min_interval_minutes: int = DIGEST_MIN_INTERVAL_MINUTES,
+):
+    """
+    Send one digest per recipient for the pending notifications.
+    Rows whose alert is no longer overdue are cancelled.
+    Returns {"envoyes": n, "notifications": n, "reportes": n, "echecs": n,
+    "annulees": n}.
+    """
+    now = now or datetime.now()
+    stats = {"envoyes": 0, "notifications": 0, "reportes": 0, "echecs": 0, "annulees": 0}
+    owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+    with get_connection(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+
+        cur.execute(
+            """
+            UPDATE notifications SET statut = 'annulee'
+            WHERE statut = 'en_attente'
+              AND EXISTS (
+                  SELECT 1 FROM alertes a
+                  WHERE a.id = notifications.alerte_id
+                    AND (a.statut != 'retard' OR a.date_acquittement IS NOT NULL)
+              )
+            """
+        )
+        stats["annulees"] = cur.rowcount
+
+        rows = cur.execute(
+            """
+            SELECT n.id, n.destinataire, n.tentatives,
+                   a.source_type, a.libelle, a.date_echeance,
+                   COALESCE(v.immatriculation, e.nom || ' ' || e.prenom) AS concerne
+            FROM notifications n
+            JOIN alertes a ON a.id = n.alerte_id
+            LEFT JOIN vehicules v ON v.id = a.vehicule_id
+            LEFT JOIN employes e ON e.id = a.employe_id
+            WHERE (n.statut = 'en_attente' AND n.prochain_essai <= ?)
+               OR (n.statut = 'envoi' AND n.envoi_debut < ?)
+            ORDER BY n.destinataire, a.date_echeance
+            """,
+            (_ts(now), _ts(now - timedelta(minutes=CLAIM_TIMEOUT_MINUTES))),
+        ).fetchall()
+
+        recently_served = {
+            r["destinataire"]
+            for r in cur.execute(
+                """
+                SELECT DISTINCT destinataire FROM notifications
+                WHERE statut = 'envoyee' AND date_envoi > ?
+                """,
+                (_ts(now - timedelta(minutes=min_interval_minutes)),),
+            ).fetchall()
+        }
+
+        by_recipient = defaultdict(list)
+        for r in rows:
+            by_recipient[r["destinataire"]].append(r)
+
+        claimed = {}
+        for recipient, items in by_recipient.items():
+            if recipient in recently_served or len(claimed) >= max_messages:
+                stats["reportes"] += len(items)
+            else:
+                claimed[recipient] = items
+
+        cur.executemany(
+            "UPDATE notifications SET statut = 'envoi', envoi_par = ?, envoi_debut = ? WHERE id = ?",
+            [(owner, _ts(now), it["id"]) for items in claimed.values() for it in items],
+        )
+        conn.commit()
+
+    try:
+        for recipient, items in claimed.items():
+            try:
+                transport.send(recipient, *_digest(items))
+            except Exception as e:
+                _record_failure(db_path, items, now, e)
+                stats["echecs"] += 1
+                continue
+
+            with get_connection(db_path) as conn:
+                conn.executemany(
+                    """
+                    UPDATE notifications
+                    SET statut = 'envoyee', date_envoi = ?,
+                        tentatives = tentatives + 1, derniere_erreur = NULL
+                    WHERE id = ? AND envoi_par = ?
+                    """,
+                    [(_ts(now), it["id"], owner) for it in items],
+                )
+                conn.commit()
+
+            stats["envoyes"] += 1
+            stats["notifications"] += len(items)
+    finally:
+        transport.close()
+
+    return stats
+
+
+def _record_failure(db_path, items, now, error):
+    updates = []
+    for it in items:
+        attempt = it["tentatives"] + 1
+        if attempt > len(RETRY_DELAYS_MINUTES):
+            updates.append(("echec", _ts(now), attempt, str(error), it["id"]))
+        else:
+            retry = now + timedelta(minutes=RETRY_DELAYS_MINUTES[attempt - 1])
+            updates.append(("en_attente", _ts(retry), attempt, str(error), it["id"]))
+
+    with get_connection(db_path) as conn:
+        conn.executemany(
+            """
+            UPDATE notifications
+            SET statut = ?, prochain_essai = ?, tentatives = ?, derniere_erreur = ?
+            WHERE id = ?
+            """,
+            updates,
+        )
+        conn.commit()
+
+
+def get_outbox_summary(db_path="db/parc_auto.db"):
+    """
+    Number of outbox rows per statut.
+    """
+    with get_connection(db_path) as conn:
+        rows = conn.execute(
+            "SELECT statut, COUNT(*) AS n FROM notifications GROUP BY statut"
+        ).fetchall()
+    return {r["statut"]: r["n"] for r in rows}
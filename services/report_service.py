@@ -0,0 +1,710 @@
+import csv
+import functools
+import io
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import date, datetime
+from pathlib import Path
+
+from database import get_connection
+from services.dashboard_service import (
+    get_detailed_costs_by_vehicle,
+    get_fleet_summary,
+    get_vehicle_utilization_rate,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class ReportError(Exception):
+    pass
+
+
+# Headless reports (python cli.py report): no Tk import, charts are drawn
+# with matplotlib's Agg canvas and the PDF with reportlab, both optional
+# and imported only when a PDF is requested.
+#
+# A report is a list of sections computed for a date range and, for
+# per-service reports, for the trips / refuels of the employees of one
+# service (employes.service). Fleet-wide sections (par_service=False) are
+# only part of the fleet report. Sections run in parallel, each on its own
+# connection; past the deadline a progress handler aborts the running
+# statements and the report is written with the sections that finished.
+
+DEFAULT_TIMEOUT_SECONDS = 300
+PDF_MAX_ROWS = 200
+CHART_TOP = 15
+
+SECTIONS = {}
+
+
+def section(name, title, headers, par_service=True, chart=None):
+    """
+    Register a report section. The decorated function receives
+    (cur, params) with params = {start, end, service, db_path} and
+    returns rows.
+    chart: (kind, label_column, value_column) with kind "bar" or "line".
+    """
+    def decorator(func):
+        SECTIONS[name] = {
+            "func": func,
+            "title": title,
+            "headers": headers,
+            "par_service": par_service,
+            "chart": chart,
+        }
+        return func
+    return decorator
+
+
+# =========================================================
+# SECTIONS
+# =========================================================
+
+@section(
+    "synthese", "Résumé du parc",
+    ["indicateur", "valeur"],
+    par_service=False,
+)
+def _synthese(cur, params):
+    summary = get_fleet_summary(db_path=params["db_path"])
+    labels = {
+        "total": "Total de véhicules",
+        "available": "Disponibles",
+        "en_sortie": "En sortie",
+        "maintenance": "En maintenance",
+    }
+    return [(label, summary.get(key, 0)) for key, label in labels.items()]
+
+
+@section(
+    "kilometrage", "Kilométrage par véhicule",
+    ["immatriculation", "marque", "modele", "nombre_sorties", "km_parcourus"],
+    chart=("bar", "immatriculation", "km_parcourus"),
+)
+def _kilometrage(cur, params):
+    return cur.execute(
+        """
+        SELECT v.immatriculation, v.marque, v.modele,
+               COUNT(*) AS nombre_sorties,
+               SUM(s.km_retour - s.km_depart) AS km_parcourus
+        FROM sorties_reservations s
+        JOIN vehicules v ON v.id = s.vehicule_id
+        JOIN employes e ON e.id = s.employe_id
+        WHERE COALESCE(s.date_sortie_reelle, s.date_sortie_prevue) BETWEEN :start AND :end
+          AND s.km_retour IS NOT NULL
+          AND (:service IS NULL OR e.service = :service)
+        GROUP BY v.id
+        ORDER BY km_parcourus DESC
+        """,
+        params,
+    ).fetchall()
+
+
+@section(
+    "employes", "Activité des employés",
+    ["nom", "prenom", "service", "nombre_sorties", "km_total", "km_moyen_par_sortie"],
+    chart=("bar", "nom", "km_total"),
+)
+def _employes(cur, params):
+    return cur.execute(
+        """
+        SELECT e.nom, e.prenom, e.service,
+               COUNT(*) AS nombre_sorties,
+               SUM(s.km_retour - s.km_depart) AS km_total,
+               ROUND(AVG(s.km_retour - s.km_depart), 1) AS km_moyen_par_sortie
+        FROM sorties_reservations s
+        JOIN employes e ON e.id = s.employe_id
+        WHERE COALESCE(s.date_sortie_reelle, s.date_sortie_prevue) BETWEEN :start AND :end
+          AND s.km_retour IS NOT NULL
+          AND (:service IS NULL OR e.service = :service)
+        GROUP BY e.id
+        ORDER BY nombre_sorties DESC
+        """,
+        params,
+    ).fetchall()
+
+
+@section(
+    "carburant", "Carburant par véhicule",
+    ["immatriculation", "nombre_pleins", "litres", "cout"],
+    chart=("bar", "immatriculation", "cout"),
+)
+def _carburant(cur, params):
+    return cur.execute(
+        """
+        SELECT v.immatriculation,
+               COUNT(*) AS nombre_pleins,
+               ROUND(SUM(r.quantite_litres), 1) AS litres,
+               ROUND(SUM(r.cout), 2) AS cout
+        FROM ravitaillements r
+        JOIN vehicules v ON v.id = r.vehicule_id
+        JOIN employes e ON e.id = r.employe_id
+        WHERE r.date BETWEEN :start AND :end
+          AND (:service IS NULL OR e.service = :service)
+        GROUP BY v.id
+        ORDER BY cout DESC
+        """,
+        params,
+    ).fetchall()
+
+
+@section(
+    "maintenance", "Maintenance par véhicule",
+    ["immatriculation", "nombre_interventions", "cout"],
+    par_service=False,
+    chart=("bar", "immatriculation", "cout"),
+)
+def _maintenance(cur, params):
+    return cur.execute(
+        """
+        SELECT v.immatriculation,
+               COUNT(*) AS nombre_interventions,
+               ROUND(COALESCE(SUM(m.cout), 0), 2) AS cout
+        FROM maintenances m
+        JOIN vehicules v ON v.id = m.vehicule_id
+        WHERE m.date BETWEEN :start AND :end
+        GROUP BY v.id
+        ORDER BY cout DESC
+        """,
+        params,
+    ).fetchall()
+
+
+@section(
+    "evolution_couts", "Évolution mensuelle des coûts",
+    ["periode", "cout_carburant", "cout_maintenance", "cout_total"],
+    par_service=False,
+    chart=("line", "periode", "cout_total"),
+)
+def _evolution_couts(cur, params):
+    return cur.execute(
+        """
+        SELECT periode,
+               ROUND(SUM(carburant), 2) AS cout_carburant,
+               ROUND(SUM(maintenance), 2) AS cout_maintenance,
+               ROUND(SUM(carburant + maintenance), 2) AS cout_total
+        FROM (
+            SELECT strftime('%Y-%m', date) AS periode, COALESCE(cout, 0) AS carburant, 0 AS maintenance
+            FROM ravitaillements WHERE date BETWEEN :start AND :end
+            UNION ALL
+            SELECT strftime('%Y-%m', date), 0, COALESCE(cout, 0)
+            FROM maintenances WHERE date BETWEEN :start AND :end
+        )
+        GROUP BY periode
+        ORDER BY periode
+        """,
+        params,
+    ).fetchall()
+
+
+# =========================================================
+# CALCUL PARALLÈLE
+# =========================================================
+
+def get_services(db_path="db/parc_auto.db"):
+    """
+    Distinct employes.service values.
+    """
+    with get_connection(db_path) as conn:
+        rows = conn.execute(
+            "SELECT DISTINCT service FROM employes WHERE service IS NOT NULL ORDER BY service"
+        ).fetchall()
+    return [r["service"] for r in rows]
+
+
+def _run_section(name, params, stop):
+    if stop.is_set():
+        raise ReportError("Annulée")
+
+    conn = get_connection(params["db_path"])
+    # Abort the statement in progress once the deadline has passed
+    conn.set_progress_handler(stop.is_set, 10_000)
+    try:
+        rows = SECTIONS[name]["func"](conn.cursor(), params)
+        return [tuple(r) for r in rows]
+    finally:
+        conn.close()
+
+
+def compute_sections(
+    jobs,
+    max_workers=None,
+    timeout=DEFAULT_TIMEOUT_SECONDS,
+):
+    """
+    jobs: {key: (section_name, params)}. Runs them in a thread pool and
+    returns {key: rows or exception}. Jobs still running after `timeout`
+    seconds are aborted and reported as ReportError.
+    """
+    stop = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(_run_section, name, params, stop): key
+            for key, (name, params) in jobs.items()
+        }
+        _, not_done = wait(futures, timeout=timeout)
+        if not_done:
+            stop.set()
+
+    results = {}
+    for future, key in futures.items():
+        if future in not_done:
+            results[key] = ReportError(f"Délai dépassé ({timeout} s)")
+        elif future.exception() is not None:
+            results[key] = future.exception()
+        else:
+            results[key] = future.result()
+
+    return results
+
+
+# =========================================================
+# RENDU
+# =========================================================
+
+def _slug(text):
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", text).strip("_").lower() or "tous"
+
+
+def _write_csv(path, headers, rows):
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(headers)
+        writer.writerows(rows)
+
+
+def _chart_png(spec, rows):
+    """
+    PNG bytes of the section chart, or None without matplotlib.
+    """
+    try:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+    except ImportError:
+        return None
+
+    kind, label_col, value_col = spec["chart"]
+    li = spec["headers"].index(label_col)
+    vi = spec["headers"].index(value_col)
+    data = rows if kind == "line" else rows[:CHART_TOP]
+    labels = [str(r[li]) for r in data]
+    values = [r[vi] or 0 for r in data]
+
+    fig = Figure(figsize=(8, 3.5), dpi=100)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    if kind == "line":
+        ax.plot(labels, values, marker="o", color="#1976D2")
+    else:
+        ax.bar(labels, values, color="#1976D2")
+    ax.set_title(spec["title"])
+    ax.tick_params(axis="x", labelrotation=45, labelsize=7)
+    ax.grid(True, axis="y", alpha=0.3)
+    fig.tight_layout()
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    return buf.getvalue()
+
+
+@functools.lru_cache(maxsize=None)
+def _pdf_table_style():
+    # Built once per process and shared by every table
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1976D2')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ])
+
+
+def _write_pdf(path, title, subtitle, sections):
+    """
+    sections: list of (spec, rows or exception).
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table
+
+    styles = getSampleStyleSheet()
+    elements = [
+        Paragraph(title, styles["Title"]),
+        Paragraph(subtitle, styles["Normal"]),
+        Spacer(1, 20),
+    ]
+    table_style = _pdf_table_style()
+
+    for i, (spec, rows) in enumerate(sections, start=1):
+        elements.append(Paragraph(f"{i}. {spec['title']}", styles["Heading2"]))
+
+        if isinstance(rows, Exception):
+            elements.append(Paragraph(f"Section non disponible : {rows}", styles["Normal"]))
+            continue
+        if not rows:
+            elements.append(Paragraph("Aucune donnée sur la période.", styles["Normal"]))
+            continue
+
+        if spec["chart"]:
+            png = _chart_png(spec, rows)
+            if png:
+                elements.append(Image(io.BytesIO(png), width=16 * cm, height=7 * cm))
+
+        shown = rows[:PDF_MAX_ROWS]
+        table = Table([spec["headers"]] + [[str(v) for v in r] for r in shown], repeatRows=1)
+        table.setStyle(table_style)
+        elements.append(table)
+        if len(rows) > len(shown):
+            elements.append(Paragraph(
+                f"{len(rows) - len(shown)} ligne(s) supplémentaire(s) dans le CSV.",
+                styles["Italic"],
+            ))
+        elements.append(Spacer(1, 15))
+
+    doc = SimpleDocTemplate(str(path), pagesize=A4,
+                            leftMargin=1.5 * cm, rightMargin=1.5 * cm,
+                            topMargin=1.5 * cm, bottomMargin=1.5 * cm)
+    doc.build(elements)
+
+
+# =========================================================
+# GÉNÉRATION
+# =========================================================
+
+def generate_reports(
+    output_dir,
+    start_date: str,
+    end_date: str,
+    services=None,
+    sections=None,
+    formats=("csv", "pdf"),
+    max_workers=None,
+    timeout=DEFAULT_TIMEOUT_SECONDS,
+    db_path="db/parc_auto.db",
+):
+    """
+    Write one report per service (or a single fleet report when
+    `services` is empty) for [start_date, end_date]:
+        <output_dir>/<service>/<section>.csv
+        <output_dir>/<service>/rapport_<service>_<start>_<end>.pdf
+    Returns a list of {"service", "fichiers", "erreurs"} dicts.
+    """
+    try:
+        start = date.fromisoformat(start_date)
+        end = date.fromisoformat(end_date)
+    except (TypeError, ValueError):
+        raise ReportError("Dates invalides (format AAAA-MM-JJ)")
+    if end < start:
+        raise ReportError("Date de fin antérieure à la date de début")
+
+    unknown = set(sections or []) - set(SECTIONS)
+    if unknown:
+        raise ReportError(f"Section(s) inconnue(s) : {', '.join(sorted(unknown))}")
+
+    formats = set(formats)
+    if "pdf" in formats:
+        try:
+            import reportlab  # noqa: F401
+        except ImportError:
+            raise ReportError("Le module reportlab est requis pour l'export PDF")
+
+    targets = list(services) if services else [None]
+    plan = {}
+    for service in targets:
+        names = [
+            name for name, spec in SECTIONS.items()
+            if (not sections or name in sections)
+            and (service is None or spec["par_service"])
+        ]
+        plan[service] = names
+
+    params_for = {
+        service: {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "service": service,
+            "db_path": db_path,
+        }
+        for service in targets
+    }
+    jobs = {
+        (service, name): (name, params_for[service])
+        for service, names in plan.items()
+        for name in names
+    }
+    results = compute_sections(jobs, max_workers=max_workers, timeout=timeout)
+
+    output_dir = Path(output_dir)
+    summary = []
+
+    for service, names in plan.items():
+        label = service or "parc"
+        folder = output_dir / _slug(label)
+        folder.mkdir(parents=True, exist_ok=True)
+        files, errors = [], []
+
+        for name in names:
+            rows = results[(service, name)]
+            if isinstance(rows, Exception):
+                errors.append(f"{name}: {rows}")
+            elif "csv" in formats:
+                path = folder / f"{name}.csv"
+                _write_csv(path, SECTIONS[name]["headers"], rows)
+                files.append(path)
+
+        if "pdf" in formats:
+            path = folder / f"rapport_{_slug(label)}_{start:%Y%m%d}_{end:%Y%m%d}.pdf"
+            _write_pdf(
+                path,
+                f"Rapport du parc automobile — {label}",
+                f"Période du {start:%d/%m/%Y} au {end:%d/%m/%Y} — "
+                f"généré le {datetime.now():%d/%m/%Y à %H:%M}",
+                [(SECTIONS[name], results[(service, name)]) for name in names],
+            )
+            files.append(path)
+
+        summary.append({"service": label, "fichiers": files, "erreurs": errors})
+
+    return summary
+
+
+# =========================================================
+# RAPPORT COMPLET DU PARC (PDF PAGINÉ)
+# =========================================================
+#
+# Every vehicle, no truncation. A single reportlab Table spanning many
+# pages is re-measured from the split point at each page break (quadratic
+# in the number of rows), so rows are laid out in page-sized tables with
+# fixed column widths and row heights: nothing is measured cell by cell
+# and a page break only ever splits a small table.
+#
+# Long sections are cut into parts of FLEET_PDF_ROWS_PER_PART rows,
+# rendered as partial PDFs by worker processes, then concatenated with
+# pypdf. Without pypdf (or with a single part) the whole report is
+# rendered in the calling process; a warning is logged when pypdf is
+# what prevents the parallel rendering.
+
+FLEET_PDF_ROWS_PER_TABLE = 50
+FLEET_PDF_ROWS_PER_PART = 2400
+FLEET_PDF_ROW_HEIGHT = 14
+
+FLEET_PDF_SECTIONS = {
+    "synthese": ("Résumé du parc", ["Indicateur", "Valeur"], [10, 5]),
+    "couts": (
+        "Coûts détaillés par véhicule",
+        ["Immatriculation", "Carburant", "Maintenance", "Assurance", "Total"],
+        [4, 3, 3, 3, 3],
+    ),
+    "utilisation": (
+        "Taux d'utilisation (30 derniers jours)",
+        ["Véhicule", "Sorties", "Jours utilisés", "Km parcourus", "Taux (%)"],
+        [4, 2.5, 3, 3, 2.5],
+    ),
+}
+
+
+def _fleet_pdf_rows(summary, costs, utilization):
+    """
+    Section rows as plain strings (picklable for the worker processes).
+    """
+    return {
+        "synthese": [
+            ["Total de véhicules", str(summary.get("total", 0))],
+            ["Disponibles", str(summary.get("available", 0))],
+            ["En sortie", str(summary.get("en_sortie", 0))],
+            ["En maintenance", str(summary.get("maintenance", 0))],
+        ],
+        "couts": [
+            [
+                r["immatriculation"],
+                f"{r['cout_carburant']:.2f} €",
+                f"{r['cout_maintenance']:.2f} €",
+                f"{r['cout_assurance']:.2f} €",
+                f"{r['cout_total']:.2f} €",
+            ]
+            for r in costs or []
+        ],
+        "utilisation": [
+            [
+                r["immatriculation"],
+                str(r["nombre_sorties"]),
+                str(r["jours_utilises"]),
+                f"{r['km_parcourus']} km",
+                f"{r['taux_utilisation']}%",
+            ]
+            for r in utilization or []
+        ],
+    }
+
+
+def _fleet_pdf_parts(rows_by_section, rows_per_part):
+    """
+    Cut the sections into parts: lists of (section, first_row_index, rows).
+    """
+    parts, current, size = [], [], 0
+    for name, rows in rows_by_section.items():
+        if not rows:
+            continue
+        for i in range(0, len(rows), rows_per_part):
+            chunk = rows[i:i + rows_per_part]
+            if current and size + len(chunk) > rows_per_part:
+                parts.append(current)
+                current, size = [], 0
+            current.append((name, i, chunk))
+            size += len(chunk)
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _render_fleet_part(path, title, subtitle, blocks):
+    """
+    Render one part to `path` (runs in a worker process).
+    Returns the number of pages.
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table
+
+    styles = getSampleStyleSheet()
+    table_style = _pdf_table_style()
+    elements = []
+    if title:
+        elements += [Paragraph(title, styles["Title"]), Paragraph(subtitle, styles["Normal"]), Spacer(1, 20)]
+
+    for name, first, rows in blocks:
+        section_title, headers, widths = FLEET_PDF_SECTIONS[name]
+        if first == 0:
+            number = list(FLEET_PDF_SECTIONS).index(name) + 1
+            elements.append(Paragraph(f"{number}. {section_title}", styles["Heading2"]))
+        col_widths = [w * cm for w in widths]
+
+        for i in range(0, len(rows), FLEET_PDF_ROWS_PER_TABLE):
+            table_rows = rows[i:i + FLEET_PDF_ROWS_PER_TABLE]
+            table = Table(
+                [headers] + table_rows,
+                colWidths=col_widths,
+                rowHeights=[FLEET_PDF_ROW_HEIGHT] * (len(table_rows) + 1),
+                repeatRows=1,
+            )
+            table.setStyle(table_style)
+            elements.append(table)
+        elements.append(Spacer(1, 15))
+
+    doc = SimpleDocTemplate(str(path), pagesize=A4,
+                            leftMargin=1.5 * cm, rightMargin=1.5 * cm,
+                            topMargin=1.5 * cm, bottomMargin=1.5 * cm)
+    doc.build(elements)
+    return doc.page
+
+
+def _merge_pdfs(paths, target):
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for p in paths:
+        writer.append(str(p))
+    with open(target, "wb") as f:
+        writer.write(f)
+    writer.close()
+
+
+def render_fleet_pdf(
+    path,
+    summary,
+    costs,
+    utilization,
+    max_workers=None,
+    rows_per_part=FLEET_PDF_ROWS_PER_PART,
+):
+    """
+    Write the complete fleet report (summary, costs and utilisation of
+    every vehicle) to `path`. max_workers=1 renders in-process.
+    Returns {"pages", "parties", "secondes", "pages_par_seconde"}.
+    """
+    try:
+        import reportlab  # noqa: F401
+    except ImportError:
+        raise ReportError("Le module reportlab est requis pour l'export PDF")
+    try:
+        import pypdf  # noqa: F401
+        can_merge = True
+    except ImportError:
+        can_merge = False
+
+    t0 = time.perf_counter()
+    path = Path(path)
+    title = "Rapport du Parc Automobile"
+    subtitle = f"Généré le {datetime.now():%d/%m/%Y à %H:%M}"
+    rows_by_section = _fleet_pdf_rows(summary, costs, utilization)
+    parts = _fleet_pdf_parts(rows_by_section, max(rows_per_part, FLEET_PDF_ROWS_PER_TABLE))
+    workers = min(max_workers or os.cpu_count() or 1, len(parts))
+    tmp = path.with_name(path.name + ".tmp")
+
+    if len(parts) > 1 and workers > 1 and not can_merge:
+        logger.warning(
+            "pypdf absent : rapport de flotte rendu en un seul processus (%d parties)", len(parts)
+        )
+
+    try:
+        if len(parts) <= 1 or workers <= 1 or not can_merge:
+            blocks = [block for part in parts for block in part]
+            pages = _render_fleet_part(tmp, title, subtitle, blocks)
+            count = 1
+        else:
+            with tempfile.TemporaryDirectory(dir=path.parent) as tmp_dir:
+                part_paths = [Path(tmp_dir) / f"partie_{i:04}.pdf" for i in range(len(parts))]
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = [
+                        pool.submit(
+                            _render_fleet_part, part_path,
+                            title if i == 0 else None, subtitle, part,
+                        )
+                        for i, (part_path, part) in enumerate(zip(part_paths, parts))
+                    ]
+                    pages = sum(f.result() for f in futures)
+                _merge_pdfs(part_paths, tmp)
+            count = len(parts)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    elapsed = time.perf_counter() - t0
+    return {
+        "pages": pages,
+        "parties": count,
+        "secondes": round(elapsed, 2),
+        "pages_par_seconde": round(pages / elapsed, 1) if elapsed else None,
+    }
+
+
+def generate_fleet_pdf(path, max_workers=None, db_path="db/parc_auto.db"):
+    """
+    Complete fleet report from the database (see render_fleet_pdf).
+    """
+    return render_fleet_pdf(
+        path,
+        get_fleet_summary(db_path=db_path),
+        get_detailed_costs_by_vehicle(db_path=db_path),
+        get_vehicle_utilization_rate(db_path=db_path),
+        max_workers=max_workers,
+    )
@@ -1,5 +1,8 @@
 from datetime import datetime
 from database import get_connection
+from services import alert_engine, rollup_service
+from services.employee_service import invalidate_eligibility, is_driver_eligible
+from utils.stats_cache import invalidate_tables
 
 
 class ReservationError(Exception):
@@ -10,8 +13,8 @@ class ReservationError(Exception):
 # LECTURE DES RÉSERVATIONS
 # =========================================================
 
-def get_all_reservations():
-    conn = get_connection()
+def get_all_reservations(db_path="db/parc_auto.db"):
+    conn = get_connection(db_path)
     cur = conn.cursor()
 
     cur.execute("""
@@ -64,9 +67,10 @@ def create_reservation(
     heure_retour_prevue,
     km_depart,
     motif,
-    destination
+    destination,
+    db_path="db/parc_auto.db",
 ):
-    conn = get_connection()
+    conn = get_connection(db_path)
     cur = conn.cursor()
 
     # 🔒 Vérifier véhicule
@@ -93,23 +97,25 @@ def create_reservation(
             f"Kilométrage départ invalide (kilométrage actuel : {km_actuel})"
         )
 
-    # 🔒 Vérifier employé
-    cur.execute(
-        "SELECT autorise_conduire FROM employes WHERE id = ?",
-        (employe_id,)
-    )
-    emp = cur.fetchone()
-
-    if not emp or emp[0] != 1:
+    # 🔒 Vérifier employé (autorisé, permis valide jusqu'au retour)
+    if not is_driver_eligible(
+        employe_id,
+        until=date_retour_prevue or date_sortie_prevue,
+        db_path=db_path,
+    ):
         conn.close()
-        raise ReservationError("Employé non autorisé à conduire")
+        raise ReservationError(
+            "Employé non autorisé à conduire ou permis expiré"
+        )
 
     # 🔒 Vérifier dates
     if date_retour_prevue and date_retour_prevue < date_sortie_prevue:
         conn.close()
         raise ReservationError("Date de retour antérieure à la date de sortie")
 
-    # ➕ Insertion sortie
+    # ➕ Insertion sortie, si le conducteur est toujours autorisé : la
+    # vérification ci-dessus lit un cache, une suspension faite par un
+    # autre processus (planificateur) n'y est pas encore visible
     cur.execute("""
         INSERT INTO sorties_reservations (
             vehicule_id,
@@ -122,7 +128,15 @@ def create_reservation(
             motif,
             destination,
             statut
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'en sortie')
+        )
+        SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, 'en sortie'
+        WHERE EXISTS (
+            SELECT 1 FROM employes
+            WHERE id = ?
+              AND autorise_conduire = 1
+              AND COALESCE(permis_suspendu, 0) = 0
+              AND date_validite_permis >= ?
+        )
     """, (
         vehicule_id,
         employe_id,
@@ -132,9 +146,19 @@ def create_reservation(
         heure_retour_prevue,
         km_depart,
         motif,
-        destination
+        destination,
+        employe_id,
+        date_retour_prevue or date_sortie_prevue,
     ))
 
+    if cur.rowcount == 0:
+        conn.rollback()
+        conn.close()
+        invalidate_eligibility(db_path)
+        raise ReservationError(
+            "Employé non autorisé à conduire ou permis expiré"
+        )
+
     # 🚗 Mise à jour véhicule
     cur.execute("""
         UPDATE vehicules
@@ -144,16 +168,26 @@ def create_reservation(
         WHERE id = ?
     """, (km_depart, vehicule_id))
 
+    alert_engine.on_vehicle_odometer(cur, vehicule_id)
+
     conn.commit()
     conn.close()
 
+    invalidate_tables("sorties_reservations", "vehicules", db_path=db_path)
+
 
 # =========================================================
 # RETOUR DE VÉHICULE
 # =========================================================
 
-def return_vehicle(reservation_id, km_retour, etat_retour, niveau_carburant):
-    conn = get_connection()
+def return_vehicle(
+    reservation_id,
+    km_retour,
+    etat_retour,
+    niveau_carburant,
+    db_path="db/parc_auto.db",
+):
+    conn = get_connection(db_path)
     cur = conn.cursor()
 
     cur.execute("""
@@ -211,5 +245,10 @@ def return_vehicle(reservation_id, km_retour, etat_retour, niveau_carburant):
         WHERE id = ?
     """, (km_retour, statut, vehicule_id))
 
+    alert_engine.on_vehicle_odometer(cur, vehicule_id)
+    rollup_service.refresh_within(cur)
+
     conn.commit()
-    conn.close()
\ No newline at end of file
+    conn.close()
+
+    invalidate_tables("sorties_reservations", "vehicules", db_path=db_path)
\ No newline at end of file
@@ -0,0 +1,359 @@
+import json
+from datetime import date, timedelta
+
+from database import get_connection
+
+
+class RollupError(Exception):
+    pass
+
+
+# Pre-aggregated costs and mileage (agregats_jour / agregats_mois).
+#
+# One row per day (month) and vehicle with the costs of the maintenances
+# and refuels of that day and the km of the trips that left that day,
+# so that evolution charts and period totals read a few hundred rows
+# instead of the source tables.
+#
+# refresh_rollups() adds the rows written since the previous refresh:
+# the highest aggregated id of each source table is kept in app_state.
+# init_db builds the aggregates, and record_fuel, record_maintenance and
+# return_vehicle bring them up to date in their own write transaction
+# (refresh_within), so they stay current without the scheduler.
+# A trip counts once returned (km_retour set); trips still open are
+# remembered and looked at again by the next refresh. The application
+# never updates costs nor deletes rows: call rebuild_rollups() after
+# editing those tables by hand.
+#
+# Refreshes run in a write transaction (BEGIN IMMEDIATE) so that two
+# processes cannot aggregate the same rows twice. Reads never refresh
+# (they would compete for the write lock with check-outs and returns, and
+# write into the reporting replica): they add the rows past the watermark
+# read from the source tables (pending_rows_sql): the rows written
+# outside those services since their last write.
+
+STATE_KEY = "agregats"
+
+GROUP_BY = {
+    None: None,
+    "vehicule": "v.immatriculation",
+    "service": "COALESCE(v.service_principal, '')",
+    "type": "v.type_vehicule",
+}
+
+_MEASURES = (
+    "cout_carburant", "cout_maintenance", "cout_assurance", "cout_total", "km", "sorties",
+)
+
+_DELTA_SQL = {
+    "maintenances": """
+        SELECT
+            date, vehicule_id,
+            COALESCE(SUM(CASE WHEN categorie = 'carburant' THEN cout END), 0),
+            COALESCE(SUM(CASE WHEN categorie = 'maintenance' THEN cout END), 0),
+            COALESCE(SUM(CASE WHEN categorie = 'assurance' THEN cout END), 0),
+            COALESCE(SUM(cout), 0), 0, 0
+        FROM maintenances
+        WHERE id > ? AND id <= ? AND date IS NOT NULL
+        GROUP BY date, vehicule_id
+    """,
+    "ravitaillements": """
+        SELECT date, vehicule_id, COALESCE(SUM(cout), 0), 0, 0, COALESCE(SUM(cout), 0), 0, 0
+        FROM ravitaillements
+        WHERE id > ? AND id <= ? AND date IS NOT NULL
+        GROUP BY date, vehicule_id
+    """,
+    # Trips count on their departure day (the planned one when the actual
+    # departure was not recorded), returned trips only
+    "sorties_reservations": """
+        SELECT
+            COALESCE(date_sortie_reelle, date_sortie_prevue) AS jour, vehicule_id,
+            0, 0, 0, 0, SUM(km_retour - km_depart), COUNT(*)
+        FROM sorties_reservations
+        WHERE ((id > ? AND id <= ?) OR id IN (SELECT value FROM json_each(?)))
+            AND km_retour IS NOT NULL
+            AND COALESCE(date_sortie_reelle, date_sortie_prevue) IS NOT NULL
+        GROUP BY jour, vehicule_id
+    """,
+}
+
+
+# Upper id bound of the pending rows: every row past the watermark
+_NO_LIMIT = 2**63 - 1
+
+
+def _load_state(conn):
+    row = conn.execute(
+        "SELECT valeur FROM app_state WHERE cle = ?", (STATE_KEY,)
+    ).fetchone()
+    state = json.loads(row[0]) if row else {}
+    return {
+        "max_id": {table: state.get("max_id", {}).get(table, 0) for table in _DELTA_SQL},
+        "sorties_ouvertes": state.get("sorties_ouvertes", []),
+    }
+
+
+def _max_ids(conn):
+    return {
+        table: conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+        for table in _DELTA_SQL
+    }
+
+
+def _has_pending(conn, state):
+    if _max_ids(conn) != state["max_id"]:
+        return True
+    returned = conn.execute(
+        """
+        SELECT COUNT(*) FROM sorties_reservations
+        WHERE id IN (SELECT value FROM json_each(?)) AND km_retour IS NOT NULL
+        """,
+        (json.dumps(state["sorties_ouvertes"]),),
+    ).fetchone()[0]
+    return returned > 0
+
+
+def _upsert(conn, table, period_sql):
+    assignments = ", ".join(f"{m} = {m} + excluded.{m}" for m in _MEASURES)
+    sums = ", ".join(f"SUM({m})" for m in _MEASURES)
+    key = "jour" if table == "agregats_jour" else "mois"
+    conn.execute(f"""
+        INSERT INTO {table} ({key}, vehicule_id, {", ".join(_MEASURES)})
+        SELECT {period_sql} AS periode, vehicule_id, {sums}
+        FROM temp.agregats_delta
+        WHERE true
+        GROUP BY periode, vehicule_id
+        ON CONFLICT ({key}, vehicule_id) DO UPDATE SET {assignments}
+    """)
+
+
+def refresh_within(cur):
+    """
+    Aggregate the rows added since the last refresh inside the caller's
+    write transaction (init_db, and the services writing refuels,
+    maintenances and returns, before their commit). Not committed.
+    Returns {source table: (day, vehicle) groups added}.
+    """
+    state = _load_state(cur)
+    if not _has_pending(cur, state):
+        return {table: 0 for table in _DELTA_SQL}
+    max_ids = _max_ids(cur)
+
+    cur.execute(f"""
+        CREATE TEMP TABLE agregats_delta (
+            jour TEXT, vehicule_id INTEGER, {", ".join(f"{m} REAL" for m in _MEASURES)}
+        )
+    """)
+
+    counts = {}
+    for table, select in _DELTA_SQL.items():
+        params = [state["max_id"][table], max_ids[table]]
+        if table == "sorties_reservations":
+            params.append(json.dumps(state["sorties_ouvertes"]))
+        counts[table] = cur.execute(f"INSERT INTO temp.agregats_delta {select}", params).rowcount
+
+    open_trips = [
+        r[0] for r in cur.execute(
+            """
+            SELECT id FROM sorties_reservations
+            WHERE ((id > ? AND id <= ?) OR id IN (SELECT value FROM json_each(?)))
+                AND km_retour IS NULL
+            ORDER BY id
+            """,
+            (
+                state["max_id"]["sorties_reservations"],
+                max_ids["sorties_reservations"],
+                json.dumps(state["sorties_ouvertes"]),
+            ),
+        ).fetchall()
+    ]
+
+    _upsert(cur, "agregats_jour", "jour")
+    _upsert(cur, "agregats_mois", "substr(jour, 1, 7)")
+    cur.execute("DROP TABLE temp.agregats_delta")
+
+    cur.execute(
+        """
+        INSERT INTO app_state (cle, valeur) VALUES (?, ?)
+        ON CONFLICT (cle) DO UPDATE SET valeur = excluded.valeur
+        """,
+        (STATE_KEY, json.dumps({"max_id": max_ids, "sorties_ouvertes": open_trips})),
+    )
+    return counts
+
+
+def refresh_rollups(db_path="db/parc_auto.db"):
+    """
+    Aggregate the rows added since the last refresh (every row the
+    first time). Returns {source table: (day, vehicle) groups added}.
+    """
+    with get_connection(db_path) as conn:
+        # Nothing new: no write lock taken
+        if not _has_pending(conn, _load_state(conn)):
+            return {table: 0 for table in _DELTA_SQL}
+
+        # Checked again under the lock: another process may have
+        # refreshed in between
+        conn.execute("BEGIN IMMEDIATE")
+        counts = refresh_within(conn.cursor())
+        conn.commit()
+
+    return counts
+
+
+def rebuild_rollups(db_path="db/parc_auto.db"):
+    """
+    Recompute the aggregates from scratch (after rows were edited or
+    deleted outside the application).
+    """
+    with get_connection(db_path) as conn:
+        conn.execute("DELETE FROM agregats_jour")
+        conn.execute("DELETE FROM agregats_mois")
+        conn.execute("DELETE FROM app_state WHERE cle = ?", (STATE_KEY,))
+        conn.commit()
+    return refresh_rollups(db_path)
+
+
+# =========================================================
+# LECTURE
+# =========================================================
+
+def _month_end(day: date) -> date:
+    following = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return following - timedelta(days=1)
+
+
+def split_period(start_date=None, end_date=None):
+    """
+    Cut [start_date, end_date] (inclusive, None for no bound) into whole
+    months, read from agregats_mois, and the days of the partial months
+    at both ends, read from agregats_jour.
+    Returns ((first_month, last_month), [(first_day, last_day), ...]),
+    months as YYYY-MM (None for no bound), days as YYYY-MM-DD.
+    """
+    start = date.fromisoformat(start_date) if start_date else None
+    end = date.fromisoformat(end_date) if end_date else None
+    months = [None, None]
+    days = []
+
+    if start:
+        if start.day == 1:
+            months[0] = start.strftime("%Y-%m")
+        else:
+            last = _month_end(start)
+            days.append((start, min(last, end) if end else last))
+            months[0] = (last + timedelta(days=1)).strftime("%Y-%m")
+
+    if end:
+        if _month_end(end) == end:
+            months[1] = end.strftime("%Y-%m")
+        else:
+            first = end.replace(day=1)
+            months[1] = (first - timedelta(days=1)).strftime("%Y-%m")
+            # Start and end in the same partial month: already covered
+            if not days or days[0][1] < first:
+                days.append((max(first, start) if start else first, end))
+
+    return tuple(months), [(a.isoformat(), b.isoformat()) for a, b in days]
+
+
+def pending_rows_sql(conn):
+    """
+    Subquery (and its parameters) returning the source rows not
+    aggregated yet, in the agregats_jour layout (jour, vehicule_id,
+    measures). Read only.
+    """
+    state = _load_state(conn)
+    selects, params = [], []
+    for table, select in _DELTA_SQL.items():
+        selects.append(select)
+        params += [state["max_id"][table], _NO_LIMIT]
+        if table == "sorties_reservations":
+            params.append(json.dumps(state["sorties_ouvertes"]))
+
+    columns = ", ".join(("jour", "vehicule_id") + _MEASURES)
+    sql = f"""
+        WITH en_attente ({columns}) AS ({" UNION ALL ".join(selects)})
+        SELECT {columns} FROM en_attente
+    """
+    return sql, params
+
+
+def period_rows_sql(start_date=None, end_date=None, pending=None):
+    """
+    Subquery (and its parameters) returning the vehicule_id and measures
+    of the aggregate rows covering the period, plus the pending rows of
+    the period when `pending` (pending_rows_sql) is given.
+    """
+    (first_month, last_month), days = split_period(start_date, end_date)
+    columns = ", ".join(("vehicule_id",) + _MEASURES)
+    sql = f"""
+        SELECT {columns} FROM agregats_mois
+        WHERE (? IS NULL OR mois >= ?) AND (? IS NULL OR mois <= ?)
+    """
+    params = [first_month, first_month, last_month, last_month]
+    for first_day, last_day in days:
+        sql += f" UNION ALL SELECT {columns} FROM agregats_jour WHERE jour BETWEEN ? AND ?"
+        params += [first_day, last_day]
+    if pending:
+        sql += f"""
+            UNION ALL SELECT {columns} FROM ({pending[0]})
+            WHERE (? IS NULL OR jour >= ?) AND (? IS NULL OR jour <= ?)
+        """
+        params += pending[1] + [start_date, start_date, end_date, end_date]
+    return sql, params
+
+
+def months_back(months: int) -> str:
+    """
+    First month (YYYY-MM) of the last `months` calendar months,
+    the current one included.
+    """
+    today = date.today()
+    index = today.year * 12 + today.month - 1 - (months - 1)
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def get_evolution(
+    granularity="month",
+    group_by=None,
+    start_date=None,
+    end_date=None,
+    db_path="db/parc_auto.db",
+):
+    """
+    Costs and km per day or month, for the whole fleet or per
+    vehicle / service / vehicle type (group_by).
+    start_date / end_date: YYYY-MM-DD for days, YYYY-MM for months.
+    Returns [{"periode", "groupe", "cout_carburant", "cout_maintenance",
+    "cout_assurance", "cout_total", "km", "sorties"}].
+    """
+    if granularity not in ("day", "month"):
+        raise RollupError(f"Granularité inconnue : {granularity}")
+    if group_by not in GROUP_BY:
+        raise RollupError(f"Regroupement inconnu : {group_by}")
+
+    table, key = ("agregats_jour", "jour") if granularity == "day" else ("agregats_mois", "mois")
+    pending_key = "jour" if granularity == "day" else "substr(jour, 1, 7)"
+    group = GROUP_BY[group_by] or "NULL"
+    columns = ", ".join(("vehicule_id",) + _MEASURES)
+
+    with get_connection(db_path) as conn:
+        pending_sql, pending_params = pending_rows_sql(conn)
+        rows = conn.execute(f"""
+            SELECT
+                a.periode,
+                {group} AS groupe,
+                {", ".join(f"SUM(a.{m}) AS {m}" for m in _MEASURES)}
+            FROM (
+                SELECT {key} AS periode, {columns} FROM {table}
+                UNION ALL
+                SELECT {pending_key}, {columns} FROM ({pending_sql})
+            ) a
+            JOIN vehicules v ON v.id = a.vehicule_id
+            WHERE (? IS NULL OR a.periode >= ?) AND (? IS NULL OR a.periode <= ?)
+            GROUP BY a.periode, groupe
+            ORDER BY a.periode, groupe
+        """, pending_params + [start_date, start_date, end_date, end_date]).fetchall()
+
+    return [dict(r) for r in rows]
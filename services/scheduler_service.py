@@ -0,0 +1,363 @@
+import os
+import random
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from database import get_connection, init_db
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class SchedulerError(Exception):
+    pass
+
+
+# Headless periodic jobs (python cli.py scheduler).
+#
+# Jobs are registered with @job(name, interval_seconds). Their last run,
+# next run, status and duration are persisted in `scheduler_jobs`, so a
+# restarted scheduler resumes the schedule instead of running everything
+# again. Each next run is pushed back by a random jitter (a fraction of
+# the interval) so that jobs registered together do not keep firing in
+# the same second.
+#
+# Only one scheduler may run per database: it holds an OS lock (flock,
+# msvcrt.locking on Windows) on `<db>.scheduler.lock`. The lock goes away
+# with the process, so a crashed scheduler never blocks the next one and
+# no takeover is needed. While it runs, a daemon thread writes its pid
+# and a heartbeat time into the file every HEARTBEAT_SECONDS, long jobs
+# included (shown when a second scheduler is refused).
+
+DEFAULT_JITTER = 0.1
+HEARTBEAT_SECONDS = 60
+
+_JOBS = {}
+
+
+def job(name: str, interval: float, jitter: float = DEFAULT_JITTER):
+    """
+    Register a job. The decorated function receives the db_path.
+    """
+    def decorator(func):
+        _JOBS[name] = {"func": func, "interval": float(interval), "jitter": float(jitter)}
+        return func
+    return decorator
+
+
+def get_jobs():
+    """
+    Registered jobs: {name: {"func", "interval", "jitter"}}.
+    """
+    return dict(_JOBS)
+
+
+def set_interval(name: str, interval: float):
+    if name not in _JOBS:
+        raise SchedulerError(f"Tâche inconnue : {name}")
+    if interval <= 0:
+        raise SchedulerError("Intervalle invalide")
+    _JOBS[name]["interval"] = float(interval)
+
+
+# =========================================================
+# TÂCHES
+# =========================================================
+
+@job("alert_sweep", interval=3600)
+def _alert_sweep(db_path):
+    from services.alert_engine import sweep_alerts
+    from services.employee_service import sweep_expired_licences
+
+    # PARC_AUTO_SUSPEND_EXPIRED=1 suspends drivers with an expired licence
+    expired = sweep_expired_licences(
+        auto_suspend=os.environ.get("PARC_AUTO_SUSPEND_EXPIRED") == "1",
+        db_path=db_path,
+    )
+    escalated = sweep_alerts(db_path=db_path)
+    return {"permis_expires": len(expired), **escalated}
+
+
+@job("notifications", interval=900)
+def _notifications(db_path):
+    from services.notification_service import (
+        deliver_pending,
+        enqueue_alert_notifications,
+        transport_from_env,
+    )
+
+    queued = enqueue_alert_notifications(db_path)
+    return {"en_file": queued, **deliver_pending(transport_from_env(db_path), db_path)}
+
+
+@job("rollups", interval=600)
+def _rollups(db_path):
+    from services.rollup_service import refresh_rollups
+    return refresh_rollups(db_path)
+
+
+@job("snapshot", interval=900)
+def _snapshot(db_path):
+    from services.snapshot_service import create_snapshot
+    return create_snapshot(db_path)
+
+
+@job("backup", interval=24 * 3600)
+def _backup(db_path):
+    from services.backup_service import create_backup
+    return create_backup(db_path)
+
+
+@job("log_archival", interval=24 * 3600)
+def _log_archival(db_path):
+    from services.log_service import archive_logs
+    return {"archivees": archive_logs(db_path=db_path)}
+
+
+@job("analyze", interval=24 * 3600)
+def _analyze(db_path):
+    with get_connection(db_path) as conn:
+        conn.execute("ANALYZE")
+        conn.commit()
+
+
+@job("vacuum", interval=7 * 24 * 3600)
+def _vacuum(db_path):
+    with get_connection(db_path) as conn:
+        conn.execute("VACUUM")
+
+
+# =========================================================
+# VERROU (UNE INSTANCE PAR BASE)
+# =========================================================
+
+def lock_path(db_path) -> Path:
+    db_path = Path(db_path)
+    return db_path.with_name(db_path.name + ".scheduler.lock")
+
+
+class _Lock:
+    def __init__(self, path, file):
+        self.path = path
+        self.file = file
+        self.stop = threading.Event()
+        self.thread = None
+
+
+def _os_lock(f, locked=True):
+    """Lock / unlock the file; OSError when another process holds it."""
+    if fcntl:
+        fcntl.flock(f.fileno(), (fcntl.LOCK_EX | fcntl.LOCK_NB) if locked else fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK if locked else msvcrt.LK_UNLCK, 1)
+
+
+def _heartbeat(lock):
+    f = lock.file
+    f.seek(0)
+    f.truncate()
+    f.write(f"{os.getpid()} {datetime.now().isoformat(timespec='seconds')}\n")
+    f.flush()
+
+
+def _heartbeat_loop(lock, interval):
+    while not lock.stop.wait(interval):
+        _heartbeat(lock)
+
+
+def acquire_lock(db_path, heartbeat: float = HEARTBEAT_SECONDS) -> _Lock:
+    """
+    Lock the database for this scheduler or raise SchedulerError if
+    another one holds it. The heartbeat is refreshed by a daemon thread
+    until release_lock().
+    """
+    path = lock_path(db_path)
+    f = open(path, "a+", encoding="utf-8")
+    try:
+        _os_lock(f)
+    except OSError:
+        try:
+            f.seek(0)
+            owner = f.read().strip()
+        except OSError:  # Windows: locked byte not readable
+            owner = ""
+        f.close()
+        raise SchedulerError(f"Planificateur déjà actif ({path} {owner})".strip())
+
+    lock = _Lock(path, f)
+    _heartbeat(lock)
+    lock.thread = threading.Thread(
+        target=_heartbeat_loop, args=(lock, heartbeat), name="scheduler-heartbeat", daemon=True
+    )
+    lock.thread.start()
+    return lock
+
+
+def release_lock(lock):
+    # The file is kept: deleting it would let a contender lock the
+    # deleted file while another one creates a new one
+    lock.stop.set()
+    lock.thread.join()
+    try:
+        _os_lock(lock.file, locked=False)
+    finally:
+        lock.file.close()
+
+
+# =========================================================
+# ÉTAT PERSISTANT
+# =========================================================
+
+def _load_state(db_path):
+    with get_connection(db_path) as conn:
+        rows = conn.execute("SELECT * FROM scheduler_jobs").fetchall()
+    return {r["nom"]: dict(r) for r in rows}
+
+
+def _next_run(now, spec):
+    delay = spec["interval"] * (1 + random.uniform(0, spec["jitter"]))
+    return now + timedelta(seconds=delay)
+
+
+def _save_run(db_path, name, started, next_run, statut, erreur, duree_ms):
+    with get_connection(db_path) as conn:
+        conn.execute(
+            """
+            INSERT INTO scheduler_jobs (
+                nom, dernier_lancement, prochain_lancement,
+                dernier_statut, derniere_erreur, duree_ms
+            ) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (nom) DO UPDATE SET
+                dernier_lancement = excluded.dernier_lancement,
+                prochain_lancement = excluded.prochain_lancement,
+                dernier_statut = excluded.dernier_statut,
+                derniere_erreur = excluded.derniere_erreur,
+                duree_ms = excluded.duree_ms
+            """,
+            (
+                name,
+                started.isoformat(timespec="seconds"),
+                next_run.isoformat(timespec="seconds"),
+                statut,
+                erreur,
+                round(duree_ms, 1),
+            ),
+        )
+        conn.commit()
+
+
+def get_job_states(db_path="db/parc_auto.db"):
+    """
+    Persisted state of every registered job (None fields when never run).
+    """
+    state = _load_state(db_path)
+    return [
+        {
+            "nom": name,
+            "intervalle_s": spec["interval"],
+            "dernier_lancement": state.get(name, {}).get("dernier_lancement"),
+            "prochain_lancement": state.get(name, {}).get("prochain_lancement"),
+            "dernier_statut": state.get(name, {}).get("dernier_statut"),
+            "derniere_erreur": state.get(name, {}).get("derniere_erreur"),
+            "duree_ms": state.get(name, {}).get("duree_ms"),
+        }
+        for name, spec in sorted(_JOBS.items())
+    ]
+
+
+# =========================================================
+# EXÉCUTION
+# =========================================================
+
+def run_job(name: str, db_path="db/parc_auto.db", now: datetime | None = None):
+    """
+    Run one job now and persist its outcome. Exceptions are recorded,
+    not raised, so that one failing job does not stop the others.
+    Returns (statut, result_or_error).
+    """
+    if name not in _JOBS:
+        raise SchedulerError(f"Tâche inconnue : {name}")
+    spec = _JOBS[name]
+
+    started = now or datetime.now()
+    t0 = time.perf_counter()
+    try:
+        result = spec["func"](db_path)
+        statut, erreur = "ok", None
+    except Exception as e:
+        result = e
+        statut, erreur = "erreur", "".join(traceback.format_exception_only(type(e), e)).strip()
+    duree_ms = (time.perf_counter() - t0) * 1000
+
+    _save_run(db_path, name, started, _next_run(started, spec), statut, erreur, duree_ms)
+    return statut, result
+
+
+def due_jobs(db_path="db/parc_auto.db", now: datetime | None = None, only=None):
+    """
+    Names of the jobs whose next run is due (never-run jobs are due).
+    """
+    now = now or datetime.now()
+    state = _load_state(db_path)
+    due = []
+
+    for name in sorted(_JOBS):
+        if only and name not in only:
+            continue
+        next_run = state.get(name, {}).get("prochain_lancement")
+        if next_run is None or datetime.fromisoformat(next_run) <= now:
+            due.append(name)
+
+    return due
+
+
+def run_pending(db_path="db/parc_auto.db", now: datetime | None = None, only=None, log=None):
+    """
+    Run every due job once. Returns {name: statut}.
+    """
+    results = {}
+    for name in due_jobs(db_path, now, only):
+        statut, result = run_job(name, db_path)
+        results[name] = statut
+        if log:
+            log(f"{datetime.now().isoformat(timespec='seconds')} {name}: {statut} {result if result is not None else ''}")
+    return results
+
+
+def _seconds_until_next(db_path, only):
+    state = _load_state(db_path)
+    now = datetime.now()
+    delays = [
+        (datetime.fromisoformat(s["prochain_lancement"]) - now).total_seconds()
+        for name, s in state.items()
+        if name in _JOBS and (not only or name in only) and s["prochain_lancement"]
+    ]
+    return max(0.0, min(delays)) if delays else 0.0
+
+
+def run_forever(db_path="db/parc_auto.db", only=None, stop_event: threading.Event | None = None, log=print):
+    """
+    Scheduler loop: holds the lock, runs due jobs, sleeps until the next
+    one (waking up at least every HEARTBEAT_SECONDS).
+    Stops when stop_event is set or on KeyboardInterrupt.
+    """
+    stop_event = stop_event or threading.Event()
+    init_db(db_path)
+    lock = acquire_lock(db_path)
+
+    try:
+        while not stop_event.is_set():
+            run_pending(db_path, only=only, log=log)
+            delay = min(_seconds_until_next(db_path, only), HEARTBEAT_SECONDS)
+            stop_event.wait(max(delay, 1.0))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        release_lock(lock)
@@ -0,0 +1,175 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+
+from database import get_connection
+
+
+class SessionError(Exception):
+    pass
+
+
+SESSION_TTL_SECONDS = 8 * 3600
+USER_CACHE_TTL_SECONDS = 300
+
+# Signing key for session tokens, regenerated at each process start:
+# tokens never outlive the application.
+_SECRET = os.urandom(32)
+
+_lock = threading.Lock()
+
+# (db_path, user_id) -> (expires_at, user dict)
+_user_cache: dict[tuple[str, int], tuple[float, dict]] = {}
+
+# (db_path, user_id) -> tokens issued up to this time (µs) are rejected
+_revoked_before: dict[tuple[str, int], int] = {}
+
+# nonces of explicitly closed sessions
+_closed_sessions: set[str] = set()
+
+
+def _now_us() -> int:
+    return time.time_ns() // 1000
+
+
+def _sign(payload: str) -> str:
+    return hmac.new(_SECRET, payload.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def _cache_key(user_id: int, db_path) -> tuple[str, int]:
+    return str(db_path), int(user_id)
+
+
+def _load_user(user_id: int, db_path) -> dict | None:
+    with get_connection(db_path) as conn:
+        row = conn.execute(
+            """
+            SELECT id, username, role, nom, prenom, email, actif
+            FROM users
+            WHERE id = ?
+            """,
+            (user_id,),
+        ).fetchone()
+
+    if row is None or not row["actif"]:
+        return None
+
+    return {
+        "id": row["id"],
+        "username": row["username"],
+        "role": row["role"],
+        "nom": row["nom"],
+        "prenom": row["prenom"],
+        "email": row["email"],
+    }
+
+
+def _cache_user(user: dict, db_path):
+    with _lock:
+        _user_cache[_cache_key(user["id"], db_path)] = (
+            time.monotonic() + USER_CACHE_TTL_SECONDS,
+            dict(user),
+        )
+
+
+# =========================================================
+# SESSIONS
+# =========================================================
+
+def create_session(user: dict, db_path="db/parc_auto.db") -> str:
+    """
+    Open a session for an authenticated user (see auth.authenticate_user).
+    Returns a signed token: user_id.issued_at.nonce.signature
+    """
+    payload = f"{user['id']}.{_now_us()}.{os.urandom(8).hex()}"
+
+    _cache_user(user, db_path)
+
+    return f"{payload}.{_sign(payload)}"
+
+
+def end_session(token: str):
+    """
+    Close a session (logout). Unknown or malformed tokens are ignored.
+    """
+    parts = token.split(".") if token else []
+    if len(parts) == 4:
+        with _lock:
+            _closed_sessions.add(parts[2])
+
+
+def get_session_user(token: str, db_path="db/parc_auto.db") -> dict:
+    """
+    Return the user attached to a session token.
+    Served from memory; the users table is only read when the
+    cached entry has expired or was invalidated.
+    Raises SessionError if the token is invalid, expired or revoked.
+    """
+    try:
+        payload, signature = token.rsplit(".", 1)
+        user_id_str, issued_str, nonce = payload.split(".")
+        user_id = int(user_id_str)
+        issued_at = int(issued_str)
+    except (AttributeError, ValueError):
+        raise SessionError("Session invalide")
+
+    if not hmac.compare_digest(signature, _sign(payload)):
+        raise SessionError("Session invalide")
+
+    if _now_us() - issued_at > SESSION_TTL_SECONDS * 1_000_000:
+        raise SessionError("Session expirée")
+
+    key = _cache_key(user_id, db_path)
+
+    with _lock:
+        if nonce in _closed_sessions:
+            raise SessionError("Session fermée")
+        if issued_at <= _revoked_before.get(key, 0):
+            raise SessionError("Session révoquée")
+        cached = _user_cache.get(key)
+
+    if cached is not None and cached[0] > time.monotonic():
+        return dict(cached[1])
+
+    user = _load_user(user_id, db_path)
+    if user is None:
+        invalidate_user(user_id, db_path)
+        raise SessionError("Compte utilisateur inactif ou supprimé")
+
+    _cache_user(user, db_path)
+    return dict(user)
+
+
+def require_role(token: str, *roles: str, db_path="db/parc_auto.db") -> dict:
+    """
+    Authorisation check for service functions.
+    Returns the session user if their role is one of `roles`.
+    """
+    user = get_session_user(token, db_path)
+
+    if roles and user["role"] not in roles:
+        raise SessionError("Accès refusé")
+
+    return user
+
+
+def invalidate_user(user_id: int, db_path="db/parc_auto.db"):
+    """
+    Drop cached data for a user and revoke their open sessions.
+    Must be called whenever a user is deactivated or their role changes.
+    """
+    key = _cache_key(user_id, db_path)
+
+    with _lock:
+        _user_cache.pop(key, None)
+        _revoked_before[key] = _now_us()
+
+
+def clear_session_cache():
+    """
+    Forget every cached user (sessions stay valid, data is reloaded).
+    """
+    with _lock:
+        _user_cache.clear()
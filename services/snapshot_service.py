@@ -0,0 +1,198 @@
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+from database import get_connection
+
+
+class SnapshotError(Exception):
+    pass
+
+
+# Reporting replica (db/parc_auto_rapports.db by default).
+#
+# Heavy statistics read a copy of the database so that their read locks
+# never delay the check-outs / returns written to parc_auto.db. The copy
+# is made with the SQLite online backup API, a few hundred pages per
+# step: the source is only locked during a step and the pause between
+# steps lets writers commit. A write from another connection makes
+# SQLite restart the copy: it is started again with larger steps, and
+# after max_restarts restarts in one step (one read lock for the whole
+# copy). online_copy() is shared with backup_service.
+#
+# The copy is written next to the replica then renamed over it, so that
+# readers never see a half-copied file. The rollups (rollup_service) are
+# brought up to date in the copy, and the signature of the source (file
+# change counter, size, mtime) is kept in its app_state: a snapshot of an
+# unchanged database copies nothing.
+#
+# Readers pass the replica as db_path (dashboard_service, report_service)
+# or call reporting_db(), which returns it when PARC_AUTO_REPORT_SNAPSHOT=1.
+
+STATE_KEY = "snapshot"
+
+DEFAULT_PAGES = 256  # 1 MiB per step with 4 KiB pages
+DEFAULT_PAUSE = 0.005
+DEFAULT_MAX_RESTARTS = 5
+
+
+class _Restarted(Exception):
+    pass
+
+
+def replica_path(db_path="db/parc_auto.db") -> Path:
+    """Default replica of db_path: <name>_rapports.db in the same folder."""
+    path = Path(db_path)
+    return path.with_name(f"{path.stem}_rapports{path.suffix}")
+
+
+def source_signature(db_path) -> list:
+    """
+    File change counter (header bytes 24-27, bumped by every commit),
+    size and mtime of the database and of its WAL file if any.
+    """
+    path = Path(db_path)
+    with open(path, "rb") as f:
+        counter = int.from_bytes(f.read(100)[24:28], "big")
+    signature = [counter, path.stat().st_size, path.stat().st_mtime_ns]
+    wal = path.with_name(path.name + "-wal")
+    if wal.exists():
+        signature += [wal.stat().st_size, wal.stat().st_mtime_ns]
+    return signature
+
+
+def get_snapshot_info(replica):
+    """Snapshot state kept in the replica, None when there is no replica."""
+    if not Path(replica).exists():
+        return None
+    with get_connection(replica) as conn:
+        row = conn.execute(
+            "SELECT valeur FROM app_state WHERE cle = ?", (STATE_KEY,)
+        ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def online_copy(
+    db_path,
+    target,
+    pages=DEFAULT_PAGES,
+    pause=DEFAULT_PAUSE,
+    max_restarts=DEFAULT_MAX_RESTARTS,
+    progress=None,
+):
+    """
+    Copy the database db_path into the file `target` (overwritten) with
+    the backup API, `pages` pages per step and `pause` seconds between
+    steps. A copy restarted by SQLite is started again with 4 times more
+    pages per step, in one step after max_restarts restarts.
+    Returns (steps, restarts).
+    """
+    counters = {"steps": 0, "restarts": 0}
+
+    def on_step(status, remaining, total):
+        counters["steps"] += 1
+        # No fewer pages left than after the previous step: copy restarted
+        if last["remaining"] is not None and remaining >= last["remaining"]:
+            raise _Restarted()
+        last["remaining"] = remaining
+        if progress:
+            progress(total - remaining, total)
+        if remaining and pause:
+            # No lock held between steps: writers go through
+            time.sleep(pause)
+
+    with closing(sqlite3.connect(db_path)) as source, closing(sqlite3.connect(target)) as copy:
+        while True:
+            last = {"remaining": None}
+            try:
+                source.backup(copy, pages=pages, progress=on_step)
+                return counters["steps"], counters["restarts"]
+            except _Restarted:
+                counters["restarts"] += 1
+                pages = -1 if counters["restarts"] >= max_restarts else pages * 4
+
+
+def create_snapshot(
+    db_path="db/parc_auto.db",
+    replica=None,
+    pages=DEFAULT_PAGES,
+    pause=DEFAULT_PAUSE,
+    max_restarts=DEFAULT_MAX_RESTARTS,
+    force=False,
+    progress=None,
+):
+    """
+    Copy db_path to the replica unless it is unchanged since the last
+    snapshot (force: copy anyway). progress(pages copied, total pages)
+    is called after every step.
+    Returns {"replique", "copie", "pages", "etapes", "redemarrages", "secondes"}.
+    """
+    from services.rollup_service import refresh_rollups
+
+    if not Path(db_path).exists():
+        raise SnapshotError(f"Base introuvable : {db_path}")
+    replica = Path(replica or replica_path(db_path))
+    if replica.resolve() == Path(db_path).resolve():
+        raise SnapshotError("La réplique doit être un autre fichier que la base")
+
+    signature = source_signature(db_path)
+    info = get_snapshot_info(replica)
+    if not force and info and info.get("signature") == signature:
+        return {"replique": str(replica), "copie": False, "pages": 0,
+                "etapes": 0, "redemarrages": 0, "secondes": 0.0}
+
+    t0 = time.perf_counter()
+    replica.parent.mkdir(parents=True, exist_ok=True)
+    tmp = replica.with_name(replica.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+
+    steps, restarts = online_copy(db_path, tmp, pages, pause, max_restarts, progress)
+
+    # Aggregates completed in the copy: readers of the replica have
+    # nothing left to write
+    refresh_rollups(tmp)
+    with get_connection(tmp) as conn:
+        conn.execute(
+            """
+            INSERT INTO app_state (cle, valeur) VALUES (?, ?)
+            ON CONFLICT (cle) DO UPDATE SET valeur = excluded.valeur
+            """,
+            (STATE_KEY, json.dumps({
+                "source": str(db_path),
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "signature": signature,
+            })),
+        )
+        total_pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        conn.commit()
+
+    try:
+        os.replace(tmp, replica)
+    except PermissionError as e:
+        # Windows: the replica is open in a reader
+        tmp.unlink(missing_ok=True)
+        raise SnapshotError(f"Réplique en cours d'utilisation : {replica}") from e
+
+    return {
+        "replique": str(replica),
+        "copie": True,
+        "pages": total_pages,
+        "etapes": steps,
+        "redemarrages": restarts,
+        "secondes": round(time.perf_counter() - t0, 3),
+    }
+
+
+def reporting_db(db_path="db/parc_auto.db"):
+    """
+    Database the statistics should read: the replica when
+    PARC_AUTO_REPORT_SNAPSHOT=1 and it exists, db_path otherwise.
+    """
+    if os.environ.get("PARC_AUTO_REPORT_SNAPSHOT") != "1":
+        return db_path
+    replica = Path(os.environ.get("PARC_AUTO_REPORT_DB") or replica_path(db_path))
+    return replica if replica.exists() else db_path
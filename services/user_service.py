@@ -1,4 +1,10 @@
+import csv
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
 from database import get_connection
+from services.session_service import invalidate_user
 from utils.hashing import hash_password
 
 
@@ -49,3 +55,153 @@ def create_user(
             conn.commit()
     except Exception as e:
         raise UserCreationError(str(e))
+
+
+def set_user_active(
+    user_id: int,
+    actif: bool,
+    db_path="db/parc_auto.db",
+):
+    """
+    Activate or deactivate a user account.
+    Deactivation immediately revokes the user's open sessions.
+    """
+    with get_connection(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "UPDATE users SET actif = ? WHERE id = ?",
+            (1 if actif else 0, user_id),
+        )
+        if cur.rowcount == 0:
+            raise UserCreationError("Utilisateur introuvable")
+        conn.commit()
+
+    invalidate_user(user_id, db_path)
+
+
+# =========================================================
+# CRÉATION EN MASSE (IMPORT CSV)
+# =========================================================
+
+USER_CSV_COLUMNS = ("username", "password", "role", "nom", "prenom", "email", "actif")
+
+
+def _validate_user_row(row: dict) -> str | None:
+    """
+    Return an error message for an invalid row, None otherwise.
+    """
+    if not row.get("username") or not row.get("password"):
+        return "Username and password required"
+
+    if row.get("role") not in VALID_ROLES:
+        return f"Invalid role: {row.get('role')}"
+
+    if not row.get("nom") or not row.get("prenom"):
+        return "Nom et prénom requis"
+
+    return None
+
+
+def _hash_passwords(passwords: list[str], max_workers: int | None):
+    """
+    Hash passwords across a process pool (PBKDF2 is CPU bound).
+    Small batches are hashed inline to avoid the pool start-up cost.
+    """
+    if max_workers == 1 or len(passwords) < 8:
+        return [hash_password(p) for p in passwords]
+
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(passwords) // (workers * 4))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(hash_password, passwords, chunksize=chunksize))
+
+
+def bulk_create_users(
+    rows: list[dict],
+    max_workers: int | None = None,
+    db_path="db/parc_auto.db",
+):
+    """
+    Create many users in a single transaction.
+    Rows use the USER_CSV_COLUMNS keys. Invalid rows are skipped.
+    Returns (created_count, errors) where errors is a list of
+    (row_index, message) tuples.
+    """
+    errors = []
+    valid = []
+    seen = set()
+
+    for index, row in enumerate(rows):
+        message = _validate_user_row(row)
+        if message is None and row["username"] in seen:
+            message = f"Duplicate username in batch: {row['username']}"
+        if message is not None:
+            errors.append((index, message))
+            continue
+        seen.add(row["username"])
+        valid.append((index, row))
+
+    hashes = _hash_passwords([row["password"] for _, row in valid], max_workers)
+
+    created = 0
+    with get_connection(db_path) as conn:
+        cur = conn.cursor()
+        for (index, row), password_hash in zip(valid, hashes):
+            try:
+                cur.execute(
+                    """
+                    INSERT INTO users (
+                        username, password_hash, role,
+                        nom, prenom, email, actif
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        row["username"],
+                        password_hash,
+                        row["role"],
+                        row["nom"],
+                        row["prenom"],
+                        row.get("email") or None,
+                        1 if row.get("actif") in (None, "") else int(row["actif"]),
+                    ),
+                )
+            except (sqlite3.IntegrityError, ValueError) as e:
+                errors.append((index, str(e)))
+                continue
+            created += 1
+        conn.commit()
+
+    errors.sort()
+    return created, errors
+
+
+def import_users_from_csv(
+    csv_path,
+    delimiter: str = ";",
+    max_workers: int | None = None,
+    db_path="db/parc_auto.db",
+):
+    """
+    Import users from a CSV file with a header row
+    (see USER_CSV_COLUMNS; email and actif are optional).
+    Returns (created_count, errors) with errors as (line_number, message).
+    """
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f, delimiter=delimiter)
+        missing = {"username", "password", "role", "nom", "prenom"} - set(
+            reader.fieldnames or ()
+        )
+        if missing:
+            raise UserCreationError(
+                f"Colonnes manquantes : {', '.join(sorted(missing))}"
+            )
+        rows = [
+            {k: (v or "").strip() for k, v in row.items() if k}
+            for row in reader
+        ]
+
+    created, errors = bulk_create_users(rows, max_workers=max_workers, db_path=db_path)
+
+    # Line 1 is the header
+    return created, [(index + 2, message) for index, message in errors]
@@ -1,4 +1,6 @@
 from database import get_connection
+from services import alert_engine
+from utils.stats_cache import invalidate_tables
 
 
 class VehicleError(Exception):
@@ -47,7 +49,8 @@ def create_vehicle(
 
     try:
         with get_connection(db_path) as conn:
-            conn.execute(
+            cur = conn.cursor()
+            cur.execute(
                 """
                 INSERT INTO vehicules (
                     immatriculation, marque, modele, type_vehicule,
@@ -74,10 +77,14 @@ def create_vehicle(
                     seuil_revision_km,
                 ),
             )
+            # Vehicle already past its revision threshold
+            alert_engine.on_vehicle_odometer(cur, cur.lastrowid)
             conn.commit()
     except Exception as e:
         raise VehicleError(str(e))
 
+    invalidate_tables("vehicules", db_path=db_path)
+
 
 def update_vehicle_status(
     vehicule_id: int,
@@ -99,8 +106,11 @@ def update_vehicle_status(
         )
         if cur.rowcount == 0:
             raise VehicleError("Véhicule introuvable")
+        alert_engine.on_vehicle_odometer(cur, vehicule_id)
         conn.commit()
 
+    invalidate_tables("vehicules", db_path=db_path)
+
 
 def get_vehicles(
     statut: str | None = None,
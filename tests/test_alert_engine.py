@@ -0,0 +1,240 @@
+import unittest
+from pathlib import Path
+import uuid
+import gc
+from datetime import date, timedelta
+
+from database import init_db, get_connection
+from services.document_service import add_document
+from services.maintenance_service import record_maintenance
+from services.employee_service import create_employee
+from services.fuel_service import record_fuel
+from services.alert_engine import (
+    sweep_alerts,
+    rebuild_alerts,
+    ensure_alert_store,
+    get_open_alerts,
+    acknowledge_alert,
+    AlertError,
+)
+
+
+def _d(days):
+    return (date.today() + timedelta(days=days)).isoformat()
+
+
+class TestAlertEngine(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = Path("tests/_tmp")
+        cls.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def setUp(self):
+        self.db_path = self.tmp_dir / f"alertengine_{uuid.uuid4().hex}.db"
+        init_db(self.db_path)
+
+        with get_connection(self.db_path) as conn:
+            conn.execute(
+                """
+                INSERT INTO vehicules (
+                    immatriculation, marque, modele,
+                    type_vehicule, type_affectation, statut
+                ) VALUES ('AE-001', 'Renault', 'Clio', 'voiture', 'mutualise', 'disponible')
+                """
+            )
+            conn.commit()
+            self.vehicule_id = conn.execute("SELECT id FROM vehicules").fetchone()["id"]
+
+        # Build the (empty) store so that hooks are the only writers
+        sweep_alerts(db_path=self.db_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        gc.collect()
+        for f in cls.tmp_dir.glob("alertengine_*.db"):
+            try:
+                f.unlink()
+            except PermissionError:
+                pass
+
+    def _statuts(self):
+        with get_connection(self.db_path) as conn:
+            return {
+                (r["source_type"], r["source_id"]): r["statut"]
+                for r in conn.execute("SELECT source_type, source_id, statut FROM alertes")
+            }
+
+    def test_document_write_creates_alert(self):
+        add_document(self.vehicule_id, "Assurance", "a.pdf", date_echeance=_d(10), db_path=self.db_path)
+        add_document(self.vehicule_id, "Vignette", "v.pdf", date_echeance=_d(200), db_path=self.db_path)
+
+        alerts = get_open_alerts(db_path=self.db_path)
+
+        self.assertEqual([a["libelle"] for a in alerts], ["Assurance"])
+        self.assertEqual(alerts[0]["statut"], "proche")
+        self.assertEqual(alerts[0]["vehicule"], "AE-001")
+
+    def test_renewed_document_resolves_previous(self):
+        add_document(self.vehicule_id, "Assurance", "a.pdf", date_echeance=_d(-3), db_path=self.db_path)
+        self.assertEqual(get_open_alerts(db_path=self.db_path)[0]["statut"], "retard")
+
+        add_document(self.vehicule_id, "Assurance", "b.pdf", date_echeance=_d(362), db_path=self.db_path)
+
+        self.assertEqual(get_open_alerts(db_path=self.db_path), [])
+        self.assertEqual(sorted(self._statuts().values()), ["a_venir", "resolue"])
+
+    def test_newer_maintenance_resolves_previous(self):
+        record_maintenance(self.vehicule_id, _d(-300), "Vidange", date_prochaine_echeance=_d(5), db_path=self.db_path)
+        record_maintenance(self.vehicule_id, _d(-1), "Vidange", date_prochaine_echeance=_d(365), db_path=self.db_path)
+
+        self.assertEqual(get_open_alerts(db_path=self.db_path), [])
+
+    def test_sweep_escalates_with_time(self):
+        add_document(self.vehicule_id, "Assurance", "a.pdf", date_echeance=_d(40), db_path=self.db_path)
+        self.assertEqual(get_open_alerts(db_path=self.db_path), [])
+
+        counts = sweep_alerts(today=date.today() + timedelta(days=15), db_path=self.db_path)
+        self.assertEqual(counts, {"proche": 1, "retard": 0})
+
+        counts = sweep_alerts(today=date.today() + timedelta(days=41), db_path=self.db_path)
+        self.assertEqual(counts, {"proche": 0, "retard": 1})
+
+    def test_acknowledge_cleared_on_escalation(self):
+        add_document(self.vehicule_id, "Assurance", "a.pdf", date_echeance=_d(5), db_path=self.db_path)
+        alert_id = get_open_alerts(db_path=self.db_path)[0]["id"]
+
+        acknowledge_alert(alert_id, db_path=self.db_path)
+        self.assertEqual(get_open_alerts(include_acknowledged=False, db_path=self.db_path), [])
+
+        sweep_alerts(today=date.today() + timedelta(days=6), db_path=self.db_path)
+        self.assertEqual(len(get_open_alerts(include_acknowledged=False, db_path=self.db_path)), 1)
+
+    def test_acknowledge_unknown_alert(self):
+        with self.assertRaises(AlertError):
+            acknowledge_alert(12345, db_path=self.db_path)
+
+    def test_permis_alert(self):
+        create_employee(
+            "EMP1", "Doe", "John",
+            num_permis="P1", date_validite_permis=_d(20), autorise_conduire=1,
+            db_path=self.db_path,
+        )
+
+        alerts = get_open_alerts(db_path=self.db_path)
+        self.assertEqual(alerts[0]["type"], "Permis")
+        self.assertEqual(alerts[0]["vehicule"], "Doe John")
+
+    def test_odometer_reading_raises_revision_alert(self):
+        create_employee("Doe", "John", "Driver", db_path=self.db_path)
+        with get_connection(self.db_path) as conn:
+            conn.execute(
+                "UPDATE vehicules SET kilometrage_actuel = 5000, seuil_revision_km = 15000"
+            )
+            conn.commit()
+
+        record_maintenance(self.vehicule_id, _d(-60), "Révision", kilometrage=5000, db_path=self.db_path)
+        self.assertNotIn(("revision_km", self.vehicule_id), self._statuts())
+
+        record_fuel(self.vehicule_id, 1, _d(0), 40, 70, kilometrage=19500, db_path=self.db_path)
+        self.assertEqual(self._statuts()[("revision_km", self.vehicule_id)], "proche")
+        # No trip to project a date from: none stored, and the days passing
+        # do not make it overdue before the threshold is reached
+        self.assertIsNone(get_open_alerts(db_path=self.db_path)[0]["date_echeance"])
+        sweep_alerts(today=date.today() + timedelta(days=2), db_path=self.db_path)
+        self.assertEqual(self._statuts()[("revision_km", self.vehicule_id)], "proche")
+
+        record_fuel(self.vehicule_id, 1, _d(0), 40, 70, kilometrage=20100, db_path=self.db_path)
+        self.assertEqual(self._statuts()[("revision_km", self.vehicule_id)], "retard")
+
+        # The revision itself resets the counter
+        record_maintenance(self.vehicule_id, _d(0), "Révision", kilometrage=20100, db_path=self.db_path)
+        self.assertEqual(self._statuts()[("revision_km", self.vehicule_id)], "resolue")
+
+    def test_non_revision_maintenance_keeps_counter(self):
+        create_employee("Doe", "John", "Driver", db_path=self.db_path)
+        with get_connection(self.db_path) as conn:
+            conn.execute("UPDATE vehicules SET kilometrage_actuel = 5000, seuil_revision_km = 15000")
+            conn.commit()
+        record_maintenance(self.vehicule_id, _d(-60), "Révision", kilometrage=5000, db_path=self.db_path)
+
+        record_fuel(self.vehicule_id, 1, _d(0), 40, 70, kilometrage=20100, db_path=self.db_path)
+        self.assertEqual(self._statuts()[("revision_km", self.vehicule_id)], "retard")
+
+        # Insurance renewal recorded with the odometer reading: still due
+        record_maintenance(self.vehicule_id, _d(0), "Assurance annuelle", kilometrage=20100, db_path=self.db_path)
+        self.assertEqual(self._statuts()[("revision_km", self.vehicule_id)], "retard")
+        rebuild_alerts(db_path=self.db_path)
+        self.assertEqual(self._statuts()[("revision_km", self.vehicule_id)], "retard")
+
+    def test_store_created_with_mandatory_date_migrated(self):
+        with get_connection(self.db_path) as conn:
+            conn.execute(
+                """
+                INSERT INTO alertes (source_type, source_id, vehicule_id, libelle,
+                                     date_echeance, statut, date_creation, date_maj)
+                VALUES ('document', 1, 1, 'Assurance', '2026-01-01', 'retard', 'x', 'x')
+                """
+            )
+            conn.execute(
+                """
+                INSERT INTO notifications (destinataire, alerte_id, cle_dedup, statut,
+                                           tentatives, prochain_essai, date_creation)
+                VALUES ('a@b.fr', 1, 'k', 'envoyee', 1, 'x', 'x')
+                """
+            )
+            # Schema of the first alert store
+            conn.execute("PRAGMA writable_schema = ON")
+            conn.execute(
+                "UPDATE sqlite_master SET sql = replace(sql, 'date_echeance TEXT,', 'date_echeance TEXT NOT NULL,') "
+                "WHERE name = 'alertes'"
+            )
+            conn.commit()
+        with get_connection(self.db_path) as conn:
+            columns = {r["name"]: r["notnull"] for r in conn.execute("PRAGMA table_info(alertes)")}
+            self.assertEqual(columns["date_echeance"], 1)
+
+        init_db(self.db_path)
+
+        with get_connection(self.db_path) as conn:
+            columns = {r["name"]: r["notnull"] for r in conn.execute("PRAGMA table_info(alertes)")}
+            self.assertEqual(columns["date_echeance"], 0)
+            self.assertEqual(conn.execute("PRAGMA foreign_key_check").fetchall(), [])
+            self.assertEqual(conn.execute("PRAGMA integrity_check").fetchone()[0], "ok")
+        self.assertEqual(self._statuts(), {("document", 1): "retard"})
+
+    def test_ensure_store_builds_once(self):
+        def raw_document(fichier):
+            # Written without the service hooks (seeded database)
+            with get_connection(self.db_path) as conn:
+                conn.execute(
+                    """
+                    INSERT INTO documents (vehicule_id, type_document, chemin_fichier, date_echeance)
+                    VALUES (?, 'Assurance', ?, ?)
+                    """,
+                    (self.vehicule_id, fichier, _d(-3)),
+                )
+                conn.commit()
+
+        with get_connection(self.db_path) as conn:
+            conn.execute("DELETE FROM app_state WHERE cle = 'alertes_initialisees'")
+            conn.commit()
+        raw_document("a.pdf")
+
+        self.assertTrue(ensure_alert_store(db_path=self.db_path))
+        self.assertEqual(list(self._statuts().values()), ["retard"])
+
+        # Store present: read only
+        raw_document("b.pdf")
+        self.assertFalse(ensure_alert_store(db_path=self.db_path))
+        self.assertEqual(len(self._statuts()), 1)
+
+    def test_rebuild_matches_incremental(self):
+        add_document(self.vehicule_id, "Assurance", "a.pdf", date_echeance=_d(-3), db_path=self.db_path)
+        add_document(self.vehicule_id, "Assurance", "b.pdf", date_echeance=_d(20), db_path=self.db_path)
+        record_maintenance(self.vehicule_id, _d(-30), "Vidange", date_prochaine_echeance=_d(-1), db_path=self.db_path)
+
+        incremental = self._statuts()
+        rebuild_alerts(db_path=self.db_path)
+
+        self.assertEqual(self._statuts(), incremental)
@@ -9,6 +9,7 @@ from services.alert_service import (
     get_document_alerts,
     get_maintenance_alerts,
     get_revision_km_alerts,
+    get_all_alerts,
 )
 
 
@@ -57,14 +58,15 @@ class TestAlertService(unittest.TestCase):
             conn.execute(
                 """
                 INSERT INTO maintenances (
-                    vehicule_id, date, type_intervention,
+                    vehicule_id, date, type_intervention, categorie,
                     date_prochaine_echeance
-                ) VALUES (?, ?, ?, ?)
+                ) VALUES (?, ?, ?, ?, ?)
                 """,
                 (
                     vehicule_id,
                     "2026-01-01",
                     "Vidange",
+                    "maintenance",
                     date.today().isoformat(),
                 ),
             )
@@ -85,5 +87,53 @@ class TestAlertService(unittest.TestCase):
         self.assertEqual(len(alerts), 1)
 
     def test_maintenance_alerts(self):
-        alerts = get_maintenance_alerts(self.db_path)
+        alerts = get_maintenance_alerts(db_path=self.db_path)
+        self.assertEqual(len(alerts), 1)
+
+    def test_all_alerts_merged_and_sorted(self):
+        alerts = get_all_alerts(30, self.db_path)
+
+        self.assertEqual([a["type"] for a in alerts], ["Maintenance", "Document"])
+        self.assertEqual([a["statut"] for a in alerts], ["proche", "proche"])
+
+    def test_window_excludes_far_deadlines(self):
+        self.assertEqual(get_document_alerts(2, self.db_path), [])
+
+    def test_revision_km_overdue(self):
+        # No maintenance with a km reading: due at 0 + 10 000 km
+        alerts = get_revision_km_alerts(db_path=self.db_path)
+
         self.assertEqual(len(alerts), 1)
+        self.assertEqual(alerts[0]["statut"], "retard")
+        self.assertEqual(alerts[0]["km_restants"], -2000)
+
+    def test_revision_km_projected_from_mileage(self):
+        with get_connection(self.db_path) as conn:
+            conn.execute(
+                "UPDATE maintenances SET kilometrage = 11000"
+            )
+            conn.execute(
+                "INSERT INTO employes (matricule, nom, prenom) VALUES ('E1', 'Doe', 'John')"
+            )
+            # 900 km driven over the last 90 days -> 10 km / day
+            conn.execute(
+                """
+                INSERT INTO sorties_reservations (
+                    vehicule_id, employe_id, date_sortie_prevue, date_retour_prevue,
+                    km_depart, km_retour, date_retour_reelle, statut
+                ) VALUES (1, 1, ?, ?, 11100, 12000, ?, 'terminée')
+                """,
+                ((date.today() - timedelta(days=10)).isoformat(),) * 3,
+            )
+            conn.commit()
+
+        # 9 000 km left: outside the km margin, 900 days away
+        self.assertEqual(get_revision_km_alerts(db_path=self.db_path), [])
+
+        alerts = get_revision_km_alerts(km_ahead=9000, db_path=self.db_path)
+        self.assertEqual(alerts[0]["statut"], "proche")
+        self.assertEqual(alerts[0]["km_par_jour"], 10.0)
+        self.assertEqual(
+            alerts[0]["date_echeance"],
+            (date.today() + timedelta(days=900)).isoformat(),
+        )
@@ -0,0 +1,213 @@
+import unittest
+from pathlib import Path
+import uuid
+import gc
+import importlib.util
+
+from database import init_db, get_connection
+from services import dashboard_service
+from services.analytics_service import (
+    classify_intervention,
+    CAT_FUEL,
+    CAT_INSURANCE,
+    CAT_MAINTENANCE,
+    CAT_UNKNOWN,
+)
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+
+class TestAnalyticsService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = Path("tests/_tmp")
+        cls.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def setUp(self):
+        self.db_path = self.tmp_dir / f"analytics_{uuid.uuid4().hex}.db"
+        init_db(self.db_path)
+
+        with get_connection(self.db_path) as conn:
+            conn.executemany(
+                """
+                INSERT INTO vehicules (
+                    immatriculation, marque, modele,
+                    type_vehicule, type_affectation, statut
+                ) VALUES (?, 'Renault', 'Clio', ?, 'mutualise', ?)
+                """,
+                [
+                    ("AN-001", "voiture", "disponible"),
+                    ("AN-002", "utilitaire", "en_sortie"),
+                    ("AN-003", "voiture", "en_maintenance"),
+                ],
+            )
+            conn.execute("INSERT INTO employes (matricule, nom, prenom) VALUES ('E1', 'Doe', 'John')")
+            conn.executemany(
+                """
+                INSERT INTO maintenances (vehicule_id, date, type_intervention, categorie, cout)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [
+                    (1, "2025-01-10", "Vidange", "maintenance", 120),
+                    (1, "2025-02-10", "Plein gasoil diesel", "carburant", 80),
+                    (2, "2025-02-15", "Assurance annuelle", "assurance", 600),
+                    (2, "2025-03-01", "Contrôle technique", "maintenance", 50),
+                ],
+            )
+            conn.executemany(
+                """
+                INSERT INTO ravitaillements (vehicule_id, employe_id, date, quantite_litres, cout)
+                VALUES (?, 1, ?, 40, ?)
+                """,
+                [(1, "2025-01-05", 70), (2, "2025-01-06", 90)],
+            )
+            conn.executemany(
+                """
+                INSERT INTO sorties_reservations (
+                    vehicule_id, employe_id, date_sortie_reelle, heure_sortie_reelle,
+                    date_retour_reelle, heure_retour_reelle, km_depart, km_retour, statut
+                ) VALUES (?, 1, ?, '08:00', ?, '18:00', ?, ?, ?)
+                """,
+                [
+                    (1, "2025-01-05", "2025-01-05", 1000, 1100, "terminée"),
+                    (1, "2025-02-05", "2025-02-06", 1100, 1400, "terminée"),
+                    (2, "2025-02-07", None, 500, None, "en sortie"),
+                ],
+            )
+            conn.commit()
+
+    def tearDown(self):
+        if HAS_NUMPY:
+            from services.analytics_service import reset_arrays
+            reset_arrays(self.db_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        gc.collect()
+        for f in cls.tmp_dir.glob("analytics_*.db"):
+            try:
+                f.unlink()
+            except PermissionError:
+                pass
+
+    def test_classify_intervention(self):
+        self.assertEqual(classify_intervention("Plein Diesel"), CAT_FUEL)
+        self.assertEqual(classify_intervention("Assurance tous risques"), CAT_INSURANCE)
+        self.assertEqual(classify_intervention("Révision"), CAT_MAINTENANCE)
+        self.assertEqual(classify_intervention(None), CAT_UNKNOWN)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy non installé")
+    def test_same_results_as_dashboard_sql(self):
+        from services import analytics_service as analytics
+
+        self.assertEqual(
+            analytics.fleet_summary(self.db_path),
+            dashboard_service.get_fleet_summary.__wrapped__(self.db_path),
+        )
+
+        sql = {r["id"]: dict(r) for r in dashboard_service.get_detailed_costs_by_vehicle.__wrapped__(self.db_path)}
+        for row in analytics.detailed_costs_by_vehicle(self.db_path):
+            for key in ("cout_carburant", "cout_maintenance", "cout_assurance", "cout_total"):
+                self.assertAlmostEqual(row[key], sql[row["id"]][key])
+
+        for period in ((None, None), ("2025-02-01", "2025-02-28")):
+            self.assertEqual(
+                [(r["immatriculation"], r["km_periode"]) for r in analytics.mileage_by_period(*period, db_path=self.db_path)],
+                [(r["immatriculation"], r["km_periode"])
+                 for r in dashboard_service.get_mileage_by_period.__wrapped__(*period, db_path=self.db_path)],
+            )
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy non installé")
+    def test_incremental_refresh(self):
+        from services import analytics_service as analytics
+
+        arrays = analytics.get_arrays(self.db_path)
+        self.assertEqual(arrays.high_water["ravitaillements"], 2)
+
+        with get_connection(self.db_path) as conn:
+            conn.execute(
+                """
+                INSERT INTO ravitaillements (vehicule_id, employe_id, date, quantite_litres, cout)
+                VALUES (3, 1, '2025-03-01', 30, 55)
+                """
+            )
+            conn.execute(
+                """
+                UPDATE sorties_reservations
+                SET date_retour_reelle = '2025-02-08', heure_retour_reelle = '12:00',
+                    km_retour = 650, statut = 'terminée'
+                WHERE id = 3
+                """
+            )
+            conn.commit()
+
+        self.assertEqual(
+            arrays.refresh(),
+            {"sorties_reservations": 1, "ravitaillements": 1, "maintenances": 0},
+        )
+        trips = arrays.tables["sorties_reservations"]
+        self.assertEqual(len(trips["id"]), 3)
+        self.assertEqual(trips["km_retour"][2], 650)
+        self.assertEqual(str(trips["fin"][2]), "2025-02-08T12:00")
+        # Nothing left open: the next refresh reads nothing
+        self.assertEqual(sum(arrays.refresh().values()), 0)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy non installé")
+    def test_distributions(self):
+        from services import analytics_service as analytics
+
+        trips = analytics.trip_distance_percentiles(percentiles=(50,), db_path=self.db_path)
+        self.assertEqual(trips, {"sorties": 2, "moyenne": 200.0, "p50": 200.0})
+
+        # Only vehicle 1 has driven: (120 + 80 + 70) / 400 km
+        per_km = analytics.cost_per_km_percentiles(percentiles=(50,), db_path=self.db_path)
+        self.assertEqual(per_km, {"vehicules": 1, "p50": 0.675})
+        by_type = analytics.cost_per_km_percentiles(percentiles=(50,), by="type_vehicule", db_path=self.db_path)
+        self.assertEqual(by_type["utilitaire"], {"vehicules": 0, "p50": None})
+
+        rolling = analytics.rolling_daily_costs(2, "2025-01-05", "2025-01-07", db_path=self.db_path)
+        self.assertEqual(
+            [(r["date"], r["cout"], r["moyenne_glissante"]) for r in rolling],
+            [("2025-01-05", 70.0, 35.0), ("2025-01-06", 90.0, 80.0), ("2025-01-07", 0.0, 45.0)],
+        )
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy non installé")
+    def test_occupied_minutes_sweep(self):
+        import numpy as np
+        from services import analytics_service as analytics
+
+        edges = np.array(["2025-01-01T00:00", "2025-01-01T01:00", "2025-01-01T02:00"], dtype="datetime64[m]")
+        minutes = analytics.occupied_minutes(
+            np.array([0, 0, 1]),
+            np.array(["2025-01-01T00:00", "2025-01-01T00:30", "2024-12-31T23:00"], dtype="datetime64[m]"),
+            np.array(["2025-01-01T01:00", "2025-01-01T01:30", "2025-01-01T00:15"], dtype="datetime64[m]"),
+            edges,
+            3,
+        )
+        # Overlap counted once, interval cut at the window start
+        self.assertEqual(minutes.tolist(), [[60, 30], [15, 0], [0, 0]])
+
+        weeks = analytics._bucket_edges("2025-01-01", "2025-01-14", "week")
+        self.assertEqual(
+            [str(d) for d in weeks.astype("datetime64[D]")],
+            ["2025-01-01", "2025-01-06", "2025-01-13", "2025-01-15"],
+        )
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy non installé")
+    def test_utilization(self):
+        from services import analytics_service as analytics
+
+        days = analytics.utilization("2025-02-04", "2025-02-06", "day", db_path=self.db_path)
+        self.assertEqual(days["periodes"], ["2025-02-04", "2025-02-05", "2025-02-06"])
+        first = days["vehicules"][0]
+        self.assertEqual(first["heures"], [0.0, 16.0, 18.0])
+        self.assertEqual(first["taux"], [0.0, 66.7, 75.0])
+
+        # Open trip of vehicle 2: occupied from 2025-02-07 08:00 onwards
+        months = analytics.utilization("2025-01-01", "2025-02-28", "month", db_path=self.db_path)
+        self.assertEqual(months["periodes"], ["2025-01", "2025-02"])
+        self.assertEqual([v["heures"] for v in months["vehicules"]], [[10.0, 34.0], [0.0, 520.0], [0.0, 0.0]])
+
+        with self.assertRaises(analytics.AnalyticsError):
+            analytics.utilization("2025-01-01", "2025-02-28", "year", db_path=self.db_path)
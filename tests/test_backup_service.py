@@ -0,0 +1,162 @@
+import unittest
+from pathlib import Path
+import uuid
+import gc
+import gzip
+import os
+import shutil
+from datetime import datetime
+
+from database import init_db, get_connection
+from services.backup_service import (
+    create_backup,
+    find_backup,
+    list_backups,
+    restore_backup,
+    rotate_backups,
+    BackupError,
+)
+from services.dashboard_service import get_fleet_summary
+
+
+class TestBackupService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = Path("tests/_tmp")
+        cls.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def setUp(self):
+        name = f"backup_{uuid.uuid4().hex}"
+        self.db_path = self.tmp_dir / f"{name}.db"
+        self.backups = self.tmp_dir / f"{name}_sauvegardes"
+        init_db(self.db_path)
+
+        with get_connection(self.db_path) as conn:
+            conn.execute(
+                """
+                INSERT INTO vehicules (
+                    immatriculation, marque, modele, type_vehicule,
+                    type_affectation, statut
+                ) VALUES ('BK-001', 'Renault', 'Clio', 'voiture', 'mutualise', 'disponible')
+                """
+            )
+            conn.execute("INSERT INTO employes (matricule, nom, prenom) VALUES ('E1', 'Doe', 'John')")
+            conn.executemany(
+                "INSERT INTO ravitaillements (vehicule_id, employe_id, date, quantite_litres, cout) VALUES (1, 1, ?, 40, 70)",
+                [(f"2025-{m:02d}-{d:02d}",) for m in range(1, 13) for d in range(1, 29)] * 5,
+            )
+            conn.commit()
+
+    def tearDown(self):
+        gc.collect()
+        shutil.rmtree(self.backups, ignore_errors=True)
+        for f in self.tmp_dir.glob(f"{self.db_path.stem}*"):
+            try:
+                f.unlink()
+            except PermissionError:
+                pass
+
+    def _fuel_rows(self):
+        with get_connection(self.db_path) as conn:
+            return conn.execute("SELECT COUNT(*) FROM ravitaillements").fetchone()[0]
+
+    def _set_date(self, backup, when):
+        # Backups named as if taken at `when`
+        target = backup.with_name(f"{self.db_path.stem}_{when:%Y%m%d-%H%M%S}.db.gz")
+        backup.rename(target)
+        return target
+
+    def test_backup_is_compressed_and_checked(self):
+        result = create_backup(self.db_path, self.backups, pages=4, pause=0)
+
+        backup = Path(result["fichier"])
+        self.assertGreater(result["etapes"], 1)
+        self.assertLess(result["taille"], self.db_path.stat().st_size)
+        self.assertEqual([b["fichier"] for b in list_backups(self.db_path, self.backups)], [backup])
+        self.assertEqual([f.name for f in self.backups.iterdir()], [backup.name])
+
+        copy = self.tmp_dir / f"{self.db_path.stem}_copie.db"
+        with gzip.open(backup, "rb") as src, open(copy, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        with get_connection(copy) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM ravitaillements").fetchone()[0], 1680)
+
+        with self.assertRaises(BackupError):
+            create_backup(self.tmp_dir / "absente.db", self.backups)
+
+    def test_corrupted_copy_is_rejected(self):
+        # Page contents overwritten past the schema: integrity_check fails
+        size = self.db_path.stat().st_size
+        with open(self.db_path, "r+b") as f:
+            f.seek(size // 2)
+            f.write(os.urandom(size // 4))
+
+        with self.assertRaises(BackupError):
+            create_backup(self.db_path, self.backups)
+        self.assertEqual(list(self.backups.iterdir()), [])
+
+    def test_rotation(self):
+        for _ in range(4):
+            create_backup(self.db_path, self.backups, keep=None)
+        self.assertEqual(len(list_backups(self.db_path, self.backups)), 4)
+
+        newest = list_backups(self.db_path, self.backups)[-2:]
+        result = create_backup(self.db_path, self.backups, keep=3)
+
+        self.assertEqual(result["supprimees"], 2)
+        self.assertEqual(
+            [b["fichier"] for b in list_backups(self.db_path, self.backups)],
+            [b["fichier"] for b in newest] + [Path(result["fichier"])],
+        )
+        with self.assertRaises(BackupError):
+            rotate_backups(self.db_path, self.backups, keep=0)
+
+    def test_point_in_time_restore(self):
+        monday = self._set_date(Path(create_backup(self.db_path, self.backups)["fichier"]), datetime(2026, 10, 12, 18))
+        with get_connection(self.db_path) as conn:
+            conn.execute("DELETE FROM ravitaillements WHERE date >= '2025-07-01'")
+            conn.commit()
+        tuesday = self._set_date(Path(create_backup(self.db_path, self.backups)["fichier"]), datetime(2026, 10, 13, 18))
+        with get_connection(self.db_path) as conn:
+            conn.execute("DELETE FROM ravitaillements")
+            conn.execute("UPDATE vehicules SET statut = 'en maintenance'")
+            conn.commit()
+
+        self.assertEqual(find_backup(self.db_path, datetime(2026, 10, 13, 9), self.backups)["fichier"], monday)
+        with self.assertRaises(BackupError):
+            find_backup(self.db_path, datetime(2026, 10, 1), self.backups)
+
+        # A connection opened before the restore sees the restored content
+        with get_connection(self.db_path) as reader:
+            self.assertEqual(reader.execute("SELECT COUNT(*) FROM ravitaillements").fetchone()[0], 0)
+            self.assertEqual(get_fleet_summary(self.db_path)["available"], 0)
+
+            result = restore_backup(self.db_path, at=datetime(2026, 10, 13, 9), directory=self.backups)
+
+            self.assertEqual(result["sauvegarde"], str(monday))
+            self.assertEqual(reader.execute("SELECT COUNT(*) FROM ravitaillements").fetchone()[0], 1680)
+        # Statistics cache dropped
+        self.assertEqual(get_fleet_summary(self.db_path)["available"], 1)
+
+        # The state before the restore was saved
+        self.assertEqual(len(list_backups(self.db_path, self.backups)), 3)
+        restore_backup(self.db_path, result["securite"], safety=False)
+        self.assertEqual(self._fuel_rows(), 0)
+
+        restore_backup(self.db_path, tuesday, safety=False)
+        self.assertEqual(self._fuel_rows(), 840)
+
+    def test_unreadable_backup_leaves_database(self):
+        bad = self.backups / f"{self.db_path.stem}_20261019-120000.db.gz"
+        self.backups.mkdir()
+        bad.write_bytes(b"pas une sauvegarde")
+
+        with self.assertRaises(BackupError):
+            restore_backup(self.db_path, directory=self.backups)
+        self.assertEqual(self._fuel_rows(), 1680)
+        self.assertEqual(len(list_backups(self.db_path, self.backups)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,17 @@
+import unittest
+
+from benchmarks.bench_services import DEFAULT_BASELINE, main
+
+
+class TestBenchServices(unittest.TestCase):
+
+    def test_small_dataset_within_baseline(self):
+        # Slack for machines slower than the one that recorded the
+        # baseline; drifts of several times still fail. Intended
+        # slowdowns: re-record the baseline (benchmarks/bench_services)
+        status = main(["--sizes", "small", "--baseline", str(DEFAULT_BASELINE), "--tolerance", "1.0"])
+        self.assertEqual(status, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
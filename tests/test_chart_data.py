@@ -0,0 +1,54 @@
+import unittest
+import math
+
+from utils.chart_data import histogram, lttb, min_max, top_k
+
+
+class TestChartData(unittest.TestCase):
+
+    def test_top_k(self):
+        rows = [("a", 5, 1), ("b", 9, 2), ("c", 1, 3), ("d", 3, 4)]
+        self.assertEqual(top_k(rows, 2), [("b", 9, 2), ("a", 5, 1), ("Autres (2)", 4, 7)])
+        self.assertEqual(top_k(rows, 2, aggregate="mean")[-1], ("Autres (2)", 2.0, 3.5))
+        # Sorted on another column, nothing to fold
+        self.assertEqual([r[0] for r in top_k(rows, 4, key=2)], ["d", "c", "b", "a"])
+        self.assertEqual(top_k([], 3), [])
+        with self.assertRaises(ValueError):
+            top_k(rows, 2, aggregate="max")
+
+    def test_histogram(self):
+        bins = histogram([0, 9.9, 10, 55, 100, 120, None], bins=10, lower=0, upper=100)
+        self.assertEqual(len(bins), 10)
+        self.assertEqual(bins[0], (0, 10, 2))
+        self.assertEqual([c for _, _, c in bins], [2, 1, 0, 0, 0, 1, 0, 0, 0, 1])
+
+        # Bounds from the values, a single value still gives a bin
+        self.assertEqual(sum(c for _, _, c in histogram([3, 4, 5], bins=4)), 3)
+        self.assertEqual(histogram([7], bins=1), [(7, 8, 1)])
+
+    def test_lttb(self):
+        values = [math.sin(i / 50) * 100 + (500 if i == 1234 else 0) for i in range(10_000)]
+        kept = lttb(values, 300)
+
+        self.assertEqual(len(kept), 300)
+        self.assertEqual((kept[0], kept[-1]), (0, 9_999))
+        self.assertEqual(kept, sorted(set(kept)))
+        # The spike is the largest triangle of its bucket
+        self.assertIn(1234, kept)
+        self.assertEqual(lttb(values[:12], 300), list(range(12)))
+
+    def test_min_max(self):
+        values = [i % 7 for i in range(1_000)]
+        values[500] = -50
+        kept = min_max(values, 50)
+
+        self.assertLessEqual(len(kept), 102)
+        self.assertIn(500, kept)
+        self.assertEqual((kept[0], kept[-1]), (0, 999))
+        # Between the end points: only the extremes of each bucket
+        self.assertEqual({values[i] for i in kept[1:-1]}, {-50, 0, 6})
+        self.assertEqual(min_max(values[:20], 50), list(range(20)))
+
+
+if __name__ == "__main__":
+    unittest.main()
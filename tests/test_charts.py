@@ -0,0 +1,103 @@
+import unittest
+import gc
+import importlib.util
+
+HAS_MATPLOTLIB = importlib.util.find_spec("matplotlib") is not None
+
+
+def _data(step):
+    """Chart data of gui.reports, varying with step (5 distinct sets)."""
+    k = step % 5
+    return {
+        "fleet_status": (("Disponible", 10 + k, "#4CAF50"), ("En sortie", 3, "#FF9800")),
+        "vehicle_types": (("Voiture", 12 + k), ("Utilitaire", 4)),
+        "mileage": tuple((f"AA-{i:03}-AA\nRenault Clio", 50000 - 1000 * i + k) for i in range(10)),
+        "detailed_costs": tuple((f"AA-{i:03}-AA", 100.0 * i + k + 70, 100.0 * i + k, 50.0, 20.0) for i in range(10)),
+        "utilization": (
+            tuple((f"AA-{i:03}-AA", 5.0 * i + k) for i in range(1, 15)),
+            tuple((10.0 * i, 10.0 * (i + 1), i + k) for i in range(10)),
+        ),
+        "employees": tuple((f"Doe {i}", 20 - i + k, 2000 - 100 * i) for i in range(15)),
+        "consumption": (("Voiture", 30000.0 + k), ("Utilitaire", 25000.0)),
+        "cost_evolution": tuple((f"2025-{m:02}", 100.0 * m + k, 50.0, 150.0 * m) for m in range(1, 13)),
+    }
+
+
+@unittest.skipUnless(HAS_MATPLOTLIB, "matplotlib non installé")
+class TestCharts(unittest.TestCase):
+
+    def test_unchanged_data_not_drawn(self):
+        from gui.charts import Chart
+
+        calls = []
+        chart = Chart((4, 3))
+        render = lambda c, data: calls.append(data)
+
+        self.assertTrue(chart.refresh((("a", 1),), render))
+        self.assertFalse(chart.refresh((("a", 1),), render))
+        self.assertTrue(chart.refresh((("a", 2),), render))
+        self.assertEqual(calls, [(("a", 1),), (("a", 2),)])
+        self.assertEqual(chart.draws, 2)
+
+    def test_bars_updated_in_place(self):
+        from gui.charts import Chart
+
+        chart = Chart((4, 3))
+        bars = chart.bars("v", value_format=str)
+        bars.set([1, 2, 3])
+        patches = list(bars.container)
+
+        bars.set([4, 5, 6])
+        self.assertEqual(list(bars.container), patches)
+        self.assertEqual([p.get_height() for p in patches], [4, 5, 6])
+        self.assertEqual([t.get_text() for t in bars.texts], ["4", "5", "6"])
+
+        # Another number of bars: recreated, the previous ones removed
+        bars.set([7, 8])
+        self.assertEqual(len(chart.ax.patches), 2)
+        self.assertEqual(len(chart.ax.texts), 2)
+
+    def test_message_hides_axes(self):
+        from gui.charts import Chart
+        from gui.reports import render_mileage
+
+        chart = Chart((4, 3))
+        chart.refresh((), render_mileage)
+        self.assertFalse(chart.ax.get_visible())
+        chart.refresh((("AA-001-AA", 100),), render_mileage)
+        self.assertTrue(chart.ax.get_visible())
+
+    def test_memory_flat_over_refreshes(self):
+        from matplotlib.backend_bases import FigureCanvasBase
+        from gui.charts import Chart
+        from gui.reports import CHART_ROWS, RENDERERS
+
+        # Pie, bars and lines on the base canvas: artists updated, nothing
+        # rasterised (RSS of the drawn window: bench_report_charts)
+        keys = ("fleet_status", "vehicle_types", "mileage", "consumption", "cost_evolution")
+        charts = {key: Chart((6, 4), CHART_ROWS.get(key, 1), canvas=FigureCanvasBase) for key in keys}
+
+        def refresh(steps):
+            for step in steps:
+                data = _data(step)
+                for key in keys:
+                    charts[key].refresh(data[key], RENDERERS[key])
+
+        def live_objects():
+            gc.collect()
+            return len(gc.get_objects())
+
+        # Warm-up: matplotlib caches (fonts, text layout) filled
+        refresh(range(20))
+        counts = [len(ax.get_children()) for c in charts.values() for ax in c.axes]
+
+        before = live_objects()
+        refresh(range(20, 120))
+        self.assertLess(live_objects() - before, 50)
+
+        self.assertEqual([len(ax.get_children()) for c in charts.values() for ax in c.axes], counts)
+        self.assertTrue(all(c.draws == 120 for c in charts.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,11 +2,13 @@ import unittest
 from pathlib import Path
 import uuid
 import gc
+from datetime import datetime, timedelta
 
 from database import init_db, get_connection
 from services.dashboard_service import (
     get_fleet_summary,
     get_available_vehicles,
+    get_vehicle_utilization_rate,
 )
 
 
@@ -70,3 +72,50 @@ class TestDashboardService(unittest.TestCase):
 
         self.assertEqual(len(vehicles), 1)
         self.assertEqual(vehicles[0]["immatriculation"], "AA-001")
+
+    def test_utilization_rate(self):
+        now = datetime.now()
+        start = (now - timedelta(days=7)).replace(hour=12, minute=0)
+        planned = now - timedelta(hours=6)
+
+        def fmt(dt):
+            return dt.strftime("%Y-%m-%d"), dt.strftime("%H:%M")
+
+        with get_connection(self.db_path) as conn:
+            conn.execute("INSERT INTO employes (matricule, nom, prenom) VALUES ('E1', 'Doe', 'John')")
+            conn.executemany(
+                """
+                INSERT INTO sorties_reservations (
+                    vehicule_id, employe_id, date_sortie_reelle, heure_sortie_reelle,
+                    date_retour_reelle, heure_retour_reelle, km_depart, km_retour, statut
+                ) VALUES (?, 1, ?, ?, ?, ?, ?, ?, 'terminée')
+                """,
+                [
+                    # Two days, with an overlapping trip counted once
+                    (1, *fmt(start), *fmt(start + timedelta(hours=48)), 100, 400),
+                    (1, *fmt(start + timedelta(hours=1)), *fmt(start + timedelta(hours=3)), 400, 450),
+                    # Outside the window
+                    (3, *fmt(now - timedelta(days=40)), *fmt(now - timedelta(days=39)), 0, 80),
+                ],
+            )
+            # Still out, as written by create_reservation (planned dates only)
+            conn.execute(
+                """
+                INSERT INTO sorties_reservations (
+                    vehicule_id, employe_id, date_sortie_prevue, heure_sortie_prevue, km_depart, statut
+                ) VALUES (2, 1, ?, ?, 500, 'en sortie')
+                """,
+                fmt(planned),
+            )
+            conn.commit()
+
+        rates = {r["immatriculation"]: r for r in get_vehicle_utilization_rate(db_path=self.db_path)}
+
+        self.assertEqual(rates["AA-001"]["heures_utilisees"], 48.0)
+        self.assertEqual(rates["AA-001"]["jours_utilises"], 3)
+        self.assertEqual(rates["AA-001"]["nombre_sorties"], 2)
+        self.assertEqual(rates["AA-001"]["km_parcourus"], 350)
+        self.assertEqual(rates["AA-001"]["taux_utilisation"], round(48 * 100 / 720, 1))
+        self.assertEqual(rates["BB-002"]["heures_utilisees"], 6.0)
+        self.assertEqual(rates["CC-003"]["nombre_sorties"], 0)
+        self.assertEqual(rates["CC-003"]["taux_utilisation"], 0.0)
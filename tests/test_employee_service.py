@@ -4,10 +4,15 @@ import uuid
 import gc
 from datetime import date, timedelta
 
-from database import init_db
+from database import init_db, get_connection
+from services.reservation_service import create_reservation, ReservationError
 from services.employee_service import (
     create_employee,
     get_authorized_employees,
+    get_expired_drivers,
+    sweep_expired_licences,
+    update_driver_licence,
+    is_driver_eligible,
     EmployeeError,
 )
 
@@ -86,3 +91,97 @@ class TestEmployeeService(unittest.TestCase):
                 prenom="User2",
                 db_path=self.db_path,
             )
+
+    def _create_driver(self, days_valid=30):
+        create_employee(
+            matricule="DRV001",
+            nom="Driver",
+            prenom="Jane",
+            num_permis="PERMIS123",
+            date_validite_permis=(date.today() + timedelta(days=days_valid)).isoformat(),
+            autorise_conduire=1,
+            db_path=self.db_path,
+        )
+        return get_authorized_employees(self.db_path)[0]["id"]
+
+    def _permis_alert(self):
+        with get_connection(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT statut FROM alertes WHERE source_type = 'permis'"
+            ).fetchone()
+        return row["statut"] if row else None
+
+    def test_driver_eligibility_until_return(self):
+        employe_id = self._create_driver(days_valid=30)
+        later = (date.today() + timedelta(days=40)).isoformat()
+
+        self.assertTrue(is_driver_eligible(employe_id, db_path=self.db_path))
+        self.assertFalse(is_driver_eligible(employe_id, until=later, db_path=self.db_path))
+        self.assertFalse(is_driver_eligible(9999, db_path=self.db_path))
+
+    def test_sweep_flags_expired_drivers(self):
+        self._create_driver(days_valid=30)
+        in_40_days = date.today() + timedelta(days=40)
+
+        self.assertEqual(get_expired_drivers(db_path=self.db_path), [])
+
+        expired = sweep_expired_licences(today=in_40_days, db_path=self.db_path)
+
+        self.assertEqual([e["matricule"] for e in expired], ["DRV001"])
+        self.assertEqual(len(get_authorized_employees(self.db_path)), 1)
+        self.assertEqual(self._permis_alert(), "retard")
+
+    def test_sweep_auto_suspend_and_renewal(self):
+        employe_id = self._create_driver(days_valid=30)
+        in_40_days = date.today() + timedelta(days=40)
+
+        self.assertTrue(is_driver_eligible(employe_id, db_path=self.db_path))
+        sweep_expired_licences(today=in_40_days, auto_suspend=True, db_path=self.db_path)
+
+        # Suspended: no longer eligible (cache dropped), alert kept
+        self.assertEqual(get_authorized_employees(self.db_path), [])
+        self.assertFalse(is_driver_eligible(employe_id, db_path=self.db_path))
+        self.assertEqual(self._permis_alert(), "retard")
+
+        update_driver_licence(
+            employe_id, "PERMIS456",
+            (date.today() + timedelta(days=3650)).isoformat(),
+            db_path=self.db_path,
+        )
+
+        self.assertTrue(is_driver_eligible(employe_id, db_path=self.db_path))
+        self.assertEqual(self._permis_alert(), "a_venir")
+
+    def test_suspension_by_other_process_blocks_reservation(self):
+        employe_id = self._create_driver(days_valid=30)
+        with get_connection(self.db_path) as conn:
+            conn.execute(
+                """
+                INSERT INTO vehicules (
+                    immatriculation, marque, modele, type_vehicule,
+                    type_affectation, statut
+                ) VALUES ('EM-001', 'Renault', 'Clio', 'voiture', 'mutualise', 'disponible')
+                """
+            )
+            conn.commit()
+        self.assertTrue(is_driver_eligible(employe_id, db_path=self.db_path))
+
+        # Suspended by the scheduler process: this process' cache still
+        # says eligible
+        with get_connection(self.db_path) as conn:
+            conn.execute(
+                "UPDATE employes SET autorise_conduire = 0, permis_suspendu = 1 WHERE id = ?",
+                (employe_id,),
+            )
+            conn.commit()
+
+        today = date.today().isoformat()
+        with self.assertRaises(ReservationError):
+            create_reservation(
+                1, employe_id, today, "08:00", today, "18:00", 0, "Mission", "Siège",
+                db_path=self.db_path,
+            )
+        with get_connection(self.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM sorties_reservations").fetchone()[0], 0)
+            self.assertEqual(conn.execute("SELECT statut FROM vehicules").fetchone()[0], "disponible")
+        self.assertFalse(is_driver_eligible(employe_id, db_path=self.db_path))
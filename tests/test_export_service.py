@@ -0,0 +1,227 @@
+import unittest
+from pathlib import Path
+import uuid
+import gc
+import gzip
+import importlib.util
+import shutil
+import threading
+import time
+from unittest import mock
+
+from database import init_db, get_connection
+from services import export_service
+from services.export_service import (
+    export_table_csv,
+    export_columnar,
+    get_pending_partitions,
+    ExportError,
+)
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+class TestExportService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = Path("tests/_tmp")
+        cls.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def setUp(self):
+        self.db_path = self.tmp_dir / f"export_{uuid.uuid4().hex}.db"
+        self.out = self.tmp_dir / f"export_{uuid.uuid4().hex}.csv"
+        init_db(self.db_path)
+
+        with get_connection(self.db_path) as conn:
+            conn.execute(
+                """
+                INSERT INTO vehicules (
+                    immatriculation, marque, modele,
+                    type_vehicule, type_affectation, statut
+                ) VALUES ('EX-001', 'Renault', 'Clio', 'voiture', 'mutualise', 'disponible')
+                """
+            )
+            conn.execute("INSERT INTO employes (matricule, nom, prenom) VALUES ('E1', 'Doe', 'John')")
+            conn.executemany(
+                """
+                INSERT INTO ravitaillements (vehicule_id, employe_id, date, quantite_litres, cout)
+                VALUES (1, 1, ?, 40, ?)
+                """,
+                [(f"2025-{m:02d}-15", 60 + m) for m in range(1, 13)],
+            )
+            conn.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        gc.collect()
+        for f in cls.tmp_dir.glob("export_*"):
+            try:
+                if f.is_dir():
+                    shutil.rmtree(f)
+                else:
+                    f.unlink()
+            except PermissionError:
+                pass
+
+    def test_full_table_in_chunks(self):
+        calls = []
+        count = export_table_csv(
+            "ravitaillements", self.out, chunk_size=5,
+            progress=lambda written, total: calls.append((written, total)),
+            db_path=self.db_path,
+        )
+
+        lines = self.out.read_text(encoding="utf-8-sig").splitlines()
+        self.assertEqual(count, 12)
+        self.assertEqual(len(lines), 13)
+        self.assertTrue(lines[0].startswith("id;vehicule_id;employe_id;date"))
+        self.assertEqual(calls, [(5, 12), (10, 12), (12, 12)])
+
+    def test_columns_and_period(self):
+        count = export_table_csv(
+            "ravitaillements", self.out,
+            columns=["date", "cout"], start_date="2025-03-01", end_date="2025-04-30",
+            db_path=self.db_path,
+        )
+
+        lines = self.out.read_text(encoding="utf-8-sig").splitlines()
+        self.assertEqual(count, 2)
+        self.assertEqual(lines, ["date;cout", "2025-03-15;63.0", "2025-04-15;64.0"])
+
+    def test_trips_period_includes_planned_departures(self):
+        with get_connection(self.db_path) as conn:
+            conn.executemany(
+                """
+                INSERT INTO sorties_reservations (
+                    vehicule_id, employe_id, date_sortie_reelle, date_sortie_prevue, km_depart, statut
+                ) VALUES (1, 1, ?, ?, 1000, 'terminée')
+                """,
+                [("2025-03-20", "2025-03-19"), (None, "2025-03-05"), (None, "2025-05-01")],
+            )
+            conn.commit()
+            plan = " ".join(r[3] for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM sorties_reservations "
+                "WHERE COALESCE(date_sortie_reelle, date_sortie_prevue) >= ? "
+                "ORDER BY COALESCE(date_sortie_reelle, date_sortie_prevue), id",
+                ("2025-03-01",),
+            ))
+
+        count = export_table_csv(
+            "sorties_reservations", self.out, columns=["date_sortie_prevue"],
+            start_date="2025-03-01", end_date="2025-03-31", db_path=self.db_path,
+        )
+
+        lines = self.out.read_text(encoding="utf-8-sig").splitlines()
+        self.assertEqual(count, 2)
+        # Trip created in the application first: dated by its planned departure
+        self.assertEqual(lines, ["date_sortie_prevue", "2025-03-05", "2025-03-19"])
+        self.assertIn("idx_sorties_date_depart", plan)
+
+    def test_gzip_output(self):
+        out = self.out.with_name(self.out.name + ".gz")
+        export_table_csv("ravitaillements", out, db_path=self.db_path)
+
+        with gzip.open(out, "rt", encoding="utf-8-sig") as f:
+            self.assertEqual(len(f.read().splitlines()), 13)
+        self.assertFalse(out.with_name(out.name + ".tmp").exists())
+
+    def test_invalid_requests(self):
+        with self.assertRaises(ExportError):
+            export_table_csv("users", self.out, db_path=self.db_path)
+        with self.assertRaises(ExportError):
+            export_table_csv("ravitaillements", self.out, columns=["inconnue"], db_path=self.db_path)
+        with self.assertRaises(ExportError):
+            export_table_csv("vehicules", self.out, start_date="2025-01-01", db_path=self.db_path)
+        self.assertFalse(self.out.exists())
+
+    # ---------- export colonnaire ----------
+
+    def _add_fuel(self, day, cost):
+        with get_connection(self.db_path) as conn:
+            conn.execute(
+                """
+                INSERT INTO ravitaillements (vehicule_id, employe_id, date, quantite_litres, cout)
+                VALUES (1, 1, ?, 40, ?)
+                """,
+                (day, cost),
+            )
+            conn.commit()
+
+    def test_pending_partitions(self):
+        out_dir = self.tmp_dir / f"export_{uuid.uuid4().hex}"
+        months = get_pending_partitions("ravitaillements", out_dir, db_path=self.db_path)
+
+        self.assertEqual(months, [f"2025-{m:02d}" for m in range(1, 13)])
+        with self.assertRaises(ExportError):
+            get_pending_partitions("users", out_dir, db_path=self.db_path)
+        with self.assertRaises(ExportError):
+            export_columnar("ravitaillements", out_dir, fmt="csv", db_path=self.db_path)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy non installé")
+    def test_npz_partitions_and_incremental(self):
+        import numpy as np
+
+        out_dir = self.tmp_dir / f"export_{uuid.uuid4().hex}"
+        result = export_columnar("ravitaillements", out_dir, fmt="npz", db_path=self.db_path)
+        self.assertEqual(len(result["partitions"]), 12)
+        self.assertEqual(result["lignes"], 12)
+
+        part = out_dir / "ravitaillements" / "mois=2025-03" / "part.npz"
+        with np.load(part) as data:
+            self.assertEqual(data["date"].dtype, np.dtype("datetime64[D]"))
+            self.assertEqual(data["cout"].tolist(), [63.0])
+            self.assertEqual(data["kilometrage__valide"].tolist(), [False])
+
+        # Nothing new: no partition rewritten
+        self.assertEqual(
+            export_columnar("ravitaillements", out_dir, fmt="npz", incremental=True,
+                            db_path=self.db_path)["partitions"],
+            [],
+        )
+
+        self._add_fuel("2025-03-20", 70)
+        self._add_fuel("2026-01-05", 80)
+        result = export_columnar("ravitaillements", out_dir, fmt="npz", incremental=True,
+                                 db_path=self.db_path)
+        self.assertEqual(result["partitions"], ["2025-03", "2026-01"])
+        with np.load(part) as data:
+            self.assertEqual(data["cout"].tolist(), [63.0, 70.0])
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy non installé")
+    def test_row_committed_during_export_not_lost(self):
+        out_dir = self.tmp_dir / f"export_{uuid.uuid4().hex}"
+        load_state = export_service._load_export_state
+        writers = []
+
+        def load_state_then_write(*args):
+            # Another connection adds a row of a new month while the
+            # pending months are being read
+            writers.append(threading.Thread(target=self._add_fuel, args=("2026-02-10", 90)))
+            writers[0].start()
+            time.sleep(0.2)
+            return load_state(*args)
+
+        with mock.patch.object(export_service, "_load_export_state", side_effect=load_state_then_write):
+            result = export_columnar("ravitaillements", out_dir, fmt="npz", incremental=True,
+                                     db_path=self.db_path)
+        writers[0].join()
+
+        self.assertNotIn("2026-02", result["partitions"])
+        self.assertEqual(
+            export_columnar("ravitaillements", out_dir, fmt="npz", incremental=True,
+                            db_path=self.db_path)["partitions"],
+            ["2026-02"],
+        )
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow non installé")
+    def test_parquet_dataset(self):
+        import pyarrow.parquet as pq
+
+        out_dir = self.tmp_dir / f"export_{uuid.uuid4().hex}"
+        export_columnar("ravitaillements", out_dir, fmt="parquet", db_path=self.db_path)
+
+        table = pq.read_table(out_dir / "ravitaillements")
+        self.assertEqual(table.num_rows, 12)
+        self.assertEqual(str(table.schema.field("date").type), "date32[day]")
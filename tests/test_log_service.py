@@ -3,8 +3,8 @@ from pathlib import Path
 import uuid
 import gc
 
-from database import init_db
-from services.log_service import log_action, get_logs
+from database import init_db, get_connection
+from services.log_service import log_action, get_logs, archive_logs
 
 
 class TestLogService(unittest.TestCase):
@@ -42,3 +42,18 @@ class TestLogService(unittest.TestCase):
     def test_action_required(self):
         with self.assertRaises(ValueError):
             log_action(action="", db_path=self.db_path)
+
+    def test_archive_old_logs(self):
+        log_action("RECENT", db_path=self.db_path)
+        with get_connection(self.db_path) as conn:
+            conn.execute(
+                "INSERT INTO logs (action, date_action) VALUES ('OLD', '2020-01-01T10:00:00')"
+            )
+            conn.commit()
+
+        self.assertEqual(archive_logs(365, db_path=self.db_path), 1)
+
+        self.assertEqual([l["action"] for l in get_logs(db_path=self.db_path)], ["RECENT"])
+        with get_connection(self.db_path) as conn:
+            archived = conn.execute("SELECT action FROM logs_archive").fetchall()
+        self.assertEqual([r["action"] for r in archived], ["OLD"])
@@ -7,6 +7,7 @@ from database import init_db, get_connection
 from services.maintenance_service import (
     record_maintenance,
     get_maintenances_for_vehicle,
+    classify_intervention,
     MaintenanceError,
 )
 
@@ -37,7 +38,7 @@ class TestMaintenanceService(unittest.TestCase):
     @classmethod
     def tearDownClass(cls):
         gc.collect()
-        for f in cls.tmp_dir.glob("maint_*.db"):
+        for f in cls.tmp_dir.glob("maint*.db"):
             try:
                 f.unlink()
             except PermissionError:
@@ -71,3 +72,43 @@ class TestMaintenanceService(unittest.TestCase):
                 type_intervention="pneus",
                 db_path=self.db_path,
             )
+
+    def test_category(self):
+        self.assertEqual(classify_intervention("Plein ESSENCE"), "carburant")
+        self.assertEqual(classify_intervention("Assurance flotte"), "assurance")
+        self.assertEqual(classify_intervention("Freins"), "maintenance")
+        self.assertIsNone(classify_intervention(None))
+
+        record_maintenance(1, "2026-01-01", "Ravitaillement diesel", cout=60, db_path=self.db_path)
+        maints = get_maintenances_for_vehicle(1, self.db_path)
+        self.assertEqual(maints[0]["categorie"], "carburant")
+
+    def test_category_backfilled_by_migration(self):
+        old_db = self.tmp_dir / f"maintold_{uuid.uuid4().hex}.db"
+        with get_connection(old_db) as conn:
+            conn.execute(
+                """
+                CREATE TABLE maintenances (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    vehicule_id INTEGER NOT NULL,
+                    date TEXT NOT NULL,
+                    type_intervention TEXT NOT NULL,
+                    kilometrage INTEGER,
+                    cout REAL,
+                    prestataire TEXT,
+                    remarques TEXT,
+                    date_prochaine_echeance TEXT
+                )
+                """
+            )
+            conn.executemany(
+                "INSERT INTO maintenances (vehicule_id, date, type_intervention) VALUES (1, '2025-01-01', ?)",
+                [("Assurance",), ("Vidange",)],
+            )
+            conn.commit()
+
+        init_db(old_db)
+
+        with get_connection(old_db) as conn:
+            categories = [r[0] for r in conn.execute("SELECT categorie FROM maintenances ORDER BY id")]
+        self.assertEqual(categories, ["assurance", "maintenance"])
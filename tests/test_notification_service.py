@@ -0,0 +1,222 @@
+import unittest
+from pathlib import Path
+import uuid
+import gc
+import shutil
+from datetime import date, datetime, timedelta
+
+from database import init_db, get_connection
+from services.alert_engine import sweep_alerts, acknowledge_alert, get_open_alerts, on_vehicle_odometer
+from services.document_service import add_document
+from services.notification_service import (
+    enqueue_alert_notifications,
+    deliver_pending,
+    get_outbox_summary,
+    SpoolTransport,
+    RETRY_DELAYS_MINUTES,
+)
+
+
+class _MemoryTransport:
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.sent = []
+
+    def send(self, recipient, subject, body):
+        if self.fail:
+            raise OSError("SMTP indisponible")
+        self.sent.append((recipient, subject, body))
+
+    def close(self):
+        pass
+
+
+def _d(days):
+    return (date.today() + timedelta(days=days)).isoformat()
+
+
+class TestNotificationService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = Path("tests/_tmp")
+        cls.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def setUp(self):
+        self.db_path = self.tmp_dir / f"notification_{uuid.uuid4().hex}.db"
+        init_db(self.db_path)
+
+        with get_connection(self.db_path) as conn:
+            conn.executemany(
+                """
+                INSERT INTO users (username, password_hash, role, nom, prenom, email)
+                VALUES (?, 'x', ?, 'N', 'P', ?)
+                """,
+                [
+                    ("g1", "Gestionnaire", "g1@test.local"),
+                    ("g2", "Gestionnaire", "g2@test.local"),
+                    ("e1", "Employe", "e1@test.local"),
+                ],
+            )
+            conn.execute(
+                """
+                INSERT INTO vehicules (
+                    immatriculation, marque, modele,
+                    type_vehicule, type_affectation, statut
+                ) VALUES ('NT-001', 'Renault', 'Clio', 'voiture', 'permanent', 'disponible')
+                """
+            )
+            conn.execute(
+                "INSERT INTO employes (matricule, nom, prenom, email) VALUES ('E1', 'Doe', 'John', 'john@test.local')"
+            )
+            conn.execute(
+                "INSERT INTO affectations_permanentes (vehicule_id, employe_id, date_debut) VALUES (1, 1, '2025-01-01')"
+            )
+            conn.commit()
+
+        sweep_alerts(db_path=self.db_path)
+        add_document(1, "Assurance", "a.pdf", date_echeance=_d(-3), db_path=self.db_path)
+        add_document(1, "Vignette", "v.pdf", date_echeance=_d(-1), db_path=self.db_path)
+        add_document(1, "Contrôle technique", "c.pdf", date_echeance=_d(10), db_path=self.db_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        gc.collect()
+        for f in cls.tmp_dir.glob("notification_*"):
+            try:
+                if f.is_dir():
+                    shutil.rmtree(f)
+                else:
+                    f.unlink()
+            except PermissionError:
+                pass
+
+    def test_one_digest_per_recipient(self):
+        # 2 overdue alerts x (2 gestionnaires + assigned driver)
+        self.assertEqual(enqueue_alert_notifications(self.db_path), 6)
+
+        transport = _MemoryTransport()
+        stats = deliver_pending(transport, self.db_path)
+
+        self.assertEqual(stats["envoyes"], 3)
+        self.assertEqual(stats["notifications"], 6)
+        self.assertEqual(
+            sorted(r for r, _, _ in transport.sent),
+            ["g1@test.local", "g2@test.local", "john@test.local"],
+        )
+        self.assertIn("2 alerte(s)", transport.sent[0][1])
+        self.assertIn("Assurance", transport.sent[0][2])
+
+    def test_dedup_across_sweeps(self):
+        enqueue_alert_notifications(self.db_path)
+        deliver_pending(_MemoryTransport(), self.db_path)
+
+        self.assertEqual(enqueue_alert_notifications(self.db_path), 0)
+        self.assertEqual(deliver_pending(_MemoryTransport(), self.db_path)["envoyes"], 0)
+
+    def test_revision_not_renotified_when_date_moves(self):
+        enqueue_alert_notifications(self.db_path)
+
+        def odometer(km, today):
+            with get_connection(self.db_path) as conn:
+                conn.execute(
+                    "UPDATE vehicules SET kilometrage_actuel = ?, seuil_revision_km = 15000", (km,)
+                )
+                on_vehicle_odometer(conn.cursor(), 1, today=today)
+                conn.commit()
+
+        odometer(16000, date.today())
+        self.assertEqual(enqueue_alert_notifications(self.db_path), 3)
+
+        # Overdue revision re-estimated on a later reading: same threshold
+        odometer(16500, date.today() + timedelta(days=3))
+        self.assertEqual(enqueue_alert_notifications(self.db_path), 0)
+
+        # Next threshold (after a revision at 16500 km)
+        with get_connection(self.db_path) as conn:
+            conn.execute(
+                "INSERT INTO maintenances (vehicule_id, date, type_intervention, categorie, kilometrage) "
+                "VALUES (1, ?, 'Révision', 'maintenance', 16500)",
+                (_d(0),),
+            )
+            conn.commit()
+        odometer(32000, date.today() + timedelta(days=60))
+        self.assertEqual(enqueue_alert_notifications(self.db_path), 3)
+
+    def test_concurrent_runs_send_once(self):
+        enqueue_alert_notifications(self.db_path)
+        other = _MemoryTransport()
+
+        class _SecondRunDuringSend(_MemoryTransport):
+            def send(inner, recipient, subject, body):
+                # Manual run started while the scheduler job is sending
+                if not inner.sent:
+                    deliver_pending(other, self.db_path)
+                super().send(recipient, subject, body)
+
+        transport = _SecondRunDuringSend()
+        stats = deliver_pending(transport, self.db_path)
+
+        self.assertEqual(stats["envoyes"], 3)
+        self.assertEqual(other.sent, [])
+        self.assertEqual(get_outbox_summary(self.db_path), {"envoyee": 6})
+
+    def test_stale_claim_taken_over(self):
+        enqueue_alert_notifications(self.db_path)
+        # Sender that crashed after claiming the rows
+        with get_connection(self.db_path) as conn:
+            conn.execute(
+                "UPDATE notifications SET statut = 'envoi', envoi_par = 'x', envoi_debut = ?",
+                ((datetime.now() - timedelta(hours=1)).isoformat(timespec="seconds"),),
+            )
+            conn.commit()
+
+        self.assertEqual(deliver_pending(_MemoryTransport(), self.db_path)["notifications"], 6)
+
+    def test_rate_limit_defers_next_digest(self):
+        enqueue_alert_notifications(self.db_path)
+        deliver_pending(_MemoryTransport(), self.db_path)
+
+        add_document(1, "Carte grise", "g.pdf", date_echeance=_d(-2), db_path=self.db_path)
+        enqueue_alert_notifications(self.db_path)
+
+        stats = deliver_pending(_MemoryTransport(), self.db_path)
+        self.assertEqual((stats["envoyes"], stats["reportes"]), (0, 3))
+
+        later = datetime.now() + timedelta(hours=2)
+        stats = deliver_pending(_MemoryTransport(), self.db_path, now=later)
+        self.assertEqual(stats["envoyes"], 3)
+
+    def test_failed_delivery_retried(self):
+        enqueue_alert_notifications(self.db_path)
+
+        stats = deliver_pending(_MemoryTransport(fail=True), self.db_path)
+        self.assertEqual(stats["echecs"], 3)
+        self.assertEqual(get_outbox_summary(self.db_path), {"en_attente": 6})
+
+        # Not due again before the back-off delay
+        self.assertEqual(deliver_pending(_MemoryTransport(), self.db_path)["envoyes"], 0)
+
+        retry = datetime.now() + timedelta(minutes=RETRY_DELAYS_MINUTES[0] + 1)
+        self.assertEqual(deliver_pending(_MemoryTransport(), self.db_path, now=retry)["envoyes"], 3)
+        self.assertEqual(get_outbox_summary(self.db_path), {"envoyee": 6})
+
+    def test_acknowledged_alert_cancelled(self):
+        enqueue_alert_notifications(self.db_path)
+        for alert in get_open_alerts(db_path=self.db_path):
+            acknowledge_alert(alert["id"], db_path=self.db_path)
+
+        stats = deliver_pending(_MemoryTransport(), self.db_path)
+        self.assertEqual((stats["envoyes"], stats["annulees"]), (0, 6))
+
+    def test_spool_transport_writes_eml(self):
+        spool = self.tmp_dir / f"notification_spool_{uuid.uuid4().hex}"
+        enqueue_alert_notifications(self.db_path)
+
+        deliver_pending(SpoolTransport(spool), self.db_path)
+
+        files = sorted(spool.glob("*.eml"))
+        self.assertEqual(len(files), 3)
+        self.assertIn(b"Subject: [Parc auto]", files[0].read_bytes())
+        self.assertEqual(list(spool.glob("*.tmp")), [])
@@ -0,0 +1,110 @@
+import unittest
+from pathlib import Path
+import uuid
+import gc
+import threading
+from unittest import mock
+
+from database import init_db, get_connection
+from utils import query_trace
+from utils.query_trace import (
+    enable_query_tracing,
+    disable_query_tracing,
+    get_query_stats,
+    reset_query_stats,
+)
+
+
+def count_vehicles(db_path):
+    with get_connection(db_path) as conn:
+        return conn.execute("SELECT * FROM vehicules").fetchall()
+
+
+class TestQueryTrace(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = Path("tests/_tmp")
+        cls.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def setUp(self):
+        self.db_path = self.tmp_dir / f"trace_{uuid.uuid4().hex}.db"
+        self.log_path = self.tmp_dir / f"trace_{uuid.uuid4().hex}.log"
+        init_db(self.db_path)
+
+        with get_connection(self.db_path) as conn:
+            conn.executemany(
+                """
+                INSERT INTO vehicules (
+                    immatriculation, marque, modele,
+                    type_vehicule, type_affectation, statut
+                ) VALUES (?, 'Renault', 'Clio', 'voiture', 'mutualise', 'disponible')
+                """,
+                [("TR-001",), ("TR-002",)],
+            )
+            conn.commit()
+
+        reset_query_stats()
+        enable_query_tracing(slow_threshold_ms=0, slow_log_path=self.log_path)
+
+    def tearDown(self):
+        disable_query_tracing()
+        reset_query_stats()
+
+    @classmethod
+    def tearDownClass(cls):
+        gc.collect()
+        for f in cls.tmp_dir.glob("trace_*"):
+            try:
+                f.unlink()
+            except PermissionError:
+                pass
+
+    def test_statement_stats(self):
+        count_vehicles(self.db_path)
+        count_vehicles(self.db_path)
+
+        stats = {s["sql"]: s for s in get_query_stats()}
+        s = stats["SELECT * FROM vehicules"]
+
+        self.assertEqual(s["calls"], 2)
+        self.assertEqual(s["rows"], 4)
+        self.assertEqual(sum(s["histogram"].values()), 2)
+        self.assertIn(f"{__name__}.count_vehicles", s["callers"])
+
+    def test_slow_query_log(self):
+        count_vehicles(self.db_path)
+
+        self.assertIn("SELECT * FROM vehicules", self.log_path.read_text(encoding="utf-8"))
+
+    def test_cursor_finalized_while_lock_held(self):
+        lock = threading.Lock()
+
+        def collect_under_lock():
+            with get_connection(self.db_path) as conn, lock:
+                cur = conn.cursor()
+                cur.execute("SELECT * FROM vehicules").fetchone()
+                del cur
+                gc.collect()
+
+        # Own lock: a deadlocked worker does not block the other tests
+        with mock.patch.object(query_trace, "_lock", lock):
+            worker = threading.Thread(target=collect_under_lock, daemon=True)
+            worker.start()
+            worker.join(timeout=5)
+        self.assertFalse(worker.is_alive())
+
+    def test_one_liner_on_temporary_cursor(self):
+        with get_connection(self.db_path) as conn:
+            for _ in range(10):
+                conn.execute("SELECT COUNT(*) FROM vehicules").fetchone()[0]
+
+        stats = {s["sql"]: s for s in get_query_stats()}
+        self.assertEqual(stats["SELECT COUNT(*) FROM vehicules"]["calls"], 10)
+        self.assertEqual(stats["SELECT COUNT(*) FROM vehicules"]["rows"], 10)
+
+    def test_disabled_by_default(self):
+        disable_query_tracing()
+        count_vehicles(self.db_path)
+
+        self.assertEqual(get_query_stats(), [])
@@ -0,0 +1,248 @@
+import unittest
+import sys
+from pathlib import Path
+import uuid
+import gc
+import shutil
+import time
+from unittest import mock
+
+from database import init_db, get_connection
+from services import report_service
+from services.report_service import (
+    generate_fleet_pdf,
+    generate_reports,
+    get_services,
+    render_fleet_pdf,
+    section,
+    ReportError,
+)
+
+try:
+    import reportlab  # noqa: F401
+    HAS_REPORTLAB = True
+except ImportError:
+    HAS_REPORTLAB = False
+
+try:
+    import pypdf  # noqa: F401
+    HAS_PYPDF = True
+except ImportError:
+    HAS_PYPDF = False
+
+
+class TestReportService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = Path("tests/_tmp")
+        cls.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def setUp(self):
+        self.db_path = self.tmp_dir / f"report_{uuid.uuid4().hex}.db"
+        self.out_dir = self.tmp_dir / f"report_out_{uuid.uuid4().hex}"
+        init_db(self.db_path)
+
+        with get_connection(self.db_path) as conn:
+            conn.execute(
+                """
+                INSERT INTO vehicules (
+                    immatriculation, marque, modele,
+                    type_vehicule, type_affectation, statut
+                ) VALUES ('RP-001', 'Renault', 'Clio', 'voiture', 'mutualise', 'disponible')
+                """
+            )
+            conn.executemany(
+                "INSERT INTO employes (matricule, nom, prenom, service) VALUES (?, ?, ?, ?)",
+                [("E1", "Doe", "John", "RH"), ("E2", "Roe", "Jane", "SAV")],
+            )
+            conn.executemany(
+                """
+                INSERT INTO sorties_reservations (
+                    vehicule_id, employe_id, date_sortie_reelle,
+                    km_depart, km_retour, statut
+                ) VALUES (1, ?, ?, ?, ?, 'terminée')
+                """,
+                [
+                    (1, "2025-03-10", 1000, 1100),
+                    (2, "2025-03-12", 1100, 1350),
+                    (2, "2024-12-31", 900, 1000),
+                ],
+            )
+            conn.execute(
+                """
+                INSERT INTO ravitaillements (vehicule_id, employe_id, date, quantite_litres, cout)
+                VALUES (1, 1, '2025-03-11', 40, 70)
+                """
+            )
+            conn.commit()
+
+    def tearDown(self):
+        report_service.SECTIONS.pop("test_lente", None)
+        shutil.rmtree(self.out_dir, ignore_errors=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        gc.collect()
+        for f in cls.tmp_dir.glob("report_*.db"):
+            try:
+                f.unlink()
+            except PermissionError:
+                pass
+
+    def _csv(self, *parts):
+        return (self.out_dir.joinpath(*parts)).read_text(encoding="utf-8-sig").splitlines()
+
+    def test_report_per_service(self):
+        summary = generate_reports(
+            self.out_dir, "2025-01-01", "2025-12-31",
+            services=get_services(self.db_path), formats=["csv"], db_path=self.db_path,
+        )
+
+        self.assertEqual([r["service"] for r in summary], ["RH", "SAV"])
+        self.assertEqual(self._csv("rh", "kilometrage.csv")[1], "RP-001;Renault;Clio;1;100")
+        self.assertEqual(self._csv("sav", "kilometrage.csv")[1], "RP-001;Renault;Clio;1;250")
+        self.assertEqual(len(self._csv("sav", "carburant.csv")), 1)
+        # Fleet-wide sections only in the fleet report
+        self.assertFalse((self.out_dir / "rh" / "maintenance.csv").exists())
+
+    def test_fleet_report(self):
+        summary = generate_reports(
+            self.out_dir, "2025-01-01", "2025-12-31",
+            formats=["csv"], db_path=self.db_path,
+        )
+
+        self.assertEqual(summary[0]["service"], "parc")
+        self.assertEqual(summary[0]["erreurs"], [])
+        self.assertEqual(self._csv("parc", "kilometrage.csv")[1], "RP-001;Renault;Clio;2;350")
+        self.assertIn("Total de véhicules;1", self._csv("parc", "synthese.csv"))
+
+    def test_trips_without_actual_departure(self):
+        # create_reservation only records the planned departure
+        with get_connection(self.db_path) as conn:
+            conn.execute(
+                """
+                INSERT INTO sorties_reservations (
+                    vehicule_id, employe_id, date_sortie_prevue,
+                    km_depart, km_retour, statut
+                ) VALUES (1, 1, '2025-04-02', 1350, 1400, 'terminée')
+                """
+            )
+            conn.commit()
+
+        generate_reports(
+            self.out_dir, "2025-01-01", "2025-12-31",
+            sections=["kilometrage", "employes"], formats=["csv"], db_path=self.db_path,
+        )
+
+        self.assertEqual(self._csv("parc", "kilometrage.csv")[1], "RP-001;Renault;Clio;3;400")
+        self.assertEqual(self._csv("parc", "employes.csv")[1].split(";")[:5], ["Doe", "John", "RH", "2", "150"])
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ReportError):
+            generate_reports(self.out_dir, "2025-12-31", "2025-01-01", formats=["csv"], db_path=self.db_path)
+        with self.assertRaises(ReportError):
+            generate_reports(self.out_dir, "2025-01-01", "2025-12-31", sections=["inconnue"],
+                             formats=["csv"], db_path=self.db_path)
+
+    def test_timeout_aborts_slow_section(self):
+        @section("test_lente", "Lente", ["n"])
+        def _slow(cur, params):
+            return cur.execute(
+                """
+                WITH RECURSIVE c(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM c)
+                SELECT MAX(n) FROM c
+                """
+            ).fetchall()
+
+        t0 = time.perf_counter()
+        summary = generate_reports(
+            self.out_dir, "2025-01-01", "2025-12-31",
+            sections=["test_lente", "kilometrage"], formats=["csv"],
+            timeout=0.5, db_path=self.db_path,
+        )
+
+        self.assertLess(time.perf_counter() - t0, 5)
+        self.assertEqual(len(summary[0]["erreurs"]), 1)
+        self.assertTrue((self.out_dir / "parc" / "kilometrage.csv").exists())
+
+    @unittest.skipUnless(HAS_REPORTLAB, "reportlab non installé")
+    def test_pdf_written(self):
+        summary = generate_reports(
+            self.out_dir, "2025-01-01", "2025-12-31",
+            formats=["pdf"], db_path=self.db_path,
+        )
+        pdf = summary[0]["fichiers"][0]
+        self.assertTrue(pdf.read_bytes().startswith(b"%PDF"))
+
+    # ---------- rapport complet du parc ----------
+
+    def _fleet_rows(self, n):
+        costs = [
+            {"immatriculation": f"FL-{i:04}", "cout_carburant": 10.0, "cout_maintenance": 5.0,
+             "cout_assurance": 0.0, "cout_total": 15.0}
+            for i in range(n)
+        ]
+        utilization = [
+            {"immatriculation": f"FL-{i:04}", "nombre_sorties": 1, "jours_utilises": 1,
+             "km_parcourus": 50, "taux_utilisation": 3.3}
+            for i in range(n)
+        ]
+        return {"total": n}, costs, utilization
+
+    def test_fleet_parts_keep_every_row(self):
+        rows = report_service._fleet_pdf_rows(*self._fleet_rows(250))
+        parts = report_service._fleet_pdf_parts(rows, 100)
+
+        self.assertEqual(
+            sum(len(chunk) for part in parts for _, _, chunk in part),
+            4 + 250 + 250,
+        )
+        self.assertTrue(all(sum(len(c) for _, _, c in part) <= 100 for part in parts))
+        # Section titles are printed once, on the chunk starting at row 0
+        firsts = [(name, first) for part in parts for name, first, _ in part if first == 0]
+        self.assertEqual(firsts, [("synthese", 0), ("couts", 0), ("utilisation", 0)])
+
+    def test_generate_fleet_pdf_reads_database(self):
+        # Rendering stubbed: the data calls are checked without reportlab
+        with mock.patch.object(report_service, "render_fleet_pdf", return_value={"pages": 1}) as render:
+            self.assertEqual(generate_fleet_pdf("parc.pdf", max_workers=1, db_path=self.db_path), {"pages": 1})
+
+        _, summary, costs, utilization = render.call_args.args
+        self.assertEqual(summary["total"], 1)
+        self.assertEqual([c["immatriculation"] for c in costs], ["RP-001"])
+        self.assertEqual([u["immatriculation"] for u in utilization], ["RP-001"])
+        self.assertEqual(render.call_args.kwargs, {"max_workers": 1})
+
+    @unittest.skipUnless(HAS_REPORTLAB, "reportlab non installé")
+    def test_fleet_pdf_not_truncated(self):
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        path = self.out_dir / "parc.pdf"
+        stats = render_fleet_pdf(path, *self._fleet_rows(300), max_workers=1)
+
+        self.assertTrue(path.read_bytes().startswith(b"%PDF"))
+        self.assertEqual(stats["parties"], 1)
+        self.assertGreater(stats["pages"], 10)
+
+    @unittest.skipUnless(HAS_REPORTLAB, "reportlab non installé")
+    def test_fleet_pdf_without_pypdf_warns(self):
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        path = self.out_dir / "parc.pdf"
+        with mock.patch.dict(sys.modules, {"pypdf": None}), \
+                self.assertLogs(report_service.logger, "WARNING") as logs:
+            stats = render_fleet_pdf(path, *self._fleet_rows(300), max_workers=2, rows_per_part=100)
+
+        self.assertEqual(stats["parties"], 1)
+        self.assertIn("pypdf", logs.output[0])
+
+    @unittest.skipUnless(HAS_REPORTLAB and HAS_PYPDF, "reportlab / pypdf non installés")
+    def test_fleet_pdf_parts_merged(self):
+        from pypdf import PdfReader
+
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        path = self.out_dir / "parc.pdf"
+        stats = render_fleet_pdf(path, *self._fleet_rows(300), max_workers=2, rows_per_part=100)
+
+        self.assertGreater(stats["parties"], 1)
+        self.assertEqual(len(PdfReader(str(path)).pages), stats["pages"])
+        self.assertEqual([p.name for p in self.out_dir.iterdir()], ["parc.pdf"])
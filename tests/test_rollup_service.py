@@ -0,0 +1,212 @@
+import unittest
+from pathlib import Path
+import uuid
+import gc
+from datetime import date
+
+from database import init_db, get_connection
+from services.dashboard_service import get_cost_evolution, get_mileage_by_period
+from services.fuel_service import record_fuel
+from services.maintenance_service import record_maintenance
+from services.reservation_service import return_vehicle
+from services.rollup_service import (
+    get_evolution,
+    months_back,
+    rebuild_rollups,
+    refresh_rollups,
+    split_period,
+    RollupError,
+)
+
+
+class TestRollupService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = Path("tests/_tmp")
+        cls.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def setUp(self):
+        self.db_path = self.tmp_dir / f"rollup_{uuid.uuid4().hex}.db"
+        init_db(self.db_path)
+
+        with get_connection(self.db_path) as conn:
+            conn.executemany(
+                """
+                INSERT INTO vehicules (
+                    immatriculation, marque, modele, type_vehicule,
+                    type_affectation, statut, service_principal
+                ) VALUES (?, 'Renault', 'Clio', ?, 'mutualise', 'disponible', ?)
+                """,
+                [("RO-001", "voiture", "Ventes"), ("RO-002", "utilitaire", "Atelier")],
+            )
+            conn.execute("INSERT INTO employes (matricule, nom, prenom) VALUES ('E1', 'Doe', 'John')")
+            conn.executemany(
+                """
+                INSERT INTO maintenances (vehicule_id, date, type_intervention, categorie, cout)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [
+                    (1, "2025-01-10", "Vidange", "maintenance", 120),
+                    (1, "2025-01-10", "Assurance annuelle", "assurance", 600),
+                    (2, "2025-02-15", "Plein diesel", "carburant", 80),
+                ],
+            )
+            conn.executemany(
+                "INSERT INTO ravitaillements (vehicule_id, employe_id, date, quantite_litres, cout) VALUES (?, 1, ?, 40, ?)",
+                [(1, "2025-01-31", 70), (2, "2025-02-01", 90)],
+            )
+            conn.executemany(
+                """
+                INSERT INTO sorties_reservations (
+                    vehicule_id, employe_id, date_sortie_reelle, km_depart, km_retour, statut
+                ) VALUES (?, 1, ?, ?, ?, ?)
+                """,
+                [
+                    (1, "2025-01-30", 1000, 1100, "terminée"),
+                    (1, "2025-02-03", 1100, 1400, "terminée"),
+                    (2, "2025-02-28", 500, None, "en sortie"),
+                ],
+            )
+            conn.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        gc.collect()
+        for f in cls.tmp_dir.glob("rollup_*.db"):
+            try:
+                f.unlink()
+            except PermissionError:
+                pass
+
+    def _fleet(self, granularity="month"):
+        return {
+            r["periode"]: (r["cout_carburant"], r["cout_maintenance"], r["cout_assurance"], r["km"])
+            for r in get_evolution(granularity, db_path=self.db_path)
+        }
+
+    def test_split_period(self):
+        self.assertEqual(split_period(), ((None, None), []))
+        self.assertEqual(split_period("2025-01-01", "2025-03-31"), (("2025-01", "2025-03"), []))
+        self.assertEqual(
+            split_period("2025-01-15", "2025-03-10"),
+            (("2025-02", "2025-02"), [("2025-01-15", "2025-01-31"), ("2025-03-01", "2025-03-10")]),
+        )
+        # Same partial month: one day range, no month
+        months, days = split_period("2025-02-03", "2025-02-20")
+        self.assertEqual(days, [("2025-02-03", "2025-02-20")])
+        self.assertGreater(months[0], months[1])
+        self.assertEqual(split_period(None, "2024-02-10"), ((None, "2024-01"), [("2024-02-01", "2024-02-10")]))
+
+    def test_aggregates(self):
+        self.assertEqual(
+            self._fleet(),
+            {"2025-01": (70.0, 120.0, 600.0, 100.0), "2025-02": (170.0, 0.0, 0.0, 300.0)},
+        )
+        by_service = get_evolution(group_by="service", start_date="2025-02", db_path=self.db_path)
+        self.assertEqual(
+            [(r["groupe"], r["cout_total"], r["km"]) for r in by_service],
+            [("Atelier", 170.0, 0.0), ("Ventes", 0.0, 300.0)],
+        )
+        with self.assertRaises(RollupError):
+            get_evolution(group_by="employe", db_path=self.db_path)
+
+    def test_incremental_refresh(self):
+        refresh_rollups(self.db_path)
+        self.assertEqual(sum(refresh_rollups(self.db_path).values()), 0)
+
+        with get_connection(self.db_path) as conn:
+            conn.execute(
+                """
+                INSERT INTO maintenances (vehicule_id, date, type_intervention, categorie, cout)
+                VALUES (2, '2025-02-20', 'Pneus', 'maintenance', 300)
+                """
+            )
+            # The open trip is returned
+            conn.execute("UPDATE sorties_reservations SET km_retour = 650, statut = 'terminée' WHERE id = 3")
+            conn.commit()
+
+        self.assertEqual(
+            refresh_rollups(self.db_path),
+            {"maintenances": 1, "ravitaillements": 0, "sorties_reservations": 1},
+        )
+        self.assertEqual(self._fleet()["2025-02"], (170.0, 300.0, 0.0, 450.0))
+        self.assertEqual(self._fleet("day")["2025-02-28"], (0.0, 0.0, 0.0, 150.0))
+
+        # Rows edited by hand: only a rebuild sees them
+        with get_connection(self.db_path) as conn:
+            conn.execute("DELETE FROM maintenances WHERE id = 4")
+            conn.commit()
+        rebuild_rollups(self.db_path)
+        self.assertEqual(self._fleet()["2025-02"], (170.0, 0.0, 0.0, 450.0))
+
+    def test_kept_current_without_scheduler(self):
+        # Existing rows: aggregated when the application starts
+        init_db(self.db_path)
+        self.assertEqual(self._fleet()["2025-02"], (170.0, 0.0, 0.0, 300.0))
+        self.assertEqual(sum(refresh_rollups(self.db_path).values()), 0)
+
+        record_fuel(1, 1, "2025-02-10", 30, 50, db_path=self.db_path)
+        record_maintenance(2, "2025-02-20", "Pneus", cout=300, db_path=self.db_path)
+        return_vehicle(3, 650, "propre", "plein", db_path=self.db_path)
+
+        self.assertEqual(sum(refresh_rollups(self.db_path).values()), 0)
+        self.assertEqual(self._fleet()["2025-02"], (220.0, 300.0, 0.0, 450.0))
+
+    def test_dashboard_reads(self):
+        mileage = get_mileage_by_period("2025-01-15", "2025-02-02", db_path=self.db_path)
+        self.assertEqual([(r["immatriculation"], r["km_periode"]) for r in mileage], [("RO-001", 100.0)])
+        mileage = get_mileage_by_period(db_path=self.db_path)
+        self.assertEqual([(r["immatriculation"], r["km_periode"]) for r in mileage], [("RO-001", 400.0)])
+
+        months = (date.today().year - 2025) * 12 + date.today().month
+        evolution = get_cost_evolution(months, db_path=self.db_path)
+        self.assertEqual(months_back(months), "2025-01")
+        self.assertEqual(
+            [(r["periode"], r["cout_carburant"], r["cout_maintenance"], r["cout_total"]) for r in evolution],
+            [("2025-01", 70.0, 720.0, 790.0), ("2025-02", 170.0, 0.0, 170.0)],
+        )
+
+    def test_reads_do_not_write(self):
+        def written():
+            with get_connection(self.db_path) as conn:
+                return (
+                    conn.execute("SELECT COUNT(*) FROM agregats_jour").fetchone()[0],
+                    conn.execute("SELECT COUNT(*) FROM app_state WHERE cle = 'agregats'").fetchone()[0],
+                )
+
+        months = (date.today().year - 2025) * 12 + date.today().month
+        get_mileage_by_period.__wrapped__(db_path=self.db_path)
+        get_cost_evolution.__wrapped__(months, db_path=self.db_path)
+        self._fleet()
+        self.assertEqual(written(), (0, 0))
+
+        # Rows past the watermark are read from the source tables
+        refresh_rollups(self.db_path)
+        with get_connection(self.db_path) as conn:
+            conn.execute(
+                """
+                INSERT INTO maintenances (vehicule_id, date, type_intervention, categorie, cout)
+                VALUES (2, '2025-02-20', 'Pneus', 'maintenance', 300)
+                """
+            )
+            conn.execute("UPDATE sorties_reservations SET km_retour = 650, statut = 'terminée' WHERE id = 3")
+            conn.commit()
+        before = written()
+
+        self.assertEqual(self._fleet()["2025-02"], (170.0, 300.0, 0.0, 450.0))
+        self.assertEqual(self._fleet("day")["2025-02-28"], (0.0, 0.0, 0.0, 150.0))
+        self.assertEqual(
+            [r["cout_total"] for r in get_cost_evolution.__wrapped__(months, db_path=self.db_path)][:2],
+            [790.0, 470.0],
+        )
+        mileage = get_mileage_by_period.__wrapped__("2025-02-01", "2025-02-28", db_path=self.db_path)
+        self.assertEqual(
+            [(r["immatriculation"], r["km_periode"]) for r in mileage],
+            [("RO-001", 300.0), ("RO-002", 150.0)],
+        )
+        self.assertEqual(written(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
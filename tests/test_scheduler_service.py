@@ -0,0 +1,110 @@
+import unittest
+from pathlib import Path
+import uuid
+import gc
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+from database import init_db
+from services import scheduler_service as scheduler
+from services.scheduler_service import (
+    job,
+    run_pending,
+    due_jobs,
+    get_job_states,
+    acquire_lock,
+    release_lock,
+    SchedulerError,
+)
+
+
+class TestSchedulerService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = Path("tests/_tmp")
+        cls.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def setUp(self):
+        self.db_path = self.tmp_dir / f"scheduler_{uuid.uuid4().hex}.db"
+        init_db(self.db_path)
+        self.calls = []
+
+        @job("test_ok", interval=60, jitter=0)
+        def _ok(db_path):
+            self.calls.append(db_path)
+
+        @job("test_fail", interval=60, jitter=0)
+        def _fail(db_path):
+            raise RuntimeError("boom")
+
+    def tearDown(self):
+        scheduler._JOBS.pop("test_ok", None)
+        scheduler._JOBS.pop("test_fail", None)
+
+    @classmethod
+    def tearDownClass(cls):
+        gc.collect()
+        for f in cls.tmp_dir.glob("scheduler_*"):
+            try:
+                f.unlink()
+            except PermissionError:
+                pass
+
+    def _state(self, name):
+        return next(s for s in get_job_states(self.db_path) if s["nom"] == name)
+
+    def test_due_jobs_run_and_persisted(self):
+        results = run_pending(self.db_path, only=["test_ok", "test_fail"])
+
+        self.assertEqual(results, {"test_fail": "erreur", "test_ok": "ok"})
+        self.assertEqual(self.calls, [self.db_path])
+        self.assertEqual(self._state("test_ok")["dernier_statut"], "ok")
+        self.assertIn("boom", self._state("test_fail")["derniere_erreur"])
+
+    def test_next_run_respects_interval(self):
+        run_pending(self.db_path, only=["test_ok"])
+
+        self.assertEqual(due_jobs(self.db_path, only=["test_ok"]), [])
+        later = datetime.now() + timedelta(seconds=61)
+        self.assertEqual(due_jobs(self.db_path, now=later, only=["test_ok"]), ["test_ok"])
+
+    def test_builtin_jobs_run(self):
+        results = run_pending(self.db_path, only=["alert_sweep", "log_archival", "analyze", "vacuum"])
+        self.assertEqual(set(results.values()), {"ok"})
+
+    def test_single_instance_lock(self):
+        lock = acquire_lock(self.db_path)
+        try:
+            with self.assertRaises(SchedulerError):
+                acquire_lock(self.db_path)
+        finally:
+            release_lock(lock)
+
+        release_lock(acquire_lock(self.db_path))
+
+    def test_lock_of_dead_process_released(self):
+        # Lock file left by a scheduler killed while holding it
+        code = (
+            "import os; from services import scheduler_service as s; "
+            f"s.acquire_lock({str(self.db_path)!r}); os._exit(0)"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
+        self.assertTrue(scheduler.lock_path(self.db_path).exists())
+
+        release_lock(acquire_lock(self.db_path))
+
+    def test_heartbeat_during_long_job(self):
+        lock = acquire_lock(self.db_path, heartbeat=0.05)
+        try:
+            first = scheduler.lock_path(self.db_path).read_text()
+            time.sleep(1.2)  # job longer than the heartbeat, timestamps in seconds
+            self.assertNotEqual(scheduler.lock_path(self.db_path).read_text(), first)
+            self.assertTrue(first.startswith(f"{os.getpid()} "))
+            with self.assertRaises(SchedulerError):
+                acquire_lock(self.db_path)
+        finally:
+            release_lock(lock)
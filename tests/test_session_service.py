@@ -0,0 +1,89 @@
+import unittest
+from pathlib import Path
+import uuid
+import gc
+
+from database import init_db, get_connection
+from auth import authenticate_user
+from services.user_service import create_user, set_user_active
+from services.session_service import (
+    create_session,
+    end_session,
+    get_session_user,
+    require_role,
+    SessionError,
+)
+
+
+class TestSessionService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = Path("tests/_tmp")
+        cls.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def setUp(self):
+        self.db_path = self.tmp_dir / f"session_{uuid.uuid4().hex}.db"
+        init_db(self.db_path)
+
+        create_user(
+            username="gest",
+            password="secret",
+            role="Gestionnaire",
+            nom="Martin",
+            prenom="Paul",
+            db_path=self.db_path,
+        )
+        self.user = authenticate_user("gest", "secret", self.db_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        gc.collect()
+        for f in cls.tmp_dir.glob("session_*.db"):
+            try:
+                f.unlink()
+            except PermissionError:
+                pass
+
+    def test_session_user_served_from_cache(self):
+        token = create_session(self.user, self.db_path)
+
+        # Changing the table directly is not seen while the cache is fresh
+        with get_connection(self.db_path) as conn:
+            conn.execute("UPDATE users SET role = 'Admin'")
+            conn.commit()
+
+        user = get_session_user(token, self.db_path)
+        self.assertEqual(user["role"], "Gestionnaire")
+
+    def test_require_role(self):
+        token = create_session(self.user, self.db_path)
+
+        self.assertEqual(
+            require_role(token, "Admin", "Gestionnaire", db_path=self.db_path)["username"],
+            "gest",
+        )
+        with self.assertRaises(SessionError):
+            require_role(token, "Admin", db_path=self.db_path)
+
+    def test_tampered_token(self):
+        token = create_session(self.user, self.db_path)
+        user_id, rest = token.split(".", 1)
+
+        with self.assertRaises(SessionError):
+            get_session_user(f"{int(user_id) + 1}.{rest}", self.db_path)
+
+    def test_deactivation_revokes_sessions(self):
+        token = create_session(self.user, self.db_path)
+
+        set_user_active(self.user["id"], False, db_path=self.db_path)
+
+        with self.assertRaises(SessionError):
+            get_session_user(token, self.db_path)
+
+    def test_end_session(self):
+        token = create_session(self.user, self.db_path)
+        end_session(token)
+
+        with self.assertRaises(SessionError):
+            get_session_user(token, self.db_path)
@@ -0,0 +1,143 @@
+import unittest
+from pathlib import Path
+import uuid
+import gc
+import os
+from datetime import date
+from unittest import mock
+
+from database import init_db, get_connection
+from services.dashboard_service import get_cost_evolution, get_mileage_by_period
+from services.snapshot_service import (
+    create_snapshot,
+    get_snapshot_info,
+    replica_path,
+    reporting_db,
+    SnapshotError,
+)
+
+
+class TestSnapshotService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = Path("tests/_tmp")
+        cls.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def setUp(self):
+        self.db_path = self.tmp_dir / f"snapshot_{uuid.uuid4().hex}.db"
+        self.replica = replica_path(self.db_path)
+        init_db(self.db_path)
+
+        with get_connection(self.db_path) as conn:
+            conn.execute(
+                """
+                INSERT INTO vehicules (
+                    immatriculation, marque, modele, type_vehicule,
+                    type_affectation, statut
+                ) VALUES ('SN-001', 'Renault', 'Clio', 'voiture', 'mutualise', 'disponible')
+                """
+            )
+            conn.execute("INSERT INTO employes (matricule, nom, prenom) VALUES ('E1', 'Doe', 'John')")
+            # Enough rows for a copy in several steps
+            conn.executemany(
+                "INSERT INTO ravitaillements (vehicule_id, employe_id, date, quantite_litres, cout) VALUES (1, 1, ?, 40, 70)",
+                [(f"2025-{m:02d}-{d:02d}",) for m in range(1, 13) for d in range(1, 29)] * 10,
+            )
+            conn.execute(
+                """
+                INSERT INTO sorties_reservations (
+                    vehicule_id, employe_id, date_sortie_reelle, km_depart, km_retour, statut
+                ) VALUES (1, 1, '2025-03-02', 1000, 1250, 'terminée')
+                """
+            )
+            conn.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        gc.collect()
+        for f in cls.tmp_dir.glob("snapshot_*.db*"):
+            try:
+                f.unlink()
+            except PermissionError:
+                pass
+
+    def _fuel_rows(self, db_path):
+        with get_connection(db_path) as conn:
+            return conn.execute("SELECT COUNT(*) FROM ravitaillements").fetchone()[0]
+
+    def test_snapshot_copies_and_skips_unchanged(self):
+        result = create_snapshot(self.db_path, pages=4, pause=0)
+
+        self.assertTrue(result["copie"])
+        self.assertGreater(result["etapes"], 1)
+        self.assertEqual(self._fuel_rows(self.replica), 3360)
+        self.assertEqual(get_snapshot_info(self.replica)["source"], str(self.db_path))
+        self.assertFalse(self.replica.with_name(self.replica.name + ".tmp").exists())
+
+        self.assertFalse(create_snapshot(self.db_path)["copie"])
+        self.assertTrue(create_snapshot(self.db_path, force=True)["copie"])
+
+        with get_connection(self.db_path) as conn:
+            conn.execute("DELETE FROM ravitaillements WHERE date >= '2025-07-01'")
+            conn.commit()
+        self.assertTrue(create_snapshot(self.db_path)["copie"])
+        self.assertEqual(self._fuel_rows(self.replica), 1680)
+
+        with self.assertRaises(SnapshotError):
+            create_snapshot(self.db_path, replica=self.db_path)
+
+    def test_writes_during_copy(self):
+        writes = []
+
+        def write(copied, total):
+            # Another connection commits between two steps: SQLite restarts the copy
+            if len(writes) < 3:
+                with get_connection(self.db_path) as conn:
+                    conn.execute(
+                        "INSERT INTO ravitaillements (vehicule_id, employe_id, date, quantite_litres, cout) "
+                        "VALUES (1, 1, '2026-01-01', 10, 15)"
+                    )
+                    conn.commit()
+                writes.append(copied)
+
+        result = create_snapshot(self.db_path, pages=4, pause=0, max_restarts=2, progress=write)
+
+        # Restarted with 16 pages per step, then copied in one step: the
+        # third write comes after the copy, with the two first committed
+        self.assertEqual(result["redemarrages"], 2)
+        self.assertEqual(len(writes), 3)
+        self.assertEqual(self._fuel_rows(self.replica), 3362)
+        with get_connection(self.replica) as conn:
+            self.assertEqual(conn.execute("PRAGMA integrity_check").fetchone()[0], "ok")
+
+    def test_reports_read_replica(self):
+        create_snapshot(self.db_path)
+
+        # Rollups completed in the copy: reading the replica writes nothing
+        with get_connection(self.replica) as conn:
+            self.assertGreater(conn.execute("SELECT COUNT(*) FROM agregats_mois").fetchone()[0], 0)
+        before = self.replica.stat().st_mtime_ns
+        self.assertEqual(
+            [(r["immatriculation"], r["km_periode"]) for r in get_mileage_by_period(db_path=self.replica)],
+            [("SN-001", 250.0)],
+        )
+        months = (date.today().year - 2025) * 12 + date.today().month
+        self.assertEqual(
+            [(r["periode"], r["cout_total"]) for r in get_cost_evolution.__wrapped__(months, db_path=self.replica)][:1],
+            [("2025-01", 19600.0)],
+        )
+        self.assertEqual(self.replica.stat().st_mtime_ns, before)
+
+    def test_reporting_db(self):
+        with mock.patch.dict(os.environ, {"PARC_AUTO_REPORT_SNAPSHOT": "0"}):
+            self.assertEqual(reporting_db(self.db_path), self.db_path)
+        with mock.patch.dict(os.environ, {"PARC_AUTO_REPORT_SNAPSHOT": "1"}):
+            # No replica yet: the database itself
+            self.assertEqual(reporting_db(self.db_path), self.db_path)
+            create_snapshot(self.db_path)
+            self.assertEqual(reporting_db(self.db_path), self.replica)
+
+
+if __name__ == "__main__":
+    unittest.main()
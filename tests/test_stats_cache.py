@@ -0,0 +1,144 @@
+import unittest
+from pathlib import Path
+import uuid
+import gc
+import time
+
+from database import init_db, get_connection
+from services.dashboard_service import get_fleet_summary
+from services.vehicle_service import create_vehicle
+from utils import stats_cache
+from utils.stats_cache import (
+    cached,
+    clear_cache,
+    configure_cache,
+    get_cache_stats,
+    invalidate_tables,
+    reset_cache_stats,
+)
+
+CALLS = []
+
+
+@cached("vehicules")
+def count_vehicles(db_path, statut=None):
+    CALLS.append(statut)
+    with get_connection(db_path) as conn:
+        if statut is None:
+            return conn.execute("SELECT COUNT(*) FROM vehicules").fetchone()[0]
+        return conn.execute(
+            "SELECT COUNT(*) FROM vehicules WHERE statut = ?", (statut,)
+        ).fetchone()[0]
+
+
+@cached("maintenances")
+def list_tables(db_path):
+    CALLS.append("tables")
+    return ["maintenances"]
+
+
+class TestStatsCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = Path("tests/_tmp")
+        cls.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def setUp(self):
+        self.db_path = self.tmp_dir / f"cache_{uuid.uuid4().hex}.db"
+        init_db(self.db_path)
+        CALLS.clear()
+        clear_cache()
+        reset_cache_stats()
+
+    def tearDown(self):
+        configure_cache(
+            ttl=stats_cache.DEFAULT_TTL_SECONDS,
+            max_entries=stats_cache.DEFAULT_MAX_ENTRIES,
+            enabled=True,
+        )
+        clear_cache()
+
+    @classmethod
+    def tearDownClass(cls):
+        gc.collect()
+        for f in cls.tmp_dir.glob("cache_*.db"):
+            try:
+                f.unlink()
+            except PermissionError:
+                pass
+
+    def _insert_vehicle(self, plate):
+        with get_connection(self.db_path) as conn:
+            conn.execute(
+                """
+                INSERT INTO vehicules (
+                    immatriculation, marque, modele,
+                    type_vehicule, type_affectation, statut
+                ) VALUES (?, 'Renault', 'Clio', 'voiture', 'mutualise', 'disponible')
+                """,
+                (plate,),
+            )
+            conn.commit()
+
+    def test_hits_keyed_by_arguments_and_db(self):
+        count_vehicles(self.db_path)
+        count_vehicles(db_path=str(self.db_path))
+        count_vehicles(self.db_path, statut="disponible")
+
+        self.assertEqual(CALLS, [None, "disponible"])
+        stats = get_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+        self.assertEqual(stats["functions"][f"{__name__}.count_vehicles"]["hits"], 1)
+
+    def test_table_invalidation(self):
+        self.assertEqual(count_vehicles(self.db_path), 0)
+        list_tables(self.db_path)
+        self._insert_vehicle("CA-001")
+
+        # Raw write without invalidation: the cached value is served
+        self.assertEqual(count_vehicles(self.db_path), 0)
+
+        invalidate_tables("vehicules", db_path=self.db_path)
+        self.assertEqual(count_vehicles(self.db_path), 1)
+        list_tables(self.db_path)
+        self.assertEqual(CALLS, [None, "tables", None])
+
+    def test_service_write_invalidates_dashboard(self):
+        self.assertEqual(get_fleet_summary(self.db_path)["total"], 0)
+        create_vehicle("CA-002", "Peugeot", "208", "voiture", "mutualise", db_path=self.db_path)
+
+        self.assertEqual(get_fleet_summary(self.db_path)["total"], 1)
+
+    def test_ttl_and_lru_eviction(self):
+        configure_cache(ttl=0.05)
+        count_vehicles(self.db_path)
+        time.sleep(0.1)
+        count_vehicles(self.db_path)
+        self.assertEqual(get_cache_stats()["expired"], 1)
+
+        configure_cache(ttl=60, max_entries=2)
+        count_vehicles(self.db_path, statut="a")
+        count_vehicles(self.db_path, statut="b")
+        count_vehicles(self.db_path, statut="a")  # "a" becomes most recent
+        count_vehicles(self.db_path, statut="c")  # evicts "b"
+
+        CALLS.clear()
+        count_vehicles(self.db_path, statut="a")
+        count_vehicles(self.db_path, statut="b")
+        self.assertEqual(CALLS, ["b"])
+        self.assertGreaterEqual(get_cache_stats()["evictions"], 1)
+
+    def test_returned_value_is_a_copy(self):
+        first = list_tables(self.db_path)
+        first.append("vehicules")
+
+        self.assertEqual(list_tables(self.db_path), ["maintenances"])
+
+    def test_disabled(self):
+        configure_cache(enabled=False)
+        count_vehicles(self.db_path)
+        count_vehicles(self.db_path)
+
+        self.assertEqual(len(CALLS), 2)
+        self.assertEqual(get_cache_stats()["entries"], 0)
@@ -0,0 +1,79 @@
+import unittest
+from pathlib import Path
+import uuid
+import gc
+from datetime import date
+
+from database import get_connection
+from utils.synthetic_data import generate_dataset
+
+
+class TestSyntheticData(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = Path("tests/_tmp")
+        cls.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def _db(self):
+        return self.tmp_dir / f"synthetic_{uuid.uuid4().hex}.db"
+
+    @classmethod
+    def tearDownClass(cls):
+        gc.collect()
+        for f in cls.tmp_dir.glob("synthetic_*.db"):
+            try:
+                f.unlink()
+            except PermissionError:
+                pass
+
+    def test_counts_match_tables(self):
+        db_path = self._db()
+        counts = generate_dataset(db_path, vehicles=5, employees=4, years=1, with_users=False)
+
+        with get_connection(db_path) as conn:
+            for table, count in counts.items():
+                self.assertEqual(
+                    conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0],
+                    count,
+                )
+
+        self.assertEqual(counts["vehicules"], 5)
+        self.assertGreater(counts["sorties_reservations"], 0)
+
+    def test_same_seed_same_data(self):
+        end = date(2026, 1, 1)
+        a, b = self._db(), self._db()
+        generate_dataset(a, vehicles=3, employees=2, years=1, seed=7, end_date=end, with_users=False)
+        generate_dataset(b, vehicles=3, employees=2, years=1, seed=7, end_date=end, with_users=False)
+
+        query = "SELECT vehicule_id, km_depart, km_retour FROM sorties_reservations ORDER BY id"
+        with get_connection(a) as ca, get_connection(b) as cb:
+            self.assertEqual(
+                [tuple(r) for r in ca.execute(query)],
+                [tuple(r) for r in cb.execute(query)],
+            )
+
+    def test_odometer_is_monotonic(self):
+        db_path = self._db()
+        generate_dataset(db_path, vehicles=2, employees=2, years=1, with_users=False)
+
+        with get_connection(db_path) as conn:
+            bad = conn.execute(
+                """
+                SELECT COUNT(*)
+                FROM sorties_reservations s1
+                JOIN sorties_reservations s2
+                  ON s2.vehicule_id = s1.vehicule_id AND s2.id = s1.id + 1
+                WHERE s2.km_depart < s1.km_retour
+                """
+            ).fetchone()[0]
+
+        self.assertEqual(bad, 0)
+
+    def test_refuses_non_empty_database(self):
+        db_path = self._db()
+        generate_dataset(db_path, vehicles=1, employees=1, years=1, with_users=False)
+
+        with self.assertRaises(ValueError):
+            generate_dataset(db_path, vehicles=1, employees=1, years=1, with_users=False)
@@ -3,8 +3,14 @@ from pathlib import Path
 import uuid
 import gc
 
-from database import init_db
-from services.user_service import create_user, UserCreationError
+from database import init_db, get_connection
+from utils.hashing import verify_password
+from services.user_service import (
+    create_user,
+    bulk_create_users,
+    import_users_from_csv,
+    UserCreationError,
+)
 
 
 class TestUserService(unittest.TestCase):
@@ -21,7 +27,7 @@ class TestUserService(unittest.TestCase):
     @classmethod
     def tearDownClass(cls):
         gc.collect()
-        for f in cls.tmp_dir.glob("user_*.db"):
+        for f in list(cls.tmp_dir.glob("user_*.db")) + list(cls.tmp_dir.glob("user_*.csv")):
             try:
                 f.unlink()
             except PermissionError:
@@ -67,3 +73,86 @@ class TestUserService(unittest.TestCase):
                 prenom="Guy",
                 db_path=self.db_path,
             )
+
+    def test_bulk_create_users_reports_row_errors(self):
+        create_user(
+            username="taken",
+            password="secret",
+            role="Admin",
+            nom="Root",
+            prenom="User",
+            db_path=self.db_path,
+        )
+
+        rows = [
+            {"username": "a", "password": "pa", "role": "Employe", "nom": "A", "prenom": "A"},
+            {"username": "b", "password": "pb", "role": "Hacker", "nom": "B", "prenom": "B"},
+            {"username": "taken", "password": "pc", "role": "Admin", "nom": "C", "prenom": "C"},
+            {"username": "a", "password": "pd", "role": "Employe", "nom": "D", "prenom": "D"},
+        ]
+
+        created, errors = bulk_create_users(rows, max_workers=1, db_path=self.db_path)
+
+        self.assertEqual(created, 1)
+        self.assertEqual([index for index, _ in errors], [1, 2, 3])
+
+    def test_bulk_create_users_actif(self):
+        rows = [
+            {"username": "off", "password": "p", "role": "Employe", "nom": "A", "prenom": "A", "actif": 0},
+            {"username": "off_csv", "password": "p", "role": "Employe", "nom": "B", "prenom": "B", "actif": "0"},
+            {"username": "default", "password": "p", "role": "Employe", "nom": "C", "prenom": "C", "actif": ""},
+            {"username": "on", "password": "p", "role": "Employe", "nom": "D", "prenom": "D"},
+        ]
+
+        bulk_create_users(rows, max_workers=1, db_path=self.db_path)
+
+        with get_connection(self.db_path) as conn:
+            actif = dict(conn.execute("SELECT username, actif FROM users").fetchall())
+        self.assertEqual(actif, {"off": 0, "off_csv": 0, "default": 1, "on": 1})
+
+    def test_bulk_create_users_process_pool(self):
+        create_user(
+            username="taken",
+            password="secret",
+            role="Admin",
+            nom="Root",
+            prenom="User",
+            db_path=self.db_path,
+        )
+        rows = [
+            {"username": f"u{i}", "password": f"p{i}", "role": "Employe", "nom": "N", "prenom": "P"}
+            for i in range(12)
+        ]
+        rows.insert(5, {"username": "u3", "password": "x", "role": "Employe", "nom": "N", "prenom": "P"})
+        rows.append({"username": "taken", "password": "x", "role": "Admin", "nom": "N", "prenom": "P"})
+
+        created, errors = bulk_create_users(rows, max_workers=2, db_path=self.db_path)
+
+        self.assertEqual(created, 12)
+        self.assertEqual([index for index, _ in errors], [5, 13])
+        with get_connection(self.db_path) as conn:
+            users = dict(conn.execute("SELECT username, password_hash FROM users").fetchall())
+        self.assertEqual(len(users), 13)
+        # Hashes from the pool stored with their own row
+        for i in range(12):
+            self.assertTrue(verify_password(f"p{i}", users[f"u{i}"]))
+
+    def test_import_users_from_csv(self):
+        csv_path = self.tmp_dir / f"user_{uuid.uuid4().hex}.csv"
+        csv_path.write_text(
+            "username;password;role;nom;prenom;email\n"
+            "jdoe;secret;Gestionnaire;Doe;John;jdoe@test.com\n"
+            ";secret;Employe;No;Name;\n",
+            encoding="utf-8",
+        )
+
+        created, errors = import_users_from_csv(csv_path, max_workers=1, db_path=self.db_path)
+
+        self.assertEqual(created, 1)
+        self.assertEqual(errors[0][0], 3)
+
+        with get_connection(self.db_path) as conn:
+            role = conn.execute(
+                "SELECT role FROM users WHERE username = 'jdoe'"
+            ).fetchone()["role"]
+        self.assertEqual(role, "Gestionnaire")
@@ -42,6 +42,24 @@ class TestVehicleService(unittest.TestCase):
             db_path=self.db_path,
         )
 
+    def test_vehicle_created_past_revision_threshold(self):
+        create_vehicle(
+            immatriculation="RV-001",
+            marque="Renault",
+            modele="Master",
+            type_vehicule="utilitaire",
+            type_affectation="mutualise",
+            kilometrage_actuel=20000,
+            seuil_revision_km=15000,
+            db_path=self.db_path,
+        )
+
+        with get_connection(self.db_path) as conn:
+            alert = conn.execute(
+                "SELECT source_type, statut FROM alertes"
+            ).fetchall()
+        self.assertEqual([tuple(a) for a in alert], [("revision_km", "retard")])
+
     def test_duplicate_immatriculation(self):
         create_vehicle(
             immatriculation="BB-456",
@@ -0,0 +1,112 @@
+# utils/chart_data.py
+"""
+Chart data reduced to what a figure can show, whatever the fleet size.
+
+    top_k(rows, 10, aggregate="mean")      # 10 largest + "Autres (n)"
+    histogram(rates, bins=10, lower=0, upper=100)
+    lttb(values, 200) / min_max(values, 100)   # indices of points kept
+
+Rows are tuples (label, value, ...). top_k keeps the k rows with the
+largest value and folds the rest into one "others" row (sum or mean of
+each value column). Time series are decimated by index: lttb
+(Largest-Triangle-Three-Buckets) keeps the points that preserve the
+visual shape of a line, min_max keeps the extremes of every bucket
+(spikes are never lost). Both return the indices to keep so that every
+series of a chart and its labels are cut the same way.
+"""
+import math
+
+OTHERS_LABEL = "Autres"
+
+
+def top_k(rows, k, key=1, aggregate="sum", others=OTHERS_LABEL):
+    """
+    The k rows with the largest rows[key], largest first, then
+    (f"{others} ({n})", ...) aggregating the n remaining rows.
+    """
+    if aggregate not in ("sum", "mean"):
+        raise ValueError(f"aggregate: 'sum' or 'mean', not {aggregate!r}")
+
+    ordered = sorted(rows, key=lambda row: row[key] or 0, reverse=True)
+    kept, rest = ordered[:k], ordered[k:]
+    if not rest:
+        return kept
+
+    columns = [[row[i] or 0 for row in rest] for i in range(1, len(rest[0]))]
+    values = [sum(c) if aggregate == "sum" else sum(c) / len(c) for c in columns]
+    return kept + [(f"{others} ({len(rest)})", *values)]
+
+
+def histogram(values, bins=10, lower=None, upper=None):
+    """
+    Counts of `values` in `bins` equal-width bins over [lower, upper]
+    (min / max of the values by default), values outside ignored.
+    Returns [(left edge, right edge, count)].
+    """
+    values = [v for v in values if v is not None]
+    if lower is None:
+        lower = min(values, default=0)
+    if upper is None:
+        upper = max(values, default=0)
+    if upper <= lower:
+        upper = lower + 1
+
+    width = (upper - lower) / bins
+    counts = [0] * bins
+    for v in values:
+        if lower <= v <= upper:
+            # The upper bound belongs to the last bin
+            counts[min(int((v - lower) / width), bins - 1)] += 1
+    return [(lower + i * width, lower + (i + 1) * width, c) for i, c in enumerate(counts)]
+
+
+def lttb(values, threshold):
+    """
+    Indices of `threshold` points of the series (x = index) chosen by
+    Largest-Triangle-Three-Buckets; every index when already shorter.
+    """
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    kept = [0]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        # Average of the next bucket (the last point for the last bucket)
+        following = range(end, min(int((i + 2) * every) + 1, n))
+        avg_x = sum(following) / len(following)
+        avg_y = sum(values[j] for j in following) / len(following)
+
+        ay = values[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((a - avg_x) * (values[j] - ay) - (a - j) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+
+    kept.append(n - 1)
+    return kept
+
+
+def min_max(values, buckets):
+    """
+    Indices of the minimum and maximum of each of `buckets` slices of the
+    series, in order, first and last points included (at most
+    2 * buckets + 2 points).
+    """
+    n = len(values)
+    if 2 * buckets + 2 >= n:
+        return list(range(n))
+
+    kept = {0, n - 1}
+    size = n / buckets
+    for b in range(buckets):
+        indices = range(math.floor(b * size), math.floor((b + 1) * size))
+        kept.add(min(indices, key=values.__getitem__))
+        kept.add(max(indices, key=values.__getitem__))
+    return sorted(kept)
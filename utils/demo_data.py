@@ -3,6 +3,7 @@ from datetime import date, datetime, timedelta
 import random
 
 from database import get_connection
+from services.maintenance_service import classify_intervention
 from utils.hashing import hash_password
 
 
@@ -134,17 +135,19 @@ def seed_reservations(cur):
 def seed_maintenances(cur):
     for _ in range(10):
         km = random.randint(30000, 90000)
+        intervention = random.choice(["Vidange", "Pneus", "Freins", "Révision"])
         cur.execute("""
             INSERT INTO maintenances (
-                vehicule_id, date, type_intervention,
+                vehicule_id, date, type_intervention, categorie,
                 kilometrage, cout, prestataire, remarques,
                 date_prochaine_echeance
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             random.randint(1, 5),
             date.today() - timedelta(days=random.randint(30, 400)),
-            random.choice(["Vidange", "Pneus", "Freins", "Révision"]),
+            intervention,
+            classify_intervention(intervention),
             km,
             random.randint(120, 1200),
             "Garage Central",
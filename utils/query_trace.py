@@ -0,0 +1,313 @@
+# utils/query_trace.py
+"""
+Opt-in SQL instrumentation for database.get_connection.
+
+When enabled, connections are created with TracedConnection: every
+statement is timed (execute + fetches), its returned rows counted and
+attributed to the calling service function. Statements slower than the
+threshold are appended to a slow-query log.
+
+Enable from code with enable_query_tracing(), or for a whole process
+with the PARC_AUTO_TRACE_SQL=1 environment variable
+(PARC_AUTO_SLOW_QUERY_MS and PARC_AUTO_SLOW_QUERY_LOG tune the log).
+"""
+from collections import Counter
+from datetime import datetime
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import weakref
+
+# Upper bounds (ms) of the latency histogram buckets
+HISTOGRAM_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, float("inf"))
+
+_IGNORED_FILES = (__file__, sqlite3.__file__)
+
+_lock = threading.Lock()
+# Statements finished by cursor finalizers: garbage collection may run on
+# a thread holding _lock, so they are queued and recorded by the next
+# _record() / get_query_stats()
+_finished = queue.SimpleQueue()
+_enabled = False
+_slow_threshold_ms = 100.0
+_slow_log_path = None
+_stats = {}
+
+
+class _StatementStats:
+
+    __slots__ = ("sql", "calls", "total_ms", "max_ms", "rows", "histogram", "callers")
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.histogram = [0] * len(HISTOGRAM_BUCKETS_MS)
+        self.callers = Counter()
+
+
+def enable_query_tracing(slow_threshold_ms: float = 100.0, slow_log_path=None):
+    """
+    Trace connections opened from now on.
+    slow_log_path: file receiving one line per statement slower than
+    slow_threshold_ms (None keeps slow statements in the stats only).
+    """
+    global _enabled, _slow_threshold_ms, _slow_log_path
+    with _lock:
+        _enabled = True
+        _slow_threshold_ms = float(slow_threshold_ms)
+        _slow_log_path = slow_log_path
+
+
+def disable_query_tracing():
+    global _enabled
+    with _lock:
+        _enabled = False
+
+
+def is_tracing_enabled() -> bool:
+    return _enabled
+
+
+def reset_query_stats():
+    with _lock:
+        while not _finished.empty():
+            _finished.get_nowait()
+        _stats.clear()
+
+
+def get_query_stats():
+    """
+    Return one dict per distinct statement, slowest total time first.
+    """
+    _drain()
+    with _lock:
+        snapshot = list(_stats.values())
+
+    result = []
+    for s in snapshot:
+        result.append({
+            "sql": s.sql,
+            "calls": s.calls,
+            "total_ms": round(s.total_ms, 3),
+            "avg_ms": round(s.total_ms / s.calls, 3) if s.calls else 0.0,
+            "max_ms": round(s.max_ms, 3),
+            "rows": s.rows,
+            "histogram": {
+                _bucket_label(bound): count
+                for bound, count in zip(HISTOGRAM_BUCKETS_MS, s.histogram)
+            },
+            "callers": dict(s.callers.most_common()),
+        })
+
+    result.sort(key=lambda r: r["total_ms"], reverse=True)
+    return result
+
+
+def format_query_stats(limit: int = 20, sql_width: int = 70) -> str:
+    """
+    Render get_query_stats() as a fixed-width text table.
+    """
+    stats = get_query_stats()[:limit]
+    if not stats:
+        return "Aucune requête tracée"
+
+    header = f"{'total ms':>10} {'appels':>7} {'moy ms':>9} {'max ms':>9} {'lignes':>9}  {'appelant':<40} requête"
+    lines = [header, "-" * len(header)]
+
+    for s in stats:
+        caller = next(iter(s["callers"]), "?")
+        sql = s["sql"] if len(s["sql"]) <= sql_width else s["sql"][: sql_width - 3] + "..."
+        lines.append(
+            f"{s['total_ms']:>10.1f} {s['calls']:>7} {s['avg_ms']:>9.2f} "
+            f"{s['max_ms']:>9.2f} {s['rows']:>9}  {caller:<40} {sql}"
+        )
+
+    return "\n".join(lines)
+
+
+def _bucket_label(bound):
+    return f"<{bound:g}ms" if bound != float("inf") else ">=1000ms"
+
+
+def _normalize(sql):
+    return " ".join(sql.split())
+
+
+def _caller():
+    """
+    First frame outside this module, database.py and sqlite3.
+    """
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename not in _IGNORED_FILES and not filename.endswith("database.py"):
+            module = frame.f_globals.get("__name__", "?")
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "?"
+
+
+def _record(sql, elapsed_ms, rows, caller):
+    _finished.put((sql, elapsed_ms, rows, caller))
+    _drain()
+
+
+def _drain():
+    slow_lines = []
+    with _lock:
+        while True:
+            try:
+                sql, elapsed_ms, rows, caller = _finished.get_nowait()
+            except queue.Empty:
+                break
+
+            stats = _stats.get(sql)
+            if stats is None:
+                stats = _stats[sql] = _StatementStats(sql)
+
+            stats.calls += 1
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.rows += rows
+            stats.callers[caller] += 1
+
+            for i, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+                if elapsed_ms < bound:
+                    stats.histogram[i] += 1
+                    break
+
+            if elapsed_ms >= _slow_threshold_ms:
+                slow_lines.append(
+                    f"{datetime.now().isoformat(timespec='seconds')}\t{elapsed_ms:.1f}ms\t"
+                    f"{rows} lignes\t{caller}\t{sql}\n"
+                )
+        log_path = _slow_log_path
+
+        if slow_lines and log_path:
+            with open(log_path, "a", encoding="utf-8") as f:
+                f.writelines(slow_lines)
+
+
+class TracedCursor(sqlite3.Cursor):
+    """
+    Cursor timing each statement from execute() until its rows are
+    consumed (SQLite does most of the work while stepping through rows).
+    """
+
+    _pending = None
+
+    def _finish(self):
+        pending = self._pending
+        if pending is not None:
+            self._pending = None
+            _record(*pending)
+
+    def _start(self, sql):
+        self._finish()
+        self._pending = [_normalize(sql), 0.0, 0, _caller()]
+
+    def _timed(self, method, *args):
+        t0 = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            if self._pending is not None:
+                self._pending[1] += (time.perf_counter() - t0) * 1000
+
+    def execute(self, sql, parameters=()):
+        self._start(sql)
+        self._timed(super().execute, sql, parameters)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._start(sql)
+        self._timed(super().executemany, sql, seq_of_parameters)
+        self._finish()
+        return self
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._finish()
+        elif self._pending is not None:
+            self._pending[2] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(super().fetchmany, self.arraysize if size is None else size)
+        if self._pending is not None:
+            self._pending[2] += len(rows)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        if self._pending is not None:
+            self._pending[2] += len(rows)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # Queued only: see _finished
+        pending = self._pending
+        if pending is not None:
+            self._pending = None
+            _finished.put(tuple(pending))
+
+
+class TracedConnection(sqlite3.Connection):
+    """
+    Connection whose cursors (including conn.execute shortcuts) are traced.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cursors = weakref.WeakSet()
+
+    def cursor(self, factory=TracedCursor):
+        cur = super().cursor(factory)
+        if isinstance(cur, TracedCursor):
+            self._cursors.add(cur)
+        return cur
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def _finish_cursors(self):
+        for cur in list(self._cursors):
+            cur._finish()
+
+    def __exit__(self, *exc):
+        self._finish_cursors()
+        return super().__exit__(*exc)
+
+    def close(self):
+        self._finish_cursors()
+        super().close()
+
+
+if os.environ.get("PARC_AUTO_TRACE_SQL") == "1":
+    enable_query_tracing(
+        slow_threshold_ms=float(os.environ.get("PARC_AUTO_SLOW_QUERY_MS", 100)),
+        slow_log_path=os.environ.get("PARC_AUTO_SLOW_QUERY_LOG"),
+    )
@@ -0,0 +1,160 @@
+# utils/stats_cache.py
+"""
+In-process memoization of read-only statistics (services.dashboard_service).
+
+    @cached("vehicules", "maintenances")
+    def get_detailed_costs_by_vehicle(db_path=...): ...
+
+Results are keyed by function, arguments and db_path, expire after a TTL
+(writes made by other processes) and are evicted least-recently-used
+beyond a maximum number of entries. Services call invalidate_tables()
+after committing a write, which drops every entry that read one of the
+written tables. Lists and dicts are returned as shallow copies so that
+callers cannot alter the cached value.
+
+Hit / miss counters are available from get_cache_stats().
+PARC_AUTO_STATS_CACHE=0 disables the cache for a whole process,
+PARC_AUTO_STATS_CACHE_TTL sets the TTL in seconds.
+"""
+from collections import OrderedDict
+import copy
+import functools
+import inspect
+import os
+import threading
+import time
+
+DEFAULT_TTL_SECONDS = 60.0
+DEFAULT_MAX_ENTRIES = 256
+
+_lock = threading.Lock()
+_enabled = os.environ.get("PARC_AUTO_STATS_CACHE", "1") != "0"
+_ttl = float(os.environ.get("PARC_AUTO_STATS_CACHE_TTL", DEFAULT_TTL_SECONDS))
+_max_entries = DEFAULT_MAX_ENTRIES
+
+# key -> (expires, tables, db, value), least recently used first
+_entries = OrderedDict()
+# Bumped by every invalidation: a result computed across one is not stored
+_generation = 0
+_counters = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+_per_function = {}
+
+
+def configure_cache(ttl: float | None = None, max_entries: int | None = None, enabled: bool | None = None):
+    global _ttl, _max_entries, _enabled
+    with _lock:
+        if ttl is not None:
+            _ttl = float(ttl)
+        if max_entries is not None:
+            _max_entries = max(1, int(max_entries))
+            while len(_entries) > _max_entries:
+                _entries.popitem(last=False)
+                _counters["evictions"] += 1
+        if enabled is not None:
+            _enabled = bool(enabled)
+            if not _enabled:
+                _entries.clear()
+
+
+def cached(*tables):
+    """
+    Memoize a function reading `tables`. The function must take a
+    db_path parameter; other arguments must be hashable.
+    The undecorated function stays available as func.__wrapped__.
+    """
+    table_set = frozenset(tables)
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            db = str(bound.arguments["db_path"])
+            key = (name, tuple(
+                (arg, db if arg == "db_path" else value)
+                for arg, value in bound.arguments.items()
+            ))
+            now = time.monotonic()
+
+            with _lock:
+                stats = _per_function.setdefault(name, {"hits": 0, "misses": 0})
+                entry = _entries.get(key)
+                if entry is not None:
+                    if entry[0] > now:
+                        _entries.move_to_end(key)
+                        _counters["hits"] += 1
+                        stats["hits"] += 1
+                        return copy.copy(entry[3])
+                    del _entries[key]
+                    _counters["expired"] += 1
+                _counters["misses"] += 1
+                stats["misses"] += 1
+                generation = _generation
+
+            value = func(*args, **kwargs)
+
+            with _lock:
+                if generation == _generation and _enabled:
+                    _entries[key] = (now + _ttl, table_set, db, value)
+                    _entries.move_to_end(key)
+                    while len(_entries) > _max_entries:
+                        _entries.popitem(last=False)
+                        _counters["evictions"] += 1
+            return copy.copy(value)
+
+        return wrapper
+    return decorator
+
+
+def invalidate_tables(*tables, db_path=None):
+    """
+    Drop the entries that read one of `tables` (every entry when no
+    table is given), for one database or all of them.
+    """
+    global _generation
+    written = set(tables)
+    db = None if db_path is None else str(db_path)
+
+    with _lock:
+        _generation += 1
+        stale = [
+            key for key, (_, read, entry_db, _) in _entries.items()
+            if (db is None or entry_db == db) and (not written or read & written)
+        ]
+        for key in stale:
+            del _entries[key]
+        _counters["invalidations"] += len(stale)
+
+
+def clear_cache():
+    invalidate_tables()
+
+
+def reset_cache_stats():
+    with _lock:
+        for name in _counters:
+            _counters[name] = 0
+        _per_function.clear()
+
+
+def get_cache_stats():
+    """
+    Global counters, current size and per-function hits / misses.
+    """
+    with _lock:
+        lookups = _counters["hits"] + _counters["misses"]
+        return {
+            **_counters,
+            "hit_ratio": round(_counters["hits"] / lookups, 3) if lookups else None,
+            "entries": len(_entries),
+            "max_entries": _max_entries,
+            "ttl_s": _ttl,
+            "enabled": _enabled,
+            "functions": {name: dict(s) for name, s in sorted(_per_function.items())},
+        }
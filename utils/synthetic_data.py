@@ -0,0 +1,382 @@
+# utils/synthetic_data.py
+"""
+Parametrised synthetic dataset for load testing and benchmarks.
+
+Unlike utils/demo_data (a handful of hand-picked rows), every table is
+generated from a fixed seed with plausible distributions and bulk-loaded
+with executemany inside a single transaction.
+"""
+from datetime import date, datetime, timedelta
+import random
+
+from database import get_connection, init_db
+from services.maintenance_service import classify_intervention
+from utils.hashing import hash_password
+
+
+_BATCH_SIZE = 50_000
+
+_MARQUES = [
+    ("Peugeot", ["208", "308", "3008", "Partner", "Expert"]),
+    ("Renault", ["Clio", "Megane", "Kangoo", "Trafic", "Zoe"]),
+    ("Citroën", ["C3", "C4", "Berlingo", "Jumpy"]),
+    ("Toyota", ["Yaris", "Corolla", "C-HR", "Proace"]),
+    ("Volkswagen", ["Polo", "Golf", "Caddy", "Transporter"]),
+    ("Tesla", ["Model 3", "Model Y"]),
+]
+_TYPES = [("Voiture", 0.6), ("Utilitaire", 0.25), ("Camionnette", 0.15)]
+_CARBURANTS = [("Diesel", 0.45), ("Essence", 0.3), ("Hybride", 0.15), ("Électrique", 0.1)]
+_STATUTS = [
+    ("disponible", 0.75),
+    ("en_sortie", 0.12),
+    ("en_maintenance", 0.08),
+    ("en_panne", 0.03),
+    ("immobilise", 0.02),
+]
+_SERVICES = ["Commercial", "Technique", "RH", "Logistique", "Direction", "Achats", "SAV"]
+_NOMS = [
+    "Martin", "Bernard", "Thomas", "Petit", "Robert", "Richard", "Durand",
+    "Dubois", "Moreau", "Laurent", "Simon", "Michel", "Lefebvre", "Leroy",
+    "Roux", "David", "Bertrand", "Morel", "Fournier", "Girard",
+]
+_PRENOMS = [
+    "Julie", "Paul", "Marie", "Lucas", "Emma", "Hugo", "Léa", "Louis",
+    "Chloé", "Jules", "Camille", "Arthur", "Manon", "Nathan", "Sarah",
+]
+_MOTIFS = ["Rendez-vous client", "Livraison", "Déplacement pro", "Formation", "Chantier"]
+_DESTINATIONS = ["Paris", "Lyon", "Marseille", "Lille", "Nantes", "Bordeaux", "Toulouse", "Rennes"]
+_STATIONS = ["Total", "Shell", "BP", "Esso", "Intermarché", "Leclerc"]
+_INTERVENTIONS = [("Vidange", 0.35), ("Pneus", 0.25), ("Freins", 0.2), ("Carrosserie", 0.1), ("Batterie", 0.1)]
+_DOCUMENTS = [("Assurance", 365), ("Contrôle technique", 730), ("Vignette", 365)]
+
+
+def _weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights)[0]
+
+
+def _immatriculation(i):
+    """
+    Unique SIV-like plate (AA-000-AA) for the i-th vehicle.
+    """
+    letter = lambda n: chr(65 + n % 26)
+    return f"{letter(i // 26_000)}{letter(i // 1000)}-{i % 1000:03}-{letter(i)}{letter(i // 26)}"
+
+
+class _BulkInserter:
+    """
+    Buffer rows for one INSERT statement and flush them with executemany.
+    """
+
+    def __init__(self, cur, sql, batch_size=_BATCH_SIZE):
+        self.cur = cur
+        self.sql = sql
+        self.batch_size = batch_size
+        self.rows = []
+        self.count = 0
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.cur.executemany(self.sql, self.rows)
+            self.count += len(self.rows)
+            self.rows = []
+
+
+def generate_dataset(
+    db_path,
+    vehicles: int = 100,
+    employees: int = 50,
+    years: int = 2,
+    seed: int = 42,
+    end_date: date | None = None,
+    with_users: bool = True,
+):
+    """
+    Fill an empty database with a synthetic fleet history.
+
+    Each vehicle gets `years` of trips (gaps and distances drawn from
+    exponential/log-normal laws), refuels when its tank range is used,
+    km-based revisions plus random repairs, and renewed documents.
+    The same seed always produces the same database.
+
+    Returns a dict {table: inserted row count}.
+    """
+    if vehicles <= 0 or employees <= 0 or years <= 0:
+        raise ValueError("vehicles, employees et years doivent être positifs")
+
+    rng = random.Random(seed)
+    end_date = end_date or date.today()
+    start_date = end_date - timedelta(days=365 * years)
+
+    init_db(db_path)
+
+    with get_connection(db_path) as conn:
+        cur = conn.cursor()
+
+        cur.execute("SELECT COUNT(*) FROM vehicules")
+        if cur.fetchone()[0] > 0:
+            raise ValueError("La base contient déjà des véhicules")
+
+        # Bulk-load settings, scoped to this connection
+        cur.execute("PRAGMA synchronous = OFF")
+        cur.execute("PRAGMA journal_mode = MEMORY")
+
+        counts = {}
+
+        if with_users:
+            counts["users"] = _generate_users(cur)
+
+        counts["employes"] = _generate_employees(cur, rng, employees, end_date)
+        counts["vehicules"] = _generate_vehicles(cur, rng, vehicles, start_date)
+        counts["affectations_permanentes"] = _generate_affectations(
+            cur, rng, vehicles, employees, start_date
+        )
+        counts.update(
+            _generate_history(cur, rng, vehicles, employees, start_date, end_date)
+        )
+
+        conn.commit()
+
+    return counts
+
+
+def _generate_users(cur):
+    users = [
+        ("admin", "admin123", "Admin", "Root", "Admin"),
+        ("gestion", "gestion123", "Gestionnaire", "Martin", "Paul"),
+        ("employe", "employe123", "Employe", "Durand", "Julie"),
+    ]
+    cur.executemany(
+        """
+        INSERT INTO users (username, password_hash, role, nom, prenom, email, actif)
+        VALUES (?, ?, ?, ?, ?, ?, 1)
+        """,
+        [
+            (u, hash_password(p), role, nom, prenom, f"{u}@company.com")
+            for u, p, role, nom, prenom in users
+        ],
+    )
+    return len(users)
+
+
+def _generate_employees(cur, rng, count, end_date):
+    rows = []
+    for i in range(1, count + 1):
+        nom = rng.choice(_NOMS)
+        prenom = rng.choice(_PRENOMS)
+        # ~5 % of licences already expired, the rest valid for up to 10 years
+        if rng.random() < 0.05:
+            validite = end_date - timedelta(days=rng.randint(1, 400))
+        else:
+            validite = end_date + timedelta(days=rng.randint(1, 3650))
+        rows.append((
+            f"EMP{i:06}",
+            nom,
+            prenom,
+            rng.choice(_SERVICES),
+            f"06{rng.randint(0, 99_999_999):08}",
+            f"{prenom.lower()}.{nom.lower()}{i}@company.com",
+            f"PERMIS{i:08}",
+            validite.isoformat(),
+            1 if rng.random() < 0.9 else 0,
+        ))
+
+    cur.executemany(
+        """
+        INSERT INTO employes (
+            matricule, nom, prenom, service, telephone, email,
+            num_permis, date_validite_permis, autorise_conduire
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    return len(rows)
+
+
+def _generate_vehicles(cur, rng, count, start_date):
+    rows = []
+    for i in range(1, count + 1):
+        marque, modeles = rng.choice(_MARQUES)
+        acquisition = start_date - timedelta(days=rng.randint(0, 1500))
+        rows.append((
+            _immatriculation(i),
+            marque,
+            rng.choice(modeles),
+            _weighted(rng, _TYPES),
+            acquisition.year,
+            acquisition.isoformat(),
+            rng.randint(0, 40_000),
+            _weighted(rng, _CARBURANTS),
+            rng.randint(4, 11),
+            "fonction" if rng.random() < 0.2 else "mutualise",
+            _weighted(rng, _STATUTS),
+            rng.choice(_SERVICES),
+            rng.choice([10_000, 15_000, 20_000, 30_000]),
+        ))
+
+    cur.executemany(
+        """
+        INSERT INTO vehicules (
+            immatriculation, marque, modele, type_vehicule,
+            annee, date_acquisition, kilometrage_actuel,
+            carburant, puissance_fiscale, type_affectation,
+            statut, service_principal, seuil_revision_km
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    return len(rows)
+
+
+def _generate_affectations(cur, rng, vehicles, employees, start_date):
+    cur.execute("SELECT id FROM vehicules WHERE type_affectation = 'fonction'")
+    rows = [
+        (
+            vehicule_id,
+            rng.randint(1, employees),
+            (start_date + timedelta(days=rng.randint(0, 180))).isoformat(),
+        )
+        for (vehicule_id,) in cur.fetchall()
+    ]
+    cur.executemany(
+        """
+        INSERT INTO affectations_permanentes (vehicule_id, employe_id, date_debut, date_fin)
+        VALUES (?, ?, ?, NULL)
+        """,
+        rows,
+    )
+    return len(rows)
+
+
+def _generate_history(cur, rng, vehicles, employees, start_date, end_date):
+    sorties = _BulkInserter(cur, """
+        INSERT INTO sorties_reservations (
+            vehicule_id, employe_id,
+            date_sortie_prevue, heure_sortie_prevue,
+            date_retour_prevue, heure_retour_prevue,
+            date_sortie_reelle, heure_sortie_reelle, km_depart,
+            date_retour_reelle, heure_retour_reelle, km_retour,
+            motif, destination, etat_retour, niveau_carburant_retour, statut
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'terminée')
+    """)
+    ravitaillements = _BulkInserter(cur, """
+        INSERT INTO ravitaillements (
+            vehicule_id, employe_id, date, quantite_litres, cout, station, kilometrage
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+    """)
+    maintenances = _BulkInserter(cur, """
+        INSERT INTO maintenances (
+            vehicule_id, date, type_intervention, categorie, kilometrage,
+            cout, prestataire, remarques, date_prochaine_echeance
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """)
+    documents = _BulkInserter(cur, """
+        INSERT INTO documents (
+            vehicule_id, type_document, date_emission, date_echeance,
+            chemin_fichier, description
+        ) VALUES (?, ?, ?, ?, ?, ?)
+    """)
+
+    start = datetime.combine(start_date, datetime.min.time())
+    end = datetime.combine(end_date, datetime.min.time())
+
+    cur.execute("SELECT id, kilometrage_actuel, seuil_revision_km, carburant FROM vehicules")
+    fleet = cur.fetchall()
+
+    for vehicule_id, km, seuil, carburant in fleet:
+        # Per-vehicle usage profile: some vehicles sit idle, others run daily
+        mean_gap_hours = rng.uniform(12, 96)
+        consommation = 0 if carburant == "Électrique" else rng.uniform(4.5, 9.5)
+        next_revision = km + seuil
+        fuel_km = 0.0
+        t = start + timedelta(hours=rng.expovariate(1 / mean_gap_hours))
+
+        while t < end:
+            if rng.random() < 0.1:
+                duration = timedelta(hours=rng.uniform(24, 120))
+                distance = int(rng.lognormvariate(5.8, 0.5))
+            else:
+                duration = timedelta(hours=rng.uniform(1, 10))
+                distance = int(rng.lognormvariate(4.0, 0.7))
+            retour = t + duration
+            if retour >= end:
+                break
+
+            employe_id = rng.randint(1, employees)
+            d_sortie = t.date().isoformat()
+            h_sortie = t.strftime("%H:%M")
+            d_retour = retour.date().isoformat()
+            h_retour = retour.strftime("%H:%M")
+            sorties.add((
+                vehicule_id, employe_id,
+                d_sortie, h_sortie, d_retour, h_retour,
+                d_sortie, h_sortie, km,
+                d_retour, h_retour, km + distance,
+                rng.choice(_MOTIFS), rng.choice(_DESTINATIONS),
+                "propre" if rng.random() < 0.85 else "sale",
+                rng.choice(["plein", "3/4", "1/2", "1/4"]),
+            ))
+            km += distance
+            fuel_km += distance
+
+            if consommation and fuel_km >= 550:
+                litres = round(fuel_km * consommation / 100, 1)
+                ravitaillements.add((
+                    vehicule_id, employe_id, d_retour,
+                    litres, round(litres * rng.uniform(1.65, 1.95), 2),
+                    rng.choice(_STATIONS), km,
+                ))
+                fuel_km = 0.0
+
+            if km >= next_revision:
+                revision_date = retour.date()
+                maintenances.add((
+                    vehicule_id, revision_date.isoformat(), "Révision",
+                    classify_intervention("Révision"), km,
+                    round(rng.uniform(150, 600), 2), "Garage Central", None,
+                    (revision_date + timedelta(days=365)).isoformat(),
+                ))
+                next_revision = km + seuil
+
+            if rng.random() < 0.004:
+                intervention = _weighted(rng, _INTERVENTIONS)
+                maintenances.add((
+                    vehicule_id, retour.date().isoformat(), intervention,
+                    classify_intervention(intervention), km,
+                    round(rng.lognormvariate(5.5, 0.6), 2), rng.choice(["Garage Central", "Speedy", "Norauto"]),
+                    None, None,
+                ))
+
+            t = retour + timedelta(hours=rng.expovariate(1 / mean_gap_hours))
+
+        cur.execute(
+            "UPDATE vehicules SET kilometrage_actuel = ? WHERE id = ?",
+            (km, vehicule_id),
+        )
+
+        for doc_type, validite in _DOCUMENTS:
+            emission = start_date - timedelta(days=rng.randint(0, validite - 1))
+            while emission <= end_date:
+                echeance = emission + timedelta(days=validite)
+                documents.add((
+                    vehicule_id, doc_type, emission.isoformat(), echeance.isoformat(),
+                    f"docs/{doc_type.lower().replace(' ', '_')}_{vehicule_id}_{emission.year}.pdf",
+                    f"{doc_type} du véhicule",
+                ))
+                emission = echeance
+
+    for inserter in (sorties, ravitaillements, maintenances, documents):
+        inserter.flush()
+
+    return {
+        "sorties_reservations": sorties.count,
+        "ravitaillements": ravitaillements.count,
+        "maintenances": maintenances.count,
+        "documents": documents.count,
+    }
+